@@ -4,6 +4,10 @@ from scipy.constants import mu_0, pi
 from scipy.special import erf
 from SimPEG import Utils
 
+orientationDict = {
+    'X': np.r_[1., 0., 0.], 'Y': np.r_[0., 1., 0.], 'Z': np.r_[0., 0., 1.]
+}
+
 
 def hzAnalyticDipoleF(r, freq, sigma, secondary=True, mu=mu_0):
     """
@@ -161,3 +165,180 @@ def ElectricDipoleWholeSpace(XYZ, srcLoc, sig, f, current=1., length=1., orienta
         Ey = front*(dz*dy  / r**2)*mid
         return Ex, Ey, Ez
         # return Ey, Ez, Ex
+
+
+def _asSourceArrays(srcLocs, orientations):
+    """
+    Source locations (nSrc, 3) and unit orientation vectors (nSrc, 3)
+    """
+    srcLocs = np.atleast_2d(np.asarray(srcLocs, dtype=float))
+    nSrc = srcLocs.shape[0]
+
+    if isinstance(orientations, str):
+        orientations = orientationDict[orientations.upper()]
+    elif all(isinstance(o, str) for o in orientations):
+        orientations = [orientationDict[o.upper()] for o in orientations]
+    orientations = np.atleast_2d(np.asarray(orientations, dtype=float))
+    orientations = orientations * np.ones((nSrc, 3))
+
+    assert np.allclose(np.linalg.norm(orientations, axis=1), 1.), (
+        'orientations must be unit vectors, use the moment to scale the '
+        'source'
+    )
+    return srcLocs, orientations
+
+
+def _dipoleChunks(nObs, nSrc, nFreq, chunkSize=None):
+    if chunkSize is None:
+        chunkSize = max(1, int(1e6 // max(nObs * nFreq, 1)))
+    return [
+        slice(start, min(start + chunkSize, nSrc))
+        for start in range(0, nSrc, chunkSize)
+    ]
+
+
+def _dipoleWholeSpace(dR, p, k, front):
+    r"""
+    Dipolar whole-space field
+
+    .. math::
+
+        \mathbf{F} = front \left( \hat{\mathbf{r}} (\hat{\mathbf{r}} \cdot
+        \mathbf{p})(-k^2r^2 + 3ikr + 3) + \mathbf{p} (k^2r^2 - ikr - 1)
+        \right)
+
+    where :code:`dR` is (..., 3), :code:`p` the orientations, :code:`k` the
+    wavenumbers and :code:`front` the amplitudes, all broadcasting against
+    each other. Equation 2.57 of Ward and Hohmann for the magnetic dipole,
+    and its dual for the electric dipole.
+    """
+    r = np.sqrt((dR**2).sum(axis=-1))
+    kr = k*r
+    mid = (-kr**2. + 3.*1j*kr + 3.) * (dR*p).sum(axis=-1) / r**2.
+    back = kr**2. - 1j*kr - 1.
+    return [
+        front*(dR[..., i] * mid + p[..., i] * back) for i in range(3)
+    ]
+
+
+def MagneticDipoleWholeSpaceBatch(
+    XYZ, srcLocs, sig, f, moment=1., orientation='X', mu=mu_0,
+    chunkSize=None
+):
+    """
+    Analytical magnetic flux density of many magnetic dipoles in a
+    whole-space at many frequencies (see
+    :func:`MagneticDipoleWholeSpace`).
+
+    :param numpy.ndarray XYZ: observation locations (nObs, 3)
+    :param numpy.ndarray srcLocs: source locations (nSrc, 3)
+    :param float sig: conductivity of the whole-space
+    :param numpy.ndarray f: frequencies (nFreq,)
+    :param float,numpy.ndarray moment: moment, one per source or a single one
+    :param str,list,numpy.ndarray orientation: 'X', 'Y', 'Z' or a unit
+        vector, one per source or a single one
+    :param float mu: permeability of the whole-space
+    :param int chunkSize: number of sources evaluated at once, by default
+        about 1e6 values are held per component
+    :rtype: tuple
+    :return: Bx, By, Bz, each (nObs, nSrc, nFreq)
+    """
+    XYZ = Utils.asArray_N_x_Dim(XYZ, 3)
+    srcLocs, orientation = _asSourceArrays(srcLocs, orientation)
+    f = np.atleast_1d(f).astype(float)
+    moment = np.asarray(moment, dtype=float) * np.ones(srcLocs.shape[0])
+
+    nObs, nSrc, nFreq = XYZ.shape[0], srcLocs.shape[0], f.size
+    k = np.sqrt(-1j*2.*np.pi*f*mu*sig)
+
+    B = [np.empty((nObs, nSrc, nFreq), dtype=complex) for _ in range(3)]
+    for chunk in _dipoleChunks(nObs, nSrc, nFreq, chunkSize):
+        dR = XYZ[:, np.newaxis, :] - srcLocs[np.newaxis, chunk, :]
+        r = np.sqrt((dR**2).sum(axis=-1))[:, :, np.newaxis]
+        front = (
+            mu * moment[np.newaxis, chunk, np.newaxis] / (4.*pi * r**3.) *
+            np.exp(-1j*k*r)
+        )
+        Bchunk = _dipoleWholeSpace(
+            dR[:, :, np.newaxis, :], orientation[np.newaxis, chunk,
+                                                 np.newaxis, :],
+            k, front
+        )
+        for i in range(3):
+            B[i][:, chunk, :] = Bchunk[i]
+
+    return tuple(B)
+
+
+def ElectricDipoleWholeSpaceBatch(
+    XYZ, srcLocs, sig, f, current=1., length=1., orientation='X', mu=mu_0,
+    epsilon=0., field='E', chunkSize=None
+):
+    """
+    Analytical fields of many electric dipoles in a whole-space at many
+    frequencies (see :func:`ElectricDipoleWholeSpace`). With
+    :code:`epsilon=0` the quasi-static fields are returned, with
+    :code:`mu=mu_0*(1+kappa)` and :code:`epsilon=epsilon_0*epsr` the
+    fields of
+    :func:`SimPEG.EM.Analytics.FDEMDipolarfields.E_from_ElectricDipoleWholeSpace`
+    and its companions.
+
+    :param numpy.ndarray XYZ: observation locations (nObs, 3)
+    :param numpy.ndarray srcLocs: source locations (nSrc, 3)
+    :param float sig: conductivity of the whole-space
+    :param numpy.ndarray f: frequencies (nFreq,)
+    :param float,numpy.ndarray current: current, one per source or a single
+        one
+    :param float,numpy.ndarray length: dipole length, one per source or a
+        single one
+    :param str,list,numpy.ndarray orientation: 'X', 'Y', 'Z' or a unit
+        vector, one per source or a single one
+    :param float mu: permeability of the whole-space
+    :param float epsilon: permittivity of the whole-space
+    :param str field: 'E', 'J', 'H' or 'B'
+    :param int chunkSize: number of sources evaluated at once, by default
+        about 1e6 values are held per component
+    :rtype: tuple
+    :return: x, y and z components, each (nObs, nSrc, nFreq)
+    """
+    assert field in ['E', 'J', 'H', 'B'], (
+        "field must be 'E', 'J', 'H' or 'B', not {}".format(field)
+    )
+    XYZ = Utils.asArray_N_x_Dim(XYZ, 3)
+    srcLocs, orientation = _asSourceArrays(srcLocs, orientation)
+    f = np.atleast_1d(f).astype(float)
+    IL = (
+        np.asarray(current, dtype=float) * np.asarray(length, dtype=float) *
+        np.ones(srcLocs.shape[0])
+    )
+
+    nObs, nSrc, nFreq = XYZ.shape[0], srcLocs.shape[0], f.size
+    omega = 2.*np.pi*f
+    sig_hat = sig + 1j*omega*epsilon
+    k = np.sqrt(omega**2.*mu*epsilon - 1j*omega*mu*sig)
+
+    F = [np.empty((nObs, nSrc, nFreq), dtype=complex) for _ in range(3)]
+    for chunk in _dipoleChunks(nObs, nSrc, nFreq, chunkSize):
+        dR = XYZ[:, np.newaxis, :] - srcLocs[np.newaxis, chunk, :]
+        r = np.sqrt((dR**2).sum(axis=-1))[:, :, np.newaxis]
+        p = orientation[np.newaxis, chunk, np.newaxis, :]
+        IL_chunk = IL[np.newaxis, chunk, np.newaxis]
+
+        if field in ['E', 'J']:
+            front = IL_chunk / (4.*pi*sig_hat * r**3) * np.exp(-1j*k*r)
+            Fchunk = _dipoleWholeSpace(dR[:, :, np.newaxis, :], p, k, front)
+            if field == 'J':
+                Fchunk = [sig*Fi for Fi in Fchunk]
+        else:
+            front = (
+                IL_chunk / (4.*pi * r**3) * (-1j*k*r + 1.) * np.exp(-1j*k*r)
+            )
+            pxR = np.cross(p, dR[:, :, np.newaxis, :])
+            Fchunk = [front*pxR[..., i] for i in range(3)]
+            if field == 'B':
+                Fchunk = [mu*Fi for Fi in Fchunk]
+
+        for i in range(3):
+            F[i][:, chunk, :] = Fchunk[i]
+
+    return tuple(F)
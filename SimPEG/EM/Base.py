@@ -3,7 +3,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import inspect
+import multiprocessing
+import os
+
+import numpy as np
 import properties
+import scipy.sparse as sp
 from scipy.constants import mu_0
 
 from SimPEG import Survey
@@ -17,6 +23,83 @@ from SimPEG import Solver as SimpegSolver
 __all__ = ['BaseEMProblem', 'BaseEMSurvey', 'BaseEMSrc']
 
 
+def _derivTakesVector(mapping):
+    """
+    True if :code:`mapping.deriv` accepts the vector v, some maps only
+    form the derivative matrix (e.g. :code:`Maps.ParametrizedLayer`)
+    """
+    try:
+        args = inspect.signature(mapping.deriv).parameters
+    except AttributeError:
+        args = inspect.getargspec(mapping.deriv).args
+    return 'v' in args
+
+
+def _mapDerivVec(mapping, m, v):
+    """
+    Derivative of a mapping times a vector. Combo maps are traversed one
+    map at a time, and maps that take the vector apply their derivative
+    to it without forming it.
+
+    :param SimPEG.Maps.IdentityMap mapping: mapping
+    :param numpy.ndarray m: model
+    :param numpy.ndarray v: vector
+    :rtype: numpy.ndarray
+    :return: mapping.deriv(m) * v
+    """
+    if not isinstance(mapping, Maps.ComboMap):
+        if _derivTakesVector(mapping):
+            return mapping.deriv(m, v)
+        return mapping.deriv(m) * v
+
+    for map_i in reversed(mapping.maps):
+        v = _mapDerivVec(map_i, m, v)
+        m = map_i * m
+    return v
+
+
+def _mapDerivAdjoint(mapping, m, v):
+    """
+    Adjoint of the derivative of a mapping times a vector. Combo maps are
+    traversed one map at a time so that only the derivatives of the
+    individual maps are formed.
+
+    :param SimPEG.Maps.IdentityMap mapping: mapping
+    :param numpy.ndarray m: model
+    :param numpy.ndarray v: vector
+    :rtype: numpy.ndarray
+    :return: mapping.deriv(m).T * v
+    """
+    if not isinstance(mapping, Maps.ComboMap):
+        return mapping.deriv(m).T * v
+
+    # models going into each of the maps
+    models = [m]
+    for map_i in reversed(mapping.maps[1:]):
+        models.append(map_i * models[-1])
+
+    for map_i, mi in zip(mapping.maps, reversed(models)):
+        v = _mapDerivAdjoint(map_i, mi, v)
+    return v
+
+
+# job run by the worker processes of BaseEMProblem._mapSourceGroups, set
+# before the workers are forked so that they share the problem (and its
+# factorizations) with the parent
+_workerJob = {}
+
+
+def _runSourceGroup(iGroup):
+    """
+    Run a method of the problem for one group of sources (in a worker
+    process)
+    """
+    prob = _workerJob['prob']
+    method, args = _workerJob['tasks'][iGroup]
+    prob._isWorker = True
+    return prob._runSourceGroup(_workerJob['groups'][iGroup], method, args)
+
+
 ###############################################################################
 #                                                                             #
 #                             Base EM Problem                                 #
@@ -68,16 +151,279 @@ class BaseEMProblem(Problem.BaseProblem):
     # Mass Matrices
     ####################################################
 
-    @property
-    def deleteTheseOnModelUpdate(self):
-        toDelete = []
-        if self.sigmaMap is not None or self.rhoMap is not None:
-            toDelete += ['_MeSigma', '_MeSigmaI', '_MfRho', '_MfRhoI']
+    def _innerProductMap(self, projType, prop):
+        """
+        Linear map from a physical property to the diagonal of the inner
+        product matrix on edges ('E') or faces ('F'). The map is built once
+        per mesh, inner product type and property size so that a model update
+        only refreshes the values of the mass matrices.
+
+        :param str projType: 'E' or 'F'
+        :param numpy.ndarray prop: physical property
+        :rtype: scipy.sparse.csr_matrix
+        :return: map (n, prop.size), None if the inner product matrix is not
+            diagonal (e.g. full tensor properties)
+        """
+        cache = getattr(self, '_innerProductMaps', None)
+        if cache is None or cache[0] is not self.mesh:
+            cache = self._innerProductMaps = (self.mesh, {})
+
+        key = (projType, np.size(prop))
+        if key not in cache[1]:
+            cache[1][key] = self._getInnerProductMap(projType, prop)
+        return cache[1][key]
+
+    def _getInnerProductMap(self, projType, prop):
+        name = {'E': 'Edge', 'F': 'Face'}[projType]
+        M = getattr(self.mesh, 'get{}InnerProduct'.format(name))(prop)
+        if sp.triu(M, 1).nnz > 0 or sp.tril(M, -1).nnz > 0:
+            return None
+
+        # the derivative of the diagonal with respect to the property
+        try:
+            dMdprop = getattr(
+                self.mesh, 'get{}InnerProductDeriv'.format(name)
+            )(prop)(np.ones(M.shape[0]))
+        except NotImplementedError:
+            return None
+        if dMdprop is None:
+            return None
+
+        P = sp.csr_matrix(dMdprop)
+        propVec = Utils.mkvc(np.atleast_1d(prop))
+        if P.shape != (M.shape[0], propVec.size) or not np.allclose(
+            P * propVec, M.diagonal()
+        ):
+            return None
+        return P
+
+    def _getMassMatrix(self, projType, prop, invMat=False):
+        """
+        Inner product matrix for a physical property, refreshing only the
+        values if the structure is known (see :code:`_innerProductMap`)
+        """
+        P = self._innerProductMap(projType, prop)
+        if P is None:
+            name = {'E': 'Edge', 'F': 'Face'}[projType]
+            return getattr(self.mesh, 'get{}InnerProduct'.format(name))(
+                prop, invMat=invMat
+            )
+
+        values = P * Utils.mkvc(np.atleast_1d(prop))
+        if invMat:
+            values = 1./values
+        return Utils.sdiag(values)
+
+    def _getMassMatrixDeriv(
+        self, projType, name, u, v=None, adjoint=False, invMat=False
+    ):
+        """
+        Derivative of the inner product matrix for a physical property with
+        respect to the model, times a vector u. For diagonal mass matrices
+        the product of the inner product map with the derivative of the
+        property map is built once per model (see
+        :code:`deleteTheseOnModelUpdate`), so the derivative is a row scaling
+        of that matrix.
+
+        If v is provided, the product with v (or its adjoint) is returned
+        and the vector is passed through the derivative of the mapping
+        without forming the sparse derivative of the mapping.
+
+        :param str projType: 'E' or 'F'
+        :param str name: name of the physical property ('sigma', 'rho', ...)
+        :param numpy.ndarray u: vector the mass matrix multiplies
+        :param numpy.ndarray v: vector to take the product with (optional)
+        :param bool adjoint: adjoint?
+        :param bool invMat: derivative of the inverse of the mass matrix?
+        :rtype: scipy.sparse.csr_matrix or numpy.ndarray
+        :return: derivative (n, nP), or its product with v
+        """
+        if isinstance(u, Utils.Zero):
+            return Utils.Zero()
 
-        if hasattr(self, 'muMap') or hasattr(self, 'muiMap'):
-            if self.muMap is not None or self.muiMap is not None:
-                toDelete += ['_MeMu', '_MeMuI', '_MfMui', '_MfMuiI']
-        return toDelete
+        prop = getattr(self, name)
+        mass = '{}{}'.format(
+            {'E': 'Me', 'F': 'Mf'}[projType], name[0].upper() + name[1:]
+        )
+        P = self._innerProductMap(projType, prop)
+
+        if P is None:
+            dM_dprop = getattr(
+                self.mesh, 'get{}InnerProductDeriv'.format(
+                    {'E': 'Edge', 'F': 'Face'}[projType]
+                )
+            )(prop)(u)
+            if invMat:
+                dM_dprop = -getattr(self, '{}I'.format(mass))**2 * dM_dprop
+            if v is None:
+                return dM_dprop * getattr(self, '{}Deriv'.format(name))
+            if adjoint:
+                return self._mapDeriv(name, dM_dprop.T * v, adjoint=True)
+            return dM_dprop * self._mapDeriv(name, v)
+
+        scale = Utils.mkvc(u)
+        if invMat:
+            MI = self._diagonal(getattr(self, '{}I'.format(mass)))
+            scale = -scale * MI**2
+
+        if v is not None:
+            if adjoint:
+                return self._mapDeriv(
+                    name, P.T * (Utils.sdiag(scale) * v), adjoint=True
+                )
+            return Utils.sdiag(scale) * (P * self._mapDeriv(name, v))
+
+        derivMap = '_{}DerivMap'.format(mass)
+        if getattr(self, derivMap, None) is None:
+            setattr(
+                self, derivMap,
+                sp.csr_matrix(P * getattr(self, '{}Deriv'.format(name)))
+            )
+        return Utils.sdiag(scale) * getattr(self, derivMap)
+
+    def _mapDeriv(self, name, v, adjoint=False):
+        """
+        Derivative of the mapping of a physical property times a vector.
+        The maps of a :code:`Maps.ComboMap` are applied one at a time so the
+        derivative of the chain is never formed.
+
+        :param str name: name of the physical property ('sigma', 'rho', ...)
+        :param numpy.ndarray v: vector (nP,) or (nProp,) for the adjoint
+        :param bool adjoint: adjoint?
+        :rtype: numpy.ndarray
+        :return: derivative times a vector
+        """
+        mapping = getattr(self, '{}Map'.format(name))
+        if not adjoint:
+            return _mapDerivVec(mapping, self.model, v)
+        return _mapDerivAdjoint(mapping, self.model, v)
+
+    ####################################################
+    # System matrices
+    ####################################################
+
+    def _systemPattern(self, name, getBlocks, depends=()):
+        """
+        Sparsity pattern of a system matrix
+        :code:`L * sdiag(d) * R + sdiag(c)` (see
+        :code:`SimPEG.Utils.SparsePattern`). The model independent blocks
+        (L, R) are only built again when the mesh or one of the objects in
+        depends changes.
+
+        :param str name: name of the system matrix
+        :param callable getBlocks: returns the blocks (L, R)
+        :param tuple depends: objects the blocks are built from
+        :rtype: SimPEG.Utils.SparsePattern
+        :return: sparsity pattern
+        """
+        cache = getattr(self, '_systemPatterns', None)
+        if cache is None:
+            cache = self._systemPatterns = {}
+
+        depends = (self.mesh,) + tuple(depends)
+        if name not in cache or len(cache[name][0]) != len(depends) or any(
+            a is not b for a, b in zip(cache[name][0], depends)
+        ):
+            cache[name] = (depends, Utils.SparsePattern(*getBlocks()))
+        return cache[name][1]
+
+    @staticmethod
+    def _diagonal(M):
+        """
+        Diagonal of a mass matrix, None if the matrix is not diagonal
+        """
+        n = M.shape[0]
+        if (
+            sp.isspmatrix_csr(M) and np.array_equal(M.indptr, np.arange(n+1))
+            and np.array_equal(M.indices, np.arange(n))
+        ):
+            return M.data
+        M = M.tocoo()
+        if np.any(M.row != M.col):
+            return None
+        return M.diagonal()
+
+    @staticmethod
+    def _forkContext():
+        """
+        Multiprocessing context used to fork the workers (None if forking
+        is not available, e.g. on windows)
+        """
+        if not hasattr(multiprocessing, 'get_all_start_methods'):
+            return multiprocessing if hasattr(os, 'fork') else None
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return None
+        return multiprocessing.get_context('fork')
+
+    def _useWorkers(self):
+        """
+        True if groups of sources are run on :code:`nWorkers` forked
+        processes (the problems that support it define nWorkers)
+        """
+        return (
+            getattr(self, 'nWorkers', 1) > 1 and
+            len(self.survey.srcList) > 1 and
+            not getattr(self, '_isWorker', False) and
+            self._forkContext() is not None
+        )
+
+    def _sourceGroups(self):
+        """
+        Contiguous groups of source indices, one per worker
+        """
+        nSrc = len(self.survey.srcList)
+        return np.array_split(np.arange(nSrc), min(self.nWorkers, nSrc))
+
+    def _runSourceGroup(self, group, method, args):
+        """
+        Run a method for a group of sources in a worker process
+
+        :param numpy.ndarray group: source indices of the group
+        :param str method: name of the method to run
+        :param tuple args: arguments of the method
+        """
+        return getattr(self, method)(*args)
+
+    def _mapSourceGroups(self, method, groupArgs):
+        """
+        Run a method of the problem for contiguous groups of sources on a
+        pool of :code:`nWorkers` forked processes, which share the problem
+        and what it has cached (e.g. factorizations and fields) with the
+        parent
+
+        :param str method: name of the method to run
+        :param callable groupArgs: arguments of the method given the source
+            indices of a group
+        :rtype: tuple
+        :return: (groups, outputs of the method for each group)
+        """
+        groups = self._sourceGroups()
+        _workerJob.update(
+            prob=self, groups=groups,
+            tasks=[(method, groupArgs(group)) for group in groups]
+        )
+        try:
+            pool = self._forkContext().Pool(len(groups))
+            try:
+                out = pool.map(_runSourceGroup, range(len(groups)))
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            _workerJob.clear()
+        return groups, out
+
+    @property
+    def deleteTheseOnPropertyUpdate(self):
+        sigma = [
+            '_MeSigma', '_MeSigmaI', '_MfRho', '_MfRhoI',
+            '_MeSigmaDerivMap', '_MfRhoDerivMap'
+        ]
+        mu = [
+            '_MeMu', '_MeMuI', '_MfMui', '_MfMuiI',
+            '_MeMuDerivMap', '_MfMuiDerivMap'
+        ]
+        return {'sigma': sigma, 'rho': sigma, 'mu': mu, 'mui': mu}
 
     @property
     def Me(self):
@@ -131,18 +477,18 @@ class BaseEMProblem(Problem.BaseProblem):
         Used in the E-B formulation
         """
         if getattr(self, '_MfMui', None) is None:
-            self._MfMui = self.mesh.getFaceInnerProduct(self.mui)
+            self._MfMui = self._getMassMatrix('F', self.mui)
         return self._MfMui
 
-    def MfMuiDeriv(self, u):
+    def MfMuiDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of :code:`MfMui` with respect to the model.
         """
         if self.muiMap is None:
             return Utils.Zero()
 
-        return (
-            self.mesh.getFaceInnerProductDeriv(self.mui)(u) * self.muiDeriv
+        return self._getMassMatrixDeriv(
+            'F', 'mui', u, v=v, adjoint=adjoint
         )
 
     @property
@@ -151,11 +497,11 @@ class BaseEMProblem(Problem.BaseProblem):
         Inverse of :code:`MfMui`.
         """
         if getattr(self, '_MfMuiI', None) is None:
-            self._MfMuiI = self.mesh.getFaceInnerProduct(self.mui, invMat=True)
+            self._MfMuiI = self._getMassMatrix('F', self.mui, invMat=True)
         return self._MfMuiI
 
     # TODO: This should take a vector
-    def MfMuiIDeriv(self, u):
+    def MfMuiIDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of :code:`MfMui` with respect to the model
         """
@@ -169,9 +515,9 @@ class BaseEMProblem(Problem.BaseProblem):
                         "Full anisotropy is not implemented for MfMuiIDeriv."
                 )
 
-        dMfMuiI_dI = -self.MfMuiI**2
-        dMf_dmui = self.mesh.getEdgeInnerProductDeriv(self.mui)(u)
-        return dMfMuiI_dI * (dMf_dmui * self.muiDeriv)
+        return self._getMassMatrixDeriv(
+            'F', 'mui', u, v=v, adjoint=adjoint, invMat=True
+        )
 
 
     @property
@@ -181,18 +527,18 @@ class BaseEMProblem(Problem.BaseProblem):
         Used in the H-J formulation
         """
         if getattr(self, '_MeMu', None) is None:
-            self._MeMu = self.mesh.getEdgeInnerProduct(self.mu)
+            self._MeMu = self._getMassMatrix('E', self.mu)
         return self._MeMu
 
-    def MeMuDeriv(self, u):
+    def MeMuDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of :code:`MeMu` with respect to the model.
         """
         if self.muMap is None:
             return Utils.Zero()
 
-        return (
-            self.mesh.getEdgeInnerProductDeriv(self.mu)(u) * self.muDeriv
+        return self._getMassMatrixDeriv(
+            'E', 'mu', u, v=v, adjoint=adjoint
         )
 
     @property
@@ -201,11 +547,11 @@ class BaseEMProblem(Problem.BaseProblem):
             Inverse of :code:`MeMu`
         """
         if getattr(self, '_MeMuI', None) is None:
-            self._MeMuI = self.mesh.getEdgeInnerProduct(self.mu, invMat=True)
+            self._MeMuI = self._getMassMatrix('E', self.mu, invMat=True)
         return self._MeMuI
 
     # TODO: This should take a vector
-    def MeMuIDeriv(self, u):
+    def MeMuIDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of :code:`MeMuI` with respect to the model
         """
@@ -219,9 +565,9 @@ class BaseEMProblem(Problem.BaseProblem):
                     "Full anisotropy is not implemented for MeMuIDeriv."
                 )
 
-        dMeMuI_dI = -self.MeMuI**2
-        dMe_dmu = self.mesh.getEdgeInnerProductDeriv(self.mu)(u)
-        return dMeMuI_dI * (dMe_dmu * self.muDeriv)
+        return self._getMassMatrixDeriv(
+            'E', 'mu', u, v=v, adjoint=adjoint, invMat=True
+        )
 
     ####################################################
     # Electrical Conductivity
@@ -233,20 +579,19 @@ class BaseEMProblem(Problem.BaseProblem):
         Used in the E-B formulation
         """
         if getattr(self, '_MeSigma', None) is None:
-            self._MeSigma = self.mesh.getEdgeInnerProduct(self.sigma)
+            self._MeSigma = self._getMassMatrix('E', self.sigma)
         return self._MeSigma
 
     # TODO: This should take a vector
-    def MeSigmaDeriv(self, u):
+    def MeSigmaDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of MeSigma with respect to the model
         """
         if self.sigmaMap is None:
             return Utils.Zero()
 
-        return (
-            self.mesh.getEdgeInnerProductDeriv(self.sigma)(u) *
-            self.sigmaDeriv
+        return self._getMassMatrixDeriv(
+            'E', 'sigma', u, v=v, adjoint=adjoint
         )
 
 
@@ -256,13 +601,13 @@ class BaseEMProblem(Problem.BaseProblem):
         Inverse of the edge inner product matrix for \\(\\sigma\\).
         """
         if getattr(self, '_MeSigmaI', None) is None:
-            self._MeSigmaI = self.mesh.getEdgeInnerProduct(
-                self.sigma, invMat=True
+            self._MeSigmaI = self._getMassMatrix(
+                'E', self.sigma, invMat=True
             )
         return self._MeSigmaI
 
     # TODO: This should take a vector
-    def MeSigmaIDeriv(self, u):
+    def MeSigmaIDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of :code:`MeSigmaI` with respect to the model
         """
@@ -275,9 +620,9 @@ class BaseEMProblem(Problem.BaseProblem):
                     "Full anisotropy is not implemented for MeSigmaIDeriv."
                 )
 
-        dMeSigmaI_dI = -self.MeSigmaI**2
-        dMe_dsig = self.mesh.getEdgeInnerProductDeriv(self.sigma)(u)
-        return dMeSigmaI_dI * (dMe_dsig * self.sigmaDeriv)
+        return self._getMassMatrixDeriv(
+            'E', 'sigma', u, v=v, adjoint=adjoint, invMat=True
+        )
 
     @property
     def MfRho(self):
@@ -286,19 +631,19 @@ class BaseEMProblem(Problem.BaseProblem):
         formulation
         """
         if getattr(self, '_MfRho', None) is None:
-            self._MfRho = self.mesh.getFaceInnerProduct(self.rho)
+            self._MfRho = self._getMassMatrix('F', self.rho)
         return self._MfRho
 
     # TODO: This should take a vector
-    def MfRhoDeriv(self, u):
+    def MfRhoDeriv(self, u, v=None, adjoint=False):
         """
         Derivative of :code:`MfRho` with respect to the model.
         """
         if self.rhoMap is None:
             return Utils.Zero()
 
-        return (
-            self.mesh.getFaceInnerProductDeriv(self.rho)(u) * self.rhoDeriv
+        return self._getMassMatrixDeriv(
+            'F', 'rho', u, v=v, adjoint=adjoint
         )
 
     @property
@@ -307,11 +652,11 @@ class BaseEMProblem(Problem.BaseProblem):
         Inverse of :code:`MfRho`
         """
         if getattr(self, '_MfRhoI', None) is None:
-            self._MfRhoI = self.mesh.getFaceInnerProduct(self.rho, invMat=True)
+            self._MfRhoI = self._getMassMatrix('F', self.rho, invMat=True)
         return self._MfRhoI
 
     # TODO: This should take a vector
-    def MfRhoIDeriv(self, u):
+    def MfRhoIDeriv(self, u, v=None, adjoint=False):
         """
             Derivative of :code:`MfRhoI` with respect to the model.
         """
@@ -324,9 +669,9 @@ class BaseEMProblem(Problem.BaseProblem):
                     "Full anisotropy is not implemented for MfRhoIDeriv."
                 )
 
-        dMfRhoI_dI = -self.MfRhoI**2
-        dMf_drho = self.mesh.getFaceInnerProductDeriv(self.rho)(u)
-        return dMfRhoI_dI * (dMf_drho * self.rhoDeriv)
+        return self._getMassMatrixDeriv(
+            'F', 'rho', u, v=v, adjoint=adjoint, invMat=True
+        )
 
 
 ###############################################################################
@@ -0,0 +1,154 @@
+from __future__ import division
+import numpy as np
+from scipy.special import loggamma
+from scipy.interpolate import CubicSpline
+
+
+def _designHankelFilter(nu, base, delta, taper=0.5, nOmega=20001):
+    r"""
+    Weights of a digital filter for Hankel transforms of order nu
+
+    .. math::
+
+        \int_0^\infty K(\lambda) J_\nu(\lambda r) d\lambda \approx
+        \frac{1}{r} \sum_n K\left(\frac{e^{b_n}}{r}\right) w_n
+
+    The kernel is sinc-interpolated between the abscissae :math:`b_n` in
+    :math:`\log \lambda`; the weights are the band-limited correlation of
+    :math:`e^t J_\nu(e^t)` with the sinc, evaluated from its Fourier
+    transform
+
+    .. math::
+
+        \int_0^\infty J_\nu(x) x^{-i\omega} dx = 2^{-i\omega}
+        \frac{\Gamma((\nu + 1 - i\omega)/2)}{\Gamma((\nu + 1 +
+        i\omega)/2)}
+
+    with a cosine taper on the upper part of the band to damp the ringing.
+    """
+    omegaMax = np.pi / delta
+    omega = np.linspace(0., omegaMax, nOmega)
+    G = np.exp(
+        -1j*omega*np.log(2.) + loggamma((nu + 1. - 1j*omega)/2.) -
+        loggamma((nu + 1. + 1j*omega)/2.)
+    )
+    omegaTaper = (1. - taper) * omegaMax
+    T = np.ones_like(omega)
+    inTaper = omega > omegaTaper
+    T[inTaper] = 0.5 * (1. + np.cos(
+        np.pi * (omega[inTaper] - omegaTaper) / (omegaMax - omegaTaper)
+    ))
+
+    # Simpson's rule over the band
+    quad = np.ones(nOmega)
+    quad[1:-1:2] = 4.
+    quad[2:-1:2] = 2.
+    quad *= (omega[1] - omega[0]) / 3.
+
+    GT = G * T * quad
+    return np.array([
+        delta / np.pi * np.real(np.exp(1j*omega*b) * GT).sum() for b in base
+    ])
+
+
+_filters = {}
+
+
+def hankelFilter(nu, delta=0.1, bmin=-20., bmax=10.):
+    r"""
+    Abscissae (in :math:`\log \lambda r`) and weights of the digital filter
+    for Hankel transforms of order nu (see :func:`hankelTransform`). The
+    filters are designed once and cached.
+
+    :param float nu: order of the Bessel function, 0, 1 or +-1/2 for the
+                     sine and cosine transforms
+    :param float delta: spacing of the abscissae
+    :param float bmin: smallest abscissa
+    :param float bmax: largest abscissa
+    :rtype: tuple
+    :return: (base, weights)
+    """
+    key = (nu, delta, bmin, bmax)
+    if key not in _filters:
+        base = np.arange(bmin, bmax + delta/2., delta)
+        _filters[key] = (base, _designHankelFilter(nu, base, delta))
+    return _filters[key]
+
+
+def hankelTransform(kernel, r, nu=0):
+    r"""
+    Hankel transform of order nu evaluated with a digital filter
+
+    .. math::
+
+        I(r) = \int_0^\infty K(\lambda) J_\nu(\lambda r) d\lambda
+
+    :param callable kernel: K(lambda), vectorized, lambda is (nr, nFilter)
+    :param numpy.ndarray r: offsets (nr,)
+    :param float nu: order of the Bessel function
+    :rtype: numpy.ndarray
+    :return: I(r)
+    """
+    r = np.atleast_1d(r)
+    base, weights = hankelFilter(nu)
+    lam = np.exp(base)[np.newaxis, :] / r[:, np.newaxis]
+    return kernel(lam).dot(weights) / r
+
+
+def frequencyToTimeMatrix(times, freqs, quantity='b'):
+    r"""
+    Linear operator that takes the frequency responses H of a step-on
+    source (:math:`e^{i \omega t}` time dependence), sampled at freqs, to
+    the step-off responses at times
+
+    .. math::
+
+        b(t) = -\frac{2}{\pi} \int_0^\infty \frac{\mathrm{Im}[H(\omega)]}
+        {\omega} \cos(\omega t) d\omega
+
+        \frac{\partial b}{\partial t} = \frac{2}{\pi} \int_0^\infty
+        \mathrm{Im}[H(\omega)] \sin(\omega t) d\omega
+
+    The cosine and sine transforms are Hankel transforms of order -1/2 and
+    1/2. The imaginary part of H is interpolated with a cubic spline in
+    :math:`\log \omega` to the frequencies of the filter, and extrapolated
+    with its low (:math:`\propto \omega`) and high
+    (:math:`\propto \omega^{-1/2}`) frequency asymptotes.
+
+    :param numpy.ndarray times: times (nT,)
+    :param numpy.ndarray freqs: frequencies, increasing and log-spaced (nF,)
+    :param str quantity: 'b' or 'dbdt'
+    :rtype: numpy.ndarray
+    :return: (nT, nF) real matrix to multiply with Im[H(freqs)]
+    """
+    assert quantity in ['b', 'dbdt'], (
+        "quantity must be 'b' or 'dbdt', not {}".format(quantity)
+    )
+    times = np.atleast_1d(times)
+    omegas = 2. * np.pi * np.asarray(freqs, dtype=float)
+    logw = np.log(omegas)
+
+    nu = -0.5 if quantity == 'b' else 0.5
+    base, weights = hankelFilter(nu)
+    # filter frequencies (nT, nFilter)
+    w = np.exp(base)[np.newaxis, :] / times[:, np.newaxis]
+
+    # cubic spline interpolation of the columns of the identity
+    spline = CubicSpline(logw, np.eye(omegas.size), axis=0)
+    inside = (w >= omegas[0]) & (w <= omegas[-1])
+    P = np.zeros(w.shape + (omegas.size,))
+    P[inside] = spline(np.log(w[inside]))
+    below = w < omegas[0]
+    P[below, 0] = w[below] / omegas[0]
+    above = w > omegas[-1]
+    P[above, -1] = np.sqrt(omegas[-1] / w[above])
+
+    # sqrt(pi t / 2) int F(w) w^(1/2) J(w t) dw, F = -2/pi Im[H] / w for b
+    # and F = 2/pi Im[H] for db/dt
+    if quantity == 'b':
+        kernel = -2. / np.pi * w**-0.5
+    else:
+        kernel = 2. / np.pi * w**0.5
+    W = (kernel * weights[np.newaxis, :] / times[:, np.newaxis] *
+         np.sqrt(np.pi * times[:, np.newaxis] / 2.))
+    return np.einsum('tn,tnf->tf', W, P)
@@ -0,0 +1,390 @@
+from __future__ import division
+import numpy as np
+import scipy.sparse as sp
+from scipy.constants import mu_0
+
+from SimPEG import Problem, Props, Utils
+
+from . import DigFilter
+from .SurveyEM1D import Survey as SurveyEM1D
+
+
+def _hzSecondary(
+    sigma, thicknesses, freqs, offsets, heights, sensitivity=False,
+    chunkSize=None
+):
+    """
+    Secondary vertical magnetic field of unit vertical magnetic dipoles
+    above a layered earth (:math:`e^{i \\omega t}`)
+
+    .. math::
+
+        H_z = \\frac{1}{4 \\pi} \\int_0^\\infty r_{TE}(\\lambda)
+        e^{-\\lambda (z + h)} \\lambda^2 J_0(\\lambda r) d\\lambda
+
+    where the reflection coefficient of the layers is obtained from the
+    recursion of their admittances, and its derivatives with respect to the
+    conductivities of the layers by differentiating the recursion.
+
+    :param numpy.ndarray sigma: conductivities of the layers, top to bottom,
+                                of each datum (nD, nLayer)
+    :param numpy.ndarray thicknesses: thicknesses of the layers (nLayer-1,)
+    :param numpy.ndarray freqs: frequencies (nD,)
+    :param numpy.ndarray offsets: horizontal source-receiver offsets (nD,)
+    :param numpy.ndarray heights: sum of the heights of the source and the
+                                  receiver above the surface (nD,)
+    :param bool sensitivity: also return the derivatives with respect to
+                             sigma
+    :param int chunkSize: number of data evaluated at once
+    :rtype: tuple
+    :return: (Hz (nD,), dHz/dsigma (nD, nLayer) or None)
+    """
+    base, weights = DigFilter.hankelFilter(0)
+    nD, nLayer = sigma.shape
+    nFilter = base.size
+
+    # the filter needs an offset; a coincident receiver is moved by a
+    # fraction of its height, which changes the response by ~(r/h)^2
+    offsets = np.maximum(offsets, 1e-3 * heights)
+    assert np.all(offsets > 0.), (
+        'coincident sources and receivers must be above the surface'
+    )
+
+    if chunkSize is None:
+        chunkSize = max(1, int(2e6 // (nFilter * nLayer)))
+
+    hz = np.empty(nD, dtype=complex)
+    dhz = np.empty((nD, nLayer), dtype=complex) if sensitivity else None
+
+    for start in range(0, nD, chunkSize):
+        chunk = slice(start, min(start + chunkSize, nD))
+
+        r = offsets[chunk, np.newaxis]
+        lam = np.exp(base)[np.newaxis, :] / r
+        iwmu = (1j * 2. * np.pi * mu_0 * freqs[chunk])[:, np.newaxis]
+        u = [
+            np.sqrt(lam**2 + iwmu * sigma[chunk, j, np.newaxis])
+            for j in range(nLayer)
+        ]
+
+        # recursion of the admittances from the bottom layer up
+        uhat = u[-1]
+        dUhat_dUhatBelow = [None] * nLayer
+        dUhat_dU = [None] * (nLayer - 1) + [1.]
+        for j in range(nLayer - 2, -1, -1):
+            e = np.exp(-2. * u[j] * thicknesses[j])
+            tanh = (1. - e) / (1. + e)
+            sech2 = 4. * e / (1. + e)**2
+            num = uhat + u[j] * tanh
+            den = u[j] + uhat * tanh
+            if sensitivity:
+                dnum = tanh + u[j] * thicknesses[j] * sech2
+                dden = 1. + uhat * thicknesses[j] * sech2
+                dUhat_dUhatBelow[j] = (u[j] / den)**2 * sech2
+                dUhat_dU[j] = (
+                    num / den + u[j] * (dnum * den - num * dden) / den**2
+                )
+            uhat = u[j] * num / den
+
+        rTE = (lam - uhat) / (lam + uhat)
+        propagate = (
+            np.exp(-lam * heights[chunk, np.newaxis]) * lam**2 / (4. * np.pi)
+        )
+        hz[chunk] = (rTE * propagate).dot(weights) / r[:, 0]
+
+        if sensitivity:
+            dr = -2. * lam / (lam + uhat)**2
+            for j in range(nLayer):
+                drTE = dr * dUhat_dU[j] * iwmu / (2. * u[j])
+                dhz[chunk, j] = (drTE * propagate).dot(weights) / r[:, 0]
+                if j < nLayer - 1:
+                    dr = dr * dUhat_dUhatBelow[j]
+
+    return hz, dhz
+
+
+class BaseEM1DProblem(Problem.BaseProblem):
+    """
+    Base class for soundings over a layered earth. The layers are the cells
+    of a 1D mesh, from the surface down; the last layer is a half-space.
+    The conductivity holds either one layered model used by all the
+    soundings, or one layered model per sounding of the survey (stitched
+    1D problems, see :code:`Survey.soundingIndex`).
+    """
+
+    sigma, sigmaMap, sigmaDeriv = Props.Invertible(
+        "Electrical conductivity of the layers (S/m)"
+    )
+
+    surveyPair = SurveyEM1D
+
+    #: number of data evaluated at once, by default the work arrays hold
+    #: about 2e6 values
+    chunkSize = None
+
+    def __init__(self, mesh, **kwargs):
+        assert mesh.dim == 1, 'the layers are defined by a 1D mesh'
+        Problem.BaseProblem.__init__(self, mesh, **kwargs)
+
+    @property
+    def deleteTheseOnModelUpdate(self):
+        toDelete = super(BaseEM1DProblem, self).deleteTheseOnModelUpdate
+        if getattr(self, '_Jmatrix', None) is not None:
+            toDelete = toDelete + ['_Jmatrix']
+        return toDelete
+
+    @property
+    def thicknesses(self):
+        """Thicknesses of the layers, the last one is a half-space"""
+        return self.mesh.hx[:-1]
+
+    @property
+    def nLayer(self):
+        """Number of layers"""
+        return self.mesh.nC
+
+    def _sigmaVector(self):
+        sigma = Utils.mkvc(np.atleast_1d(self.sigma))
+        if sigma.size == 1:
+            sigma = sigma * np.ones(self.nLayer)
+        return sigma
+
+    def _soundingSigma(self, sounding):
+        """
+        Conductivities of the layers of each sounding in sounding
+        (n, nLayer), and the indices of their first value in sigma
+        """
+        sigma = self._sigmaVector()
+        if sigma.size == self.nLayer:
+            sounding = np.zeros_like(sounding)
+        else:
+            assert sigma.size == self.survey.nSounding * self.nLayer, (
+                'sigma must hold nLayer or nSounding*nLayer values'
+            )
+        return (
+            sigma.reshape(-1, self.nLayer)[sounding], sounding * self.nLayer
+        )
+
+    def _sensitivityMatrix(self, J, first):
+        """Sparse derivative of the data with respect to sigma"""
+        nD = J.shape[0]
+        nSigma = self._sigmaVector().size
+        return sp.csr_matrix(
+            (
+                J.flatten(),
+                (
+                    np.repeat(np.arange(nD), self.nLayer),
+                    (first[:, np.newaxis] + np.arange(self.nLayer)).flatten()
+                )
+            ), shape=(nD, nSigma)
+        )
+
+    def _predict(self, sensitivity=False):
+        raise NotImplementedError(
+            '_predict must be implemented by the layered earth problem'
+        )
+
+    def fields(self, m=None):
+        """
+        The predicted data of all the soundings
+
+        :param numpy.ndarray m: model
+        :rtype: numpy.ndarray
+        :return: predicted data
+        """
+        if m is not None:
+            self.model = m
+        return self._predict()[0]
+
+    def getJ(self, m, f=None):
+        """
+        Sensitivity matrix, computed with the data and kept until the model
+        changes; it is sparse for stitched problems.
+
+        :param numpy.ndarray m: model
+        :rtype: scipy.sparse.csr_matrix
+        :return: J (nD, nP)
+        """
+        self.model = m
+        if getattr(self, '_Jmatrix', None) is None:
+            _, J = self._predict(sensitivity=True)
+            self._Jmatrix = J * self.sigmaDeriv
+        return self._Jmatrix
+
+    def Jvec(self, m, v, f=None):
+        return Utils.mkvc(self.getJ(m).dot(v))
+
+    def Jtvec(self, m, v, f=None):
+        return Utils.mkvc(self.getJ(m).T.dot(v))
+
+
+class Problem1D_FD(BaseEM1DProblem):
+    """
+    Frequency domain soundings of vertical magnetic dipoles over a layered
+    earth, evaluated with a digital filter for the Hankel transform. The
+    data are the real or imaginary parts of the secondary vertical magnetic
+    flux density.
+    """
+
+    def _geometry(self):
+        """Sounding, frequency, offset, height and moment of each datum"""
+        srcList = self.survey.srcList
+        uids = [src.uid for src in srcList]
+        if getattr(self, '_geometryCache', None) is not None and (
+            self._geometryCache[0] == uids
+        ):
+            return self._geometryCache[1]
+
+        soundingIndex = self.survey.soundingIndex
+        geometry = {
+            key: [] for key in
+            ['sounding', 'freq', 'offset', 'height', 'moment', 'real']
+        }
+        for src, sounding in zip(srcList, soundingIndex):
+            for rx in src.rxList:
+                n = rx.nD
+                dxy = rx.locs[:, :2] - src.loc[:2]
+                geometry['sounding'].append(sounding * np.ones(n, dtype=int))
+                geometry['freq'].append(src.freq * np.ones(n))
+                geometry['offset'].append(np.sqrt((dxy**2).sum(axis=1)))
+                geometry['height'].append(rx.locs[:, 2] + src.loc[2])
+                geometry['moment'].append(src.moment * np.ones(n))
+                geometry['real'].append(
+                    (rx.component == 'real') * np.ones(n, dtype=bool)
+                )
+        geometry = {key: np.hstack(val) for key, val in geometry.items()}
+
+        # the real and imaginary parts of a response are evaluated once
+        _, geometry['unique'], geometry['inverse'] = np.unique(
+            np.c_[
+                geometry['sounding'], geometry['freq'], geometry['offset'],
+                geometry['height']
+            ], axis=0, return_index=True, return_inverse=True
+        )
+        geometry['inverse'] = geometry['inverse'].flatten()
+        self._geometryCache = (uids, geometry)
+        return geometry
+
+    def _predict(self, sensitivity=False):
+        geometry = self._geometry()
+        unique, inverse = geometry['unique'], geometry['inverse']
+        sigma, first = self._soundingSigma(geometry['sounding'])
+        hz, dhz = _hzSecondary(
+            sigma[unique], self.thicknesses, geometry['freq'][unique],
+            geometry['offset'][unique], geometry['height'][unique],
+            sensitivity=sensitivity, chunkSize=self.chunkSize
+        )
+        hz = hz[inverse]
+        if sensitivity:
+            dhz = dhz[inverse]
+        scale = mu_0 * geometry['moment']
+        real = geometry['real']
+
+        bz = scale * hz
+        data = np.where(real, bz.real, bz.imag)
+        if not sensitivity:
+            return data, None
+
+        dbz = scale[:, np.newaxis] * dhz
+        J = np.where(real[:, np.newaxis], dbz.real, dbz.imag)
+        return data, self._sensitivityMatrix(J, first)
+
+
+class Problem1D_TD(BaseEM1DProblem):
+    """
+    Time domain soundings of vertical magnetic dipoles switched off at t=0
+    over a layered earth. The frequency responses are evaluated with a
+    digital filter for the Hankel transform on a log-spaced grid of
+    frequencies for each receiver, and taken to time with digital filters
+    for the sine and cosine transforms (see
+    :func:`SimPEG.EM.EM1D.DigFilter.frequencyToTimeMatrix`).
+    """
+
+    #: frequencies per decade of the frequency responses
+    nFreqPerDecade = 12
+
+    #: range of omega*t covered by the frequency responses
+    omegaTimeRange = (1e-4, 1e3)
+
+    def _freqs(self, times):
+        wmin = self.omegaTimeRange[0] / np.max(times)
+        wmax = self.omegaTimeRange[1] / np.min(times)
+        nFreq = int(np.ceil(np.log10(wmax / wmin) * self.nFreqPerDecade)) + 1
+        return np.logspace(np.log10(wmin), np.log10(wmax), nFreq) / (2*np.pi)
+
+    def _transform(self, rx):
+        """
+        Frequencies of the responses and the transform to the times of the
+        receiver, cached per set of times
+        """
+        if getattr(self, '_transforms', None) is None:
+            self._transforms = {}
+        key = (tuple(rx.times), rx.projField, self.nFreqPerDecade,
+               self.omegaTimeRange)
+        if key not in self._transforms:
+            freqs = self._freqs(rx.times)
+            self._transforms[key] = (
+                freqs,
+                DigFilter.frequencyToTimeMatrix(rx.times, freqs, rx.projField)
+            )
+        return self._transforms[key]
+
+    def _predict(self, sensitivity=False):
+        srcList = self.survey.srcList
+        soundingIndex = self.survey.soundingIndex
+
+        # frequency responses of all receiver locations
+        groups = []
+        geometry = {
+            key: [] for key in ['sounding', 'freq', 'offset', 'height']
+        }
+        for src, sounding in zip(srcList, soundingIndex):
+            for rx in src.rxList:
+                freqs, T = self._transform(rx)
+                nLoc, nFreq = rx.locs.shape[0], freqs.size
+                dxy = rx.locs[:, :2] - src.loc[:2]
+                geometry['sounding'].append(
+                    sounding * np.ones(nLoc * nFreq, dtype=int)
+                )
+                geometry['freq'].append(np.tile(freqs, nLoc))
+                geometry['offset'].append(
+                    np.repeat(np.sqrt((dxy**2).sum(axis=1)), nFreq)
+                )
+                geometry['height'].append(
+                    np.repeat(rx.locs[:, 2] + src.loc[2], nFreq)
+                )
+                groups.append((src, rx, T, nLoc, nFreq))
+        geometry = {key: np.hstack(val) for key, val in geometry.items()}
+
+        sigma, first = self._soundingSigma(geometry['sounding'])
+        hz, dhz = _hzSecondary(
+            sigma, self.thicknesses, geometry['freq'], geometry['offset'],
+            geometry['height'], sensitivity=sensitivity,
+            chunkSize=self.chunkSize
+        )
+
+        # to time, the data of a receiver are ordered with the locations
+        # changing fastest
+        data, J, firstData = [], [], []
+        start = 0
+        for src, rx, T, nLoc, nFreq in groups:
+            block = slice(start, start + nLoc * nFreq)
+            scale = mu_0 * src.moment
+            H = hz[block].imag.reshape(nLoc, nFreq)
+            data.append(Utils.mkvc(scale * H.dot(T.T)))
+            firstData.append(np.tile(first[block][::nFreq], T.shape[0]))
+            if sensitivity:
+                dH = dhz[block].imag.reshape(nLoc, nFreq, self.nLayer)
+                J.append(
+                    scale * np.einsum('tf,lfk->tlk', T, dH).reshape(
+                        -1, self.nLayer
+                    )
+                )
+            start += nLoc * nFreq
+
+        data = np.hstack(data)
+        if not sensitivity:
+            return data, None
+        return data, self._sensitivityMatrix(
+            np.vstack(J), np.hstack(firstData)
+        )
@@ -0,0 +1,74 @@
+import numpy as np
+import SimPEG
+
+
+class Point_bSecondary(SimPEG.Survey.BaseRx):
+    """
+    Secondary magnetic flux density of a frequency domain sounding over a
+    layered earth
+
+    :param numpy.ndarray locs: receiver locations (ie. :code:`np.r_[x,y,z]`),
+                               z is the height above the surface
+    :param string orientation: receiver orientation, only 'z'
+    :param string component: real or imaginary component 'real' or 'imag'
+    """
+
+    def __init__(self, locs, orientation='z', component='real'):
+        assert orientation == 'z', (
+            "Only vertical receivers are implemented, not {0!s}".format(
+                orientation
+            )
+        )
+        assert(
+            component in ['real', 'imag']
+            ), "'component' must be 'real' or 'imag', not {0!s}".format(
+                component
+            )
+
+        self.projComp = orientation
+        self.component = component
+
+        SimPEG.Survey.BaseRx.__init__(self, np.atleast_2d(locs), rxType=None)
+
+
+class BaseTimeRx(SimPEG.Survey.BaseTimeRx):
+    """
+    Time domain receiver of a step-off sounding over a layered earth
+
+    :param numpy.ndarray locs: receiver locations (ie. :code:`np.r_[x,y,z]`),
+                               z is the height above the surface
+    :param numpy.ndarray times: times after the shut-off (s)
+    :param string orientation: receiver orientation, only 'z'
+    """
+
+    #: 'b' or 'dbdt'
+    projField = None
+
+    def __init__(self, locs, times, orientation='z'):
+        assert orientation == 'z', (
+            "Only vertical receivers are implemented, not {0!s}".format(
+                orientation
+            )
+        )
+        self.projComp = orientation
+
+        SimPEG.Survey.BaseTimeRx.__init__(
+            self, np.atleast_2d(locs), np.atleast_1d(times), rxType=None
+        )
+
+
+class Point_b(BaseTimeRx):
+    """
+    Magnetic flux density after the shut-off of the source
+    """
+
+    projField = 'b'
+
+
+class Point_dbdt(BaseTimeRx):
+    """
+    Time derivative of the magnetic flux density after the shut-off of the
+    source
+    """
+
+    projField = 'dbdt'
@@ -0,0 +1,54 @@
+import numpy as np
+from SimPEG import Survey
+
+from . import RxEM1D as Rx
+
+
+class BaseEM1DSrc(Survey.BaseSrc):
+    """
+    Vertical magnetic dipole above a layered earth
+
+    :param list rxList: receiver list
+    :param numpy.ndarray loc: source location (ie. :code:`np.r_[x,y,z]`),
+                              z is the height above the surface
+    :param float moment: magnetic dipole moment
+    """
+
+    moment = 1.
+
+    def __init__(self, rxList, loc, **kwargs):
+        self.loc = np.asarray(loc, dtype=float)
+        assert self.loc.shape == (3,), 'loc must be np.r_[x, y, z]'
+        assert self.loc[2] >= 0., 'the source must be above the surface'
+        Survey.BaseSrc.__init__(self, rxList, **kwargs)
+
+
+class MagDipole(BaseEM1DSrc):
+    """
+    Frequency domain vertical magnetic dipole above a layered earth
+
+    :param list rxList: receiver list
+    :param float freq: frequency
+    :param numpy.ndarray loc: source location (ie. :code:`np.r_[x,y,z]`),
+                              z is the height above the surface
+    :param float moment: magnetic dipole moment
+    """
+
+    rxPair = Rx.Point_bSecondary
+
+    def __init__(self, rxList, freq, loc, **kwargs):
+        self.freq = float(freq)
+        BaseEM1DSrc.__init__(self, rxList, loc, **kwargs)
+
+
+class StepOffMagDipole(BaseEM1DSrc):
+    """
+    Vertical magnetic dipole above a layered earth, switched off at t=0
+
+    :param list rxList: receiver list
+    :param numpy.ndarray loc: source location (ie. :code:`np.r_[x,y,z]`),
+                              z is the height above the surface
+    :param float moment: magnetic dipole moment
+    """
+
+    rxPair = Rx.BaseTimeRx
@@ -0,0 +1,66 @@
+import numpy as np
+from SimPEG import Survey as SimPEGSurvey
+
+from .SrcEM1D import BaseEM1DSrc
+
+
+class Survey(SimPEGSurvey.BaseSurvey):
+    """
+    Survey of soundings over a layered earth. Sources at the same location
+    belong to the same sounding; in a stitched problem each sounding has
+    its own layered model.
+
+    :param list srcList: list of sources
+    """
+
+    srcPair = BaseEM1DSrc
+
+    def __init__(self, srcList, **kwargs):
+        self.srcList = srcList
+        SimPEGSurvey.BaseSurvey.__init__(self, **kwargs)
+
+    @property
+    def soundingLocs(self):
+        """Locations of the soundings (nSounding, 3)"""
+        if getattr(self, '_soundingLocs', None) is None:
+            self._setSoundings()
+        return self._soundingLocs
+
+    @property
+    def soundingIndex(self):
+        """Index of the sounding of each source"""
+        if getattr(self, '_soundingIndex', None) is None:
+            self._setSoundings()
+        return self._soundingIndex
+
+    @property
+    def nSounding(self):
+        """Number of soundings"""
+        return self.soundingLocs.shape[0]
+
+    def _setSoundings(self):
+        locs = np.vstack([src.loc for src in self.srcList])
+        locs, first, index = np.unique(
+            locs, axis=0, return_index=True, return_inverse=True
+        )
+        # keep the soundings in the order they appear in the survey
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(order.size)
+        self._soundingLocs = locs[order]
+        self._soundingIndex = rank[index.flatten()]
+
+    def eval(self, f):
+        """
+        The fields of the layered earth problems are the predicted data
+
+        :param numpy.ndarray f: predicted data
+        :rtype: numpy.ndarray
+        :return: predicted data
+        """
+        return f
+
+    def evalDeriv(self, f):
+        raise Exception(
+            'Use Problem.Jvec(m, v) and Problem.Jtvec(m, v)'
+        )
@@ -0,0 +1,5 @@
+from .ProblemEM1D import BaseEM1DProblem, Problem1D_FD, Problem1D_TD
+from .SurveyEM1D import Survey
+from . import SrcEM1D as Src
+from . import RxEM1D as Rx
+from . import DigFilter
@@ -1,10 +1,11 @@
 from SimPEG import Problem, Utils, Props, Solver as SimpegSolver
 from .SurveyFDEM import Survey as SurveyFDEM
+from . import SrcFDEM
 from .FieldsFDEM import (
     FieldsFDEM, Fields3D_e, Fields3D_b, Fields3D_h, Fields3D_j
 )
 from SimPEG.EM.Base import BaseEMProblem
-from SimPEG.EM.Utils import omega
+from SimPEG.EM.Utils import omega, MagneticDipoleVectorPotentialCache
 
 import numpy as np
 import scipy.sparse as sp
@@ -183,25 +184,67 @@ class BaseFDEMProblem(BaseEMProblem):
     def getSourceTerm(self, freq):
         """
         Evaluates the sources for a given frequency and puts them in matrix
-        form
+        form. The source terms of sources that only depend on the mesh, on
+        their geometry and on the physical properties listed in their
+        :code:`_dependsOn` are cached per frequency; a cached source term is
+        refreshed when the mesh, the sources, the geometry of a source (e.g.
+        its location) or the versions of those physical properties change.
+        Cached source terms are returned read-only.
 
         :param float freq: Frequency
         :rtype: tuple
         :return: (s_m, s_e) (nE or nF, nSrc)
         """
         Srcs = self.survey.getSrcByFreq(freq)
-        if self._formulation is 'EB':
-            s_m = np.zeros((self.mesh.nF, len(Srcs)), dtype=complex)
-            s_e = np.zeros((self.mesh.nE, len(Srcs)), dtype=complex)
-        elif self._formulation is 'HJ':
-            s_m = np.zeros((self.mesh.nE, len(Srcs)), dtype=complex)
-            s_e = np.zeros((self.mesh.nF, len(Srcs)), dtype=complex)
+        uids = [src.uid for src in Srcs]
+        keys = [
+            None if src._dependsOn is None else
+            [src._geometryVersion] +
+            [self._property_version(name) for name in src._dependsOn]
+            for src in Srcs
+        ]
+
+        cache = getattr(self, '_sourceTerms', None)
+        if cache is None or cache[0] is not self.mesh:
+            cache = self._sourceTerms = (self.mesh, {})
+
+        if freq not in cache[1] or cache[1][freq][0] != uids:
+            if self._formulation is 'EB':
+                s_m = np.zeros((self.mesh.nF, len(Srcs)), dtype=complex)
+                s_e = np.zeros((self.mesh.nE, len(Srcs)), dtype=complex)
+            elif self._formulation is 'HJ':
+                s_m = np.zeros((self.mesh.nE, len(Srcs)), dtype=complex)
+                s_e = np.zeros((self.mesh.nF, len(Srcs)), dtype=complex)
+            cached = [None] * len(Srcs)
+        else:
+            _, cached, s_m, s_e = cache[1][freq]
+
+        update = [
+            i for i, key in enumerate(keys)
+            if key is not None and key != cached[i]
+        ]
+        if len(update) > 0:
+            MagneticDipoleVectorPotentialCache(
+                [Srcs[i] for i in update], self, SrcFDEM.MagDipole._srcFct
+            )
+            s_m, s_e = s_m.copy(), s_e.copy()
+            for i in update:
+                smi, sei = Srcs[i].eval(self)
+
+                s_m[:, i] = 0. if isinstance(smi, Utils.Zero) else smi
+                s_e[:, i] = 0. if isinstance(sei, Utils.Zero) else sei
+            s_m.setflags(write=False)
+            s_e.setflags(write=False)
+            cache[1][freq] = (uids, keys, s_m, s_e)
 
-        for i, src in enumerate(Srcs):
-            smi, sei = src.eval(self)
+        evaluate = [i for i, key in enumerate(keys) if key is None]
+        if len(evaluate) > 0:
+            s_m, s_e = s_m.copy(), s_e.copy()
+            for i in evaluate:
+                smi, sei = Srcs[i].eval(self)
 
-            s_m[:, i] = s_m[:, i] + smi
-            s_e[:, i] = s_e[:, i] + sei
+                s_m[:, i] = 0. if isinstance(smi, Utils.Zero) else smi
+                s_e[:, i] = 0. if isinstance(sei, Utils.Zero) else sei
 
         return s_m, s_e
 
@@ -259,7 +302,14 @@ class Problem3D_e(BaseFDEMProblem):
         MeSigma = self.MeSigma
         C = self.mesh.edgeCurl
 
-        return C.T*MfMui*C + 1j*omega(freq)*MeSigma
+        mui = self._diagonal(MfMui)
+        sigma = self._diagonal(MeSigma)
+        if mui is None or sigma is None:
+            return C.T*MfMui*C + 1j*omega(freq)*MeSigma
+
+        # fill the values into the fixed pattern of C.T * MfMui * C
+        P = self._systemPattern('A', lambda: (C.T, C))
+        return P(mui, c=1j*omega(freq)*sigma)
 
     # def getADeriv(self, freq, u, v, adjoint=False):
     #     return
@@ -283,12 +333,7 @@ class Problem3D_e(BaseFDEMProblem):
             adjoint (nD,)
         """
 
-        dMe_dsig = self.MeSigmaDeriv(u)
-
-        if adjoint:
-            return 1j * omega(freq) * ( dMe_dsig.T * v )
-
-        return 1j * omega(freq) * ( dMe_dsig * v )
+        return 1j * omega(freq) * self.MeSigmaDeriv(u, v, adjoint)
 
     def getADeriv_mui(self, freq, u, v, adjoint=False):
         """
@@ -304,9 +349,9 @@ class Problem3D_e(BaseFDEMProblem):
         C = self.mesh.edgeCurl
 
         if adjoint:
-            return (self.MfMuiDeriv(C*u).T * (C * v))
+            return self.MfMuiDeriv(C*u, C * v, adjoint)
 
-        return C.T * (self.MfMuiDeriv(C*u) * v)
+        return C.T * self.MfMuiDeriv(C*u, v, adjoint)
 
     def getADeriv(self, freq, u, v, adjoint=False):
 
@@ -405,6 +450,19 @@ class Problem3D_b(BaseFDEMProblem):
         MfMui = self.MfMui
         MeSigmaI = self.MeSigmaI
         C = self.mesh.edgeCurl
+
+        mui = self._diagonal(MfMui)
+        sigmaI = self._diagonal(MeSigmaI)
+        if mui is not None and sigmaI is not None:
+            # fill the values into the fixed pattern of C * MeSigmaI * C.T
+            if self._makeASymmetric is True:
+                P = self._systemPattern('A', lambda: (C, C.T))
+                return P(sigmaI, c=1j*omega(freq)*mui, s=mui)
+            P = self._systemPattern(
+                'ANonSymmetric', lambda: (C, C.T * MfMui), depends=(MfMui,)
+            )
+            return P(sigmaI, c=1j*omega(freq))
+
         iomega = 1j * omega(freq) * sp.eye(self.mesh.nF)
 
         A = C * (MeSigmaI * (C.T * MfMui)) + iomega
@@ -435,25 +493,21 @@ class Problem3D_b(BaseFDEMProblem):
 
         MfMui = self.MfMui
         C = self.mesh.edgeCurl
-        MeSigmaIDeriv = self.MeSigmaIDeriv
         vec = C.T * (MfMui * u)
 
-        MeSigmaIDeriv = MeSigmaIDeriv(vec)
-
         if adjoint:
-            return MeSigmaIDeriv.T * (C.T * v)
-        return C * (MeSigmaIDeriv * v)
+            return self.MeSigmaIDeriv(vec, C.T * v, adjoint)
+        return C * self.MeSigmaIDeriv(vec, v, adjoint)
 
     def getADeriv_mui(self, freq, u, v, adjoint=False):
 
         MfMui = self.MfMui
-        MfMuiDeriv = self.MfMuiDeriv(u)
         MeSigmaI = self.MeSigmaI
         C = self.mesh.edgeCurl
 
         if adjoint:
-            return MfMuiDeriv.T * (C * (MeSigmaI.T * (C.T * v)))
-        return C * (MeSigmaI * (C.T * (MfMuiDeriv * v)))
+            return self.MfMuiDeriv(u, C * (MeSigmaI.T * (C.T * v)), adjoint)
+        return C * (MeSigmaI * (C.T * self.MfMuiDeriv(u, v, adjoint)))
 
     def getADeriv(self, freq, u, v, adjoint=False):
         if adjoint is True and self._makeASymmetric:
@@ -513,14 +567,13 @@ class Problem3D_b(BaseFDEMProblem):
         if self._makeASymmetric and adjoint:
             v = self.MfMui * v
 
-        MeSigmaIDeriv = self.MeSigmaIDeriv(s_e)
         s_mDeriv, s_eDeriv = src.evalDeriv(self, adjoint=adjoint)
 
         if not adjoint:
-            RHSderiv = C * (MeSigmaIDeriv * v)
+            RHSderiv = C * self.MeSigmaIDeriv(s_e, v, adjoint)
             SrcDeriv = s_mDeriv(v) + C * (self.MeSigmaI * s_eDeriv(v))
         elif adjoint:
-            RHSderiv = MeSigmaIDeriv.T * (C.T * v)
+            RHSderiv = self.MeSigmaIDeriv(s_e, C.T * v, adjoint)
             SrcDeriv = s_mDeriv(v) + s_eDeriv(self.MeSigmaI.T * (C.T * v))
 
         if self._makeASymmetric is True and not adjoint:
@@ -583,6 +636,20 @@ class Problem3D_j(BaseFDEMProblem):
         MeMuI = self.MeMuI
         MfRho = self.MfRho
         C = self.mesh.edgeCurl
+
+        muI = self._diagonal(MeMuI)
+        rho = self._diagonal(MfRho)
+        if muI is not None and rho is not None:
+            # fill the values into the fixed pattern of C * MeMuI * C.T
+            if self._makeASymmetric is True:
+                P = self._systemPattern('A', lambda: (C, C.T))
+                return P(muI, c=1j*omega(freq)*rho, s=rho)
+            P = self._systemPattern(
+                'ANonSymmetric', lambda: (C * MeMuI * C.T, None),
+                depends=(MeMuI,)
+            )
+            return P(rho, c=1j*omega(freq))
+
         iomega = 1j * omega(freq) * sp.eye(self.mesh.nF)
 
         A = C * MeMuI * C.T * MfRho + iomega
@@ -619,26 +686,25 @@ class Problem3D_j(BaseFDEMProblem):
         MeMuI = self.MeMuI
         MfRho = self.MfRho
         C = self.mesh.edgeCurl
-        MfRhoDeriv = self.MfRhoDeriv(u)
 
         if adjoint:
-            return MfRhoDeriv.T * (C * (MeMuI.T * (C.T * v)))
+            return self.MfRhoDeriv(u, C * (MeMuI.T * (C.T * v)), adjoint)
 
-        return C * (MeMuI * (C.T * (MfRhoDeriv * v)))
+        return C * (MeMuI * (C.T * self.MfRhoDeriv(u, v, adjoint)))
 
     def getADeriv_mu(self, freq, u, v, adjoint=False):
 
         C = self.mesh.edgeCurl
         MfRho = self.MfRho
 
-        MeMuIDeriv = self.MeMuIDeriv(C.T * (MfRho * u))
+        vec = C.T * (MfRho * u)
 
         if adjoint is True:
             # if self._makeASymmetric:
             #     v = MfRho * v
-            return MeMuIDeriv.T * (C.T * v)
+            return self.MeMuIDeriv(vec, C.T * v, adjoint)
 
-        Aderiv = C * (MeMuIDeriv * v)
+        Aderiv = C * self.MeMuIDeriv(vec, v, adjoint)
         # if self._makeASymmetric:
         #     Aderiv = MfRho.T * Aderiv
         return Aderiv
@@ -772,7 +838,14 @@ class Problem3D_h(BaseFDEMProblem):
         MfRho = self.MfRho
         C = self.mesh.edgeCurl
 
-        return C.T * (MfRho * C) + 1j*omega(freq)*MeMu
+        rho = self._diagonal(MfRho)
+        mu = self._diagonal(MeMu)
+        if rho is None or mu is None:
+            return C.T * (MfRho * C) + 1j*omega(freq)*MeMu
+
+        # fill the values into the fixed pattern of C.T * MfRho * C
+        P = self._systemPattern('A', lambda: (C.T, C))
+        return P(rho, c=1j*omega(freq)*mu)
 
     def getADeriv_rho(self, freq, u, v, adjoint=False):
         """
@@ -796,19 +869,13 @@ class Problem3D_h(BaseFDEMProblem):
 
         MeMu = self.MeMu
         C = self.mesh.edgeCurl
-        MfRhoDeriv = self.MfRhoDeriv(C*u)
 
         if adjoint:
-            return MfRhoDeriv.T * (C * v)
-        return C.T * (MfRhoDeriv * v)
+            return self.MfRhoDeriv(C*u, C * v, adjoint)
+        return C.T * self.MfRhoDeriv(C*u, v, adjoint)
 
     def getADeriv_mu(self, freq, u, v, adjoint=False):
-        MeMuDeriv = self.MeMuDeriv(u)
-
-        if adjoint is True:
-            return 1j*omega(freq) * (MeMuDeriv.T * v)
-
-        return 1j*omega(freq) * (MeMuDeriv * v)
+        return 1j*omega(freq) * self.MeMuDeriv(u, v, adjoint)
 
     def getADeriv(self, freq, u, v, adjoint=False):
         return (
@@ -853,11 +920,10 @@ class Problem3D_h(BaseFDEMProblem):
         C = self.mesh.edgeCurl
         MfRho = self.MfRho
 
-        MfRhoDeriv = self.MfRhoDeriv(s_e)
         if not adjoint:
-            RHSDeriv = C.T * (MfRhoDeriv * v)
+            RHSDeriv = C.T * self.MfRhoDeriv(s_e, v, adjoint)
         elif adjoint:
-            RHSDeriv = MfRhoDeriv.T * (C * v)
+            RHSDeriv = self.MfRhoDeriv(s_e, C * v, adjoint)
 
         s_mDeriv, s_eDeriv = src.evalDeriv(self, adjoint=adjoint)
 
@@ -4,7 +4,7 @@ from scipy.constants import mu_0
 import warnings
 
 from SimPEG.Utils import Zero
-from SimPEG import Survey, Problem, Utils
+from SimPEG import Survey, Problem, Utils, Props
 
 from .. import Utils as emutils
 from ..Base import BaseEMSrc
@@ -22,6 +22,15 @@ class BaseFDEMSrc(BaseEMSrc):
     _hPrimary = None
     _jPrimary = None
 
+    #: Physical properties of the problem that the source terms depend on,
+    #: None if they depend on the model in other ways. The problem caches
+    #: the source terms of sources that declare these.
+    _dependsOn = None
+
+    #: Incremented when the geometry of the source changes, so the problem
+    #: refreshes its cached source term.
+    _geometryVersion = 0
+
     def __init__(self, rxList, **kwargs):
         super(BaseFDEMSrc, self).__init__(rxList, **kwargs)
 
@@ -132,6 +141,8 @@ class RawVec_e(BaseFDEMSrc):
     :param bool integrate: Integrate the source term (multiply by Me) [False]
     """
 
+    _dependsOn = ()
+
     def __init__(self, rxList, freq, s_e, **kwargs):
         self._s_e = np.array(s_e, dtype=complex)
         self.freq = freq
@@ -161,6 +172,8 @@ class RawVec_m(BaseFDEMSrc):
     :param bool integrate: Integrate the source term (multiply by Me) [False]
     """
 
+    _dependsOn = ()
+
     def __init__(self, rxList, freq, s_m, **kwargs):
         self._s_m = np.array(s_m, dtype=complex)
         self.freq = freq
@@ -189,6 +202,9 @@ class RawVec(BaseFDEMSrc):
     :param numpy.array s_e: electric source term
     :param bool integrate: Integrate the source term (multiply by Me) [False]
     """
+
+    _dependsOn = ()
+
     def __init__(self, rxList, freq, s_m, s_e, **kwargs):
         self._s_m = np.array(s_m, dtype=complex)
         self._s_e = np.array(s_e, dtype=complex)
@@ -279,6 +295,9 @@ class MagDipole(BaseFDEMSrc):
     :param float mu: background magnetic permeability
 
     """
+
+    _dependsOn = ('mu', 'mui')
+
     moment = properties.Float(
         "dipole moment of the transmitter", default=1., min=0.
     )
@@ -328,36 +347,38 @@ class MagDipole(BaseFDEMSrc):
             orientation=self.orientation
         )
 
-    def bPrimary(self, prob):
-        """
-        The primary magnetic flux density from a magnetic vector potential
+    @properties.observer(['loc', 'orientation', 'moment', 'mu'])
+    def _clear_aSrc(self, change):
+        self._aSrcs = None
+        self._geometryVersion += 1
 
-        :param BaseFDEMProblem prob: FDEM problem
-        :rtype: numpy.ndarray
-        :return: primary magnetic field
+    def _aSrc(self, prob):
         """
+        Vector potential of the source on the mesh, cached per mesh and
+        formulation.
+        """
+        return emutils.MagneticDipoleVectorPotentialCache(
+            [self], prob, MagDipole._srcFct
+        )[0]
+
+    def _getaSrc(self, prob):
         formulation = prob._formulation
 
         if formulation == 'EB':
             gridX = prob.mesh.gridEx
             gridY = prob.mesh.gridEy
             gridZ = prob.mesh.gridEz
-            C = prob.mesh.edgeCurl
 
         elif formulation == 'HJ':
             gridX = prob.mesh.gridFx
             gridY = prob.mesh.gridFy
             gridZ = prob.mesh.gridFz
-            C = prob.mesh.edgeCurl.T
 
         if prob.mesh._meshType == 'CYL':
             if not prob.mesh.isSymmetric:
                 # TODO ?
                 raise NotImplementedError(
                     'Non-symmetric cyl mesh not implemented yet!')
-            assert (np.linalg.norm(self.orientation - np.r_[0., 0., 1.]) <
-                    1e-6), ('for cylindrical symmetry, the dipole must be '
-                            'oriented in the Z direction')
             a = self._srcFct(gridY, 'y')
         else:
             ax = self._srcFct(gridX, 'x')
@@ -365,7 +386,30 @@ class MagDipole(BaseFDEMSrc):
             az = self._srcFct(gridZ, 'z')
             a = np.concatenate((ax, ay, az))
 
-        return C*a
+        return a
+
+    def bPrimary(self, prob):
+        """
+        The primary magnetic flux density from a magnetic vector potential
+
+        :param BaseFDEMProblem prob: FDEM problem
+        :rtype: numpy.ndarray
+        :return: primary magnetic field
+        """
+        formulation = prob._formulation
+
+        if formulation == 'EB':
+            C = prob.mesh.edgeCurl
+
+        elif formulation == 'HJ':
+            C = prob.mesh.edgeCurl.T
+
+        if prob.mesh._meshType == 'CYL':
+            assert (np.linalg.norm(self.orientation - np.r_[0., 0., 1.]) <
+                    1e-6), ('for cylindrical symmetry, the dipole must be '
+                            'oriented in the Z direction')
+
+        return C*self._aSrc(prob)
 
     def hPrimary(self, prob):
         """
@@ -541,6 +585,10 @@ class CircularLoop(MagDipole):
             rxList, freq, loc, **kwargs
         )
 
+    @properties.observer('radius')
+    def _clear_aSrc_radius(self, change):
+        self._clear_aSrc(change)
+
     def _srcFct(self, obsLoc, component):
         return emutils.MagneticLoopVectorPotential(
             self.loc, obsLoc, component, mu=self.mu, radius=self.radius,
@@ -550,6 +598,8 @@ class CircularLoop(MagDipole):
 
 class PrimSecSigma(BaseFDEMSrc):
 
+    _dependsOn = ('sigma', 'rho')
+
     def __init__(self, rxList, freq, sigBack, ePrimary, **kwargs):
         self.sigBack = sigBack
 
@@ -572,7 +622,8 @@ class PrimSecMappedSigma(BaseFDEMSrc):
 
     """
     Primary-Secondary Source in which a mapping is provided to put the current
-    model onto the primary mesh. This is solved on every model update.
+    model onto the primary mesh. This is solved again whenever the primary
+    physical properties change.
     There are a lot of layers to the derivatives here!
 
     **Required**
@@ -600,8 +651,25 @@ class PrimSecMappedSigma(BaseFDEMSrc):
         BaseFDEMSrc.__init__(self, rxList, freq=freq, **kwargs)
 
     def _ProjPrimary(self, prob, locType, locTypeTo):
-        # TODO: if meshes have not changed, store the projection
-        # if getattr(self, '__ProjPrimary', None) is None:
+        """
+        Interpolation matrix from the primary mesh to the secondary mesh,
+        cached per pair of meshes.
+        """
+        cache = getattr(self, '_ProjPrimaries', None)
+        if (
+            cache is None or cache[0] is not self.primaryProblem.mesh or
+            cache[1] is not prob.mesh
+        ):
+            cache = self._ProjPrimaries = (
+                self.primaryProblem.mesh, prob.mesh, {}
+            )
+
+        key = (prob._formulation, locType, locTypeTo)
+        if key not in cache[2]:
+            cache[2][key] = self._getProjPrimary(prob, locType, locTypeTo)
+        return cache[2][key]
+
+    def _getProjPrimary(self, prob, locType, locTypeTo):
 
         # TODO: implement for HJ formulation
         if prob._formulation == 'EB':
@@ -634,13 +702,78 @@ class PrimSecMappedSigma(BaseFDEMSrc):
             prob.mesh, locType=locType, locTypeTo=locTypeTo
         )
 
-        # return self.__ProjPrimary
+    def _primaryCache(self, prob):
+        """
+        Primary fields and factorizations of the primary problem. These are
+        shared by the sources of the primary problem and kept until the
+        physical properties of the primary problem change, so the primary
+        problem is only solved again when the primary map of the current
+        model changes.
+        """
+        primary = self.primaryProblem
+        primary.model = prob.model
+
+        key = (
+            [src.uid for src in primary.survey.srcList],
+            [
+                primary._property_version(name) for name in
+                sorted(primary._props)
+                if isinstance(primary._props[name], Props.PhysicalProperty)
+            ]
+        )
+
+        cache = getattr(primary, '_primaryCache', None)
+        if (
+            cache is None or cache['mesh'] is not primary.mesh or
+            cache['key'] != key
+        ):
+            if cache is not None:
+                for Ainv in cache['Ainv'].values():
+                    Ainv.clean()
+            cache = primary._primaryCache = {
+                'mesh': primary.mesh, 'key': key, 'fields': None, 'Ainv': {}
+            }
+        return cache
+
+    def _primaryAinv(self, prob, adjoint=False, freq=None):
+        """
+        Factorization of the primary system (or its transpose) at the
+        frequency of the source, cached with the primary fields. Cached
+        factorizations are cleaned when the cache is replaced.
+        """
+        if freq is None:
+            freq = self.freq
+        cache = self._primaryCache(prob)
+        key = (freq, adjoint)
+        if key not in cache['Ainv']:
+            A = self.primaryProblem.getA(freq)
+            if adjoint is True:
+                A = A.T
+            cache['Ainv'][key] = self.primaryProblem.Solver(
+                A, **self.primaryProblem.solverOpts
+            )
+        return cache['Ainv'][key]
+
+    def _solvePrimary(self, prob):
+        """
+        Primary fields, solved with the cached factorizations so that the
+        primary system is only factored once per frequency
+        """
+        primary = self.primaryProblem
+        f = primary.fieldsPair(primary.mesh, primary.survey)
+        for freq in primary.survey.freqs:
+            Ainv = self._primaryAinv(prob, freq=freq)
+            Srcs = primary.survey.getSrcByFreq(freq)
+            f[Srcs, primary._solutionType] = Ainv * primary.getRHS(freq)
+        return f
 
     def _primaryFields(self, prob, fieldType=None, f=None):
-        # TODO: cache and check if prob.curModel has changed
 
         if f is None:
-            f = self.primaryProblem.fields(prob.model)
+            cache = self._primaryCache(prob)
+            if cache['fields'] is None:
+                cache['fields'] = self._solvePrimary(prob)
+            f = cache['fields']
 
         if fieldType is not None:
             return f[:, fieldType]
@@ -655,19 +788,16 @@ class PrimSecMappedSigma(BaseFDEMSrc):
         # Ainv = self.primaryProblem.Solver(A, **self.primaryProblem.solverOpts) # create the concept of Ainv (actually a solve)
 
         if f is None:
-            f = self._primaryFields(prob.sigma, f=f)
+            f = self._primaryFields(prob)
 
         freq = self.freq
 
-        A = self.primaryProblem.getA(freq)
         src = self.primarySurvey.srcList[0]
         u_src = Utils.mkvc(f[src, self.primaryProblem._solutionType])
 
         if adjoint is True:
             Jtv = np.zeros(prob.sigmaMap.nP, dtype=complex)
-            ATinv = self.primaryProblem.Solver(
-                A.T, **self.primaryProblem.solverOpts
-            )
+            ATinv = self._primaryAinv(prob, adjoint=True)
             df_duTFun = getattr(
                 f, '_{0}Deriv'.format(
                     'e' if self.primaryProblem._formulation == 'EB' else 'j'
@@ -689,12 +819,9 @@ class PrimSecMappedSigma(BaseFDEMSrc):
 
             Jtv += df_dmT + du_dmT
 
-            ATinv.clean()
-
             return Utils.mkvc(Jtv)
 
-        # create the concept of Ainv (actually a solve)
-        Ainv = self.primaryProblem.Solver(A, **self.primaryProblem.solverOpts)
+        Ainv = self._primaryAinv(prob)
 
         # for src in self.survey.getSrcByFreq(freq):
         dA_dm_v = self.primaryProblem.getADeriv(freq, u_src, v)
@@ -712,7 +839,6 @@ class PrimSecMappedSigma(BaseFDEMSrc):
         #     df_dmFun = getattr(f, '_{0}Deriv'.format('j'), None)
         df_dm_v = df_dmFun(src, du_dm_v, v, adjoint=False)
         # Jv[src, rx] = rx.evalDeriv(src, self.mesh, f, df_dm_v)
-        Ainv.clean()
 
         return df_dm_v
 
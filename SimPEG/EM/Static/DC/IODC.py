@@ -100,6 +100,12 @@ class IO(properties.HasProperties):
         ]
     )
 
+    uncertainty_dc = properties.Array(
+        "Uncertainties of the measured DC data",
+        shape=('*',),
+        dtype=float  # data are floats
+    )
+
     data_ip = properties.Array(
         "Measured IP data",
         shape=('*',),
@@ -350,10 +356,15 @@ class IO(properties.HasProperties):
         survey_type=None, data_dc=None, data_ip=None, data_sip=None,
         data_dc_type="volt", data_ip_type="volt", data_sip_type="volt",
         fname=None, dimension=2, line_inds=None,
-        times_ip=None
+        times_ip=None, uncertainty_dc=None
     ):
         """
         read A, B, M, N electrode location and data (V or apparent_resistivity)
+
+        The data are grouped by their unique (A, B) source in time linear in
+        the number of data, with one receiver holding all the (M, N) dipoles
+        of each source. The data, uncertainty and line columns are reordered
+        with the sources (see sort_inds).
         """
         self.a_locations = a_locations.copy()
         self.b_locations = b_locations.copy()
@@ -381,34 +392,32 @@ class IO(properties.HasProperties):
         ndata = self.a_locations.shape[0]
 
         if self.survey_layout == "SURFACE":
-            # 2D locations
+            # group the data by source in linear time: a stable sort keeps
+            # the data of each source in their original order
+            self.sort_inds = np.argsort(uniqSrc[2], kind='mergesort')
+            bounds = np.r_[
+                0, np.cumsum(np.bincount(uniqSrc[2], minlength=nSrc))
+            ]
+            locsM = self.m_locations[self.sort_inds, :]
+            locsN = self.n_locations[self.sort_inds, :]
+
+            if dimension == 2:
+                RxDipole, RxPole = Rx.Dipole_ky, Rx.Pole_ky
+            elif dimension == 3:
+                RxDipole, RxPole = Rx.Dipole, Rx.Pole
+            else:
+                raise NotImplementedError()
+
             srcLists = []
-            sort_inds = []
             for iSrc in range(nSrc):
-                inds = uniqSrc[2] == iSrc
-                sort_inds.append(np.arange(ndata)[inds])
-
-                locsM = self.m_locations[inds, :]
-                locsN = self.n_locations[inds, :]
-                if dimension == 2:
-                    if survey_type in ['dipole-dipole', 'pole-dipole']:
-                        rx = Rx.Dipole_ky(locsM, locsN)
-                    elif survey_type in ['dipole-pole', 'pole-pole']:
-                        rx = Rx.Pole_ky(locsM)
-                elif dimension == 3:
-                    if survey_type in ['dipole-dipole', 'pole-dipole']:
-                        rx = Rx.Dipole(locsM, locsN)
-                    elif survey_type in ['dipole-pole', 'pole-pole']:
-                        rx = Rx.Pole(locsM)
-                else:
-                    raise NotImplementedError()
-
-                if dimension == 2:
-                    locA = uniqSrc[0][iSrc, :2]
-                    locB = uniqSrc[0][iSrc, 2:]
-                elif dimension == 3:
-                    locA = uniqSrc[0][iSrc, :3]
-                    locB = uniqSrc[0][iSrc, 3:]
+                inds = slice(bounds[iSrc], bounds[iSrc+1])
+                if survey_type in ['dipole-dipole', 'pole-dipole']:
+                    rx = RxDipole(locsM[inds], locsN[inds])
+                elif survey_type in ['dipole-pole', 'pole-pole']:
+                    rx = RxPole(locsM[inds])
+
+                locA = uniqSrc[0][iSrc, :dimension]
+                locB = uniqSrc[0][iSrc, dimension:]
 
                 if survey_type in ['dipole-dipole', 'dipole-pole']:
                     src = Src.Dipole([rx], locA, locB)
@@ -417,8 +426,6 @@ class IO(properties.HasProperties):
 
                 srcLists.append(src)
 
-            self.sort_inds = np.hstack(sort_inds)
-
             if dimension == 2:
                 survey = Survey_ky(srcLists)
             elif dimension == 3:
@@ -430,6 +437,7 @@ class IO(properties.HasProperties):
             self.b_locations = self.b_locations[self.sort_inds, :]
             self.m_locations = self.m_locations[self.sort_inds, :]
             self.n_locations = self.n_locations[self.sort_inds, :]
+
             self.G = self.geometric_factor(survey)
 
             if data_dc is not None:
@@ -438,6 +446,8 @@ class IO(properties.HasProperties):
                 self.data_ip = data_ip[self.sort_inds]
             if data_sip is not None:
                 self.data_sip = data_sip[self.sort_inds, :]
+            if uncertainty_dc is not None:
+                self.uncertainty_dc = uncertainty_dc[self.sort_inds]
             if line_inds is not None:
                 self.line_inds = line_inds[self.sort_inds]
             # Here we ignore ... z-locations
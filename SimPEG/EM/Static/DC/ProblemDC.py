@@ -9,10 +9,59 @@ from .SurveyDC import Survey
 from .FieldsDC import FieldsDC, Fields_CC, Fields_N
 import numpy as np
 import scipy as sp
-from SimPEG.Utils import Zero
+from SimPEG.Utils import Zero, closestPoints
 from .BoundaryUtils import getxBCyBC_CC
 
 
+def _allocateJ(prob, nD, nP):
+    """
+    Sensitivity matrix (nD, nP) of zeros, in memory or memory-mapped to
+    :code:`prob.JmatrixFile`, with the dtype :code:`prob.JmatrixDtype`
+    """
+    if prob.JmatrixFile is not None:
+        return np.memmap(
+            prob.JmatrixFile, dtype=prob.JmatrixDtype, mode='w+',
+            shape=(nD, nP)
+        )
+    return np.zeros((nD, nP), dtype=prob.JmatrixDtype)
+
+
+def _sensitivityBlocks(prob, f):
+    """
+    Blocks of the projections of the receivers of each source that measure
+    the same field, of at most :code:`prob.JmatrixBlockSize` data.
+
+    :rtype: generator
+    :return: (src, projField, rows, P) where rows are the indices of the
+             data of the block and P their sparse projection
+    """
+    start = 0
+    for src in prob.survey.srcList:
+        Ps, rows = {}, {}
+        for rx in src.rxList:
+            if rx.projField not in Ps:
+                Ps[rx.projField], rows[rx.projField] = [], []
+            Ps[rx.projField].append(rx.getP(prob.mesh, rx.projGLoc(f)))
+            rows[rx.projField].append(np.arange(start, start + rx.nD))
+            start += rx.nD
+        for projField in Ps:
+            P = sp.sparse.vstack(Ps[projField]).tocsr()
+            rows_field = np.hstack(rows[projField])
+            for i in range(0, rows_field.size, prob.JmatrixBlockSize):
+                block = slice(i, i + prob.JmatrixBlockSize)
+                yield src, projField, rows_field[block], P[block]
+
+
+def _denseRHS(v):
+    """
+    Dense right hand side for a solve, from the (sparse) adjoint of a
+    projection block after the field derivative
+    """
+    if sp.sparse.issparse(v):
+        return v.toarray()
+    return v
+
+
 class BaseDCProblem(BaseEMProblem):
     """
     Base DC Problem
@@ -20,9 +69,25 @@ class BaseDCProblem(BaseEMProblem):
     surveyPair = Survey
     fieldsPair = FieldsDC
     Ainv = None
+    #: version of sigma that Ainv factorizes
+    _AinvVersion = None
     storeJ = False
     _Jmatrix = None
 
+    #: dtype of the stored sensitivity matrix (np.float32 halves its memory)
+    JmatrixDtype = np.float64
+    #: file of the memory-mapped sensitivity matrix (None: kept in memory)
+    JmatrixFile = None
+    #: number of data whose sensitivities are solved for at once
+    JmatrixBlockSize = 256
+
+    #: solve for unit poles at the unique electrodes of the survey and
+    #: superpose them into the sources (forward) and data (adjoint)
+    superposeElectrodes = False
+    _electrodeFields = None
+    _sourceElectrodes = None
+    _adjointElectrodeFields = None
+
     def fields(self, m=None):
         if m is not None:
             self.model = m
@@ -33,8 +98,15 @@ class BaseDCProblem(BaseEMProblem):
         f = self.fieldsPair(self.mesh, self.survey)
         A = self.getA()
         self.Ainv = self.Solver(A, **self.solverOpts)
-        RHS = self.getRHS()
-        u = self.Ainv * RHS
+        self._AinvVersion = self._property_version('sigma')
+        if self.superposeElectrodes:
+            locs, S = self.survey.getSourceElectrodes()
+            self._electrodeFields = self.Ainv * self.getPoleSourceTerm(locs)
+            self._sourceElectrodes = S
+            u = (S.T * self._electrodeFields.T).T
+        else:
+            RHS = self.getRHS()
+            u = self.Ainv * RHS
         Srcs = self.survey.srcList
         f[Srcs, self._solutionType] = u
         return f
@@ -53,9 +125,82 @@ class BaseDCProblem(BaseEMProblem):
             self.model = m
             if f is None:
                 f = self.fields(m)
-            self._Jmatrix = (self._Jtvec(m, v=None, f=f)).T
+            self._Jmatrix = self._formJ(f)
         return self._Jmatrix
 
+    def _formJ(self, f):
+        """
+        Sensitivity matrix, solved for blocks of the data of each source and
+        written in place into J (see JmatrixDtype, JmatrixFile and
+        JmatrixBlockSize)
+        """
+        if self.superposeElectrodes:
+            return self._formJElectrodes(f)
+
+        J = _allocateJ(self, self.survey.nD, self.model.size)
+        for src, projField, rows, P in _sensitivityBlocks(self, f):
+            u_src = f[src, self._solutionType]
+            df_duTFun = getattr(f, '_{0!s}Deriv'.format(projField), None)
+            df_duT, df_dmT = df_duTFun(src, None, P.T, adjoint=True)
+
+            ATinvdf_duT = self.Ainv * _denseRHS(df_duT)
+
+            dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
+            dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
+            du_dmT = -dA_dmT + dRHS_dmT
+            J[rows] = np.reshape(
+                df_dmT + du_dmT, (self.model.size, rows.size)
+            ).T
+        return J
+
+    def _formJElectrodes(self, f):
+        """
+        Sensitivity matrix from the adjoint fields of the unique potential
+        electrodes, superposed into the data of each source
+        """
+        lam, R = self._adjointElectrodes(f)
+        J = _allocateJ(self, self.survey.nD, self.model.size)
+        start = 0
+        for src in self.survey.srcList:
+            rows = np.arange(start, start + src.nD)
+            start += src.nD
+            Rs = R[:, rows]
+            electrodes = np.unique(Rs.indices)
+            Rs = Rs.tocsr()
+            u_src = f[src, self._solutionType]
+            for i in range(0, electrodes.size, self.JmatrixBlockSize):
+                block = electrodes[i:i + self.JmatrixBlockSize]
+                dA_dmT = self.getADeriv(u_src, lam[:, block], adjoint=True)
+                J[rows] -= Rs[block].T.dot(
+                    np.reshape(dA_dmT, (self.model.size, block.size)).T
+                )
+        return J
+
+    def _adjointElectrodes(self, f):
+        """
+        Adjoint fields of unit poles at the unique potential electrodes of
+        the survey, and the weights of the electrodes in the data
+        """
+        if self._adjointElectrodeFields is None:
+            locs, R = self.survey.getReceiverElectrodes()
+            P = self.mesh.getInterpolationMat(locs, f._GLoc('phi'))
+            self._adjointElectrodeFields = (self.Ainv * P.T.toarray(), R)
+        return self._adjointElectrodeFields
+
+    def getPoleSourceTerm(self, locs):
+        """
+        Source terms of unit poles at the electrodes locs
+
+        :param numpy.ndarray locs: electrode locations (nElectrode, dim)
+        :rtype: numpy.ndarray
+        :return: q (nC or nN, nElectrode)
+        """
+        if self._formulation == 'HJ':
+            q = np.zeros((self.mesh.nC, locs.shape[0]))
+            q[closestPoints(self.mesh, locs), np.arange(locs.shape[0])] = 1.
+            return q
+        return self.mesh.getInterpolationMat(locs, locType='N').T.toarray()
+
     def Jvec(self, m, v, f=None):
         """
             Compute sensitivity matrix (J) and vector (v) product.
@@ -67,9 +212,14 @@ class BaseDCProblem(BaseEMProblem):
 
         self.model = m
 
-        if f is None:
+        if f is None or (
+            self.superposeElectrodes and self._electrodeFields is None
+        ):
             f = self.fields(m)
 
+        if self.superposeElectrodes:
+            return self._JvecElectrodes(v, f)
+
         Jv = []
 
         for src in self.survey.srcList:
@@ -84,6 +234,28 @@ class BaseDCProblem(BaseEMProblem):
                 Jv.append(rx.evalDeriv(src, self.mesh, f, df_dm_v))
         return np.hstack(Jv)
 
+    def _JvecElectrodes(self, v, f):
+        """
+        Sensitivity times a vector, solved once for each unique current
+        electrode and superposed into the sources
+        """
+        uE = self._electrodeFields
+        dA_dm_v = np.vstack([
+            self.getADeriv(uE[:, i], v) for i in range(uE.shape[1])
+        ]).T
+        du_dm_v = self.Ainv * (-dA_dm_v)
+        S = self._sourceElectrodes.tocsc()
+
+        Jv = []
+        for i, src in enumerate(self.survey.srcList):
+            Si = S[:, i]
+            du_src = du_dm_v[:, Si.indices].dot(Si.data)
+            for rx in src.rxList:
+                df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
+                df_dm_v = df_dmFun(src, du_src, v, adjoint=False)
+                Jv.append(rx.evalDeriv(src, self.mesh, f, df_dm_v))
+        return np.hstack(Jv)
+
     def Jtvec(self, m, v, f=None):
         """
             Compute adjoint sensitivity matrix (J^T) and vector (v) product.
@@ -107,26 +279,25 @@ class BaseDCProblem(BaseEMProblem):
             Full J matrix can be computed by inputing v=None
         """
 
-        if v is not None:
-            # Ensure v is a data object.
-            if not isinstance(v, self.dataPair):
-                v = self.dataPair(self.survey, v)
-            Jtv = np.zeros(m.size)
-        else:
+        if v is None:
             # This is for forming full sensitivity matrix
-            Jtv = []
+            return self._formJ(f).T
+
+        if self.superposeElectrodes:
+            return self._JtvecElectrodes(m, v, f)
+
+        # Ensure v is a data object.
+        if not isinstance(v, self.dataPair):
+            v = self.dataPair(self.survey, v)
+        Jtv = np.zeros(m.size)
 
         for src in self.survey.srcList:
             u_src = f[src, self._solutionType]
             for rx in src.rxList:
                 # wrt f, need possibility wrt m
-                if v is not None:
-                    PTv = rx.evalDeriv(
-                        src, self.mesh, f, v[src, rx], adjoint=True
-                    )
-                else:
-                    # This is for forming full sensitivity matrix
-                    PTv = rx.getP(self.mesh, rx.projGLoc(f)).toarray().T
+                PTv = rx.evalDeriv(
+                    src, self.mesh, f, v[src, rx], adjoint=True
+                )
                 df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
                                     None)
                 df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
@@ -136,17 +307,30 @@ class BaseDCProblem(BaseEMProblem):
                 dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
                 dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
                 du_dmT = -dA_dmT + dRHS_dmT
-                if v is not None:
-                    Jtv += (df_dmT + du_dmT).astype(float)
-                else:
-                    # This is for forming full sensitivity matrix
-                    Jtv.append(
-                        np.vstack((df_dmT + du_dmT).astype(float))
-                    )
-        if v is not None:
-            return Utils.mkvc(Jtv)
-        else:
-            return np.hstack(Jtv)
+                Jtv += (df_dmT + du_dmT).astype(float)
+        return Utils.mkvc(Jtv)
+
+    def _JtvecElectrodes(self, m, v, f):
+        """
+        Adjoint sensitivity times a vector, from the adjoint fields of the
+        unique potential electrodes
+        """
+        if isinstance(v, self.dataPair):
+            v = v.tovec()
+        lam, R = self._adjointElectrodes(f)
+        Jtv = np.zeros(m.size)
+        start = 0
+        for src in self.survey.srcList:
+            rows = np.arange(start, start + src.nD)
+            start += src.nD
+            Rs = R[:, rows]
+            electrodes = np.unique(Rs.indices)
+            w = (Rs * v[rows])[electrodes]
+            u_src = f[src, self._solutionType]
+            Jtv -= self.getADeriv(
+                u_src, lam[:, electrodes].dot(w), adjoint=True
+            )
+        return Utils.mkvc(Jtv)
 
     def getSourceTerm(self):
         """
@@ -172,9 +356,13 @@ class BaseDCProblem(BaseEMProblem):
 
     @property
     def deleteTheseOnModelUpdate(self):
-        toDelete = super(BaseDCProblem, self).deleteTheseOnModelUpdate
-        if self._Jmatrix is not None:
-            toDelete += ['_Jmatrix']
+        toDelete = []
+        for name in [
+            '_Jmatrix', '_electrodeFields', '_sourceElectrodes',
+            '_adjointElectrodeFields'
+        ]:
+            if getattr(self, name) is not None:
+                toDelete += [name]
         return toDelete
 
 
@@ -202,7 +390,14 @@ class Problem3D_CC(BaseDCProblem):
         D = self.Div
         G = self.Grad
         MfRhoI = self.MfRhoI
-        A = D * MfRhoI * G
+
+        rhoI = self._diagonal(MfRhoI)
+        if rhoI is None:
+            A = D * MfRhoI * G
+        else:
+            # fill the values into the fixed pattern of D * MfRhoI * G
+            P = self._systemPattern('A', lambda: (D, G), depends=(D, G))
+            A = P(rhoI)
 
         if(self.bc_type == 'Neumann'):
             Vol = self.mesh.vol
@@ -210,9 +405,8 @@ class Problem3D_CC(BaseDCProblem):
                 print('Perturbing first row of A to remove nullspace for Neumann BC.')
 
             # Handling Null space of A
-            I, J, V = sp.sparse.find(A[0, :])
-            for jj in J:
-                A[0, jj] = 0.
+            A = A.tocsr()
+            A.data[A.indptr[0]:A.indptr[1]] = 0.
             A[0, 0] = 1.
 
         # I think we should deprecate this for DC problem.
@@ -224,12 +418,11 @@ class Problem3D_CC(BaseDCProblem):
 
         D = self.Div
         G = self.Grad
-        MfRhoIDeriv = self.MfRhoIDeriv
 
         if adjoint:
-            return(MfRhoIDeriv(G * u).T) * (D.T * v)
+            return self.MfRhoIDeriv(G * u, D.T * v, adjoint)
 
-        return D * (MfRhoIDeriv(G * u) * v)
+        return D * self.MfRhoIDeriv(G * u, v, adjoint)
 
     def getRHS(self):
         """
@@ -415,14 +608,20 @@ class Problem3D_N(BaseDCProblem):
 
         MeSigma = self.MeSigma
         Grad = self.mesh.nodalGrad
-        A = Grad.T * MeSigma * Grad
+
+        sigma = self._diagonal(MeSigma)
+        if sigma is None:
+            A = Grad.T * MeSigma * Grad
+        else:
+            # fill the values into the fixed pattern of Grad.T * MeSigma * Grad
+            P = self._systemPattern('A', lambda: (Grad.T, Grad))
+            A = P(sigma)
 
         Vol = self.mesh.vol
 
         # Handling Null space of A
-        I, J, V = sp.sparse.find(A[0, :])
-        for jj in J:
-            A[0, jj] = 0.
+        A = A.tocsr()
+        A.data[A.indptr[0]:A.indptr[1]] = 0.
         A[0, 0] = 1.
 
         return A
@@ -434,9 +633,9 @@ class Problem3D_N(BaseDCProblem):
         """
         Grad = self.mesh.nodalGrad
         if not adjoint:
-            return Grad.T*(self.MeSigmaDeriv(Grad*u)*v)
+            return Grad.T*self.MeSigmaDeriv(Grad*u, v, adjoint)
         elif adjoint:
-            return self.MeSigmaDeriv(Grad*u).T * (Grad*v)
+            return self.MeSigmaDeriv(Grad*u, Grad*v, adjoint)
 
     def getRHS(self):
         """
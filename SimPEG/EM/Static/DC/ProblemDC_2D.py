@@ -3,17 +3,47 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import traceback
+
+import properties
 from SimPEG import Utils
 from SimPEG.EM.Base import BaseEMProblem
 from .SurveyDC import Survey_ky
 from .FieldsDC_2D import Fields_ky, Fields_ky_CC, Fields_ky_N
 from .FieldsDC import FieldsDC, Fields_CC, Fields_N
+from .ProblemDC import _allocateJ, _sensitivityBlocks, _denseRHS
 import numpy as np
 from SimPEG.Utils import Zero
 from .BoundaryUtils import getxBCyBC_CC
+from .Utils import getKyQuadrature, getKyWeights
 from scipy.special import kn
 
 
+def _kyWorkerLoop(prob, kyInds, conn):
+    """
+    Loop run by a worker process of a 2.5D problem (see
+    :code:`BaseDCProblem_2D.nWorkers`). The worker solves the systems of the
+    wavenumbers kyInds and keeps their factorizations and solutions until
+    the model changes or the worker is closed.
+    """
+    prob._isWorker = True
+    prob._workerKyInds = kyInds
+    prob.Ainv = [None for i in range(prob.nky)]
+    prob._workerModel = None
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        try:
+            conn.send((True, prob._runKyTask(*task)))
+        except Exception:
+            conn.send((False, traceback.format_exc()))
+    for Ainv in prob.Ainv:
+        if Ainv is not None:
+            Ainv.clean()
+    conn.close()
+
+
 class BaseDCProblem_2D(BaseEMProblem):
     """
     Base 2.5D DC problem
@@ -28,16 +58,115 @@ class BaseDCProblem_2D(BaseEMProblem):
     storeJ = False
     _Jmatrix = None
 
+    #: dtype of the stored sensitivity matrix (np.float32 halves its memory)
+    JmatrixDtype = np.float64
+    #: file of the memory-mapped sensitivity matrix (None: kept in memory)
+    JmatrixFile = None
+    #: number of data whose sensitivities are solved for at once
+    JmatrixBlockSize = 256
+
+    nWorkers = properties.Integer(
+        "Number of worker processes that factor and solve groups of "
+        "wavenumbers (1: all wavenumbers are solved in this process)",
+        default=1, min=1
+    )
+
+    def _setKy(self, ky):
+        """
+        Set what the operators of the problem need for the wavenumber ky
+        """
+        pass
+
+    def _kyWeights(self, y=0.):
+        """
+        Weights of the integration over the wavenumbers, including the 1/pi
+        of the inverse cosine transform, so that
+        :math:`\\phi(y) = \\sum_i w_i \\phi(k_{y,i})`. The trapezoidal
+        rule is used unless the quadrature was fitted with
+        :code:`setKyQuadrature`. The weights are computed once for the
+        wavenumbers and each offset y (a float or an array of offsets).
+        """
+        cache = getattr(self, '_kyWeightsCache', None)
+        if cache is None or cache[0] is not self.kys:
+            cache = self._kyWeightsCache = (self.kys, {})
+        y = np.asarray(y, dtype=float)
+        key = (y.shape, y.tobytes())
+        if key not in cache[1]:
+            weights = getKyWeights(
+                self.kys, y=y[()],
+                weights=getattr(self, '_kyQuadratureWeights', None)
+            )
+            weights.flags.writeable = False
+            cache[1][key] = weights
+        return cache[1][key]
+
+    def setKyQuadrature(self, nky=7, rmin=None, rmax=None):
+        """
+        Replace the trapezoidal rule over 15 wavenumbers by nky wavenumbers
+        and weights fitted to the offsets between the source and receiver
+        electrodes of the survey (see
+        :func:`SimPEG.EM.Static.DC.Utils.getKyQuadrature`). The offsets
+        smaller than half the smallest cell of the mesh are not fitted.
+
+        :param int nky: number of wavenumbers
+        :param float rmin: smallest offset (default from the survey)
+        :param float rmax: largest offset (default from the survey)
+        :rtype: float
+        :return: largest relative error of the quadrature for a point
+                 source in a whole space between rmin and rmax, also stored
+                 in :code:`kyQuadratureError`
+        """
+        if rmin is None or rmax is None:
+            offsets = []
+            for src in self.survey.srcList:
+                srcLocs = np.vstack(src.loc)
+                for rx in src.rxList:
+                    rxLocs = np.vstack(rx.locs)
+                    offsets.append(Utils.mkvc(np.sqrt((
+                        (rxLocs[:, np.newaxis, :] -
+                         srcLocs[np.newaxis, :, :])**2
+                    ).sum(axis=2))))
+            offsets = np.hstack(offsets)
+            hmin = min([h.min() for h in self.mesh.h])
+            offsets = offsets[offsets >= hmin/2.]
+            if rmin is None:
+                rmin = offsets.min() if offsets.size else hmin/2.
+            if rmax is None:
+                rmax = offsets.max() if offsets.size else 2.*rmin
+
+        kys, weights, error = getKyQuadrature(rmin, rmax, nky=nky)
+        self.nky = self.nT = nky
+        self.kys = kys
+        self.Ainv = [None for i in range(nky)]
+        self._kyQuadratureWeights = weights
+        self.kyQuadratureError = error
+        if self.verbose:
+            print(
+                "{0:d} wavenumbers fitted to offsets between {1:g} and "
+                "{2:g}: relative error {3:.2e}".format(nky, rmin, rmax, error)
+            )
+        return error
+
+    def _kyInds(self):
+        """
+        Indices of the wavenumbers solved in this process
+        """
+        return getattr(self, '_workerKyInds', range(self.nky))
+
     def fields(self, m):
         if m is not None:
             self.model = m
-        if self.Ainv[0] is not None:
-            for i in range(self.nky):
-                self.Ainv[i].clean()
+
+        if self._useWorkers():
+            return self._fieldsWorkers()
+
+        for Ainv in self.Ainv:
+            if Ainv is not None:
+                Ainv.clean()
 
         f = self.fieldsPair(self.mesh, self.survey)
         Srcs = self.survey.srcList
-        for iky in range(self.nky):
+        for iky in self._kyInds():
             ky = self.kys[iky]
             A = self.getA(ky)
             self.Ainv[iky] = self.Solver(A, **self.solverOpts)
@@ -47,20 +176,30 @@ class BaseDCProblem_2D(BaseEMProblem):
         return f
 
     def fields_to_space(self, f, y=0.):
-        f_fwd = self.fieldsPair_fwd(self.mesh, self.survey)
-        # Evaluating Integration using Trapezoidal rules
-        nky = self.kys.size
-        dky = np.diff(self.kys)
-        dky = np.r_[dky[0], dky]
-        phi0 = 1./np.pi*f[:, self._solutionType, 0]
-        phi = np.zeros_like(phi0)
-        for iky in range(nky):
-            phi1 = 1./np.pi*f[:, self._solutionType, iky]
-            phi += phi1*dky[iky]/2.*np.cos(self.kys[iky]*y)
-            phi += phi0*dky[iky]/2.*np.cos(self.kys[iky]*y)
-            phi0 = phi1.copy()
-        f_fwd[:, self._solutionType] = phi
-        return f_fwd
+        """
+        Fields in space at the offset y from the plane of the sources,
+        integrated over the wavenumbers in one contraction of the stored
+        (nP, nSrc, nky) fields. For an array of offsets y, a list with the
+        fields at each offset is returned.
+
+        :param Fields f: fields of the wavenumbers
+        :param y: offset (float) or offsets (numpy.ndarray)
+        :rtype: Fields or list
+        :return: fields in space, one per offset for an array of offsets
+        """
+        y = np.asarray(y, dtype=float)
+        # the time fields hold one more slot than the wavenumbers
+        u = f._fields[self._solutionType][:, :, :self.nky]
+        u = u.dot(self._kyWeights(y=y.ravel() if y.ndim else y))
+        if y.ndim == 0:
+            u = u[:, :, np.newaxis]
+
+        fields = []
+        for i in range(u.shape[2]):
+            f_fwd = self.fieldsPair_fwd(self.mesh, self.survey)
+            f_fwd[:, self._solutionType] = u[:, :, i]
+            fields.append(f_fwd)
+        return fields[0] if y.ndim == 0 else fields
 
     def getJ(self, m, f=None):
         """
@@ -74,11 +213,45 @@ class BaseDCProblem_2D(BaseEMProblem):
         else:
 
             self.model = m
-            if f is None:
+            if f is None and not self._useWorkers():
                 f = self.fields(m)
-            self._Jmatrix = (self._Jtvec(m, v=None, f=f)).T
+            self._Jmatrix = self._formJ(f)
         return self._Jmatrix
 
+    def _formJ(self, f):
+        """
+        Sensitivity matrix, integrated over the wavenumbers in place in J
+        (see JmatrixDtype, JmatrixFile and JmatrixBlockSize)
+        """
+        # Assume y=0.
+        weights = self._kyWeights(y=0.)
+        J = _allocateJ(self, self.survey.nD, self.model.size)
+        if self._useWorkers():
+            # the workers integrate their wavenumbers and the parent adds
+            # the partial sums, so that only one J is sent by each worker
+            for J_partial in self._mapKyWorkers('J', (), weights=weights):
+                J += J_partial
+            return J
+
+        for iky in range(self.nky):
+            self._addJKy(iky, f, J, weights[iky])
+        return J
+
+    def _addJKy(self, iky, f, J, weight):
+        """
+        Add the sensitivity matrix at the wavenumber kys[iky], times weight,
+        to J, for blocks of the data of each source
+        """
+        ky = self.kys[iky]
+        self._setKy(ky)
+        for src, projField, rows, P in _sensitivityBlocks(self, f):
+            u_src = f[src, self._solutionType, iky]
+            ATinvdf_duT = self.Ainv[iky] * _denseRHS(P.T)
+            dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT, adjoint=True)
+            J[rows] -= weight*np.reshape(
+                dA_dmT, (self.model.size, rows.size)
+            ).T
+
     def Jvec(self, m, v, f=None):
         """
             Compute sensitivity matrix (J) and vector (v) product.
@@ -90,43 +263,40 @@ class BaseDCProblem_2D(BaseEMProblem):
 
         self.model = m
 
-        if f is None:
-            f = self.fields(m)
-
-        # TODO: This is not a good idea !! should change that as a list
-        Jv = self.dataPair(self.survey)  # same size as the data
-        Jv0 = self.dataPair(self.survey)
-
         # Assume y=0.
         # This needs some thoughts to implement in general when src is dipole
-        dky = np.diff(self.kys)
-        dky = np.r_[dky[0], dky]
-        y = 0.
+        weights = self._kyWeights(y=0.)
 
-        # TODO: this loop is pretty slow .. (Parellize)
+        if self._useWorkers():
+            Jv_ky = self._mapKyWorkers('_JvecKy', (v, ))
+        else:
+            if f is None:
+                f = self.fields(m)
+            Jv_ky = [self._JvecKy(iky, f, v) for iky in range(self.nky)]
+
+        Jv = np.zeros(self.survey.nD)
         for iky in range(self.nky):
-            ky = self.kys[iky]
-            A = self.getA(ky)
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType, iky]  # solution vector
-                dA_dm_v = self.getADeriv(ky, u_src, v)
-                dRHS_dm_v = self.getRHSDeriv(ky, src, v)
-                du_dm_v = self.Ainv[iky] * (- dA_dm_v + dRHS_dm_v)
-                for rx in src.rxList:
-                    df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
-                                       None)
-                    df_dm_v = df_dmFun(iky, src, du_dm_v, v, adjoint=False)
-                    # Trapezoidal intergration
-                    Jv1_temp = 1./np.pi*rx.evalDeriv(ky, src, self.mesh, f,
-                                                     df_dm_v)
-                    if iky == 0:
-                        # First assigment
-                        Jv[src, rx] = Jv1_temp*dky[iky]*np.cos(ky*y)
-                    else:
-                        Jv[src, rx] += Jv1_temp*dky[iky]/2.*np.cos(ky*y)
-                        Jv[src, rx] += Jv0[src, rx]*dky[iky]/2.*np.cos(ky*y)
-                    Jv0[src, rx] = Jv1_temp.copy()
-        return Utils.mkvc(Jv)
+            Jv += weights[iky]*Jv_ky[iky]
+        return Jv
+
+    def _JvecKy(self, iky, f, v):
+        """
+        Derivative of the data at the wavenumber kys[iky] times v
+        """
+        ky = self.kys[iky]
+        self._setKy(ky)
+        Jv = []
+        for src in self.survey.srcList:
+            u_src = f[src, self._solutionType, iky]  # solution vector
+            dA_dm_v = self.getADeriv(ky, u_src, v)
+            dRHS_dm_v = self.getRHSDeriv(ky, src, v)
+            du_dm_v = self.Ainv[iky] * (- dA_dm_v + dRHS_dm_v)
+            for rx in src.rxList:
+                df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
+                                   None)
+                df_dm_v = df_dmFun(iky, src, du_dm_v, v, adjoint=False)
+                Jv.append(rx.evalDeriv(ky, src, self.mesh, f, df_dm_v))
+        return np.hstack(Jv)
 
     def Jtvec(self, m, v, f=None):
         """
@@ -140,7 +310,7 @@ class BaseDCProblem_2D(BaseEMProblem):
 
         self.model = m
 
-        if f is None:
+        if f is None and not self._useWorkers():
             f = self.fields(m)
 
         return self._Jtvec(m, v=v, f=f)
@@ -151,96 +321,209 @@ class BaseDCProblem_2D(BaseEMProblem):
             Full J matrix can be computed by inputing v=None
         """
 
+        # Assume y=0.
+        weights = self._kyWeights(y=0.)
+
         if v is not None:
             # Ensure v is a data object.
-            if not isinstance(v, self.dataPair):
-                v = self.dataPair(self.survey, v)
-            Jtv = np.zeros(m.size, dtype=float)
-
-            # Assume y=0.
-            dky = np.diff(self.kys)
-            dky = np.r_[dky[0], dky]
-            y = 0.
+            if isinstance(v, self.dataPair):
+                v = v.tovec()
+            if self._useWorkers():
+                Jtv_ky = self._mapKyWorkers('_JtvecKy', (v, ))
+            else:
+                Jtv_ky = (
+                    self._JtvecKy(iky, f, v) for iky in range(self.nky)
+                )
 
-            for src in self.survey.srcList:
-                for rx in src.rxList:
-                    Jtv_temp1 = np.zeros(m.size, dtype=float)
-                    Jtv_temp0 = np.zeros(m.size, dtype=float)
-
-                    # TODO: this loop is pretty slow .. (Parellize)
-                    for iky in range(self.nky):
-                        u_src = f[src, self._solutionType, iky]
-                        ky = self.kys[iky]
-                        AT = self.getA(ky)
-                        # wrt f, need possibility wrt m
-                        PTv = rx.evalDeriv(ky, src, self.mesh, f, v[src, rx],
-                                           adjoint=True)
-                        df_duTFun = getattr(
-                            f, '_{0!s}Deriv'.format(rx.projField), None
-                        )
-                        df_duT, df_dmT = df_duTFun(iky, src, None, PTv,
-                                                   adjoint=True)
-
-                        ATinvdf_duT = self.Ainv[iky] * df_duT
-
-                        dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT,
-                                                adjoint=True)
-                        dRHS_dmT = self.getRHSDeriv(ky, src, ATinvdf_duT,
-                                                    adjoint=True)
-                        du_dmT = -dA_dmT + dRHS_dmT
-                        Jtv_temp1 = 1./np.pi*(df_dmT + du_dmT).astype(float)
-                        # Trapezoidal intergration
-                        if iky == 0:
-                            # First assigment
-                            Jtv += Jtv_temp1*dky[iky]*np.cos(ky*y)
-                        else:
-                            Jtv += Jtv_temp1*dky[iky]/2.*np.cos(ky*y)
-                            Jtv += Jtv_temp0*dky[iky]/2.*np.cos(ky*y)
-                        Jtv_temp0 = Jtv_temp1.copy()
+            Jtv = np.zeros(m.size, dtype=float)
+            for iky, Jtv_temp in enumerate(Jtv_ky):
+                Jtv += weights[iky]*Jtv_temp
             return Utils.mkvc(Jtv)
 
         # This is for forming full sensitivity
         else:
+            return self._formJ(f).T
 
-            Jt = []
+    def _JtvecKy(self, iky, f, v):
+        """
+        Adjoint of the derivative of the data at the wavenumber kys[iky]
+        times v
+        """
+        if not isinstance(v, self.dataPair):
+            v = self.dataPair(self.survey, v)
+        ky = self.kys[iky]
+        self._setKy(ky)
+        Jtv = np.zeros(self.model.size, dtype=float)
+        for src in self.survey.srcList:
+            u_src = f[src, self._solutionType, iky]
+            for rx in src.rxList:
+                # wrt f, need possibility wrt m
+                PTv = rx.evalDeriv(ky, src, self.mesh, f, v[src, rx],
+                                   adjoint=True)
+                df_duTFun = getattr(
+                    f, '_{0!s}Deriv'.format(rx.projField), None
+                )
+                df_duT, df_dmT = df_duTFun(iky, src, None, PTv,
+                                           adjoint=True)
 
-            # Assume y=0.
-            dky = np.diff(self.kys)
-            dky = np.r_[dky[0], dky]
-            y = 0.
-            for src in self.survey.srcList:
-                for rx in src.rxList:
-                    Jtv_temp1 = np.zeros((m.size, rx.nD), dtype=float)
-                    Jtv_temp0 = np.zeros((m.size, rx.nD), dtype=float)
-                    Jtv = np.zeros((m.size, rx.nD), dtype=float)
-                    # TODO: this loop is pretty slow .. (Parellize)
-                    for iky in range(self.nky):
-                        u_src = f[src, self._solutionType, iky]
-                        ky = self.kys[iky]
-                        AT = self.getA(ky)
-
-                        # wrt f, need possibility wrt m
-                        P = rx.getP(self.mesh, rx.projGLoc(f)).toarray()
-
-                        ATinvdf_duT = self.Ainv[iky] * (P.T)
-
-                        dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT,
-                                                adjoint=True)
-                        Jtv_temp1 = 1./np.pi*(-dA_dmT)
-                        if rx.nD == 1:
-                            Jtv_temp1 = Jtv_temp1.reshape([-1, 1])
-
-                        # Trapezoidal intergration
-                        if iky == 0:
-                            # First assigment
-                            Jtv += Jtv_temp1*dky[iky]*np.cos(ky*y)
-                        else:
-                            Jtv += Jtv_temp1*dky[iky]/2.*np.cos(ky*y)
-                            Jtv += Jtv_temp0*dky[iky]/2.*np.cos(ky*y)
-                        Jtv_temp0 = Jtv_temp1.copy()
-
-                    Jt.append(Jtv)
-            return np.hstack(Jt)
+                ATinvdf_duT = self.Ainv[iky] * df_duT
+
+                dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT,
+                                        adjoint=True)
+                dRHS_dmT = self.getRHSDeriv(ky, src, ATinvdf_duT,
+                                            adjoint=True)
+                du_dmT = -dA_dmT + dRHS_dmT
+                Jtv += (df_dmT + du_dmT).astype(float)
+        return Jtv
+
+    def _useWorkers(self):
+        return (
+            self.nWorkers > 1 and
+            self.nky > 1 and
+            not getattr(self, '_isWorker', False) and
+            self._forkContext() is not None
+        )
+
+    def _kyWorkersKey(self):
+        """
+        What the workers keep from the fork: the model is sent with every
+        task, but the survey, the wavenumbers, the mappings and the physical
+        properties that are not set by the model are not.
+        """
+        modelProperties = self._model_properties()
+        return (
+            id(self.survey), tuple(self.kys), self.nWorkers,
+            tuple(self._get(name) for name in self._all_map_names),
+            tuple(sorted(
+                (name, version) for name, version in
+                getattr(self, '_propertyVersions', {}).items()
+                if name not in modelProperties
+            ))
+        )
+
+    def _kyWorkers(self):
+        """
+        Worker processes, each solving a contiguous group of wavenumbers.
+        They are forked on first use and kept (with their factorizations)
+        until the state they were forked with changes (see
+        :code:`_kyWorkersKey`).
+        """
+        key = self._kyWorkersKey()
+        pool = getattr(self, '_kyWorkerPool', None)
+        if pool is not None and pool[0] == key:
+            return pool[1]
+        self.closeWorkers()
+
+        context = self._forkContext()
+        workers = []
+        for kyInds in np.array_split(
+            np.arange(self.nky), min(self.nWorkers, self.nky)
+        ):
+            conn, workerConn = context.Pipe()
+            process = context.Process(
+                target=_kyWorkerLoop, args=(self, kyInds, workerConn)
+            )
+            process.daemon = True
+            process.start()
+            workerConn.close()
+            workers.append((kyInds, conn, process))
+        self._kyWorkerPool = (key, workers)
+        return workers
+
+    def closeWorkers(self):
+        """
+        Stop the worker processes (see nWorkers) and free their
+        factorizations
+        """
+        pool = getattr(self, '_kyWorkerPool', None)
+        self._kyWorkerPool = None
+        if pool is None:
+            return
+        for _, conn, process in pool[1]:
+            try:
+                conn.send(None)
+            except (IOError, OSError):
+                pass
+        for _, conn, process in pool[1]:
+            process.join()
+            conn.close()
+
+    def _mapKyWorkers(self, method, args, weights=None):
+        """
+        Run a method of the problem for all the wavenumbers on the workers,
+        at the current model.
+
+        :param str method: name of the method, called as
+            :code:`method(iky, f, *args)`
+        :param tuple args: arguments of the method
+        :param numpy.ndarray weights: if given, the workers return the
+            weighted sums of the outputs over their wavenumbers
+        :rtype: list
+        :return: outputs for each wavenumber, or the partial sums of each
+            worker
+        """
+        workers = self._kyWorkers()
+        task = (self.model, method, args, weights)
+        for _, conn, _ in workers:
+            conn.send(task)
+
+        out = [None for i in range(self.nky)]
+        partial, errors = [], []
+        for kyInds, conn, _ in workers:
+            success, result = conn.recv()
+            if not success:
+                errors.append(result)
+            elif weights is not None:
+                partial.append(result)
+            else:
+                for iky, result_ky in zip(kyInds, result):
+                    out[iky] = result_ky
+        if errors:
+            raise Exception(
+                'A worker of the 2.5D problem failed:\n{0!s}'.format(
+                    errors[0]
+                )
+            )
+        return partial if weights is not None else out
+
+    def _runKyTask(self, m, method, args, weights):
+        """
+        Run a task of the parent on the wavenumbers of this worker. The
+        fields are only solved again when the model changes.
+        """
+        if self._workerModel is None or not np.array_equal(
+            m, self._workerModel
+        ):
+            self._workerFields = self.fields(m)
+            self._workerModel = np.array(m, copy=True)
+        f = self._workerFields
+
+        kyInds = self._kyInds()
+        if method == 'fields':
+            return [f[:, self._solutionType, iky] for iky in kyInds]
+        if method == 'J':
+            J = np.zeros(
+                (self.survey.nD, self.model.size), dtype=self.JmatrixDtype
+            )
+            for iky in kyInds:
+                self._addJKy(iky, f, J, weights[iky])
+            return J
+
+        out = [getattr(self, method)(iky, f, *args) for iky in kyInds]
+        if weights is None:
+            return out
+        return sum(weights[iky]*out_ky for iky, out_ky in zip(kyInds, out))
+
+    def _fieldsWorkers(self):
+        """
+        Solve the wavenumbers on the workers, and gather their fields
+        """
+        f = self.fieldsPair(self.mesh, self.survey)
+        Srcs = self.survey.srcList
+        u = self._mapKyWorkers('fields', ())
+        for iky in range(self.nky):
+            f[Srcs, self._solutionType, iky] = u[iky]
+        return f
 
     def getSourceTerm(self, ky):
         """
@@ -271,8 +554,6 @@ class BaseDCProblem_2D(BaseEMProblem):
     @property
     def deleteTheseOnModelUpdate(self):
         toDelete = []
-        if self.sigmaMap is not None or self.rhoMap is not None:
-            toDelete += ['_MeSigma', '_MeSigmaI', '_MfRho', '_MfRhoI']
         if self._Jmatrix is not None:
             toDelete += ['_Jmatrix']
         return toDelete
@@ -292,6 +573,11 @@ class Problem2D_CC(BaseDCProblem_2D):
     def __init__(self, mesh, **kwargs):
         BaseDCProblem_2D.__init__(self, mesh, **kwargs)
 
+    def _setKy(self, ky):
+        # the mixed boundary conditions depend on ky
+        if self._formulation == "HJ":
+            self.setBC(ky=ky)
+
     def getA(self, ky):
         """
 
@@ -324,14 +610,18 @@ class Problem2D_CC(BaseDCProblem_2D):
         D = self.Div
         G = self.Grad
         vol = self.mesh.vol
-        MfRhoIDeriv = self.MfRhoIDeriv
         rho = self.rho
+        dMcc_drho = Utils.sdiag(u.flatten()*vol*(-1./rho**2))
         if adjoint:
-            return((MfRhoIDeriv( G * u).T) * (D.T * v) +
-                   ky**2 * self.rhoDeriv.T*Utils.sdiag(u.flatten()*vol*(-1./rho**2))*v)
+            return (
+                self.MfRhoIDeriv(G * u, D.T * v, adjoint) +
+                ky**2 * self._mapDeriv('rho', dMcc_drho*v, adjoint=True)
+            )
 
-        return (D * ((MfRhoIDeriv(G * u)) * v) + ky**2*
-                Utils.sdiag(u.flatten()*vol*(-1./rho**2))*(self.rhoDeriv*v))
+        return (
+            D * self.MfRhoIDeriv(G * u, v, adjoint) +
+            ky**2 * dMcc_drho * self._mapDeriv('rho', v)
+        )
 
     def getRHS(self, ky):
         """
@@ -453,13 +743,22 @@ class Problem2D_N(BaseDCProblem_2D):
 
         return MnSigma
 
-    def MnSigmaDeriv(self, u):
+    def MnSigmaDeriv(self, u, v=None, adjoint=False):
         """
             Derivative of MnSigma with respect to the model
         """
         sigma = self.sigma
-        sigmaderiv = self.sigmaDeriv
         vol = self.mesh.vol
+        if v is not None:
+            U = Utils.sdiag(Utils.mkvc(u))
+            V = Utils.sdiag(vol)
+            if adjoint:
+                return self._mapDeriv(
+                    'sigma', V * (self.mesh.aveN2CC * (U * v)), adjoint=True
+                )
+            return U * (self.mesh.aveN2CC.T * (V * self._mapDeriv(
+                'sigma', v
+            )))
         return (Utils.sdiag(u)*self.mesh.aveN2CC.T*Utils.sdiag(vol) *
                 self.sigmaDeriv)
 
@@ -477,7 +776,13 @@ class Problem2D_N(BaseDCProblem_2D):
         Grad = self.mesh.nodalGrad
         # Get conductivity sigma
         sigma = self.sigma
-        A = Grad.T * MeSigma * Grad + ky**2*MnSigma
+        sigmaE = self._diagonal(MeSigma)
+        if sigmaE is None:
+            A = Grad.T * MeSigma * Grad + ky**2*MnSigma
+        else:
+            # fill the values into the fixed pattern of Grad.T*MeSigma*Grad
+            P = self._systemPattern('A', lambda: (Grad.T, Grad))
+            A = P(sigmaE, c=ky**2*MnSigma.diagonal())
         # This seems not required for 2.5D problem
         # Handling Null space of A
         # A[0, 0] = A[0, 0] + 1.
@@ -491,10 +796,10 @@ class Problem2D_N(BaseDCProblem_2D):
         vol = self.mesh.vol
 
         if adjoint:
-            return (self.MeSigmaDeriv(Grad*u).T * (Grad*v) +
-                    ky**2*self.MnSigmaDeriv(u).T*v)
-        return (Grad.T*(self.MeSigmaDeriv(Grad*u)*v) +
-                ky**2*self.MnSigmaDeriv(u)*v)
+            return (self.MeSigmaDeriv(Grad*u, Grad*v, adjoint) +
+                    ky**2*self.MnSigmaDeriv(u, v, adjoint))
+        return (Grad.T*self.MeSigmaDeriv(Grad*u, v, adjoint) +
+                ky**2*self.MnSigmaDeriv(u, v, adjoint))
 
     def getRHS(self, ky):
         """
@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 import SimPEG
 import numpy as np
 from SimPEG.Utils import closestPoints
+from .Utils import getKyWeights
 
 
 class BaseRx(SimPEG.Survey.BaseRx):
@@ -51,6 +52,19 @@ class BaseRx(SimPEG.Survey.BaseRx):
         elif adjoint:
             return P.T*v
 
+    @property
+    def electrodes(self):
+        """
+        Potential electrodes of the receiver and the signs of their
+        potentials in the data
+
+        :rtype: list
+        :return: [(locs (nD, dim), sign), ...]
+        """
+        if isinstance(self.locs, list):
+            return [(self.locs[0], 1.), (self.locs[1], -1.)]
+        return [(self.locs, 1.)]
+
 
 # DC.Rx.Dipole(locs)
 class Dipole(BaseRx):
@@ -118,10 +132,18 @@ class Dipole_ky(BaseRx):
             self._Ps[mesh] = P
         return P
 
-    def eval(self, kys, src, mesh, f):
+    def eval(self, kys, src, mesh, f, weights=None, y=0.):
+        """
+        Data at the offset(s) y from the plane of the sources. The weights
+        of the wavenumbers at y (see :code:`Problem2D._kyWeights`) are used
+        if given, the trapezoidal rule over kys otherwise.
+        """
         P = self.getP(mesh, self.projGLoc(f))
         Pf = P*f[src, self.projField, :]
-        return self.IntTrapezoidal(kys, Pf, y=0.)
+        if weights is not None:
+            # the time fields hold one more slot than the wavenumbers
+            return Pf[:, :weights.shape[0]].dot(weights)
+        return self.IntTrapezoidal(kys, Pf, y=y)
 
     def evalDeriv(self, ky, src, mesh, f, v, adjoint=False):
         P = self.getP(mesh, self.projGLoc(f))
@@ -131,17 +153,12 @@ class Dipole_ky(BaseRx):
             return P.T*v
 
     def IntTrapezoidal(self, kys, Pf, y=0.):
-        phi = np.zeros(Pf.shape[0])
-        nky = kys.size
-        dky = np.diff(kys)
-        dky = np.r_[dky[0], dky]
-        phi0 = 1./np.pi*Pf[:, 0]
-        for iky in range(nky):
-            phi1 = 1./np.pi*Pf[:, iky]
-            phi += phi1*dky[iky]/2.*np.cos(kys[iky]*y)
-            phi += phi0*dky[iky]/2.*np.cos(kys[iky]*y)
-            phi0 = phi1.copy()
-        return phi
+        """
+        Integrate the projected fields Pf (nD, nky) over the wavenumbers
+        with the trapezoidal rule, at the offset(s) y from the plane of the
+        sources
+        """
+        return Pf[:, :kys.size].dot(getKyWeights(kys, y=y))
 
 
 class Pole(BaseRx):
@@ -199,10 +216,18 @@ class Pole_ky(BaseRx):
 
         return P
 
-    def eval(self, kys, src, mesh, f):
+    def eval(self, kys, src, mesh, f, weights=None, y=0.):
+        """
+        Data at the offset(s) y from the plane of the sources. The weights
+        of the wavenumbers at y (see :code:`Problem2D._kyWeights`) are used
+        if given, the trapezoidal rule over kys otherwise.
+        """
         P = self.getP(mesh, self.projGLoc(f))
         Pf = P*f[src, self.projField, :]
-        return self.IntTrapezoidal(kys, Pf, y=0.)
+        if weights is not None:
+            # the time fields hold one more slot than the wavenumbers
+            return Pf[:, :weights.shape[0]].dot(weights)
+        return self.IntTrapezoidal(kys, Pf, y=y)
 
     def evalDeriv(self, ky, src, mesh, f, v, adjoint=False):
         P = self.getP(mesh, self.projGLoc(f))
@@ -212,14 +237,9 @@ class Pole_ky(BaseRx):
             return P.T*v
 
     def IntTrapezoidal(self, kys, Pf, y=0.):
-        phi = np.zeros(Pf.shape[0])
-        nky = kys.size
-        dky = np.diff(kys)
-        dky = np.r_[dky[0], dky]
-        phi0 = 1./np.pi*Pf[:, 0]
-        for iky in range(nky):
-            phi1 = 1./np.pi*Pf[:, iky]
-            phi += phi1*dky[iky]/2.*np.cos(kys[iky]*y)
-            phi += phi0*dky[iky]/2.*np.cos(kys[iky]*y)
-            phi0 = phi1.copy()
-        return phi
+        """
+        Integrate the projected fields Pf (nD, nky) over the wavenumbers
+        with the trapezoidal rule, at the offset(s) y from the plane of the
+        sources
+        """
+        return Pf[:, :kys.size].dot(getKyWeights(kys, y=y))
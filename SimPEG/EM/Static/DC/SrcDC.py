@@ -26,6 +26,19 @@ class BaseSrc(SimPEG.Survey.BaseSrc):
     def evalDeriv(self, prob):
         return Zero()
 
+    @property
+    def electrodes(self):
+        """
+        Current electrodes of the source and the currents injected in them
+
+        :rtype: tuple
+        :return: (locs (nElectrode, dim), currents (nElectrode,))
+        """
+        raise NotImplementedError(
+            'Electrodes of {0!s} are not '
+            'implemented'.format(self.__class__.__name__)
+        )
+
 
 class Dipole(BaseSrc):
     """
@@ -38,6 +51,10 @@ class Dipole(BaseSrc):
         self.loc = [locA, locB]
         BaseSrc.__init__(self, rxList, **kwargs)
 
+    @property
+    def electrodes(self):
+        return np.vstack(self.loc), self.current * np.array([1., -1.])
+
     def eval(self, prob):
         if self._q is not None:
             return self._q
@@ -65,6 +82,10 @@ class Pole(BaseSrc):
     def __init__(self, rxList, loc, **kwargs):
         BaseSrc.__init__(self, rxList, loc=loc, **kwargs)
 
+    @property
+    def electrodes(self):
+        return np.atleast_2d(self.loc), self.current * np.ones(1)
+
     def eval(self, prob):
         if self._q is not None:
             return self._q
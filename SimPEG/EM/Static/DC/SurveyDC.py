@@ -8,10 +8,26 @@ from . import RxDC as Rx
 from . import SrcDC as Src
 from SimPEG.EM.Base import BaseEMSurvey
 import numpy as np
+import scipy.sparse as sp
 from scipy.interpolate import interp1d, NearestNDInterpolator
 import properties
 
 
+def _uniqueLocations(locs):
+    """
+    Unique rows of locs, sorted by their coordinates, and the index of each
+    row of locs in them
+
+    :rtype: tuple
+    :return: (unique (nUnique, dim), inds (nLoc,) int)
+    """
+    order = np.lexsort(locs.T[::-1])
+    new = np.r_[True, np.any(np.diff(locs[order], axis=0) != 0., axis=1)]
+    inds = np.empty(locs.shape[0], dtype=int)
+    inds[order] = np.cumsum(new) - 1
+    return locs[order[new]], inds
+
+
 class Survey(BaseEMSurvey, properties.HasProperties):
     """
     Base DC survey
@@ -72,236 +88,158 @@ class Survey(BaseEMSurvey, properties.HasProperties):
         self.srcList = srcList
         BaseEMSurvey.__init__(self, srcList, **kwargs)
 
+    def getElectrodeTable(self):
+        """
+        Unique electrode locations of the survey and the A, B, M and N
+        electrodes of each datum as indices into them. Pole sources repeat A
+        as B and pole receivers repeat M as N. The table is built from the
+        current locations of the sources and receivers on every call, so
+        routines that need it more than once should keep the returned table.
+
+        :rtype: tuple
+        :return: (locs (nElectrode, dim), abmn (nD, 4) int)
+        """
+        srcLocs, srcInds, mLocs, nLocs = [], [], [], []
+        for i, src in enumerate(self.srcList):
+            locs, _ = src.electrodes
+            srcLocs += [locs[0], locs[-1]]
+            for rx in src.rxList:
+                electrodes = rx.electrodes
+                mLocs.append(electrodes[0][0])
+                nLocs.append(electrodes[-1][0])
+                srcInds.append(i * np.ones(rx.nD, dtype=int))
+
+        srcLocs, srcElectrodes = _uniqueLocations(np.vstack(srcLocs))
+        rxLocs, rxElectrodes = _uniqueLocations(np.vstack(mLocs + nLocs))
+        locs, inds = _uniqueLocations(np.vstack([srcLocs, rxLocs]))
+        srcElectrodes = inds[srcElectrodes].reshape((-1, 2))
+        rxElectrodes = inds[srcLocs.shape[0] + rxElectrodes]
+        srcInds = np.hstack(srcInds)
+        abmn = np.c_[
+            srcElectrodes[srcInds], rxElectrodes.reshape((2, -1)).T
+        ]
+        return locs, abmn
+
     def getABMN_locations(self):
-        a_locations = []
-        b_locations = []
-        m_locations = []
-        n_locations = []
-        for src in self.srcList:
-            # Pole
-            if isinstance(src, Src.Pole):
-                for rx in src.rxList:
-                    nRx = rx.nD
-                    a_locations.append(
-                        src.loc.reshape([1, -1]).repeat(nRx, axis=0)
-                        )
-                    b_locations.append(
-                        src.loc.reshape([1, -1]).repeat(nRx, axis=0)
-                        )
-                    # Pole
-                    if isinstance(rx, Rx.Pole) or isinstance(rx, Rx.Pole_ky):
-                        m_locations.append(rx.locs)
-                        n_locations.append(rx.locs)
-                    # Dipole
-                    elif isinstance(rx, Rx.Dipole) or isinstance(rx, Rx.Dipole_ky):
-                        m_locations.append(rx.locs[0])
-                        n_locations.append(rx.locs[1])
-            # Dipole
-            elif isinstance(src, Src.Dipole):
-                for rx in src.rxList:
-                    nRx = rx.nD
-                    a_locations.append(
-                        src.loc[0].reshape([1, -1]).repeat(nRx, axis=0)
-                        )
-                    b_locations.append(
-                        src.loc[1].reshape([1, -1]).repeat(nRx, axis=0)
-                        )
-                    # Pole
-                    if isinstance(rx, Rx.Pole) or isinstance(rx, Rx.Pole_ky):
-                        m_locations.append(rx.locs)
-                        n_locations.append(rx.locs)
-                    # Dipole
-                    elif isinstance(rx, Rx.Dipole) or isinstance(rx, Rx.Dipole_ky):
-                        m_locations.append(rx.locs[0])
-                        n_locations.append(rx.locs[1])
-
-        self.a_locations = np.vstack(a_locations)
-        self.b_locations = np.vstack(b_locations)
-        self.m_locations = np.vstack(m_locations)
-        self.n_locations = np.vstack(n_locations)
+        locs, abmn = self.getElectrodeTable()
+        self.a_locations = locs[abmn[:, 0]]
+        self.b_locations = locs[abmn[:, 1]]
+        self.m_locations = locs[abmn[:, 2]]
+        self.n_locations = locs[abmn[:, 3]]
 
-    def drapeTopo(self, mesh, actind, option='top'):
-        if self.a_locations is None:
-            self.getABMN_locations()
+    def getSourceElectrodes(self):
+        """
+        Unique current electrodes of the survey and the currents each source
+        injects in them. The potentials of a source are the superposition of
+        those of unit poles at its electrodes.
 
-        # 2D
-        if mesh.dim == 2:
-            if self.survey_geometry == "surface":
-                if self.electrodes_info is None:
-                    self.electrodes_info = SimPEG.Utils.uniqueRows(
-                        np.hstack((
-                            self.a_locations[:, 0],
-                            self.b_locations[:, 0],
-                            self.m_locations[:, 0],
-                            self.n_locations[:, 0],
-                            )).reshape([-1, 1])
-                        )
-                    self.electrode_locations = SimPEG.EM.Static.Utils.drapeTopotoLoc(
-                        mesh,
-                        self.electrodes_info[0].flatten(),
-                        actind=actind,
-                        option=option
-                    )
-                temp = (
-                    self.electrode_locations[self.electrodes_info[2], 1]
-                ).reshape((self.a_locations.shape[0], 4), order="F")
-                self.a_locations = np.c_[self.a_locations[:, 0], temp[:, 0]]
-                self.b_locations = np.c_[self.b_locations[:, 0], temp[:, 1]]
-                self.m_locations = np.c_[self.m_locations[:, 0], temp[:, 2]]
-                self.n_locations = np.c_[self.n_locations[:, 0], temp[:, 3]]
-
-                # Make interpolation function
-                self.topo_function = interp1d(
-                    self.electrode_locations[:, 0], self.electrode_locations[:, 1]
-                    )
+        :rtype: tuple
+        :return: (locs (nElectrode, dim), S (nElectrode, nSrc) sparse)
+        """
+        locs, currents, srcInds = [], [], []
+        for i, src in enumerate(self.srcList):
+            loc, current = src.electrodes
+            locs.append(loc)
+            currents.append(current)
+            srcInds.append(i * np.ones(current.size, dtype=int))
+
+        locs, _, inds = SimPEG.Utils.uniqueRows(np.vstack(locs))
+        S = sp.coo_matrix(
+            (np.hstack(currents), (inds, np.hstack(srcInds))),
+            shape=(locs.shape[0], self.nSrc)
+        )
+        return locs, S.tocsr()
+
+    def getReceiverElectrodes(self):
+        """
+        Unique potential electrodes of the survey and the weights of their
+        potentials in each datum.
 
-                # Loop over all Src and Rx locs and Drape topo
-                for src in self.srcList:
-                    # Pole Src
-                    if isinstance(src, Src.Pole):
-                        locA = src.loc.flatten()
-                        z_SrcA = self.topo_function(locA[0])
-                        src.loc = np.array([locA[0], z_SrcA])
-                        for rx in src.rxList:
-                            # Pole Rx
-                            if isinstance(rx, Rx.Pole) or isinstance(rx, Rx.Pole_ky):
-                                locM = rx.locs.copy()
-                                z_RxM = self.topo_function(locM[:, 0])
-                                rx.locs = np.c_[locM[:, 0], z_RxM]
-                            # Dipole Rx
-                            elif isinstance(rx, Rx.Dipole) or isinstance(rx, Rx.Dipole_ky):
-                                locM = rx.locs[0].copy()
-                                locN = rx.locs[1].copy()
-                                z_RxM = self.topo_function(locM[:, 0])
-                                z_RxN = self.topo_function(locN[:, 0])
-                                rx.locs[0] = np.c_[locM[:, 0], z_RxM]
-                                rx.locs[1] = np.c_[locN[:, 0], z_RxN]
-                            else:
-                                raise Exception()
-
-                    # Dipole Src
-                    elif isinstance(src, Src.Dipole):
-                        locA = src.loc[0].flatten()
-                        locB = src.loc[1].flatten()
-                        z_SrcA = self.topo_function(locA[0])
-                        z_SrcB = self.topo_function(locB[0])
-
-                        src.loc[0] = np.array([locA[0], z_SrcA])
-                        src.loc[1] = np.array([locB[0], z_SrcB])
-
-                        for rx in src.rxList:
-                            # Pole Rx
-                            if isinstance(rx, Rx.Pole) or isinstance(rx, Rx.Pole_ky):
-                                locM = rx.locs.copy()
-                                z_RxM = self.topo_function(locM[:, 0])
-                                rx.locs = np.c_[locM[:, 0], z_RxM]
-                            # Dipole Rx
-                            elif isinstance(rx, Rx.Dipole) or isinstance(rx, Rx.Dipole_ky):
-                                locM = rx.locs[0].copy()
-                                locN = rx.locs[1].copy()
-                                z_RxM = self.topo_function(locM[:, 0])
-                                z_RxN = self.topo_function(locN[:, 0])
-                                rx.locs[0] = np.c_[locM[:, 0], z_RxM]
-                                rx.locs[1] = np.c_[locN[:, 0], z_RxN]
-                            else:
-                                raise Exception()
-
-            elif self.survey_geometry == "borehole":
-                raise Exception(
-                    "Not implemented yet for borehole survey_geometry"
-                    )
-            else:
-                raise Exception(
-                    "Input valid survey survey_geometry: surface or borehole"
+        :rtype: tuple
+        :return: (locs (nElectrode, dim), R (nElectrode, nD) sparse)
+        """
+        locs, weights, dataInds = [], [], []
+        start = 0
+        for src in self.srcList:
+            for rx in src.rxList:
+                if rx.projField != 'phi':
+                    raise NotImplementedError(
+                        'Receiver electrodes are only defined for potential '
+                        'data, not {0!s}'.format(rx.rxType)
                     )
+                rows = np.arange(start, start + rx.nD)
+                for loc, sign in rx.electrodes:
+                    locs.append(loc)
+                    weights.append(sign * np.ones(rx.nD))
+                    dataInds.append(rows)
+                start += rx.nD
+
+        locs, _, inds = SimPEG.Utils.uniqueRows(np.vstack(locs))
+        R = sp.coo_matrix(
+            (np.hstack(weights), (inds, np.hstack(dataInds))),
+            shape=(locs.shape[0], self.nD)
+        )
+        return locs, R.tocsc()
 
-        if mesh.dim == 3:
-            if self.survey_geometry == "surface":
-                if self.electrodes_info is None:
-                    self.electrodes_info = SimPEG.Utils.uniqueRows(
-                        np.vstack((
-                            self.a_locations[:, :2],
-                            self.b_locations[:, :2],
-                            self.m_locations[:, :2],
-                            self.n_locations[:, :2],
-                            ))
-                        )
-                    self.electrode_locations = SimPEG.EM.Static.Utils.drapeTopotoLoc(
-                        mesh, self.electrodes_info[0], actind=actind
-                        )
-                temp = (
-                    self.electrode_locations[self.electrodes_info[2], 1]
-                    ).reshape((self.a_locations.shape[0], 4), order="F")
-
-                self.a_locations = np.c_[self.a_locations[:, :2], temp[:, 0]]
-                self.b_locations = np.c_[self.b_locations[:, :2], temp[:, 1]]
-                self.m_locations = np.c_[self.m_locations[:, :2], temp[:, 2]]
-                self.n_locations = np.c_[self.n_locations[:, :2], temp[:, 3]]
-
-                # Make interpolation function
-                self.topo_function = NearestNDInterpolator(
-                    self.electrode_locations[:, :2],
-                    self.electrode_locations[:, 2]
-                    )
-                # Loop over all Src and Rx locs and Drape topo
-                for src in self.srcList:
-                    # Pole Src
-                    if isinstance(src, Src.Pole):
-                        locA = src.loc.reshape([1, -1])
-                        z_SrcA = self.topo_function(locA[0, :2])
-                        src.loc = np.r_[locA[0, :2].flatten(), z_SrcA]
-
-                        for rx in src.rxList:
-                            # Pole Rx
-                            if isinstance(rx, Rx.Pole):
-                                locM = rx.locs.copy()
-                                z_RxM = self.topo_function(locM[:, :2])
-                                rx.locs = np.c_[locM[:, 0], z_RxM]
-                            # Dipole Rx
-                            elif isinstance(rx, Rx.Dipole):
-                                locM = rx.locs[0].copy()
-                                locN = rx.locs[1].copy()
-                                z_RxM = self.topo_function(locM[:, :2])
-                                z_RxN = self.topo_function(locN[:, :2])
-                                rx.locs[0] = np.c_[locM[:, :2], z_RxM]
-                                rx.locs[1] = np.c_[locN[:, :2], z_RxN]
-                            else:
-                                raise Exception()
-
-                    # Dipole Src
-                    elif isinstance(src, Src.Dipole):
-                        locA = src.loc[0].reshape([1, -1])
-                        locB = src.loc[1].reshape([1, -1])
-                        z_SrcA = self.topo_function(locA[0, :2])
-                        z_SrcB = self.topo_function(locB[0, :2])
-                        src.loc[0] = np.r_[locA[0, :2].flatten(), z_SrcA]
-                        src.loc[1] = np.r_[locB[0, :2].flatten(), z_SrcB]
-
-                        for rx in src.rxList:
-                            # Pole Rx
-                            if isinstance(rx, Rx.Pole):
-                                locM = rx.locs.copy()
-                                z_RxM = self.topo_function(locM[:, :2])
-                                rx.locs = np.c_[locM[:, :2], z_RxM]
-                            # Dipole Rx
-                            elif isinstance(rx, Rx.Dipole):
-                                locM = rx.locs[0].copy()
-                                locN = rx.locs[1].copy()
-                                z_RxM = self.topo_function(locM[:, :2])
-                                z_RxN = self.topo_function(locN[:, :2])
-                                rx.locs[0] = np.c_[locM[:, :2], z_RxM]
-                                rx.locs[1] = np.c_[locN[:, :2], z_RxN]
-                            else:
-                                raise Exception()
-
-            elif self.survey_geometry == "borehole":
-                raise Exception(
-                    "Not implemented yet for borehole survey_geometry"
-                    )
-            else:
-                raise Exception(
-                    "Input valid survey survey_geometry: surface or borehole"
-                    )
+    def drapeTopo(self, mesh, actind, option='top'):
+        if self.survey_geometry == "borehole":
+            raise Exception(
+                "Not implemented yet for borehole survey_geometry"
+                )
+        elif self.survey_geometry != "surface":
+            raise Exception(
+                "Input valid survey survey_geometry: surface or borehole"
+                )
+
+        # horizontal coordinates of the electrodes
+        locs, abmn = self.getElectrodeTable()
+        nH = mesh.dim - 1
+        if self.electrodes_info is None:
+            self.electrodes_info = SimPEG.Utils.uniqueRows(locs[:, :nH])
+            pts = self.electrodes_info[0]
+            if mesh.dim == 2:
+                pts = pts.flatten()
+            self.electrode_locations = SimPEG.EM.Static.Utils.drapeTopotoLoc(
+                mesh, pts, actind=actind, option=option
+            )
+
+        # Make interpolation function
+        if mesh.dim == 2:
+            self.topo_function = interp1d(
+                self.electrode_locations[:, 0], self.electrode_locations[:, 1]
+                )
+        else:
+            self.topo_function = NearestNDInterpolator(
+                self.electrode_locations[:, :2],
+                self.electrode_locations[:, 2]
+                )
+
+        locs = np.c_[
+            locs[:, :nH],
+            self.electrode_locations[self.electrodes_info[2], nH]
+        ]
+        self.a_locations = locs[abmn[:, 0]]
+        self.b_locations = locs[abmn[:, 1]]
+        self.m_locations = locs[abmn[:, 2]]
+        self.n_locations = locs[abmn[:, 3]]
+
+        # Move the electrodes of the sources and receivers
+        start = 0
+        for src in self.srcList:
+            if src.nD > 0:
+                if isinstance(src.loc, list):
+                    src.loc[0] = self.a_locations[start]
+                    src.loc[1] = self.b_locations[start]
+                else:
+                    src.loc = self.a_locations[start]
+            for rx in src.rxList:
+                rows = slice(start, start + rx.nD)
+                if isinstance(rx.locs, list):
+                    rx.locs[0] = self.m_locations[rows]
+                    rx.locs[1] = self.n_locations[rows]
+                else:
+                    rx.locs = self.m_locations[rows]
+                start += rx.nD
 
 
 class Survey_ky(Survey):
@@ -324,7 +262,8 @@ class Survey_ky(Survey):
         """
         data = SimPEG.Survey.Data(self)
         kys = self.prob.kys
+        weights = self.prob._kyWeights(y=0.)
         for src in self.srcList:
             for rx in src.rxList:
-                data[src, rx] = rx.eval(kys, src, self.mesh, f)
+                data[src, rx] = rx.eval(kys, src, self.mesh, f, weights)
         return data
@@ -4,6 +4,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import numpy as np
+from scipy.optimize import minimize
+from scipy.special import k0, k1
 
 
 def WennerSrcList(nElecs, aSpacing, in2D=False, plotIt=False):
@@ -47,3 +49,86 @@ def WennerSrcList(nElecs, aSpacing, in2D=False, plotIt=False):
         srcList += [src]
 
     return srcList
+
+
+def getKyQuadrature(rmin, rmax, nky=7, nr=100):
+    """
+    Wavenumbers and weights of a quadrature for the inverse cosine
+    transform of the 2.5D DC problems, fitted to the offsets between rmin
+    and rmax.
+
+    The potential of a point source in a whole space is
+    :math:`\\tilde{\\phi}(k_y, r) \\propto K_0(k_y r)` in the wavenumber
+    domain, and :math:`\\frac{1}{\\pi} \\int_0^\\infty K_0(k_y r) dk_y =
+    \\frac{1}{2r}`. The wavenumbers (in log space) and the weights minimize
+    the least squares misfit of
+
+    .. math::
+
+        2 r \\sum_i w_i K_0(k_{y,i} r) = 1
+
+    at nr log-spaced offsets; for given wavenumbers the weights are the
+    linear least squares solution.
+
+    :param float rmin: smallest offset
+    :param float rmax: largest offset
+    :param int nky: number of wavenumbers
+    :param int nr: number of offsets the quadrature is fitted to
+    :rtype: tuple
+    :return: (kys, weights, error) where error is the largest relative
+             error of the quadrature for a whole space between rmin and
+             rmax; :math:`\\phi(y=0) \\approx \\sum_i w_i
+             \\tilde{\\phi}(k_{y,i})`
+    """
+    assert 0. < rmin < rmax, 'the offsets must satisfy 0 < rmin < rmax'
+    r = np.logspace(np.log10(rmin), np.log10(rmax), nr)[:, np.newaxis]
+    ones = np.ones(nr)
+
+    def fit(logk):
+        A = 2.*r*k0(r*10**logk)
+        weights = np.linalg.lstsq(A, ones, rcond=None)[0]
+        return A, weights, A.dot(weights) - 1.
+
+    def objective(logk):
+        A, weights, residual = fit(logk)
+        # the derivative of the weights does not contribute at the optimum
+        # of the linear problem
+        dA = -2.*r**2*k1(r*10**logk)*10**logk*np.log(10.)
+        return 0.5*residual.dot(residual), residual.dot(dA)*weights
+
+    logk0 = np.linspace(-np.log10(rmax), -np.log10(rmin), nky)
+    out = minimize(objective, logk0, jac=True, method='L-BFGS-B')
+    logk = np.sort(out.x)
+
+    _, weights, residual = fit(logk)
+    return 10**logk, weights, np.abs(residual).max()
+
+
+def getKyWeights(kys, y=0., weights=None):
+    """
+    Weights of the inverse cosine transform of the 2.5D DC problems,
+    including its 1/pi, so that :math:`\\phi(y) = \\sum_i w_i(y)
+    \\tilde{\\phi}(k_{y,i})` is a single contraction over the wavenumbers.
+
+    :param numpy.ndarray kys: wavenumbers
+    :param y: offset (float) or offsets (numpy.ndarray) of the receivers
+              from the plane of the sources
+    :param numpy.ndarray weights: weights of the quadrature at y=0 (see
+                                  :func:`getKyQuadrature`); the trapezoidal
+                                  rule over kys is used if None
+    :rtype: numpy.ndarray
+    :return: weights, (nky, ) for a float y or (nky, ny) for offsets y
+    """
+    kys = np.asarray(kys, dtype=float)
+    cos = np.cos(np.multiply.outer(kys, y))
+    if weights is not None:
+        return np.reshape(weights, (-1, ) + (1, )*(cos.ndim - 1))*cos
+    dky = np.diff(kys)
+    dky = np.r_[dky[0], dky]
+    half = np.reshape(dky/2., (-1, ) + (1, )*(cos.ndim - 1))*cos
+    # each panel of the trapezoidal rule is weighted by the cosine at its
+    # right end, as the integration always has been
+    out = half.copy()
+    out[:-1] += half[1:]
+    out[0] += half[0]
+    return out/np.pi
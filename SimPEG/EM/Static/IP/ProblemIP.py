@@ -7,8 +7,10 @@ from SimPEG import Utils
 from SimPEG.EM.Base import BaseEMProblem
 from SimPEG.EM.Static.DC.FieldsDC import FieldsDC, Fields_CC, Fields_N
 import numpy as np
+import scipy.sparse as sp
 from SimPEG.Utils import Zero
 from SimPEG.EM.Static.DC import getxBCyBC_CC
+from SimPEG.EM.Static.DC.ProblemDC import _sensitivityBlocks, _denseRHS
 from .SurveyIP import Survey
 from SimPEG import Props
 
@@ -31,13 +33,71 @@ class BaseIPProblem(BaseEMProblem):
 
     surveyPair = Survey
     fieldsPair = FieldsDC
-    Ainv = None
     f = None
-    Ainv = None
+    _Ainv = None
+    storeJ = False
+    _Jmatrix = None
+    _JmatrixEtaDeriv = None
+    #: number of data whose sensitivities are solved for at once
+    JmatrixBlockSize = 256
+
+    #: DC problem of the same mesh and sources whose conductivity,
+    #: factorization and stored sensitivity are reused
+    dcProblem = None
+    _dcAinv = None
+
+    @property
+    def Ainv(self):
+        """
+            Factorization of the system, that of :code:`dcProblem` if the
+            problem is attached to one
+        """
+        if self.dcProblem is not None:
+            self._attachDC()
+            return self.dcProblem.Ainv
+        return self._Ainv
+
+    @Ainv.setter
+    def Ainv(self, value):
+        self._Ainv = value
+
+    def _attachDC(self):
+        """
+            Takes the conductivity of :code:`dcProblem` and its factorization,
+            which it makes once if it has none for its current conductivity.
+            The fields and sensitivity are formed again when the DC
+            factorization changes.
+        """
+        dc = self.dcProblem
+        assert dc.mesh is self.mesh, (
+            'The dcProblem must be on the mesh of the IP problem'
+        )
+        assert dc._formulation == self._formulation, (
+            'The dcProblem must have the formulation of the IP problem, '
+            '{} and not {}'.format(self._formulation, dc._formulation)
+        )
+        assert dc.ispaired and dc.survey.nD == self.survey.nD, (
+            'The dcProblem must be paired with a survey of the same sources '
+            'and receivers as the IP survey'
+        )
+        if (
+            dc.Ainv is None or
+            dc._AinvVersion != dc._property_version('sigma')
+        ):
+            dc.fields(dc.model)
+        if self._dcAinv is not dc.Ainv:
+            self._dcAinv = dc.Ainv
+            self.sigma = dc.sigma
+            self.f = None
+            self._Jmatrix = None
+            self._MfRhoI = None
+            self._MeSigma = None
 
     def fields(self, m):
         if m is not None:
             self.model = m
+        if self.dcProblem is not None:
+            self._attachDC()
         if self.f is None:
             self.f = self.fieldsPair(self.mesh, self.survey)
             if self.Ainv is None:
@@ -49,15 +109,108 @@ class BaseIPProblem(BaseEMProblem):
             self.f[Srcs, self._solutionType] = u
         return self.f
 
+    def getJ(self, m, f=None):
+        """
+            Sensitivity matrix of the chargeability. It depends on the
+            conductivity and on :code:`etaDeriv`; it is kept across model
+            updates that leave :code:`etaDeriv` unchanged (a linear
+            :code:`etaMap`). With an attached :code:`dcProblem` that stores
+            its sensitivity it is scaled from the DC one.
+        """
+        if self.dcProblem is not None:
+            self._attachDC()
+
+        self.model = m
+        if self._Jmatrix is not None:
+            etaDeriv = sp.csr_matrix(self.etaDeriv)
+            cached = self._JmatrixEtaDeriv
+            if etaDeriv.shape != cached.shape or (etaDeriv != cached).nnz:
+                self._Jmatrix = None
+
+        if self._Jmatrix is None:
+            J = None
+            if self.dcProblem is not None:
+                J = self._scaleDCJ()
+            if J is None:
+                if f is None:
+                    f = self.fields(m)
+                J = self._formJ(f)
+            self._Jmatrix = J
+            self._JmatrixEtaDeriv = sp.csr_matrix(self.etaDeriv)
+        return self._Jmatrix
+
+    def _scaleDCJ(self):
+        """
+            Sensitivity from the stored one of :code:`dcProblem`, None if it
+            does not store it or if its model does not map one to one to the
+            log conductivities of the chargeable cells.
+
+            The DC sensitivity is that of the log conductivities times
+            :code:`D = dlog(sigma)/dm`, so that
+
+            .. math::
+
+                \\frac{\\partial \\phi}{\\partial \\log \\rho}
+                \\frac{\\partial \\eta}{\\partial m_\\eta} =
+                - J_{DC} D^{+} \\frac{\\partial \\eta}{\\partial m_\\eta}
+
+        """
+        dc = self.dcProblem
+        if dc._Jmatrix is None and not dc.storeJ:
+            return None
+
+        D = sp.csc_matrix(Utils.sdiag(1./dc.sigma) * dc.sigmaDeriv)
+        D.eliminate_zeros()
+        if (
+            np.any(np.diff(D.indptr) != 1) or
+            np.any(np.bincount(D.indices, minlength=D.shape[0]) > 1)
+        ):
+            return None
+
+        etaDeriv = sp.csr_matrix(self.etaDeriv)
+        inModel = np.zeros(D.shape[0], dtype=bool)
+        inModel[D.indices] = True
+        if np.any(np.diff(etaDeriv.indptr)[~inModel]):
+            return None
+
+        Dinv = sp.csc_matrix((1./D.data, D.indices, D.indptr), shape=D.shape)
+        J = dc.getJ(dc.model)
+        return -(etaDeriv.T * Dinv).dot(np.asarray(J).T).T
+
+    def _formJ(self, f):
+        """
+            Sensitivity matrix, solved for blocks of the data of each source
+        """
+        J = np.zeros((self.survey.nD, self.model.size))
+        for src, projField, rows, P in _sensitivityBlocks(self, f):
+            u_src = f[src, self._solutionType]
+            df_duTFun = getattr(f, '_{0!s}Deriv'.format(projField), None)
+            df_duT, df_dmT = df_duTFun(src, None, P.T, adjoint=True)
+            ATinvdf_duT = self.Ainv * _denseRHS(df_duT)
+            dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
+            dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
+            du_dmT = -dA_dmT + dRHS_dmT
+            J[rows] = np.reshape(
+                df_dmT + du_dmT, (self.model.size, rows.size)
+            ).T
+        # Conductivity (d u / d log sigma)
+        if self._formulation == 'EB':
+            return -J
+        # Conductivity (d u / d log rho)
+        return J
+
     def Jvec(self, m, v, f=None):
 
+        if self.storeJ:
+            J = self.getJ(m, f=f)
+            return Utils.mkvc(np.dot(J, v))
+
         if f is None:
             f = self.fields(m)
 
         self.model = m
 
         Jv = []
-        A = self.getA()
 
         for src in self.survey.srcList:
             u_src = f[src, self._solutionType] # solution vector
@@ -80,6 +233,10 @@ class BaseIPProblem(BaseEMProblem):
             return np.hstack(Jv)
 
     def Jtvec(self, m, v, f=None):
+        if self.storeJ:
+            J = self.getJ(m, f=f)
+            return Utils.mkvc(np.dot(J.T, v))
+
         if f is None:
             f = self.fields(m)
 
@@ -90,7 +247,6 @@ class BaseIPProblem(BaseEMProblem):
             v = self.dataPair(self.survey, v)
 
         Jtv = np.zeros(m.size)
-        AT = self.getA()
 
         for src in self.survey.srcList:
             u_src = f[src, self._solutionType]
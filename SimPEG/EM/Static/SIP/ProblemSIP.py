@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import numpy as np
+import properties
 
 from SimPEG import Utils
 from SimPEG import Props
@@ -11,6 +12,7 @@ from SimPEG import Props
 from SimPEG.EM.Base import BaseEMProblem
 from SimPEG.EM.Static.DC.FieldsDC import FieldsDC, Fields_CC, Fields_N
 from SimPEG.EM.Static.DC import getxBCyBC_CC
+from SimPEG.EM.Static.DC.ProblemDC import _sensitivityBlocks, _denseRHS
 from .SurveySIP import Survey, Data
 
 
@@ -39,11 +41,21 @@ class BaseSIPProblem(BaseEMProblem):
     surveyPair = Survey
     fieldsPair = FieldsDC
     dataPair = Data
-    Ainv = None
     sigma = None
     rho = None
     f = None
     Ainv = None
+    storeJ = False
+    _Jmatrix = None
+    #: number of data whose sensitivities are solved for at once
+    JmatrixBlockSize = 256
+
+    nWorkers = properties.Integer(
+        "Number of worker processes used for groups of sources when the "
+        "sensitivity is not stored (1: all sources are handled in this "
+        "process)",
+        default=1, min=1
+    )
 
     def DebyeTime(self, t):
         peta = self.eta*np.exp(-self.taui*t)
@@ -63,6 +75,16 @@ class BaseSIPProblem(BaseEMProblem):
         else:
             return -self.eta*t*np.exp(-self.taui*t) * (self.tauiDeriv*v)
 
+    def DebyeKernel(self):
+        """
+            Debye time kernel :code:`exp(-taui t)` of all the cells at all
+            the times of the survey
+
+            :rtype: numpy.ndarray
+            :return: E (nC, nTimes)
+        """
+        return np.exp(-np.outer(self.taui, self.survey.times))
+
     def fields(self, m):
         self.model = m
         if self.f is None:
@@ -76,40 +98,151 @@ class BaseSIPProblem(BaseEMProblem):
             self.f[Srcs, self._solutionType] = u
         return self.f
 
+    def _dataIndex(self):
+        """
+            Receiver location (row of the sensitivity) and time (index in
+            :code:`survey.times`) of each datum, in the order of the data
+            (sources, receivers, receiver times, locations)
+        """
+        rows, cols = [], []
+        start = 0
+        for src in self.survey.srcList:
+            for rx in src.rxList:
+                tinds = np.searchsorted(self.survey.times, rx.times)
+                locs = np.arange(start, start+rx.nRx)
+                rows.append(np.tile(locs, tinds.size))
+                cols.append(np.repeat(tinds, rx.nRx))
+                start += rx.nRx
+        return np.hstack(rows), np.hstack(cols)
+
+    def getJ0(self, m, f=None):
+        """
+            Sensitivity (nLoc, nC) of the potentials at the receiver locations
+            to the pseudo-chargeability of the cells. It only depends on the
+            conductivity and is formed once.
+        """
+        if self._Jmatrix is None:
+            if f is None:
+                f = self.fields(m)
+            nLoc = sum(
+                rx.nRx for src in self.survey.srcList for rx in src.rxList
+            )
+            J = np.zeros((nLoc, self.mesh.nC))
+            for src, projField, rows, P in _sensitivityBlocks(self, f):
+                u_src = f[src, self._solutionType]
+                df_duTFun = getattr(f, '_{0!s}Deriv'.format(projField), None)
+                df_duT, df_dmT = df_duTFun(src, None, P.T, adjoint=True)
+                ATinvdf_duT = self.Ainv * _denseRHS(df_duT)
+                dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
+                dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
+                J[rows] = np.reshape(
+                    -dA_dmT + dRHS_dmT, (self.mesh.nC, rows.size)
+                ).T
+            # Conductivity (d u / d log sigma)
+            if self._formulation == 'EB':
+                J = -J
+            self._Jmatrix = J
+        return self._Jmatrix
+
+    def _J0Sources(self, V, srcInds, f):
+        """
+            Rows of J0 V for the sources srcInds, solved for all the columns
+            of V at once
+        """
+        JV = []
+        for i in srcInds:
+            src = self.survey.srcList[i]
+            u_src = f[src, self._solutionType]  # solution vector
+            dA_dm_V = self.getADeriv(u_src, V)
+            dRHS_dm_V = self.getRHSDeriv(src, V)
+            du_dm_V = self.Ainv * (- dA_dm_V + dRHS_dm_V)
+            for rx in src.rxList:
+                df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
+                df_dm_V = df_dmFun(src, du_dm_V, V, adjoint=False)
+                JV.append(rx.evalDeriv(src, self.mesh, f, df_dm_V))
+        JV = np.vstack(JV)
+        # Conductivity (d u / d log sigma)
+        if self._formulation == 'EB':
+            return -JV
+        # Resistivity (d u / d log rho)
+        return JV
+
+    def _J0tSources(self, W, srcInds, f):
+        """
+            J0.T W for the rows of the sources srcInds, with one adjoint
+            solve per source for all the columns of W
+        """
+        JtW = np.zeros((self.mesh.nC, W.shape[1]))
+        start = 0
+        for i in srcInds:
+            src = self.survey.srcList[i]
+            u_src = f[src, self._solutionType]
+            df_duT = 0.
+            for rx in src.rxList:
+                PTW = rx.evalDeriv(
+                    src, self.mesh, f, W[start:start+rx.nRx], adjoint=True
+                )
+                start += rx.nRx
+                df_duTFun = getattr(
+                    f, '_{0!s}Deriv'.format(rx.projField), None
+                )
+                df_duT = df_duT + df_duTFun(src, None, PTW, adjoint=True)[0]
+            ATinvdf_duT = self.Ainv * df_duT
+            dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
+            dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
+            JtW += -dA_dmT + dRHS_dmT
+        # Conductivity ((d u / d log sigma).T)
+        if self._formulation == 'EB':
+            return -JtW
+        # Conductivity ((d u / d log rho).T)
+        return JtW
+
+    def _J0Vec(self, V, f):
+        """
+            Product of J0 and a matrix V (nC, nTimes) of pseudo-chargeabilities
+            at all the times of the survey
+        """
+        if self.storeJ:
+            return self.getJ0(self.model, f=f).dot(V)
+        srcInds = np.arange(len(self.survey.srcList))
+        if self._useWorkers():
+            _, out = self._mapSourceGroups(
+                '_J0Sources', lambda group: (V, group, f)
+            )
+            return np.vstack(out)
+        return self._J0Sources(V, srcInds, f)
+
+    def _J0tVec(self, W, f):
+        """
+            Product of J0.T and a matrix W (nLoc, nTimes) of data at all the
+            times of the survey
+        """
+        if self.storeJ:
+            return self.getJ0(self.model, f=f).T.dot(W)
+        srcInds = np.arange(len(self.survey.srcList))
+        if self._useWorkers():
+            ind = np.r_[0, np.cumsum([
+                sum(rx.nRx for rx in src.rxList)
+                for src in self.survey.srcList
+            ])]
+            _, out = self._mapSourceGroups(
+                '_J0tSources',
+                lambda group: (W[ind[group[0]]:ind[group[-1]+1]], group, f)
+            )
+            return np.sum(out, axis=0)
+        return self._J0tSources(W, srcInds, f)
+
     def forward(self, m, f=None):
 
         if f is None:
             f = self.fields(m)
 
         self.model = m
-        Jv = []
-
-        # A = self.getA()
-        for tind in range(len(self.survey.times)):
-            # Pseudo-chareability
-            t = self.survey.times[tind]
-            v = self.DebyeTime(t)
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType]  # solution vector
-                dA_dm_v = self.getADeriv(u_src, v)
-                dRHS_dm_v = self.getRHSDeriv(src, v)
-                du_dm_v = self.Ainv * (- dA_dm_v + dRHS_dm_v)
-                for rx in src.rxList:
-                    timeindex = rx.getTimeP(self.survey.times)
-                    if timeindex[tind]:
-                        df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
-                        df_dm_v = df_dmFun(src, du_dm_v, v, adjoint=False)
-                        Jv.append(rx.evalDeriv(src, self.mesh, f, df_dm_v))
-                        # Jv[src, rx, t] = rx.evalDeriv(src, self.mesh, f, df_dm_v)
 
-        # Conductivity (d u / d log sigma)
-        if self._formulation == 'EB':
-            # return -Utils.mkvc(Jv)
-            return -np.hstack(Jv)
-        # Resistivity (d u / d log rho)
-        if self._formulation == 'HJ':
-            # return Utils.mkvc(Jv)
-            return np.hstack(Jv)
+        # Pseudo-chargeability at all times
+        V = self.eta[:, np.newaxis] * self.DebyeKernel()
+        rows, cols = self._dataIndex()
+        return self._J0Vec(V, f)[rows, cols]
 
     def Jvec(self, m, v, f=None):
 
@@ -117,41 +250,17 @@ class BaseSIPProblem(BaseEMProblem):
             f = self.fields(m)
 
         self.model = m
-        Jv = []
-        # A = self.getA()
-        JvAll = []
-
-        for tind in range(len(self.survey.times)):
-            t = self.survey.times[tind]
-            v0 = self.EtaDeriv(t, v)
-            v1 = self.TauiDeriv(t, v)
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType]  # solution vector
-                dA_dm_v0 = self.getADeriv(u_src, v0)
-                dRHS_dm_v0 = self.getRHSDeriv(src, v0)
-                du_dm_v0 = self.Ainv * (- dA_dm_v0 + dRHS_dm_v0)
-                dA_dm_v1 = self.getADeriv(u_src, v1)
-                dRHS_dm_v1 = self.getRHSDeriv(src, v1)
-                du_dm_v1 = self.Ainv * (- dA_dm_v1 + dRHS_dm_v1)
-                for rx in src.rxList:
-                    timeindex = rx.getTimeP(self.survey.times)
-                    if timeindex[tind]:
-                        df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
-                        df_dm_v0 = df_dmFun(src, du_dm_v0, v0, adjoint=False)
-                        df_dm_v1 = df_dmFun(src, du_dm_v1, v1, adjoint=False)
-                        # Jv[src, rx, t] = rx.evalDeriv(src, self.mesh, f, df_dm_v0)
-                        # Jv[src, rx, t] += rx.evalDeriv(src, self.mesh, f, df_dm_v1)
-                        Jv.append(rx.evalDeriv(src, self.mesh, f, df_dm_v0) +
-                                  rx.evalDeriv(src, self.mesh, f, df_dm_v1))
 
-        # Conductivity (d u / d log sigma)
-        if self._formulation == 'EB':
-            # return -Jv.tovec()
-            return -np.hstack(Jv)
-        # Resistivity (d u / d log rho)
-        if self._formulation == 'HJ':
-            # return Jv.tovec()
-            return np.hstack(Jv)
+        # EtaDeriv and TauiDeriv at all times
+        v = np.array(v, dtype=float)
+        dEta = np.zeros(self.mesh.nC) + self.etaDeriv * v
+        dTaui = np.zeros(self.mesh.nC) + self.tauiDeriv * v
+        V = self.DebyeKernel() * (
+            dEta[:, np.newaxis] -
+            np.outer(self.eta * dTaui, self.survey.times)
+        )
+        rows, cols = self._dataIndex()
+        return self._J0Vec(V, f)[rows, cols]
 
     def Jtvec(self, m, v, f=None):
         if f is None:
@@ -159,34 +268,22 @@ class BaseSIPProblem(BaseEMProblem):
 
         self.model = m
 
-        # Ensure v is a data object.
-        if not isinstance(v, self.dataPair):
-            v = self.dataPair(self.survey, v)
-
-        Jtv = np.zeros(m.size)
-
-        for tind in range(len(self.survey.times)):
-            t = self.survey.times[tind]
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType]
-                for rx in src.rxList:
-                    timeindex = rx.getTimeP(self.survey.times)
-                    if timeindex[tind]:
-                        PTv = rx.evalDeriv(src, self.mesh, f, v[src, rx, t], adjoint=True)  # wrt f, need possibility wrt m
-                        df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
-                        df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
-                        ATinvdf_duT = self.Ainv * df_duT
-                        dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
-                        dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
-                        du_dmT = -dA_dmT + dRHS_dmT
-                        Jtv += self.EtaDeriv(self.survey.times[tind], du_dmT, adjoint=True) + self.TauiDeriv(self.survey.times[tind], du_dmT, adjoint=True)
-
-        # Conductivity ((d u / d log sigma).T)
-        if self._formulation == 'EB':
-            return -Jtv
-        # Conductivity ((d u / d log rho).T)
-        if self._formulation == 'HJ':
-            return Jtv
+        if isinstance(v, self.dataPair):
+            v = v.tovec()
+
+        rows, cols = self._dataIndex()
+        nLoc = sum(
+            rx.nRx for src in self.survey.srcList for rx in src.rxList
+        )
+        W = np.zeros((nLoc, self.survey.times.size))
+        W[rows, cols] = v
+        EJtW = self.DebyeKernel() * self._J0tVec(W, f)
+
+        # adjoints of EtaDeriv and TauiDeriv summed over the times
+        return (
+            self.etaDeriv.T * EJtW.sum(axis=1) -
+            self.tauiDeriv.T * (self.eta * EJtW.dot(self.survey.times))
+        )
 
     def getSourceTerm(self):
         """
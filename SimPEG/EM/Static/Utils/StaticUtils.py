@@ -3,6 +3,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import os
+import re
 import numpy as np
 
 from SimPEG import Utils, Mesh
@@ -38,88 +40,32 @@ def electrode_separations(
                 like to calculate""" " not {}".format(type(electrode_pair))
             )
 
-    elecSepDict = {}
-    AB = []
-    MN = []
-    AM = []
-    AN = []
-    BM = []
-    BN = []
-
-    for ii in range(dc_survey.nSrc):
-
-        Tx = dc_survey.srcList[ii].loc
-        Rx = dc_survey.srcList[ii].rxList[0].locs
-        nDTx = dc_survey.srcList[ii].rxList[0].nD
-
-        if survey_type == 'dipole-dipole':
-            A = np.matlib.repmat(Tx[0], nDTx, 1)
-            B = np.matlib.repmat(Tx[1], nDTx, 1)
-            M = Rx[0]
-            N = Rx[1]
-
-            AB.append(np.sqrt(np.sum((A[:, :] - B[:, :])**2., axis=1)))
-            MN.append(np.sqrt(np.sum((M[:, :] - N[:, :])**2., axis=1)))
-            AM.append(np.sqrt(np.sum((A[:, :] - M[:, :])**2., axis=1)))
-            AN.append(np.sqrt(np.sum((A[:, :] - N[:, :])**2., axis=1)))
-            BM.append(np.sqrt(np.sum((B[:, :] - M[:, :])**2., axis=1)))
-            BN.append(np.sqrt(np.sum((B[:, :] - N[:, :])**2., axis=1)))
-
-        elif survey_type == 'pole-dipole':
-            A = np.matlib.repmat(Tx, nDTx, 1)
-            M = Rx[0]
-            N = Rx[1]
-
-            MN.append(np.sqrt(np.sum((M[:, :] - N[:, :])**2., axis=1)))
-            AM.append(np.sqrt(np.sum((A[:, :] - M[:, :])**2., axis=1)))
-            AN.append(np.sqrt(np.sum((A[:, :] - N[:, :])**2., axis=1)))
-
-        elif survey_type == 'dipole-pole':
-            A = np.matlib.repmat(Tx[0], nDTx, 1)
-            B = np.matlib.repmat(Tx[1], nDTx, 1)
-            M = Rx
-
-            AB.append(np.sqrt(np.sum((A[:, :] - B[:, :])**2., axis=1)))
-            AM.append(np.sqrt(np.sum((A[:, :] - M[:, :])**2., axis=1)))
-            BM.append(np.sqrt(np.sum((B[:, :] - M[:, :])**2., axis=1)))
-
-        elif survey_type == 'pole-pole':
-            A = np.matlib.repmat(Tx, nDTx, 1)
-            M = Rx
-
-            AM.append(np.sqrt(np.sum((A[:, :] - M[:, :])**2., axis=1)))
+    # electrode pairs that are defined for each survey type
+    surveyPairs = {
+        'dipole-dipole': ['AB', 'MN', 'AM', 'AN', 'BM', 'BN'],
+        'pole-dipole': ['MN', 'AM', 'AN'],
+        'dipole-pole': ['AB', 'AM', 'BM'],
+        'pole-pole': ['AM'],
+    }
+    if survey_type not in surveyPairs:
+        raise Exception(
+            """survey_type must be 'dipole-dipole' | 'pole-dipole' |
+            'dipole-pole' | 'pole-pole'"""
+            " not {}".format(survey_type)
+        )
 
-        else:
-            raise Exception(
-                """survey_type must be 'dipole-dipole' | 'pole-dipole' |
-                'dipole-pole' | 'pole-pole'"""
-                " not {}".format(survey_type)
-            )
+    locs, abmn = dc_survey.getElectrodeTable()
+    electrodes = dict(zip('ABMN', abmn.T))
 
-    if np.any(electrode_pair == 'AB'):
-        if AB:
-            AB = np.hstack(AB)
-        elecSepDict['AB'] = AB
-    if np.any(electrode_pair == 'MN'):
-        if MN:
-            MN = np.hstack(MN)
-        elecSepDict['MN'] = MN
-    if np.any(electrode_pair == 'AM'):
-        if AM:
-            AM = np.hstack(AM)
-        elecSepDict['AM'] = AM
-    if np.any(electrode_pair == 'AN'):
-        if AN:
-            AN = np.hstack(AN)
-        elecSepDict['AN'] = AN
-    if np.any(electrode_pair == 'BM'):
-        if BM:
-            BM = np.hstack(BM)
-        elecSepDict['BM'] = BM
-    if np.any(electrode_pair == 'BN'):
-        if BN:
-            BN = np.hstack(BN)
-        elecSepDict['BN'] = BN
+    elecSepDict = {}
+    for pair in ['AB', 'MN', 'AM', 'AN', 'BM', 'BN']:
+        if not np.any(electrode_pair == pair):
+            continue
+        if pair in surveyPairs[survey_type]:
+            dist = locs[electrodes[pair[0]]] - locs[electrodes[pair[1]]]
+            elecSepDict[pair] = np.sqrt(np.sum(dist**2., axis=1))
+        else:
+            elecSepDict[pair] = []
 
     return elecSepDict
 
@@ -138,67 +84,35 @@ def source_receiver_midpoints(dc_survey, survey_type='dipole-dipole', dim=2):
         :return numpy.ndarray midz: midpoints  z location
     """
 
-    # Pre-allocate
-    midx = []
-    midz = []
-
-    for ii in range(dc_survey.nSrc):
-        Tx = dc_survey.srcList[ii].loc
-        Rx = dc_survey.srcList[ii].rxList[0].locs
-
-        # Get distances between each poles A-B-M-N
-        if survey_type == 'pole-dipole':
-            # Create mid-point location
-            Cmid = Tx[0]
-            Pmid = (Rx[0][:, 0] + Rx[1][:, 0])/2
-            if dim == 2:
-                zsrc = Tx[1]
-            elif dim == 3:
-                zsrc = Tx[2]
-            else:
-                raise Exception()
-
-        elif survey_type == 'dipole-dipole':
-            # Create mid-point location
-            Cmid = (Tx[0][0] + Tx[1][0])/2
-            Pmid = (Rx[0][:, 0] + Rx[1][:, 0])/2
-            if dim == 2:
-                zsrc = (Tx[0][1] + Tx[1][1])/2
-            elif dim == 3:
-                zsrc = (Tx[0][2] + Tx[1][2])/2
-            else:
-                raise Exception()
-
-        elif survey_type == 'pole-pole':
-            # Create mid-point location
-            Cmid = Tx[0]
-            Pmid = Rx[:, 0]
-            if dim == 2:
-                zsrc = Tx[1]
-            elif dim == 3:
-                zsrc = Tx[2]
-            else:
-                raise Exception()
-
-        elif survey_type == 'dipole-pole':
-            # Create mid-point location
-            Cmid = (Tx[0][0] + Tx[1][0])/2
-            Pmid = Rx[:, 0]
-            if dim == 2:
-                zsrc = (Tx[0][1] + Tx[1][1])/2
-            elif dim == 3:
-                zsrc = (Tx[0][2] + Tx[1][2])/2
-            else:
-                raise Exception()
-        else:
-            raise Exception(
-                """survey_type must be 'dipole-dipole' | 'pole-dipole' |
-                'dipole-pole' | 'pole-pole'"""
-                " not {}".format(survey_type)
-            )
+    if survey_type not in [
+        'dipole-dipole', 'pole-dipole', 'dipole-pole', 'pole-pole'
+    ]:
+        raise Exception(
+            """survey_type must be 'dipole-dipole' | 'pole-dipole' |
+            'dipole-pole' | 'pole-pole'"""
+            " not {}".format(survey_type)
+        )
+    if dim not in [2, 3]:
+        raise Exception()
+
+    locs, abmn = dc_survey.getElectrodeTable()
+    A, B, M, N = [locs[inds] for inds in abmn.T]
+    srcType, rxType = survey_type.split('-')
+
+    # Create mid-point location
+    if srcType == 'pole':
+        Cmid = A[:, 0]
+        zsrc = A[:, dim-1]
+    else:
+        Cmid = (A[:, 0] + B[:, 0])/2
+        zsrc = (A[:, dim-1] + B[:, dim-1])/2
+    if rxType == 'pole':
+        Pmid = M[:, 0]
+    else:
+        Pmid = (M[:, 0] + N[:, 0])/2
 
-        midx = np.hstack([midx, (Cmid + Pmid)/2])
-        midz = np.hstack([midz, -np.abs(Cmid-Pmid)/2 + zsrc])
+    midx = (Cmid + Pmid)/2
+    midz = -np.abs(Cmid-Pmid)/2 + zsrc
 
     return midx, midz
 
@@ -626,25 +540,14 @@ def gen_DCIPsurvey(endl, survey_type, a, b, n, dim=3, d2flag='2.5D'):
     return survey
 
 
-def writeUBC_DCobs(
-    fileName, dc_survey, dim, format_type,
-    survey_type='dipole-dipole', ip_type=0,
-    comment_lines=''
+def _writeUBC_DC(
+    fileName, dc_survey, dim, format_type, ip_type, comment_lines, data
 ):
     """
-        Write UBC GIF DCIP 2D or 3D observation file
-
-        Input:
-        :param str fileName: including path where the file is written out
-        :param SimPEG.EM.Static.DC.SurveyDC.Survey dc_survey: DC survey object
-        :param int dim:  either 2 | 3
-        :param str format_type:  either 'SURFACE' | 'GENERAL'
-        :param str survey_type: 'dipole-dipole' | 'pole-dipole' |
-            'dipole-pole' | 'pole-pole' | 'gradient'
-
-        Output:
-        :return: UBC2D-Data file
-        :rtype: file
+        Write the header and the source blocks of a UBC GIF DCIP observation
+        (data=True) or locations (data=False) file into a single buffer.
+        The electrodes of each datum are taken from the electrode table of
+        the survey.
     """
 
     if not((dim == 2) | (dim == 3)):
@@ -664,370 +567,164 @@ def writeUBC_DCobs(
             " not {}".format(format_type)
         )
 
-    if(isinstance(dc_survey.std, float)):
-        print(
-            """survey.std was a float computing uncertainty vector
-            (survey.std*survey.dobs + survey.eps)"""
-        )
-
-    if(isinstance(dc_survey.eps, float)):
-        epsValue = dc_survey.eps
-        dc_survey.eps = epsValue*np.ones_like(dc_survey.dobs)
-
-    fid = open(fileName, 'w')
-
+    header = ''
     if format_type in ['SURFACE', 'GENERAL'] and dim == 2:
-        fid.write('COMMON_CURRENT\n')
+        header += 'COMMON_CURRENT\n'
 
-    fid.write('! ' + format_type + ' FORMAT\n')
+    header += '! ' + format_type + ' FORMAT\n'
 
     if comment_lines:
-        fid.write(comment_lines)
+        header += comment_lines
 
     if dim == 2:
-        fid.write('{:d}\n'.format(dc_survey.nSrc))
+        header += '{:d}\n'.format(dc_survey.nSrc)
 
     if ip_type != 0:
-        fid.write('IPTYPE=%i\n' % ip_type)
-
-    fid.close()
+        header += 'IPTYPE=%i\n' % ip_type
+
+    # A, B of each source and M, N of each datum
+    tx = np.vstack([
+        np.r_[src.electrodes[0][0], src.electrodes[0][-1]]
+        for src in dc_survey.srcList
+    ])
+    nDs = np.array([src.nD for src in dc_survey.srcList])
+    locs, abmn = dc_survey.getElectrodeTable()
+    A, B = locs[abmn[:, 0]], locs[abmn[:, 1]]
+    M, N = locs[abmn[:, 2]], locs[abmn[:, 3]]
+    nE = locs.shape[1]
 
-    count = 0
-
-    for ii in range(dc_survey.nSrc):
-
-        rx = dc_survey.srcList[ii].rxList[0].locs
-        nD = dc_survey.srcList[ii].nD
-
-        if survey_type == 'pole-dipole' or survey_type == 'pole-pole':
-            tx = np.r_[dc_survey.srcList[ii].loc]
-            tx = np.repeat(np.r_[[tx]], 2, axis=0)
-        elif survey_type == 'dipole-dipole' or survey_type == 'dipole-pole':
-            tx = np.c_[dc_survey.srcList[ii].loc]
+    if dim == 2:
+        if format_type == 'SIMPLE':
+            txFmt = ''
+            rows = [A[:, 0], B[:, 0], M[:, 0], N[:, 0]]
+        elif format_type == 'SURFACE':
+            txFmt = '%f %f '
+            tx = tx[:, [0, nE]]
+            rows = [M[:, 0], N[:, 0]]
+        else:
+            txFmt = '%e %e %e %e '
+            tx = np.c_[tx[:, :2], tx[:, nE:nE+2]]
+            # Flip sign for z-elevation to depth
+            rows = [M[:, 0], -M[:, 1], N[:, 0], -N[:, 1]]
+        rowFmt = '%.18e'
+        end = ''
 
-        if survey_type == 'pole-dipole' or survey_type == 'dipole-dipole':
-            M = rx[0]
-            N = rx[1]
-        elif survey_type == 'pole-pole' or survey_type == 'dipole-pole':
-            M = rx
-            N = rx
+    else:
+        # Flip sign of z value for UBC DCoctree code
+        tx = np.c_[tx[:, :2], -tx[:, 2], tx[:, 3:5], -tx[:, 5]]
+        M = np.c_[M[:, :2], -M[:, 2]]
+        N = np.c_[N[:, :2], -N[:, 2]]
+        if format_type == 'SURFACE':
+            txFmt = '%e %e %e %e '
+            tx = tx[:, [0, 1, 3, 4]]
+            rows = [M[:, :2], N[:, :2]]
+        elif format_type == 'GENERAL':
+            txFmt = '%e %e %e %e %e %e '
+            rows = [M, N]
+        else:
+            txFmt = ''
+            rows = [M, N]
+        rowFmt = '%e'
+        end = '\n'
 
-        # Adapt source-receiver location for dim and survey_type
+    if data:
         if dim == 2:
-
-            if format_type == 'SIMPLE':
-
-                # fid.writelines("%e " % ii for ii in Utils.mkvc(tx[0, :]))
-                A = np.repeat(tx[0, 0], M.shape[0], axis=0)
-
-                if survey_type == 'pole-dipole':
-                    B = np.repeat(tx[0, 0], M.shape[0], axis=0)
-
-                else:
-                    B = np.repeat(tx[1, 0], M.shape[0], axis=0)
-
-                M = M[:, 0]
-                N = N[:, 0]
-
-                fid = open(fileName, 'ab')
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        A, B, M, N,
-                        dc_survey.dobs[count:count+nD],
-                        dc_survey.std[count:count+nD]
-                    ],
-                    delimiter=str(' '), newline=str('\n'))
-                fid.close()
-
-            else:
-                fid = open(fileName, 'a')
-                if format_type == 'SURFACE':
-
-                    fid.writelines("%f " % ii for ii in Utils.mkvc(tx[:, 0]))
-                    M = M[:, 0]
-                    N = N[:, 0]
-
-                if format_type == 'GENERAL':
-
-                    # Flip sign for z-elevation to depth
-                    tx[2::2, :] = -tx[2::2, :]
-
-                    fid.writelines(('{:e} {:e} ').format(ii, jj) for ii, jj in tx[:, :2])
-                    M = M[:, :2]
-                    N = N[:, :2]
-
-                    # Flip sign for z-elevation to depth
-                    M[:, 1::2] = -M[:, 1::2]
-                    N[:, 1::2] = -N[:, 1::2]
-
-                fid.write('%i\n' % nD)
-                fid.close()
-
-                fid = open(fileName, 'ab')
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        M, N,
-                        dc_survey.dobs[count:count+nD],
-                        dc_survey.std[count:count+nD]
-                    ],
-                    delimiter=str(' '), newline=str('\n'))
-
-        if dim == 3:
-            fid = open(fileName, 'a')
-            # Flip sign of z value for UBC DCoctree code
-            tx[:, 2] = -tx[:, 2]
-            # print(tx)
-
-            # Flip sign of z value for UBC DCoctree code
-            M[:, 2] = -M[:, 2]
-            N[:, 2] = -N[:, 2]
-
-            if format_type == 'SURFACE':
-
-                fid.writelines("%e " % ii for ii in Utils.mkvc(tx[:, 0:2].T))
-                M = M[:, 0:2]
-                N = N[:, 0:2]
-
-            if format_type == 'GENERAL':
-
-                fid.writelines("%e " % ii for ii in Utils.mkvc(tx.T))
-
-            fid.write('%i\n' % nD)
-
-            fid.close()
-
-            fid = open(fileName, 'ab')
+            rows += [dc_survey.dobs, dc_survey.std]
+        else:
+            eps = dc_survey.eps
+            if isinstance(eps, float):
+                eps = eps*np.ones_like(dc_survey.dobs)
             if isinstance(dc_survey.std, np.ndarray):
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        M, N,
-                        dc_survey.dobs[count:count+nD],
-                        dc_survey.std[count:count+nD] + dc_survey.eps[count:count+nD]
-                    ],
-                    fmt=str('%e'), delimiter=str(' '), newline=str('\n')
-                )
-            elif (isinstance(dc_survey.std, float)):
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        M, N,
-                        dc_survey.dobs[count:count+nD],
-                        dc_survey.std*np.abs(dc_survey.dobs[count:count+nD]) + dc_survey.eps[count:count+nD]
-                    ],
-                    fmt=str('%e'), delimiter=str(' '), newline=str('\n')
-                )
+                std = dc_survey.std + eps
+            elif isinstance(dc_survey.std, float):
+                std = dc_survey.std*np.abs(dc_survey.dobs) + eps
             else:
                 raise Exception(
                     """Uncertainities SurveyObject.std should be set.
                     Either float or nunmpy.ndarray is expected, """
                     "not {}".format(type(dc_survey.std)))
+            rows += [dc_survey.dobs, std]
 
-            fid.close()
+    rows = np.column_stack(rows)
+    rowFmt = ' '.join([rowFmt]*rows.shape[1]) + '\n'
 
-            fid = open(fileName, 'a')
-            fid.write('\n')
-            fid.close()
+    if dim == 2 and format_type == 'SIMPLE':
+        body = (rowFmt*rows.shape[0]) % tuple(rows.ravel().tolist())
 
-        count += nD
+    else:
+        # one format string and one flat list of values for all the blocks
+        blockFmt = txFmt + '%i\n'
+        fmt, values, count = [], [], 0
+        for ii, nD in enumerate(nDs):
+            fmt.append(blockFmt + rowFmt*nD + end)
+            values += tx[ii].tolist() + [nD]
+            values += rows[count:count+nD].ravel().tolist()
+            count += nD
+        body = ''.join(fmt) % tuple(values)
 
-    fid.close()
+    with open(fileName, 'w') as fid:
+        fid.write(header + body)
 
 
-def writeUBC_DClocs(
+def writeUBC_DCobs(
     fileName, dc_survey, dim, format_type,
     survey_type='dipole-dipole', ip_type=0,
-    comment_lines=''):
+    comment_lines=''
+):
     """
-        Write UBC GIF DCIP 2D or 3D locations file
+        Write UBC GIF DCIP 2D or 3D observation file
+
+        The electrodes are taken from the sources and receivers of the
+        survey, pole sources and receivers repeat their electrode whatever
+        survey_type is.
 
         Input:
         :param str fileName: including path where the file is written out
         :param SimPEG.EM.Static.DC.SurveyDC.Survey dc_survey: DC survey object
         :param int dim:  either 2 | 3
-        :param str survey_type:  either 'SURFACE' | 'GENERAL'
+        :param str format_type:  either 'SURFACE' | 'GENERAL'
+        :param str survey_type: 'dipole-dipole' | 'pole-dipole' |
+            'dipole-pole' | 'pole-pole' | 'gradient'
 
         Output:
+        :return: UBC2D-Data file
         :rtype: file
-        :return: UBC 2/3D-locations file
     """
 
-    if not((dim == 2) | (dim == 3)):
-        raise Exception(
-            """dim must be either 2 or 3"""
-            " not {}".format(dim)
-        )
-
-    if not (
-        (format_type == 'SURFACE') |
-        (format_type == 'GENERAL') |
-        (format_type == 'SIMPLE')
-    ):
-        raise Exception(
-            """format_type must be 'SURFACE' | 'GENERAL' |
-            'SIMPLE' | 'pole-pole'"""
-            " not {}".format(format_type)
-        )
-
     if(isinstance(dc_survey.std, float)):
         print(
             """survey.std was a float computing uncertainty vector
             (survey.std*survey.dobs + survey.eps)"""
         )
 
-    if(isinstance(dc_survey.eps, float)):
-        epsValue = dc_survey.eps
-        dc_survey.eps = epsValue*np.ones_like(dc_survey.dobs)
-
-    fid = open(fileName, 'w')
-
-    if format_type in ['SURFACE', 'GENERAL'] and dim == 2:
-        fid.write('COMMON_CURRENT\n')
-
-    fid.write('! ' + format_type + ' FORMAT\n')
-
-    if comment_lines:
-        fid.write(comment_lines)
-
-    if dim == 2:
-        fid.write('{:d}\n'.format(dc_survey.nSrc))
-
-    if ip_type != 0:
-        fid.write('IPTYPE=%i\n' % ip_type)
-
-    fid.close()
-
-    count = 0
-
-    for ii in range(dc_survey.nSrc):
-
-        rx = dc_survey.srcList[ii].rxList[0].locs
-        nD = dc_survey.srcList[ii].nD
-
-        if survey_type == 'pole-dipole' or survey_type == 'pole-pole':
-            tx = np.r_[dc_survey.srcList[ii].loc]
-            tx = np.repeat(np.r_[[tx]], 2, axis=0)
-        elif survey_type == 'dipole-dipole' or survey_type == 'dipole-pole':
-            tx = np.c_[dc_survey.srcList[ii].loc]
-
-        if survey_type == 'pole-dipole' or survey_type == 'dipole-dipole':
-            M = rx[0]
-            N = rx[1]
-        elif survey_type == 'pole-pole' or survey_type == 'dipole-pole':
-            M = rx
-            N = rx
-
-        # Adapt source-receiver location for dim and survey_type
-        if dim == 2:
-
-            if format_type == 'SIMPLE':
-
-                # fid.writelines("%e " % ii for ii in Utils.mkvc(tx[0, :]))
-                A = np.repeat(tx[0, 0], M.shape[0], axis=0)
-
-                if survey_type == 'pole-dipole':
-                    B = np.repeat(tx[0, 0], M.shape[0], axis=0)
-
-                else:
-                    B = np.repeat(tx[1, 0], M.shape[0], axis=0)
-
-                M = M[:, 0]
-                N = N[:, 0]
-
-                fid = open(fileName, 'ab')
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        A, B, M, N,
-                    ],
-                    delimiter=str(' '), newline=str('\n'))
-                fid.close()
-
-            else:
-                fid = open(fileName, 'a')
-                if format_type == 'SURFACE':
-
-                    fid.writelines("%f " % ii for ii in Utils.mkvc(tx[:, 0]))
-                    M = M[:, 0]
-                    N = N[:, 0]
-
-                if format_type == 'GENERAL':
-
-                    # Flip sign for z-elevation to depth
-                    tx[2::2, :] = -tx[2::2, :]
-
-                    fid.writelines(('{:e} {:e} ').format(ii, jj) for ii, jj in tx[:, :2])
-                    M = M[:, :2]
-                    N = N[:, :2]
-
-                    # Flip sign for z-elevation to depth
-                    M[:, 1::2] = -M[:, 1::2]
-                    N[:, 1::2] = -N[:, 1::2]
-
-                fid.write('%i\n' % nD)
-                fid.close()
-
-                fid = open(fileName, 'ab')
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        M, N,
-                    ],
-                    delimiter=str(' '), newline=str('\n'))
-
-        if dim == 3:
-            fid = open(fileName, 'a')
-            # Flip sign of z value for UBC DCoctree code
-            tx[:, 2] = -tx[:, 2]
-            # print(tx)
-
-            # Flip sign of z value for UBC DCoctree code
-            M[:, 2] = -M[:, 2]
-            N[:, 2] = -N[:, 2]
-
-            if format_type == 'SURFACE':
-
-                fid.writelines("%e " % ii for ii in Utils.mkvc(tx[:, 0:2].T))
-                M = M[:, 0:2]
-                N = N[:, 0:2]
-
-            if format_type == 'GENERAL':
-
-                fid.writelines("%e " % ii for ii in Utils.mkvc(tx.T))
-
-            fid.write('%i\n' % nD)
-
-            fid.close()
+    _writeUBC_DC(
+        fileName, dc_survey, dim, format_type, ip_type, comment_lines,
+        data=True
+    )
 
-            fid = open(fileName, 'ab')
-            if isinstance(dc_survey.std, np.ndarray):
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        M, N,
-                    ],
-                    fmt=str('%e'), delimiter=str(' '), newline=str('\n')
-                )
-            elif (isinstance(dc_survey.std, float)):
-                np.savetxt(
-                    fid,
-                    np.c_[
-                        M, N,
-                    ],
-                    fmt=str('%e'), delimiter=str(' '), newline=str('\n')
-                )
 
-            fid.close()
+def writeUBC_DClocs(
+    fileName, dc_survey, dim, format_type,
+    survey_type='dipole-dipole', ip_type=0,
+    comment_lines=''):
+    """
+        Write UBC GIF DCIP 2D or 3D locations file
 
-            fid = open(fileName, 'a')
-            fid.write('\n')
-            fid.close()
+        Input:
+        :param str fileName: including path where the file is written out
+        :param SimPEG.EM.Static.DC.SurveyDC.Survey dc_survey: DC survey object
+        :param int dim:  either 2 | 3
+        :param str survey_type:  either 'SURFACE' | 'GENERAL'
 
-        count += nD
+        Output:
+        :rtype: file
+        :return: UBC 2/3D-locations file
+    """
 
-    fid.close()
+    _writeUBC_DC(
+        fileName, dc_survey, dim, format_type, ip_type, comment_lines,
+        data=False
+    )
 
 
 def convertObs_DC3D_to_2D(survey, lineID, flag='local'):
@@ -1181,13 +878,89 @@ def convertObs_DC3D_to_2D(survey, lineID, flag='local'):
     return survey2D
 
 
-def readUBC_DC2Dpre(fileName):
+def _readUBC_DClines(fileName):
+    """
+        Parse the numeric lines of a UBC GIF DCIP file in one pass. Comments
+        (after '!') and keyword lines (COMMON_CURRENT, IPTYPE=...) are
+        skipped.
+
+        :rtype: tuple
+        :return: (values, start, nValues) all the values of the file, and the
+            index of the first value and the number of values of each line
+    """
+    with open(fileName, 'r') as fid:
+        text = fid.read()
+    text = re.sub(r'!.*', '', text)
+    text = re.sub(r'(?m)^[ \t]*[A-Za-z_].*$', '', text)
+
+    chars = np.frombuffer(text.encode(), dtype=np.uint8)
+    blank = np.in1d(chars, np.frombuffer(b' \t\r\n,', dtype=np.uint8))
+    first = ~blank & np.r_[True, blank[:-1]]
+    line = np.cumsum(chars == ord('\n'))
+    nValues = np.bincount(line[first])
+    nValues = nValues[nValues > 0]
+
+    values = np.array(text.replace(',', ' ').split(), dtype=float)
+    start = np.r_[0, np.cumsum(nValues)[:-1]].astype(int)
+    return values, start, nValues
+
+
+def _lineRows(values, start, nValues, lines):
+    """
+        Values of the given lines, which must have the same length, as rows
+    """
+    n = np.unique(nValues[lines])
+    if n.size > 1:
+        raise Exception(
+            "Lines of the same block should have the same number of values"
+            " not {}".format(n)
+        )
+    n = n[0] if n.size else 0
+    return values[start[lines][:, np.newaxis] + np.arange(n)]
+
+
+def _cachedUBC_DC(fileName, parse, cache):
+    """
+        Arrays parsed from a UBC GIF DCIP file, loaded from the sidecar
+        fileName.npz when it was written for the current version of the file
+    """
+    if not cache:
+        return parse(fileName)
+
+    stat = os.stat(fileName)
+    stamp = np.r_[stat.st_mtime, stat.st_size]
+    cacheFile = fileName + '.npz'
+    if os.path.exists(cacheFile):
+        with np.load(cacheFile) as cached:
+            if np.all(cached['stamp'] == stamp):
+                return {
+                    key: cached[key] for key in cached.files if key != 'stamp'
+                }
+
+    arrays = parse(fileName)
+    np.savez(cacheFile, stamp=stamp, **arrays)
+    return arrays
+
+
+def _parseUBC_DC2Dpre(fileName):
+    values, start, nValues = _readUBC_DClines(fileName)
+    # skip the number of sources of the 2D formats
+    lines = np.flatnonzero(nValues > 1)
+    return {'data': _lineRows(values, start, nValues, lines)}
+
+
+def readUBC_DC2Dpre(fileName, cache=False):
     """
         Read UBC GIF DCIP 2D observation file and generate arrays
         for tx-rx location
 
+        Each line is one datum. Consecutive data of the same transmitter
+        are gathered in one source.
+
         Input:
         :param string fileName: path to the UBC GIF 3D obs file
+        :param bool cache: keep the parsed arrays in fileName.npz and reuse
+            them while the file is unchanged
 
         Output:
         :return survey: 2D DC survey class object
@@ -1199,172 +972,120 @@ def readUBC_DC2Dpre(fileName):
 
     """
 
-    # Load file
-    obsfile = np.genfromtxt(
-        fileName, delimiter=' \n',
-        dtype=np.str, comments='!'
-    )
-
-    # Pre-allocate
-    srcLists = []
-    Rx = []
-    d = []
-    zflag = True  # Flag for z value provided
-
-    for ii in range(obsfile.shape[0]):
-
-        if not obsfile[ii]:
-            continue
-
-        # First line is transmitter with number of receivers
+    data = _cachedUBC_DC(fileName, _parseUBC_DC2Dpre, cache)['data']
+    nan = np.nan*np.ones(data.shape[0])
 
-        temp = (np.fromstring(obsfile[ii], dtype=float, sep=' ').T)
+    # Check if z value is provided, if False -> nan
+    if data.shape[1] == 5:
+        tx = data[:, :2]
+        A = np.c_[data[:, 0], nan, nan]
+        B = np.c_[data[:, 1], nan, nan]
+        M = np.c_[data[:, 2], nan, nan]
+        N = np.c_[data[:, 3], nan, nan]
+    else:
+        tx = data[:, :4]
+        A = np.c_[data[:, 0], nan, data[:, 1]]
+        B = np.c_[data[:, 2], nan, data[:, 3]]
+        M = np.c_[data[:, 4], nan, data[:, 5]]
+        N = np.c_[data[:, 6], nan, data[:, 7]]
 
-        # Check if z value is provided, if False -> nan
-        if len(temp) == 5:
-            tx = np.r_[temp[0], np.nan, np.nan, temp[1], np.nan, np.nan]
-            zflag = False
+    new = np.r_[True, np.any(np.diff(tx, axis=0) != 0., axis=1)]
+    bounds = np.r_[np.flatnonzero(new), data.shape[0]]
 
-        else:
-            tx = np.r_[temp[0], np.nan, temp[1], temp[2], np.nan, temp[3]]
+    srcLists = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        Rx = DC.Rx.Dipole(M[start:end], N[start:end])
+        srcLists.append(DC.Src.Dipole([Rx], A[start], B[start]))
 
-        if zflag:
-            rx = np.c_[temp[4], np.nan, temp[5], temp[6], np.nan, temp[7]]
+    # Create survey class
+    survey = DC.SurveyDC.Survey(srcLists)
 
-        else:
-            rx = np.c_[temp[2], np.nan, np.nan, temp[3], np.nan, np.nan]
-            # Check if there is data with the location
+    survey.dobs = data[:, -1]
 
-        d.append(temp[-1])
+    return {'dc_survey': survey}
 
-        Rx = DC.Rx.Dipole(rx[:, :3], rx[:, 3:])
-        srcLists.append(DC.Src.Dipole([Rx], tx[:3], tx[3:]))
 
-    # Create survey class
-    survey = DC.SurveyDC.Survey(srcLists)
+def _parseUBC_DC3Dobs(fileName):
+    values, start, nValues = _readUBC_DClines(fileName)
 
-    survey.dobs = np.asarray(d)
+    # First line of a block is the transmitter with its number of receivers
+    headers, counts = [], []
+    line = 0
+    while line < nValues.size:
+        headers.append(line)
+        counts.append(int(values[start[line] + nValues[line] - 1]))
+        line += counts[-1] + 1
 
-    return {'dc_survey': survey}
+    headers = np.array(headers, dtype=int)
+    isData = np.ones(nValues.size, dtype=bool)
+    isData[headers] = False
+    return {
+        'tx': _lineRows(values, start, nValues, headers)[:, :-1],
+        'counts': np.array(counts, dtype=int),
+        'data': _lineRows(values, start, nValues, np.flatnonzero(isData))
+    }
 
 
-def readUBC_DC3Dobs(fileName):
+def readUBC_DC3Dobs(fileName, cache=False):
     """
         Read UBC GIF DCIP 3D observation file and generate arrays
         for tx-rx location
 
         Input:
         :param string fileName: path to the UBC GIF 3D obs file
+        :param bool cache: keep the parsed arrays in fileName.npz and reuse
+            them while the file is unchanged
 
         Output:
         :param rx, tx, d, wd
         :return
     """
 
-    # Load file
-    obsfile = np.genfromtxt(
-        fileName, delimiter=' \n',
-        dtype=np.str, comments='!'
-    )
-
-    # Pre-allocate
-    srcLists = []
-    Rx = []
-    d = []
-    wd = []
-    # Flag for z value provided
-    zflag = True
-    poletx = False
-    polerx = False
-
-    # Countdown for number of obs/tx
-    count = 0
-    for ii in range(obsfile.shape[0]):
-
-        if not obsfile[ii]:
-            continue
-
-        # First line is transmitter with number of receivers
-        if count == 0:
-            rx = []
-            temp = (np.fromstring(obsfile[ii], dtype=float, sep=' ').T)
-            count = int(temp[-1])
-            # Check if z value is provided, if False -> nan
-            if len(temp) == 5:
-                # check if pole-dipole
-                if np.allclose(temp[0:2], temp[2:4]):
-                    tx = np.r_[temp[0:2], np.nan]
-                    poletx = True
-
-                else:
-                    tx = np.r_[temp[0:2], np.nan, temp[2:4], np.nan]
-                zflag = False
-
-            else:
-                # check if pole-dipole
-                if np.allclose(temp[0:3], temp[3:6]):
-                    tx = np.r_[temp[0:3]]
-                    poletx = True
-                    temp[2] = -temp[2]
-                else:
-                    # Flip z values
-                    temp[2] = -temp[2]
-                    temp[5] = -temp[5]
-                    tx = temp[:-1]
-
-            continue
-
-        temp = np.fromstring(obsfile[ii], dtype=float, sep=' ')
-
-        if zflag:
-
-            # Check if Pole Receiver
-            if np.allclose(temp[0:3], temp[3:6]):
-                polerx = True
-                # Flip z values
-                temp[2] = -temp[2]
-                rx.append(temp[:3])
-            else:
-                temp[2] = -temp[2]
-                temp[5] = -temp[5]
-                rx.append(temp[:-2])
+    arrays = _cachedUBC_DC(fileName, _parseUBC_DC3Dobs, cache)
+    tx, counts, data = arrays['tx'], arrays['counts'], arrays['data']
+
+    # Check if z value is provided, if False -> nan
+    if tx.shape[1] == 4:
+        nan = np.nan*np.ones(tx.shape[0])
+        A = np.c_[tx[:, :2], nan]
+        B = np.c_[tx[:, 2:4], nan]
+        poletx = np.all(np.isclose(tx[:, :2], tx[:, 2:4]), axis=1)
+        nan = np.nan*np.ones(data.shape[0])
+        M = np.c_[data[:, :2], nan]
+        N = np.c_[data[:, 2:4], nan]
+        polerx = np.all(np.isclose(data[:, :2], data[:, 2:4]), axis=1)
+        nLoc = 4
+    else:
+        # Flip z values
+        A = np.c_[tx[:, :2], -tx[:, 2]]
+        B = np.c_[tx[:, 3:5], -tx[:, 5]]
+        poletx = np.all(np.isclose(tx[:, :3], tx[:, 3:6]), axis=1)
+        M = np.c_[data[:, :2], -data[:, 2]]
+        N = np.c_[data[:, 3:5], -data[:, 5]]
+        polerx = np.all(np.isclose(data[:, :3], data[:, 3:6]), axis=1)
+        nLoc = 6
 
-            # Check if there is data with the location
-            if len(temp) == 8:
-                d.append(temp[-2])
-                wd.append(temp[-1])
+    bounds = np.r_[0, np.cumsum(counts)]
 
+    srcLists = []
+    for ii, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        if np.all(polerx[start:end]):
+            Rx = DC.Rx.Pole(M[start:end])
         else:
-            # Check if Pole Receiver
-            if np.allclose(temp[0:2], temp[2:4]):
-                polerx = True
-                # Flip z values
-                rx.append(temp[:2])
-            else:
-                rx.append(np.r_[temp[0:2], np.nan, temp[2:4], np.nan])
-
-            # Check if there is data with the location
-            if len(temp) == 6:
-                d.append(temp[-2])
-                wd.append(temp[-1])
-
-        count = count - 1
-
-        # Reach the end of transmitter block
-        if count == 0:
-            rx = np.asarray(rx)
-            if polerx:
-                Rx = DC.Rx.Pole(rx[:, :3])
-            else:
-                Rx = DC.Rx.Dipole(rx[:, :3], rx[:, 3:])
-            if poletx:
-                srcLists.append(DC.Src.Pole([Rx], tx[:3]))
-            else:
-                srcLists.append(DC.Src.Dipole([Rx], tx[:3], tx[3:]))
+            Rx = DC.Rx.Dipole(M[start:end], N[start:end])
+        if poletx[ii]:
+            srcLists.append(DC.Src.Pole([Rx], A[ii]))
+        else:
+            srcLists.append(DC.Src.Dipole([Rx], A[ii], B[ii]))
 
     survey = DC.SurveyDC.Survey(srcLists)
-    survey.dobs = np.asarray(d)
-    survey.std = np.asarray(wd)
+    # Check if there is data with the location
+    if data.shape[1] == nLoc + 2:
+        survey.dobs = data[:, -2]
+        survey.std = data[:, -1]
+    else:
+        survey.dobs = np.array([])
+        survey.std = np.array([])
     survey.eps = 0.
 
     return {'dc_survey': survey}
@@ -1507,6 +1228,23 @@ def getSrc_locs(survey):
     return srcMat
 
 
+def _topCells(ZC, ACTIND, h, option="top"):
+    """
+        Top of the highest active cell of each column (nColumn, nZ) of cell
+        centers ZC, or its center with option="center".
+    """
+    ind = np.argmax(np.where(ACTIND, ZC, -np.inf), axis=1)
+    if not np.all(ACTIND[np.arange(ZC.shape[0]), ind]):
+        raise ValueError("Every column of the mesh needs an active cell")
+    if option == "top":
+        dz = h[ind] * 0.5
+    elif option == "center":
+        dz = 0.
+    else:
+        raise Exception()
+    return ZC[np.arange(ZC.shape[0]), ind] + dz
+
+
 def gettopoCC(mesh, actind, option="top"):
     """
         Get topography from active indices of mesh.
@@ -1524,19 +1262,7 @@ def gettopoCC(mesh, actind, option="top"):
                 order='F'
                 )
             ZC = zc.reshape((mesh.vnC[0]*mesh.vnC[1], mesh.vnC[2]), order='F')
-            topoCC = np.zeros(ZC.shape[0])
-
-            for i in range(ZC.shape[0]):
-                ind = np.argmax(ZC[i, :][ACTIND[i, :]])
-                if option == "top":
-                    dz = mesh.hz[ACTIND[i, :]][ind] * 0.5
-                elif option == "center":
-                    dz = 0.
-                else:
-                    raise Exception()
-                topoCC[i] = (
-                    ZC[i, :][ACTIND[i, :]].max() + dz
-                    )
+            topoCC = _topCells(ZC, ACTIND, mesh.hz, option)
             return mesh2D, topoCC
 
         elif mesh.dim == 2:
@@ -1545,18 +1271,7 @@ def gettopoCC(mesh, actind, option="top"):
             yc = mesh.gridCC[:, 1]
             ACTIND = actind.reshape((mesh.vnC[0], mesh.vnC[1]), order='F')
             YC = yc.reshape((mesh.vnC[0], mesh.vnC[1]), order='F')
-            topoCC = np.zeros(YC.shape[0])
-            for i in range(YC.shape[0]):
-                ind = np.argmax(YC[i, :][ACTIND[i, :]])
-                if option == "top":
-                    dy = mesh.hy[ACTIND[i, :]][ind] * 0.5
-                elif option == "center":
-                    dy = 0.
-                else:
-                    raise Exception()
-                topoCC[i] = (
-                    YC[i, :][ACTIND[i, :]].max() + dy
-                    )
+            topoCC = _topCells(YC, ACTIND, mesh.hy, option)
             return mesh1D, topoCC
 
     elif mesh._meshType == "TREE":
@@ -1564,20 +1279,18 @@ def gettopoCC(mesh, actind, option="top"):
             uniqXY = uniqueRows(mesh.gridCC[:, :2])
             npts = uniqXY[0].shape[0]
             ZC = mesh.gridCC[:, 2]
-            topoCC = np.zeros(npts)
             if option == "top":
                 # TODO: this assume same hz, need to be modified
                 dz = mesh.hz.min() * 0.5
             elif option == "center":
                 dz = 0.
-            for i in range(npts):
-                inds = uniqXY[2] == i
-                actind_z = actind[inds]
-                if actind_z.sum() > 0.:
-                    topoCC[i] = (ZC[inds][actind_z]).max() + dz
-                else:
-                    topoCC[i] = (ZC[inds]).max() + dz
-            return uniqXY[0], topoCC
+            # highest active cell of each column, or highest cell if none
+            topoAll = np.full(npts, -np.inf)
+            np.maximum.at(topoAll, uniqXY[2], ZC)
+            topoCC = np.full(npts, -np.inf)
+            np.maximum.at(topoCC, uniqXY[2][actind], ZC[actind])
+            topoCC[np.isinf(topoCC)] = topoAll[np.isinf(topoCC)]
+            return uniqXY[0], topoCC + dz
         else:
             raise NotImplementedError(
                 "gettopoCC is not implemented for Quad tree mesh"
@@ -1600,7 +1313,7 @@ def drapeTopotoLoc(mesh, pts, actind=None, option="top", topo=None):
         actind = Utils.surface2ind_topo(mesh, topo)
     if mesh._meshType == "TENSOR":
         meshtemp, topoCC = gettopoCC(mesh, actind, option=option)
-        inds = Utils.closestPoints(meshtemp, pts)
+        inds = closestPointsGrid(meshtemp.gridCC, pts, dim=meshtemp.dim)
 
     elif mesh._meshType == "TREE":
         if mesh.dim == 3:
@@ -1644,14 +1357,15 @@ def closestPointsGrid(grid, pts, dim=2):
     """
 
     pts = asArray_N_x_Dim(pts, dim)
+    grid = asArray_N_x_Dim(grid, dim)
     nodeInds = np.empty(pts.shape[0], dtype=int)
 
-    for i, pt in enumerate(pts):
-        if dim == 1:
-            nodeInds[i] = ((pt - grid)**2.).argmin()
-        else:
-            nodeInds[i] = (
-                (np.tile(
-                    pt, (grid.shape[0], 1)) - grid)**2.).sum(axis=1).argmin()
+    # distances to the grid for chunks of points of about 1e6 entries
+    chunk = max(1, int(1e6 // grid.shape[0]))
+    for i in range(0, pts.shape[0], chunk):
+        dist = (
+            (pts[i:i+chunk, np.newaxis, :] - grid[np.newaxis, :, :])**2.
+        ).sum(axis=2)
+        nodeInds[i:i+chunk] = dist.argmin(axis=1)
 
     return nodeInds
@@ -1,9 +1,12 @@
 from __future__ import division, print_function
 import scipy.sparse as sp
 import numpy as np
+import properties
 from SimPEG import Problem, Utils, Solver as SimpegSolver
 from SimPEG.EM.Base import BaseEMProblem
+from SimPEG.EM.Utils import MagneticDipoleVectorPotentialCache
 from SimPEG.EM.TDEM.SurveyTDEM import Survey as SurveyTDEM
+from SimPEG.EM.TDEM import SrcTDEM
 from SimPEG.EM.TDEM.FieldsTDEM import (
     FieldsTDEM, Fields3D_b, Fields3D_e, Fields3D_h, Fields3D_j, Fields_Derivs
 )
@@ -15,14 +18,229 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
     """
     We start with the first order form of Maxwell's equations, eliminate and
     solve the second order form. For the time discretization, we use backward
-    Euler.
+    Euler (default) or the second order backward differentiation formula
+    (BDF2), see :code:`timeIntegration`.
     """
     surveyPair = SurveyTDEM  #: A SimPEG.EM.TDEM.SurveyTDEM Class
     fieldsPair = FieldsTDEM  #: A SimPEG.EM.TDEM.FieldsTDEM Class
 
+    timeIntegration = properties.StringChoice(
+        "Time discretization: first order backward Euler or the second "
+        "order (variable step) backward differentiation formula",
+        default='BackwardEuler',
+        choices=['BackwardEuler', 'BDF2']
+    )
+
+    convolveWaveforms = properties.Bool(
+        "Time step the step-off response of the sources (starting at t=0) "
+        "and convolve it with the source waveforms at the receiver times "
+        "(off-time receivers only)",
+        default=False
+    )
+
+    nWorkers = properties.Integer(
+        "Number of worker processes used to time step groups of sources "
+        "(1: all sources are handled in this process)",
+        default=1, min=1
+    )
+
     def __init__(self, mesh, **kwargs):
         BaseEMProblem.__init__(self, mesh, **kwargs)
 
+    def _timeStepCoefficients(self, tInd):
+        """
+        Coefficients of the discrete time derivative used to step from
+        time index :code:`tInd` to :code:`tInd+1`
+
+        .. math::
+            \\frac{\partial \mathbf{u}}{\partial t} \\Big|^{n+1} \\approx
+            a_0 \mathbf{u}^{n+1} + a_1 \mathbf{u}^{n} +
+            a_2 \mathbf{u}^{n-1}
+
+        The first step of BDF2 is always taken with backward Euler.
+
+        :param int tInd: time index
+        :rtype: tuple
+        :return: (a0, a1, a2)
+        """
+        dt = self.timeSteps[tInd]
+        if self.timeIntegration == 'BackwardEuler' or tInd == 0:
+            return 1./dt, -1./dt, 0.
+
+        w = dt / self.timeSteps[tInd-1]
+        return (
+            (1. + 2.*w) / ((1. + w) * dt),
+            -(1. + w) / dt,
+            w**2 / ((1. + w) * dt)
+        )
+
+    def _sameAdiag(self, tInd0, tInd1):
+        """
+        Do the time indices tInd0 and tInd1 share the same system matrix?
+        (if so, we can re-use the factorization)
+        """
+        return (
+            self._timeStepCoefficients(tInd0)[0] ==
+            self._timeStepCoefficients(tInd1)[0]
+        )
+
+    def _getAdiagInv(self, tInd, adjoint=False):
+        """
+        Factorization of the diagonal block (or its transpose) at tInd. Uses
+        the factorizations shared by the parent process if available.
+        """
+        a0 = self._timeStepCoefficients(tInd)[0]
+        shared = getattr(self, '_sharedAdiagInv', None)
+        if shared is not None and (a0, adjoint) in shared:
+            return shared[(a0, adjoint)]
+
+        A = self.getAdiag(tInd)
+        if adjoint:
+            A = A.T
+        return self.Solver(A, **self.solverOpts)
+
+    def _cleanAdiagInv(self, Ainv):
+        """
+        Clean a factorization unless it is shared with the workers
+        """
+        shared = getattr(self, '_sharedAdiagInv', None)
+        if shared is not None and any(
+            Ainv is sharedAinv for sharedAinv in shared.values()
+        ):
+            return
+        Ainv.clean()
+
+    def _runSourceGroup(self, group, method, args):
+        """
+        Run a method for a group of sources in a worker process, with the
+        group paired to the problem
+        """
+        # pair the group without unpairing the full survey: fields passed to
+        # the worker are still indexed with it
+        srcList = [self.survey.srcList[i] for i in group]
+        survey = self.survey.__class__(srcList)
+        self._survey = survey
+        survey._prob = self
+
+        out = getattr(self, method)(*args)
+        if method == 'fields':
+            return out[:, self._fieldType + 'Solution', :]
+        return out
+
+    def _mapSourceGroups(self, method, groupArgs, adjoint=False):
+        """
+        Run a method of the problem for groups of sources on the workers
+        (see :code:`BaseEMProblem._mapSourceGroups`). The diagonal blocks of
+        the time-stepping system are factored once and shared (read-only)
+        with the workers.
+
+        :param bool adjoint: share the factorizations of the transposed
+            blocks
+        """
+        shared = {}
+        for tInd in range(self.nT):
+            key = (self._timeStepCoefficients(tInd)[0], adjoint)
+            if key not in shared:
+                shared[key] = self._getAdiagInv(tInd, adjoint=adjoint)
+        self._sharedAdiagInv = shared
+        try:
+            return super(BaseTDEMProblem, self)._mapSourceGroups(
+                method, groupArgs
+            )
+        finally:
+            self._sharedAdiagInv = None
+            for Ainv in shared.values():
+                Ainv.clean()
+
+    def _fieldsWorkers(self, m):
+        """
+        Time step groups of sources in parallel
+        """
+        self.model = m
+        Srcs = self.survey.srcList
+        ftype = self._fieldType + 'Solution'
+
+        F = self.fieldsPair(self.mesh, self.survey)
+        # compute the initial fields here too so that what they cache (e.g.
+        # the DC factorization for galvanic sources) is available to Jvec
+        # and Jtvec
+        F[:, ftype, 0] = self.getInitialFields()
+
+        groups, out = self._mapSourceGroups('fields', lambda group: (m,))
+        for group, sol in zip(groups, out):
+            F[[Srcs[i] for i in group], ftype, :] = sol
+        return F
+
+    def _JvecWorkers(self, m, v, f):
+        """
+        Jvec for groups of sources in parallel
+        """
+        self.model = m
+        _, out = self._mapSourceGroups('Jvec', lambda group: (m, v, f))
+        return np.hstack(out)
+
+    def _JtvecWorkers(self, m, v, f):
+        """
+        Jtvec for groups of sources in parallel
+        """
+        self.model = m
+        if isinstance(v, self.dataPair):
+            v = v.tovec()
+        ind = np.r_[0, np.cumsum([src.nD for src in self.survey.srcList])]
+
+        _, out = self._mapSourceGroups(
+            'Jtvec',
+            lambda group: (m, v[ind[group[0]]:ind[group[-1]+1]], f),
+            adjoint=True
+        )
+        return np.sum(out, axis=0)
+
+    def scheduleTimeSteps(self, times=None, breakpoints=None, **kwargs):
+        """
+        Generate and set a geometric time-stepping schedule (see
+        :meth:`SimPEG.Problem.BaseTimeProblem.scheduleTimeSteps`). By
+        default, the times are taken from the receivers in the survey and
+        the breakpoints from the waveforms of the sources. When convolving
+        waveforms, the step-off response is scheduled from t=0 up to the
+        longest delay between a receiver time and its source waveform.
+
+        .. code-block:: python
+
+            prob.pair(survey)
+            prob.scheduleTimeSteps(accuracy=0.1, nDt=6)
+
+        :param numpy.ndarray times: times at which the fields are needed
+        :param numpy.ndarray breakpoints: times where nodes are required
+        :rtype: list
+        :return: time steps as [..., (dt, repeat), ...]
+        """
+        if times is None or breakpoints is None:
+            assert self.ispaired, (
+                'The problem must be paired to a survey to get the receiver '
+                'times and source waveforms'
+            )
+        if times is None and self.convolveWaveforms:
+            # the step-off response is needed at the delays between the
+            # receiver times and the waveform
+            times = np.hstack([
+                rx.times - tau for src in self.survey.srcList
+                for rx in src.rxList
+                for tau in src.waveform.breakpoints[[0, -1]]
+            ])
+        elif times is None:
+            times = np.hstack([
+                rx.times for src in self.survey.srcList for rx in src.rxList
+            ])
+        if breakpoints is None and self.convolveWaveforms:
+            breakpoints = [0.]
+        elif breakpoints is None:
+            breakpoints = np.hstack([
+                src.waveform.breakpoints for src in self.survey.srcList
+            ])
+        return super(BaseTDEMProblem, self).scheduleTimeSteps(
+            times, breakpoints=breakpoints, **kwargs
+        )
+
     # def fields_nostore(self, m):
     #     """
     #     Solve the forward problem without storing fields
@@ -42,6 +260,9 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         :return F: fields object
         """
 
+        if self._useWorkers():
+            return self._fieldsWorkers(m)
+
         tic = time.time()
         self.model = m
 
@@ -58,27 +279,33 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             # keep factors if dt is the same as previous step b/c A will be the
             # same
             if Ainv is not None and (
-                tInd > 0 and dt != self.timeSteps[tInd - 1]
+                tInd > 0 and not self._sameAdiag(tInd, tInd - 1)
             ):
-                Ainv.clean()
+                self._cleanAdiagInv(Ainv)
                 Ainv = None
 
             if Ainv is None:
-                A = self.getAdiag(tInd)
                 if self.verbose:
                     print('Factoring...   (dt = {:e})'.format(dt))
-                Ainv = self.Solver(A, **self.solverOpts)
+                Ainv = self._getAdiagInv(tInd)
                 if self.verbose:
                     print('Done')
 
             rhs = self.getRHS(tInd+1)  # this is on the nodes of the time mesh
             Asubdiag = self.getAsubdiag(tInd)
 
+            rhs = rhs - Asubdiag * F[:, (self._fieldType + 'Solution'), tInd]
+            if tInd > 0:
+                # second order schemes also depend on the step before
+                Asubsubdiag = self.getAsubsubdiag(tInd)
+                rhs = rhs - Asubsubdiag * F[
+                    :, (self._fieldType + 'Solution'), tInd-1
+                ]
+
             if self.verbose:
                 print('    Solving...   (tInd = {:d})'.format(tInd+1))
             # taking a step
-            sol = Ainv * (rhs - Asubdiag * F[:, (self._fieldType + 'Solution'),
-                                             tInd])
+            sol = Ainv * rhs
 
             if self.verbose:
                 print('    Done...')
@@ -88,7 +315,7 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             F[:, self._fieldType+'Solution', tInd+1] = sol
         if self.verbose:
             print('{}\nDone calculating fields(m)\n{}'.format('*'*50, '*'*50))
-        Ainv.clean()
+        self._cleanAdiagInv(Ainv)
         return F
 
     def Jvec(self, m, v, f=None):
@@ -112,6 +339,9 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         if f is None:
             f = self.fields(m)
 
+        if self._useWorkers():
+            return self._JvecWorkers(m, v, f)
+
         ftype = self._fieldType + 'Solution'  # the thing we solved for
         self.model = m
 
@@ -137,21 +367,27 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         # store the field derivs we need to project to calc full deriv
         df_dm_v = Fields_Derivs(self.mesh, self.survey)
 
+        # solution deriv times a vector at the step before the previous one
+        # (only needed by second order time stepping)
+        dunm1_dm_v = np.zeros_like(dun_dm_v)
+
         Adiaginv = None
 
         for tInd, dt in zip(range(self.nT), self.timeSteps):
             # keep factors if dt is the same as previous step b/c A will be the
             # same
-            if Adiaginv is not None and (tInd > 0 and dt !=
-                                         self.timeSteps[tInd - 1]):
-                Adiaginv.clean()
+            if Adiaginv is not None and (
+                tInd > 0 and not self._sameAdiag(tInd, tInd - 1)
+            ):
+                self._cleanAdiagInv(Adiaginv)
                 Adiaginv = None
 
             if Adiaginv is None:
-                A = self.getAdiag(tInd)
-                Adiaginv = self.Solver(A, **self.solverOpts)
+                Adiaginv = self._getAdiagInv(tInd)
 
             Asubdiag = self.getAsubdiag(tInd)
+            if tInd > 0:
+                Asubsubdiag = self.getAsubsubdiag(tInd)
 
             for i, src in enumerate(self.survey.srcList):
 
@@ -179,8 +415,18 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
 
                 JRHS = dRHS_dm_v - dAsubdiag_dm_v - dA_dm_v
 
+                if tInd > 0:
+                    dAsubsubdiag_dm_v = self.getAsubsubdiagDeriv(
+                        tInd, f[src, ftype, tInd-1], v
+                    )
+                    JRHS = (
+                        JRHS - dAsubsubdiag_dm_v -
+                        Asubsubdiag * dunm1_dm_v[:, i]
+                    )
+
                 # step in time and overwrite
                 if tInd != len(self.timeSteps+1):
+                    dunm1_dm_v[:, i] = dun_dm_v[:, i]
                     dun_dm_v[:, i] = Adiaginv * (
                         JRHS - Asubdiag * dun_dm_v[:, i]
                     )
@@ -194,7 +440,7 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                         )
                     )
                 )
-        Adiaginv.clean()
+        self._cleanAdiagInv(Adiaginv)
         # del df_dm_v, dun_dm_v, Asubdiag
         # return Utils.mkvc(Jv)
         return np.hstack(Jv)
@@ -222,6 +468,9 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         if f is None:
             f = self.fields(m)
 
+        if self._useWorkers():
+            return self._JtvecWorkers(m, v, f)
+
         self.model = m
         ftype = self._fieldType + 'Solution'  # the thing we solved for
 
@@ -285,23 +534,29 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         # if the previous timestep is the same: no need to refactor the matrix
         # for tInd, dt in zip(range(self.nT), self.timeSteps):
 
+        # adjoint solution two time steps ahead (only needed by second order
+        # time stepping)
+        ATinv_df_duT_v_2 = np.zeros_like(ATinv_df_duT_v)
+
         for tInd in reversed(range(self.nT)):
             # tInd = tIndP - 1
             if AdiagTinv is not None and (
                 tInd <= self.nT and
-                self.timeSteps[tInd] != self.timeSteps[tInd+1]
+                not self._sameAdiag(tInd, tInd+1)
             ):
-                AdiagTinv.clean()
+                self._cleanAdiagInv(AdiagTinv)
                 AdiagTinv = None
 
             # refactor if we need to
             if AdiagTinv is None:  # and tInd > -1:
-                Adiag = self.getAdiag(tInd)
-                AdiagTinv = self.Solver(Adiag.T, **self.solverOpts)
+                AdiagTinv = self._getAdiagInv(tInd, adjoint=True)
 
             if tInd < self.nT - 1:
                 Asubdiag = self.getAsubdiag(tInd+1)
 
+            if tInd < self.nT - 2:
+                Asubsubdiag = self.getAsubsubdiag(tInd+2)
+
             for isrc, src in enumerate(self.survey.srcList):
 
                 # solve against df_duT_v
@@ -310,11 +565,17 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                     ATinv_df_duT_v[isrc, :] = AdiagTinv * df_duT_v[
                         src, '{}Deriv'.format(self._fieldType), tInd+1]
                 elif tInd > -1:
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * (
+                    rhs = (
                         Utils.mkvc(df_duT_v[
                             src, '{}Deriv'.format(self._fieldType), tInd+1
                         ]
                         ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
+                    if tInd < self.nT - 2:
+                        rhs = rhs - Asubsubdiag.T * Utils.mkvc(
+                            ATinv_df_duT_v_2[isrc, :]
+                        )
+                    ATinv_df_duT_v_2[isrc, :] = ATinv_df_duT_v[isrc, :]
+                    ATinv_df_duT_v[isrc, :] = AdiagTinv * rhs
 
                 if tInd < self.nT:
                     dAsubdiagT_dm_v = self.getAsubdiagDeriv(
@@ -333,33 +594,100 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                     tInd, un_src, ATinv_df_duT_v[isrc, :], adjoint=True
                 )
 
+                if tInd > 0:
+                    dAsubsubdiagT_dm_v = self.getAsubsubdiagDeriv(
+                        tInd, f[src, ftype, tInd-1], ATinv_df_duT_v[isrc, :],
+                        adjoint=True
+                    )
+                else:
+                    dAsubsubdiagT_dm_v = Utils.Zero()
+
                 JTv = JTv + Utils.mkvc(
-                    -dAT_dm_v - dAsubdiagT_dm_v + dRHST_dm_v
+                    -dAT_dm_v - dAsubdiagT_dm_v - dAsubsubdiagT_dm_v +
+                    dRHST_dm_v
                 )
 
         # del df_duT_v, ATinv_df_duT_v, A, Asubdiag
         if AdiagTinv is not None:
-            AdiagTinv.clean()
+            self._cleanAdiagInv(AdiagTinv)
 
         return Utils.mkvc(JTv).astype(float)
 
+    def getSourceSpatial(self):
+        """
+        Time-invariant spatial parts of the source terms of all sources (see
+        :code:`BaseTDEMSrc.evalSpatial`), one column per source. These are
+        cached for the sources in the survey, and refreshed when the
+        permeability changes (the spatial parts of the magnetic dipoles of
+        the EB formulation include MfMui) or when the cached potential of a
+        source is cleared because its location or moment changed.
+
+        :rtype: tuple
+        :return: (separable, S_m, S_e), separable flags the sources whose
+            source terms are the columns of S_m and S_e scaled in time
+        """
+        Srcs = self.survey.srcList
+        key = (
+            [src.uid for src in Srcs], self._property_version('mui')
+        )
+
+        cache = getattr(self, '_sourceSpatial', None)
+        if (
+            cache is None or cache[0] != key or
+            any(
+                getattr(src, '_aSrcs', None) is not aSrcs
+                for src, aSrcs in zip(Srcs, cache[1])
+            )
+        ):
+            if self._formulation == 'EB':
+                S_m = np.zeros((self.mesh.nF, len(Srcs)))
+                S_e = np.zeros((self.mesh.nE, len(Srcs)))
+            elif self._formulation == 'HJ':
+                S_m = np.zeros((self.mesh.nE, len(Srcs)))
+                S_e = np.zeros((self.mesh.nF, len(Srcs)))
+
+            MagneticDipoleVectorPotentialCache(
+                Srcs, self, SrcTDEM.MagDipole._srcFct, orientation=False
+            )
+            SrcTDEM._cacheLineCurrents(Srcs, self)
+
+            separable = np.zeros(len(Srcs), dtype=bool)
+            for i, src in enumerate(Srcs):
+                spatial = src.evalSpatial(self)
+                if spatial is None:
+                    continue
+                separable[i] = True
+                S_m[:, i] = S_m[:, i] + spatial[0]
+                S_e[:, i] = S_e[:, i] + spatial[1]
+
+            aSrcs = [getattr(src, '_aSrcs', None) for src in Srcs]
+            cache = self._sourceSpatial = (key, aSrcs, separable, S_m, S_e)
+
+        return cache[2:]
+
     def getSourceTerm(self, tInd):
         """
         Assemble the source term. This ensures that the RHS is a vector / array
-        of the correct size
+        of the correct size. The cached spatial parts of the source terms
+        are scaled by the source amplitudes at the time; sources that are not
+        separable in space and time are evaluated directly.
         """
 
         Srcs = self.survey.srcList
+        time = self.times[tInd]
 
-        if self._formulation == 'EB':
-            s_m = np.zeros((self.mesh.nF, len(Srcs)))
-            s_e = np.zeros((self.mesh.nE, len(Srcs)))
-        elif self._formulation == 'HJ':
-            s_m = np.zeros((self.mesh.nE, len(Srcs)))
-            s_e = np.zeros((self.mesh.nF, len(Srcs)))
+        separable, S_m, S_e = self.getSourceSpatial()
 
-        for i, src in enumerate(Srcs):
-            smi, sei = src.eval(self, self.times[tInd])
+        amp_m = np.zeros(len(Srcs))
+        amp_e = np.zeros(len(Srcs))
+        for i in np.where(separable)[0]:
+            amp_m[i], amp_e[i] = Srcs[i].evalAmplitude(self, time)
+
+        s_m = S_m * amp_m
+        s_e = S_e * amp_e
+
+        for i in np.where(~separable)[0]:
+            smi, sei = Srcs[i].eval(self, time)
             s_m[:, i] = s_m[:, i] + smi
             s_e[:, i] = s_e[:, i] + sei
 
@@ -377,6 +705,11 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
         elif self._fieldType in ['e', 'h']:
             ifields = np.zeros((self.mesh.nE, len(Srcs)))
 
+        MagneticDipoleVectorPotentialCache(
+            Srcs, self, SrcTDEM.MagDipole._srcFct, orientation=False
+        )
+        SrcTDEM._cacheLineCurrents(Srcs, self)
+
         for i, src in enumerate(Srcs):
             ifields[:, i] = (
                 ifields[:, i] + getattr(
@@ -493,13 +826,13 @@ class Problem3D_b(BaseTDEMProblem):
         """
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
+        a0 = self._timeStepCoefficients(tInd)[0]
         C = self.mesh.edgeCurl
         MeSigmaI = self.MeSigmaI
         MfMui = self.MfMui
         I = Utils.speye(self.mesh.nF)
 
-        A = 1./dt * I + (C * (MeSigmaI * (C.T * MfMui)))
+        A = a0 * I + (C * (MeSigmaI * (C.T * MfMui)))
 
         if self._makeASymmetric is True:
             return MfMui.T * A
@@ -511,17 +844,14 @@ class Problem3D_b(BaseTDEMProblem):
         """
         C = self.mesh.edgeCurl
 
-        def MeSigmaIDeriv(x):
-            return self.MeSigmaIDeriv(x)
-
         MfMui = self.MfMui
 
         if adjoint:
             if self._makeASymmetric is True:
                 v = MfMui * v
-            return MeSigmaIDeriv(C.T * (MfMui * u)).T * (C.T * v)
+            return self.MeSigmaIDeriv(C.T * (MfMui * u), C.T * v, adjoint)
 
-        ADeriv = (C * (MeSigmaIDeriv(C.T * (MfMui * u)) * v))
+        ADeriv = C * self.MeSigmaIDeriv(C.T * (MfMui * u), v, adjoint)
 
         if self._makeASymmetric is True:
             return MfMui.T * ADeriv
@@ -532,9 +862,9 @@ class Problem3D_b(BaseTDEMProblem):
         Matrix below the diagonal
         """
 
-        dt = self.timeSteps[tInd]
+        a1 = self._timeStepCoefficients(tInd)[1]
         MfMui = self.MfMui
-        Asubdiag = - 1./dt * sp.eye(self.mesh.nF)
+        Asubdiag = a1 * sp.eye(self.mesh.nF)
 
         if self._makeASymmetric is True:
             return MfMui.T * Asubdiag
@@ -544,6 +874,25 @@ class Problem3D_b(BaseTDEMProblem):
     def getAsubdiagDeriv(self, tInd, u, v, adjoint=False):
         return Utils.Zero() * v
 
+    def getAsubsubdiag(self, tInd):
+        """
+        Matrix two blocks below the diagonal (non-zero for BDF2)
+        """
+        a2 = self._timeStepCoefficients(tInd)[2]
+        if a2 == 0.:
+            return Utils.Zero()
+
+        MfMui = self.MfMui
+        Asubsubdiag = a2 * sp.eye(self.mesh.nF)
+
+        if self._makeASymmetric is True:
+            return MfMui.T * Asubsubdiag
+
+        return Asubsubdiag
+
+    def getAsubsubdiagDeriv(self, tInd, u, v, adjoint=False):
+        return Utils.Zero() * v
+
     def getRHS(self, tInd):
         """
         Assemble the RHS
@@ -567,9 +916,6 @@ class Problem3D_b(BaseTDEMProblem):
         C = self.mesh.edgeCurl
         MeSigmaI = self.MeSigmaI
 
-        def MeSigmaIDeriv(u):
-            return self.MeSigmaIDeriv(u)
-
         MfMui = self.MfMui
 
         _, s_e = src.eval(self, self.times[tInd])
@@ -583,7 +929,7 @@ class Problem3D_b(BaseTDEMProblem):
             if isinstance(s_e, Utils.Zero):
                 MeSigmaIDerivT_v = Utils.Zero()
             else:
-                MeSigmaIDerivT_v = MeSigmaIDeriv(s_e).T * C.T * v
+                MeSigmaIDerivT_v = self.MeSigmaIDeriv(s_e, C.T * v, adjoint)
 
             RHSDeriv = (
                 MeSigmaIDerivT_v + s_eDeriv( MeSigmaI.T * (C.T * v)) +
@@ -595,7 +941,7 @@ class Problem3D_b(BaseTDEMProblem):
         if isinstance(s_e, Utils.Zero):
             MeSigmaIDeriv_v = Utils.Zero()
         else:
-            MeSigmaIDeriv_v = MeSigmaIDeriv(s_e) * v
+            MeSigmaIDeriv_v = self.MeSigmaIDeriv(s_e, v, adjoint)
 
         RHSDeriv = (
             C * MeSigmaIDeriv_v + C * MeSigmaI * s_eDeriv(v) + s_mDeriv(v)
@@ -662,6 +1008,9 @@ class Problem3D_e(BaseTDEMProblem):
         if f is None:
             f = self.fields(m)
 
+        if self._useWorkers():
+            return self._JtvecWorkers(m, v, f)
+
         self.model = m
         ftype = self._fieldType + 'Solution'  # the thing we solved for
 
@@ -728,23 +1077,29 @@ class Problem3D_e(BaseTDEMProblem):
         # if the previous timestep is the same: no need to refactor the matrix
         # for tInd, dt in zip(range(self.nT), self.timeSteps):
 
+        # adjoint solution two time steps ahead (only needed by second order
+        # time stepping)
+        ATinv_df_duT_v_2 = np.zeros_like(ATinv_df_duT_v)
+
         for tInd in reversed(range(self.nT)):
             # tInd = tIndP - 1
             if AdiagTinv is not None and (
                 tInd <= self.nT and
-                self.timeSteps[tInd] != self.timeSteps[tInd+1]
+                not self._sameAdiag(tInd, tInd+1)
             ):
-                AdiagTinv.clean()
+                self._cleanAdiagInv(AdiagTinv)
                 AdiagTinv = None
 
             # refactor if we need to
             if AdiagTinv is None:  # and tInd > -1:
-                Adiag = self.getAdiag(tInd)
-                AdiagTinv = self.Solver(Adiag.T, **self.solverOpts)
+                AdiagTinv = self._getAdiagInv(tInd, adjoint=True)
 
             if tInd < self.nT - 1:
                 Asubdiag = self.getAsubdiag(tInd+1)
 
+            if tInd < self.nT - 2:
+                Asubsubdiag = self.getAsubsubdiag(tInd+2)
+
             for isrc, src in enumerate(self.survey.srcList):
 
                 # solve against df_duT_v
@@ -753,11 +1108,17 @@ class Problem3D_e(BaseTDEMProblem):
                     ATinv_df_duT_v[isrc, :] = AdiagTinv * df_duT_v[
                         src, '{}Deriv'.format(self._fieldType), tInd+1]
                 elif tInd > -1:
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * (
+                    rhs = (
                         Utils.mkvc(df_duT_v[
                             src, '{}Deriv'.format(self._fieldType), tInd+1
                         ]
                         ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
+                    if tInd < self.nT - 2:
+                        rhs = rhs - Asubsubdiag.T * Utils.mkvc(
+                            ATinv_df_duT_v_2[isrc, :]
+                        )
+                    ATinv_df_duT_v_2[isrc, :] = ATinv_df_duT_v[isrc, :]
+                    ATinv_df_duT_v[isrc, :] = AdiagTinv * rhs
 
                 dAsubdiagT_dm_v = self.getAsubdiagDeriv(
                     tInd, f[src, ftype, tInd], ATinv_df_duT_v[isrc, :],
@@ -773,13 +1134,27 @@ class Problem3D_e(BaseTDEMProblem):
                     tInd, un_src, ATinv_df_duT_v[isrc, :], adjoint=True
                 )
 
+                if tInd > 0:
+                    dAsubsubdiagT_dm_v = self.getAsubsubdiagDeriv(
+                        tInd, f[src, ftype, tInd-1], ATinv_df_duT_v[isrc, :],
+                        adjoint=True
+                    )
+                else:
+                    dAsubsubdiagT_dm_v = Utils.Zero()
+
                 JTv = JTv + Utils.mkvc(
-                    -dAT_dm_v - dAsubdiagT_dm_v + dRHST_dm_v
+                    -dAT_dm_v - dAsubdiagT_dm_v - dAsubsubdiagT_dm_v +
+                    dRHST_dm_v
                 )
 
         # Treating initial condition when a galvanic source is included
         tInd = -1
         Grad = self.mesh.nodalGrad
+        Asubdiag = self.getAsubdiag(0)
+        if self.nT > 1:
+            Asubsubdiag = self.getAsubsubdiag(1)
+        else:
+            Asubsubdiag = Utils.Zero()
 
         for isrc, src in enumerate(self.survey.srcList):
             if src.srcType == "Galvanic":
@@ -788,7 +1163,8 @@ class Problem3D_e(BaseTDEMProblem):
                     Utils.mkvc(df_duT_v[
                         src, '{}Deriv'.format(self._fieldType), tInd+1
                     ]
-                    ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
+                    ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]) -
+                    Asubsubdiag.T * Utils.mkvc(ATinv_df_duT_v_2[isrc, :]))
                 ))
 
                 dRHST_dm_v = self.getRHSDeriv(
@@ -797,9 +1173,9 @@ class Problem3D_e(BaseTDEMProblem):
 
                 un_src = f[src, ftype, tInd+1]
                 # cell centered on time mesh
-                dAT_dm_v = (
-                    self.MeSigmaDeriv(un_src).T * ATinv_df_duT_v[isrc, :]
-                    )
+                dAT_dm_v = self.MeSigmaDeriv(
+                    un_src, ATinv_df_duT_v[isrc, :], adjoint=True
+                )
 
                 JTv = JTv + Utils.mkvc(
                     -dAT_dm_v + dRHST_dm_v
@@ -807,7 +1183,7 @@ class Problem3D_e(BaseTDEMProblem):
 
         # del df_duT_v, ATinv_df_duT_v, A, Asubdiag
         if AdiagTinv is not None:
-            AdiagTinv.clean()
+            self._cleanAdiagInv(AdiagTinv)
 
         return Utils.mkvc(JTv).astype(float)
 
@@ -817,12 +1193,12 @@ class Problem3D_e(BaseTDEMProblem):
         """
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
+        a0 = self._timeStepCoefficients(tInd)[0]
         C = self.mesh.edgeCurl
         MfMui = self.MfMui
         MeSigma = self.MeSigma
 
-        return C.T * (MfMui * C)+1./dt * MeSigma
+        return C.T * (MfMui * C) + a0 * MeSigma
 
     def getAdiagDeriv(self, tInd, u, v, adjoint=False):
         """
@@ -830,13 +1206,9 @@ class Problem3D_e(BaseTDEMProblem):
         """
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
-        MeSigmaDeriv = self.MeSigmaDeriv(u)
+        a0 = self._timeStepCoefficients(tInd)[0]
 
-        if adjoint:
-            return 1./dt * MeSigmaDeriv.T * v
-
-        return 1./dt * MeSigmaDeriv * v
+        return a0 * self.MeSigmaDeriv(u, v, adjoint)
 
     def getAsubdiag(self, tInd):
         """
@@ -844,21 +1216,41 @@ class Problem3D_e(BaseTDEMProblem):
         """
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
+        a1 = self._timeStepCoefficients(tInd)[1]
 
-        return - 1./dt * self.MeSigma
+        return a1 * self.MeSigma
 
     def getAsubdiagDeriv(self, tInd, u, v, adjoint=False):
         """
         Derivative of the matrix below the diagonal with respect to electrical
         conductivity
         """
-        dt = self.timeSteps[tInd]
+        a1 = self._timeStepCoefficients(tInd)[1]
 
-        if adjoint:
-            return - 1./dt * self.MeSigmaDeriv(u).T * v
+        return a1 * self.MeSigmaDeriv(u, v, adjoint)
 
-        return - 1./dt * self.MeSigmaDeriv(u) * v
+    def getAsubsubdiag(self, tInd):
+        """
+        Matrix two blocks below the diagonal (non-zero for BDF2)
+        """
+        assert tInd >= 0 and tInd < self.nT
+
+        a2 = self._timeStepCoefficients(tInd)[2]
+        if a2 == 0.:
+            return Utils.Zero()
+
+        return a2 * self.MeSigma
+
+    def getAsubsubdiagDeriv(self, tInd, u, v, adjoint=False):
+        """
+        Derivative of the matrix two blocks below the diagonal with respect to
+        electrical conductivity
+        """
+        a2 = self._timeStepCoefficients(tInd)[2]
+        if a2 == 0.:
+            return Utils.Zero()
+
+        return a2 * self.MeSigmaDeriv(u, v, adjoint)
 
     def getRHS(self, tInd):
         """
@@ -868,11 +1260,15 @@ class Problem3D_e(BaseTDEMProblem):
         # if tInd == len(self.timeSteps):
         #     tInd = tInd - 1
 
-        dt = self.timeSteps[tInd-1]
+        a0, a1, a2 = self._timeStepCoefficients(tInd-1)
         s_m, s_e = self.getSourceTerm(tInd)
         _, s_en1 = self.getSourceTerm(tInd-1)
-        return (-1./dt * (s_e - s_en1) +
-                self.mesh.edgeCurl.T * self.MfMui * s_m)
+        dsedt = a0 * s_e + a1 * s_en1
+        if a2 != 0.:
+            _, s_en2 = self.getSourceTerm(tInd-2)
+            dsedt = dsedt + a2 * s_en2
+
+        return (-dsedt + self.mesh.edgeCurl.T * self.MfMui * s_m)
 
     def getRHSDeriv(self, tInd, src, v, adjoint=False):
         # right now, we are assuming that s_e, s_m do not depend on the model.
@@ -894,7 +1290,9 @@ class Problem3D_e(BaseTDEMProblem):
 
         for i, src in enumerate(Srcs):
             # Check if the source is grounded
-            if src.srcType == "Galvanic" and src.waveform.hasInitialFields:
+            if src.srcType == "Galvanic" and (
+                src.timeSteppingWaveform(self).hasInitialFields
+            ):
                 # Check self.Adcinv and clean
                 if self.Adcinv is not None:
                     self.Adcinv.clean()
@@ -923,9 +1321,9 @@ class Problem3D_e(BaseTDEMProblem):
     def getAdcDeriv(self, u, v, adjoint=False):
         Grad = self.mesh.nodalGrad
         if not adjoint:
-            return Grad.T*(self.MeSigmaDeriv(-u)*v)
+            return Grad.T*self.MeSigmaDeriv(-u, v, adjoint)
         elif adjoint:
-            return self.MeSigmaDeriv(-u).T * (Grad*v)
+            return self.MeSigmaDeriv(-u, Grad*v, adjoint)
         return Adc
 
     def clean(self):
@@ -987,35 +1385,46 @@ class Problem3D_h(BaseTDEMProblem):
         """
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
+        a0 = self._timeStepCoefficients(tInd)[0]
         C = self.mesh.edgeCurl
         MfRho = self.MfRho
         MeMu = self.MeMu
 
-        return C.T * ( MfRho * C ) + 1./dt * MeMu
+        return C.T * ( MfRho * C ) + a0 * MeMu
 
     def getAdiagDeriv(self, tInd, u, v, adjoint=False):
         assert tInd >= 0 and tInd < self.nT
 
         dt = self.timeSteps[tInd]
         C = self.mesh.edgeCurl
-        MfRhoDeriv = self.MfRhoDeriv(C * u)
 
         if adjoint:
-            return MfRhoDeriv.T * C * v
+            return self.MfRhoDeriv(C * u, C * v, adjoint)
 
-        return C.T * (MfRhoDeriv * v)
+        return C.T * self.MfRhoDeriv(C * u, v, adjoint)
 
     def getAsubdiag(self, tInd):
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
+        a1 = self._timeStepCoefficients(tInd)[1]
 
-        return - 1./dt * self.MeMu
+        return a1 * self.MeMu
 
     def getAsubdiagDeriv(self, tInd, u, v, adjoint=False):
         return Utils.Zero()
 
+    def getAsubsubdiag(self, tInd):
+        assert tInd >= 0 and tInd < self.nT
+
+        a2 = self._timeStepCoefficients(tInd)[2]
+        if a2 == 0.:
+            return Utils.Zero()
+
+        return a2 * self.MeMu
+
+    def getAsubsubdiagDeriv(self, tInd, u, v, adjoint=False):
+        return Utils.Zero()
+
     def getRHS(self, tInd):
 
         C = self.mesh.edgeCurl
@@ -1027,12 +1436,11 @@ class Problem3D_h(BaseTDEMProblem):
     def getRHSDeriv(self, tInd, src, v, adjoint=False):
         C = self.mesh.edgeCurl
         s_m, s_e = src.eval(self, self.times[tInd])
-        MfRhoDeriv = self.MfRhoDeriv(s_e)
 
         if adjoint is True:
-            return MfRhoDeriv.T * (C * v)
+            return self.MfRhoDeriv(s_e, C * v, adjoint)
         # assumes no source derivs
-        return C.T * (MfRhoDeriv * v)
+        return C.T * self.MfRhoDeriv(s_e, v, adjoint)
 
 
 # ------------------------------- Problem3D_j ------------------------------- #
@@ -1062,13 +1470,13 @@ class Problem3D_j(BaseTDEMProblem):
         """
         assert tInd >= 0 and tInd < self.nT
 
-        dt = self.timeSteps[tInd]
+        a0 = self._timeStepCoefficients(tInd)[0]
         C = self.mesh.edgeCurl
         MfRho = self.MfRho
         MeMuI = self.MeMuI
         eye = sp.eye(self.mesh.nF)
 
-        A = C * (MeMuI * (C.T * MfRho)) + 1./dt * eye
+        A = C * (MeMuI * (C.T * MfRho)) + a0 * eye
 
         if self._makeASymmetric:
             return MfRho.T * A
@@ -1081,15 +1489,14 @@ class Problem3D_j(BaseTDEMProblem):
         dt = self.timeSteps[tInd]
         C = self.mesh.edgeCurl
         MfRho = self.MfRho
-        MfRhoDeriv = self.MfRhoDeriv(u)
         MeMuI = self.MeMuI
 
         if adjoint:
             if self._makeASymmetric:
                 v = MfRho * v
-            return MfRhoDeriv.T * (C * (MeMuI.T * (C.T * v)))
+            return self.MfRhoDeriv(u, C * (MeMuI.T * (C.T * v)), adjoint)
 
-        ADeriv = C * (MeMuI * (C.T * MfRhoDeriv * v))
+        ADeriv = C * (MeMuI * (C.T * self.MfRhoDeriv(u, v, adjoint)))
         if self._makeASymmetric:
             return MfRho.T * ADeriv
         return ADeriv
@@ -1098,27 +1505,42 @@ class Problem3D_j(BaseTDEMProblem):
         assert tInd >= 0 and tInd < self.nT
         eye = sp.eye(self.mesh.nF)
 
-        dt = self.timeSteps[tInd]
+        a1 = self._timeStepCoefficients(tInd)[1]
 
         if self._makeASymmetric:
-            return -1./dt * self.MfRho.T
-        return -1./dt * eye
+            return a1 * self.MfRho.T
+        return a1 * eye
 
     def getAsubdiagDeriv(self, tInd, u, v, adjoint=False):
         return Utils.Zero()
 
-    def getRHS(self, tInd):
+    def getAsubsubdiag(self, tInd):
+        assert tInd >= 0 and tInd < self.nT
 
-        if tInd == len(self.timeSteps):
-            tInd = tInd - 1
+        a2 = self._timeStepCoefficients(tInd)[2]
+        if a2 == 0.:
+            return Utils.Zero()
+
+        if self._makeASymmetric:
+            return a2 * self.MfRho.T
+        return a2 * sp.eye(self.mesh.nF)
+
+    def getAsubsubdiagDeriv(self, tInd, u, v, adjoint=False):
+        return Utils.Zero()
+
+    def getRHS(self, tInd):
 
         C = self.mesh.edgeCurl
         MeMuI = self.MeMuI
-        dt = self.timeSteps[tInd]
+        a0, a1, a2 = self._timeStepCoefficients(tInd-1)
         s_m, s_e = self.getSourceTerm(tInd)
         _, s_en1 = self.getSourceTerm(tInd-1)
+        dsedt = a0 * s_e + a1 * s_en1
+        if a2 != 0.:
+            _, s_en2 = self.getSourceTerm(tInd-2)
+            dsedt = dsedt + a2 * s_en2
 
-        rhs = -1./dt * (s_e - s_en1) + C * MeMuI * s_m
+        rhs = -dsedt + C * MeMuI * s_m
         if self._makeASymmetric:
             return self.MfRho.T * rhs
         return rhs
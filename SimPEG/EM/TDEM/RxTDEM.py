@@ -39,52 +39,70 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         """
         return mesh.getInterpolationMat(self.locs, self.projGLoc(f))
 
-    def getTimeP(self, timeMesh, f):
-        """
-            Returns the time projection matrix.
-
-            .. note::
-
-                This is not stored in memory, but is created on demand.
-        """
-        return timeMesh.getInterpolationMat(self.times, self.projTLoc(f))
-
-    def getP(self, mesh, timeMesh, f):
+    def getP(self, mesh, timeMesh, f, src=None):
         """
             Returns the projection matrices as a
             list for all components collected by
-            the receivers.
+            the receivers. If the problem convolves waveforms, the time
+            projection includes the convolution with the waveform of src.
 
             .. note::
 
                 Projection matrices are stored as a dictionary (mesh, timeMesh) if storeProjections is True
         """
-        if (mesh, timeMesh) in self._Ps:
-            return self._Ps[(mesh, timeMesh)]
+        waveform = None
+        if src is not None and getattr(
+            f.survey.prob, 'convolveWaveforms', False
+        ):
+            waveform = src.waveform
+        key = (mesh, timeMesh, waveform)
+
+        if key in self._Ps:
+            return self._Ps[key]
 
         Ps = self.getSpatialP(mesh, f)
-        Pt = self.getTimeP(timeMesh, f)
+        Pt = self.getTimeP(timeMesh, f, waveform=waveform)
         P = sp.kron(Pt, Ps)
 
         if self.storeProjections:
-            self._Ps[(mesh, timeMesh)] = P
+            self._Ps[key] = P
 
         return P
 
-    def getTimeP(self, timeMesh, f):
+    def getTimeInterpolationMat(self, timeMesh, f, times):
+        """
+            Returns the matrix interpolating the fields on the time mesh to
+            times.
+        """
+        return timeMesh.getInterpolationMat(times, self.projTLoc(f))
+
+    def getTimeP(self, timeMesh, f, waveform=None):
         """
-            Returns the time projection matrix.
+            Returns the time projection matrix. If a waveform is provided,
+            the fields on the time mesh are treated as a step-off response
+            and convolved with the waveform at the receiver times
+            (see :meth:`BaseWaveform.stepOffQuadrature`).
 
             .. note::
 
                 This is not stored in memory, but is created on demand.
         """
-        # if self.projField == 'dbdt':
-        #     return timeMesh.getInterpolationMat(
-        #         self.times, self.projTLoc(f)
-        #     )*timeMesh.faceDiv
-        # else:
-        return timeMesh.getInterpolationMat(self.times, self.projTLoc(f))
+        if waveform is None:
+            return self.getTimeInterpolationMat(timeMesh, f, self.times)
+
+        assert self.times.min() >= waveform.offTime, (
+            "Convolution with the waveform is only implemented for "
+            "off-time receivers (times >= {})".format(waveform.offTime)
+        )
+        tau, w = waveform.stepOffQuadrature()
+        delays = Utils.mkvc(self.times[:, None] - tau[None, :])
+        assert delays.max() <= timeMesh.vectorNx[-1], (
+            "The time steps must extend to the longest delay ({}) between "
+            "the receiver times and the waveform".format(delays.max())
+        )
+        # sum over the quadrature points for each receiver time
+        W = sp.kron(w[None, :], Utils.speye(len(self.times)))
+        return W * self.getTimeInterpolationMat(timeMesh, f, delays)
 
     def eval(self, src, mesh, timeMesh, f):
         """
@@ -97,7 +115,7 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         :return: fields projected to recievers
         """
 
-        P = self.getP(mesh, timeMesh, f)
+        P = self.getP(mesh, timeMesh, f, src)
         f_part = Utils.mkvc(f[src, self.projField, :])
         return P*f_part
 
@@ -114,7 +132,7 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         :return: fields projected to recievers
         """
 
-        P = self.getP(mesh, timeMesh, f)
+        P = self.getP(mesh, timeMesh, f, src)
         if not adjoint:
             return P * v # Utils.mkvc(v[src, self.projField+'Deriv', :])
         elif adjoint:
@@ -169,7 +187,7 @@ class Point_dbdt(BaseRx):
         if self.projField in f.aliasFields:
             return super(Point_dbdt, self).eval(src, mesh, timeMesh, f)
 
-        P = self.getP(mesh, timeMesh, f)
+        P = self.getP(mesh, timeMesh, f, src)
         f_part = Utils.mkvc(f[src, 'b', :])
         return P*f_part
 
@@ -179,19 +197,18 @@ class Point_dbdt(BaseRx):
             return super(Point_dbdt, self).projGLoc(f)
         return f._GLoc(self.projField) + self.projComp
 
-    def getTimeP(self, timeMesh, f):
+    def getTimeInterpolationMat(self, timeMesh, f, times):
         """
-            Returns the time projection matrix.
-
-            .. note::
-
-                This is not stored in memory, but is created on demand.
+            Returns the matrix interpolating the fields on the time mesh to
+            times (differentiating b in time if dbdt is not a field).
         """
         if self.projField in f.aliasFields:
-            return super(Point_dbdt, self).getTimeP(timeMesh, f)
+            return super(Point_dbdt, self).getTimeInterpolationMat(
+                timeMesh, f, times
+            )
 
         return timeMesh.getInterpolationMat(
-            self.times, 'CC'
+            times, 'CC'
         )*timeMesh.faceDiv
 
 
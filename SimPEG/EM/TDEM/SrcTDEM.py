@@ -33,6 +33,12 @@ class BaseWaveform(properties.HasProperties):
         default=1e-9
     )
 
+    nConvolution = properties.Integer(
+        "number of quadrature intervals between breakpoints used when "
+        "convolving the step-off response with the waveform",
+        default=20, min=1
+    )
+
     def __init__(self, **kwargs):
         Utils.setKwargs(self, **kwargs)
 
@@ -42,6 +48,51 @@ class BaseWaveform(properties.HasProperties):
             "BaseWaveform class.".format(pair.__name__)
         )
 
+    @property
+    def breakpoints(self):
+        """
+        Times at which the waveform is not smooth. Time stepping schedules
+        should place nodes on these.
+        """
+        return np.unique(np.r_[0., self.offTime])
+
+    def stepOffQuadrature(self):
+        """
+        Quadrature of the waveform used to convolve step-off responses.
+        After the off-time, the response to the waveform is
+
+        .. math::
+            d(t) = - \int I'(\tau) s(t - \tau) d\tau \approx
+            \sum_k w_k s(t - \tau_k)
+
+        where :math:`s` is the step-off response. The integral is
+        approximated with the trapezoidal rule on :code:`nConvolution`
+        intervals between each pair of breakpoints, the switch-on (if the
+        waveform has no initial fields) and switch-off jumps of the current
+        are included.
+
+        :rtype: tuple
+        :return: (tau, w) quadrature times and weights
+        """
+        bp = self.breakpoints
+        bp = bp[bp <= self.offTime]
+        tau = np.unique(np.hstack(
+            [bp] + [
+                np.linspace(a, b, self.nConvolution + 1)
+                for a, b in zip(bp[:-1], bp[1:])
+            ]
+        ))
+        current = np.array([float(self.eval(t)) for t in tau])
+
+        w = np.zeros_like(tau)
+        dI = np.diff(current)
+        w[:-1] -= 0.5 * dI
+        w[1:] -= 0.5 * dI
+        if not self.hasInitialFields:
+            w[0] -= current[0]
+        w[-1] += current[-1]
+        return tau, w
+
     def eval(self, time):
         raise NotImplementedError
 
@@ -87,14 +138,30 @@ class RawWaveform(BaseWaveform):
 
 class TriangularWaveform(BaseWaveform):
 
-    def __init__(self, offTime=0.):
-        BaseWaveform.__init__(self, offTime, hasInitialFields=True)
+    peakTime = properties.Float(
+        "Time at which the triangular waveform is at its peak", default=0.
+    )
 
-    def eval(self, time):
-        raise NotImplementedError(
-            'TriangularWaveform has not been implemented, you should write it!'
+    def __init__(self, offTime=0., peakTime=None, **kwargs):
+        if peakTime is None:
+            peakTime = offTime / 2.
+        BaseWaveform.__init__(
+            self, offTime=offTime, peakTime=peakTime, hasInitialFields=False,
+            **kwargs
         )
 
+    @property
+    def breakpoints(self):
+        return np.unique(np.r_[0., self.peakTime, self.offTime])
+
+    def eval(self, time):
+        if time <= 0. or time >= self.offTime:
+            return 0.
+        elif time <= self.peakTime:
+            return time / self.peakTime
+        else:
+            return (self.offTime - time) / (self.offTime - self.peakTime)
+
 
 class VTEMWaveform(BaseWaveform):
 
@@ -113,6 +180,10 @@ class VTEMWaveform(BaseWaveform):
     def __init__(self, **kwargs):
         BaseWaveform.__init__(self, hasInitialFields=False, **kwargs)
 
+    @property
+    def breakpoints(self):
+        return np.unique(np.r_[0., self.peakTime, self.offTime])
+
     def eval(self, time):
         if time <= self.peakTime:
             return (
@@ -158,6 +229,17 @@ class BaseTDEMSrc(BaseEMSrc):
         self.waveform = waveform
         BaseEMSrc.__init__(self, rxList, **kwargs)
 
+    def timeSteppingWaveform(self, prob):
+        """
+        Waveform used when time stepping. If the problem convolves step-off
+        responses with the source waveforms (see
+        :code:`convolveWaveforms`), this is a step-off waveform, otherwise it
+        is the source waveform.
+        """
+        if getattr(prob, 'convolveWaveforms', False):
+            return StepOffWaveform()
+        return self.waveform
+
     def bInitial(self, prob):
         return Zero()
 
@@ -199,6 +281,33 @@ class BaseTDEMSrc(BaseEMSrc):
                 lambda v: self.s_eDeriv(prob, time, v, adjoint)
             )
 
+    def evalSpatial(self, prob):
+        """
+        Time-invariant spatial parts of the source terms. If a source
+        implements this, its source terms are the spatial parts scaled by
+        :code:`evalAmplitude`, which lets the problem assemble the source
+        terms of all sources from a single cached matrix. Returns None if
+        the source terms are not separable in space and time.
+
+        :param BaseTDEMProblem prob: TDEM Problem
+        :rtype: tuple
+        :return: (s_m, s_e) spatial parts of the source terms or None
+        """
+        return None
+
+    def evalAmplitude(self, prob, time):
+        """
+        Amplitudes of the spatial parts of the source terms at a time (see
+        :code:`evalSpatial`)
+
+        :param BaseTDEMProblem prob: TDEM Problem
+        :param float time: time
+        :rtype: tuple
+        :return: (amplitude of s_m, amplitude of s_e)
+        """
+        amplitude = self.timeSteppingWaveform(prob).eval(time)
+        return amplitude, amplitude
+
     def s_m(self, prob, time):
         return Zero()
 
@@ -223,6 +332,9 @@ class MagDipole(BaseTDEMSrc):
     orientation = properties.Vector3(
         "orientation of the source", default='Z', length=1., required=True
     )
+    loc = properties.Vector3(
+        "location of the source", default=np.r_[0., 0., 0.]
+    )
     srcType = "Inductive"
 
     def __init__(self, rxList, **kwargs):
@@ -251,7 +363,22 @@ class MagDipole(BaseTDEMSrc):
             self.loc, obsLoc, component, mu=self.mu, moment=self.moment
         )
 
+    @properties.observer(['loc', 'orientation', 'moment', 'mu'])
+    def _clear_aSrc(self, change):
+        self._aSrcs = None
+
     def _aSrc(self, prob):
+        """
+        Vector potential of the source on the mesh, cached per mesh and
+        formulation.
+        """
+        # the vector potential of MagDipole._srcFct is that of a vertical
+        # dipole
+        return MagneticDipoleVectorPotentialCache(
+            [self], prob, MagDipole._srcFct, orientation=False
+        )[0]
+
+    def _getaSrc(self, prob):
         if prob._formulation == 'EB':
             gridX = prob.mesh.gridEx
             gridY = prob.mesh.gridEy
@@ -288,60 +415,51 @@ class MagDipole(BaseTDEMSrc):
 
     def bInitial(self, prob):
 
-        if self.waveform.hasInitialFields is False:
+        if self.timeSteppingWaveform(prob).hasInitialFields is False:
             return Zero()
 
         return self._bSrc(prob)
 
     def hInitial(self, prob):
 
-        if self.waveform.hasInitialFields is False:
+        if self.timeSteppingWaveform(prob).hasInitialFields is False:
             return Zero()
 
         return 1./self.mu * self._bSrc(prob)
 
     def s_m(self, prob, time):
-        if self.waveform.hasInitialFields is False:
+        if self.timeSteppingWaveform(prob).hasInitialFields is False:
             # raise NotImplementedError
             return Zero()
         return Zero()
 
-    def s_e(self, prob, time):
+    def evalSpatial(self, prob):
         C = prob.mesh.edgeCurl
         b = self._bSrc(prob)
 
         if prob._formulation == 'EB':
-
-            MfMui = prob.MfMui
-
-            if self.waveform.hasInitialFields is True and time < prob.timeSteps[1]:
-                # if time > 0.0:
-                #     return Zero()
-                if prob._fieldType == 'b':
-                    return Zero()
-                elif prob._fieldType == 'e':
-                    # Compute s_e from vector potential
-                    return C.T * (MfMui * b)
-            else:
-                # b = self._bfromVectorPotential(prob)
-                return C.T * (MfMui * b) * self.waveform.eval(time)
-        # return Zero()
+            return Zero(), C.T * (prob.MfMui * b)
 
         elif prob._formulation == 'HJ':
+            return Zero(), C * (1./self.mu * b)
 
-            h = 1./self.mu * b
+    def evalAmplitude(self, prob, time):
+        waveform = self.timeSteppingWaveform(prob)
 
-            if self.waveform.hasInitialFields is True and time < prob.timeSteps[1]:
-                # if time > 0.0:
-                #     return Zero()
-                if prob._fieldType == 'h':
-                    return Zero()
-                elif prob._fieldType == 'j':
-                    # Compute s_e from vector potential
-                    return C * h
-            else:
-                # b = self._bfromVectorPotential(prob)
-                return C * h * self.waveform.eval(time)
+        if waveform.hasInitialFields is True and time < prob.timeSteps[1]:
+            # the initial fields account for the source in the b and h
+            # formulations, the e and j formulations need the (unscaled)
+            # source term at the first step
+            if prob._fieldType in ['b', 'h']:
+                return 0., 0.
+            return 0., 1.
+
+        return 0., waveform.eval(time)
+
+    def s_e(self, prob, time):
+        _, s_e = self.evalSpatial(prob)
+        _, amplitude = self.evalAmplitude(prob, time)
+        return s_e * amplitude
 
 
 class CircularLoop(MagDipole):
@@ -349,6 +467,10 @@ class CircularLoop(MagDipole):
     radius = properties.Float(
         "radius of the loop source", default=1., min=0.
     )
+
+    @properties.observer('radius')
+    def _clear_aSrc_radius(self, change):
+        self._clear_aSrc(change)
     # waveform = None
     # loc = None
     # orientation = 'Z'
@@ -369,6 +491,34 @@ class CircularLoop(MagDipole):
         )
 
 
+def _cacheLineCurrents(srcList, prob):
+    """
+    Integrate the wire paths of the line currents in srcList on the mesh of
+    the problem at once, and cache them on the sources (see
+    :code:`LineCurrent.Mejs`).
+
+    :param list srcList: sources
+    :param BaseTDEMProblem prob: TDEM problem
+    """
+    srcs = [
+        src for src in srcList
+        if isinstance(src, LineCurrent) and (
+            getattr(src, '_Mejs', None) is None or
+            src._MejsMesh is not prob.mesh
+        )
+    ]
+    if len(srcs) < 2:
+        return
+
+    mesh = prob.mesh
+    Mejs = getSourceTermLineCurrentPolygons(
+        mesh.x0, mesh.hx, mesh.hy, mesh.hz, [src.loc for src in srcs]
+    )
+    for i, src in enumerate(srcs):
+        src._Mejs = Mejs[:, i].toarray().flatten()
+        src._MejsMesh = mesh
+
+
 class LineCurrent(BaseTDEMSrc):
     """
     RawVec electric source. It is defined by the user provided vector s_e
@@ -386,7 +536,12 @@ class LineCurrent(BaseTDEMSrc):
         BaseEMSrc.__init__(self, rxList, **kwargs)
 
     def Mejs(self, prob):
-        if getattr(self, '_Mejs', None) is None:
+        """
+        Integrated edge current of the wire path, cached per mesh.
+        """
+        if getattr(self, '_Mejs', None) is None or (
+            self._MejsMesh is not prob.mesh
+        ):
             x0 = prob.mesh.x0
             hx = prob.mesh.hx
             hy = prob.mesh.hy
@@ -396,6 +551,7 @@ class LineCurrent(BaseTDEMSrc):
             pz = self.loc[:, 2]
             self._Mejs = getSourceTermLineCurrentPolygon(x0, hx, hy, hz,
                                                          px, py, pz)
+            self._MejsMesh = prob.mesh
         return self._Mejs
 
     def getRHSdc(self, prob):
@@ -405,13 +561,13 @@ class LineCurrent(BaseTDEMSrc):
     # TODO: Need to implement solving MMR for this when
     # StepOffwaveforme is used.
     def bInitial(self, prob):
-        if self.waveform.eval(0) == 1.:
+        if self.timeSteppingWaveform(prob).eval(0) == 1.:
             raise Exception("Not implemetned for computing b!")
         else:
             return Zero()
 
     def eInitial(self, prob):
-        if self.waveform.hasInitialFields:
+        if self.timeSteppingWaveform(prob).hasInitialFields:
             RHSdc = self.getRHSdc(prob)
             soldc = prob.Adcinv * RHSdc
             return - prob.mesh.nodalGrad * soldc
@@ -419,7 +575,7 @@ class LineCurrent(BaseTDEMSrc):
             return Zero()
 
     def eInitialDeriv(self, prob, v=None, adjoint=False, f=None):
-        if self.waveform.hasInitialFields:
+        if self.timeSteppingWaveform(prob).hasInitialFields:
             edc = f[self, 'e', 0]
             Grad = prob.mesh.nodalGrad
             if adjoint is False:
@@ -433,8 +589,11 @@ class LineCurrent(BaseTDEMSrc):
         else:
             return Zero()
 
+    def evalSpatial(self, prob):
+        return Zero(), self.Mejs(prob)
+
     def s_m(self, prob, time):
         return Zero()
 
     def s_e(self, prob, time):
-        return self.Mejs(prob) * self.waveform.eval(time)
+        return self.Mejs(prob) * self.timeSteppingWaveform(prob).eval(time)
@@ -9,9 +9,30 @@ orientationDict = {'X': np.r_[1., 0., 0.],
                    'Z': np.r_[0., 0., 1.]}
 
 
+def _sourceChunks(nSrc, nObs, chunkSize=None):
+    """
+    Slices of the sources to evaluate at once, so that the temporary arrays
+    hold about 1e6 values per component
+    """
+    if chunkSize is None:
+        chunkSize = max(1, int(1e6 // max(nObs, 1)))
+    return [
+        slice(start, min(start + chunkSize, nSrc))
+        for start in range(0, nSrc, chunkSize)
+    ]
+
+
+def _perSource(value, nSrc, size=None):
+    """Broadcast a scalar (or a single vector) to one value per source"""
+    value = np.asarray(value, dtype=float)
+    if size is None:
+        return value * np.ones(nSrc)
+    return np.atleast_2d(value) * np.ones((nSrc, size))
+
+
 def MagneticDipoleVectorPotential(srcLoc, obsLoc, component, moment=1.,
                                   orientation=np.r_[0., 0., 1.],
-                                  mu=mu_0):
+                                  mu=mu_0, chunkSize=None):
     """
         Calculate the vector potential of a set of magnetic dipoles
         at given locations 'ref. <http://en.wikipedia.org/wiki/Dipole#Magnetic_vector_potential>'
@@ -23,7 +44,13 @@ def MagneticDipoleVectorPotential(srcLoc, obsLoc, component, moment=1.,
         :param str,list component: The component to calculate - 'x', 'y', or
                                    'z' if an array, or grid type if mesh, can
                                    be a list
-        :param numpy.ndarray orientation: The vector dipole moment
+        :param float,numpy.ndarray moment: dipole moment, one per source or a
+                                           single value
+        :param numpy.ndarray orientation: The vector dipole moment, one per
+                                          source (nSrc, 3) or a single vector
+        :param float,numpy.ndarray mu: permeability, one per source or a
+                                       single value
+        :param int chunkSize: number of sources evaluated at once
         :rtype: numpy.ndarray
         :return: The vector potential each dipole at each observation location
     """
@@ -32,15 +59,17 @@ def MagneticDipoleVectorPotential(srcLoc, obsLoc, component, moment=1.,
     if isinstance(orientation, str):
         orientation = orientationDict[orientation]
 
-    assert np.linalg.norm(orientation, 2) == 1., ("orientation must "
-                                                            "be a unit vector")
+    assert np.allclose(
+        np.linalg.norm(np.atleast_2d(orientation), axis=1), 1.
+    ), "orientation must be a unit vector"
 
     if type(component) in [list, tuple]:
         out = list(range(len(component)))
         for i, comp in enumerate(component):
             out[i] = MagneticDipoleVectorPotential(srcLoc, obsLoc, comp,
+                                                   moment=moment,
                                                    orientation=orientation,
-                                                   mu=mu)
+                                                   mu=mu, chunkSize=chunkSize)
         return np.concatenate(out)
 
     if isinstance(obsLoc, Mesh.BaseMesh):
@@ -49,8 +78,9 @@ def MagneticDipoleVectorPotential(srcLoc, obsLoc, component, moment=1.,
                                  "must be in: ['Ex','Ey','Ez','Fx','Fy','Fz']")
         return MagneticDipoleVectorPotential(srcLoc, getattr(mesh, 'grid' +
                                                              component),
-                                             component[1],
-                                             orientation=orientation)
+                                             component[1], moment=moment,
+                                             orientation=orientation,
+                                             mu=mu, chunkSize=chunkSize)
 
     if component == 'x':
         dimInd = 0
@@ -63,25 +93,128 @@ def MagneticDipoleVectorPotential(srcLoc, obsLoc, component, moment=1.,
 
     srcLoc = np.atleast_2d(srcLoc)
     obsLoc = np.atleast_2d(obsLoc)
-    orientation = np.atleast_2d(orientation)
 
     nObs = obsLoc.shape[0]
     nSrc = srcLoc.shape[0]
 
-    m = moment*np.array(orientation).repeat(nObs, axis=0)
+    m = (
+        _perSource(orientation, nSrc, 3) *
+        (_perSource(moment, nSrc) * _perSource(mu, nSrc))[:, np.newaxis]
+    )
+
+    # component dimInd of m x dR
+    i1, i2 = [(1, 2), (2, 0), (0, 1)][dimInd]
+
     A = np.empty((nObs, nSrc))
-    for i in range(nSrc):
-        dR = obsLoc - srcLoc[i, np.newaxis].repeat(nObs, axis=0)
-        mCr = np.cross(m, dR)
-        r = np.sqrt((dR**2).sum(axis=1))
-        A[:, i] = +(mu/(4*np.pi)) * mCr[:, dimInd]/(r**3)
+    for chunk in _sourceChunks(nSrc, nObs, chunkSize):
+        dR = obsLoc[:, np.newaxis, :] - srcLoc[np.newaxis, chunk, :]
+        mCr = m[chunk, i1] * dR[:, :, i2] - m[chunk, i2] * dR[:, :, i1]
+        r = np.sqrt((dR**2).sum(axis=2))
+        A[:, chunk] = 1./(4*np.pi) * mCr/(r**3)
     if nSrc == 1:
         return A.flatten()
     return A
 
 
+def MagneticDipoleVectorPotentialOnMesh(srcLoc, mesh, formulation='EB',
+                                        moment=1.,
+                                        orientation=np.r_[0., 0., 1.],
+                                        mu=mu_0, chunkSize=None):
+    """
+        Vector potential of a set of magnetic dipoles on the edges (EB
+        formulation) or faces (HJ formulation) of a mesh, one column per
+        source. On a cylindrically symmetric mesh only the azimuthal
+        component is computed.
+
+        :param numpy.ndarray srcLoc: Location of the sources (nSrc, 3)
+        :param discretize.BaseMesh mesh: mesh
+        :param str formulation: 'EB' or 'HJ'
+        :param float,numpy.ndarray moment: dipole moment(s)
+        :param numpy.ndarray orientation: dipole orientation(s)
+        :param float,numpy.ndarray mu: permeability(ies)
+        :param int chunkSize: number of sources evaluated at once
+        :rtype: numpy.ndarray
+        :return: vector potential (nE or nF, nSrc)
+    """
+    gridType = 'E' if formulation == 'EB' else 'F'
+    if mesh._meshType == 'CYL':
+        if not mesh.isSymmetric:
+            raise NotImplementedError(
+                'Non-symmetric cyl mesh not implemented yet!'
+            )
+        components = ['y']
+    else:
+        components = ['x', 'y', 'z']
+
+    nSrc = np.atleast_2d(srcLoc).shape[0]
+    return np.vstack([
+        MagneticDipoleVectorPotential(
+            srcLoc, getattr(mesh, 'grid{}{}'.format(gridType, comp)), comp,
+            moment=moment, orientation=orientation, mu=mu,
+            chunkSize=chunkSize
+        ).reshape(-1, nSrc)
+        for comp in components
+    ])
+
+
+def MagneticDipoleVectorPotentialCache(srcList, prob, dipoleFct,
+                                       orientation=True):
+    """
+        Vector potentials of magnetic sources on the mesh of a problem,
+        cached on each source (:code:`src._aSrcs`) per mesh and formulation.
+        A source clears its cache by setting :code:`src._aSrcs = None` when
+        its geometry changes. The magnetic dipoles (sources whose
+        :code:`_srcFct` is dipoleFct) that are not cached yet are evaluated
+        at once with :func:`MagneticDipoleVectorPotentialOnMesh`, the other
+        sources evaluate their own (:code:`src._getaSrc`). Sources without
+        a vector potential are skipped.
+
+        :param list srcList: sources
+        :param BaseEMProblem prob: problem
+        :param function dipoleFct: :code:`_srcFct` of the magnetic dipoles
+        :param bool orientation: use the orientations of the dipoles,
+                                 otherwise they are all vertical
+        :rtype: list
+        :return: vector potentials (nE or nF, ), None for the sources
+                 without one
+    """
+    key = (prob.mesh, prob._formulation)
+    srcs = [src for src in srcList if hasattr(src, '_getaSrc')]
+    for src in srcs:
+        if getattr(src, '_aSrcs', None) is None:
+            src._aSrcs = {}
+
+    dipoles = [
+        src for src in srcs
+        if getattr(type(src), '_srcFct', None) is dipoleFct and
+        key not in src._aSrcs
+    ]
+    if len(dipoles) > 1:
+        kwargs = {}
+        if orientation:
+            kwargs['orientation'] = np.vstack(
+                [src.orientation for src in dipoles]
+            )
+        a = MagneticDipoleVectorPotentialOnMesh(
+            np.vstack([src.loc for src in dipoles]), prob.mesh,
+            prob._formulation, moment=[src.moment for src in dipoles],
+            mu=[src.mu for src in dipoles], **kwargs
+        )
+        for src, a_src in zip(dipoles, a.T):
+            src._aSrcs[key] = a_src
+
+    for src in srcs:
+        if key not in src._aSrcs:
+            src._aSrcs[key] = src._getaSrc(prob)
+    return [
+        src._aSrcs[key] if hasattr(src, '_getaSrc') else None
+        for src in srcList
+    ]
+
+
 def MagneticDipoleFields(
-    srcLoc, obsLoc, component, orientation='Z', moment=1., mu=mu_0
+    srcLoc, obsLoc, component, orientation='Z', moment=1., mu=mu_0,
+    chunkSize=None
 ):
     """
         Calculate the vector potential of a set of magnetic dipoles
@@ -98,9 +231,16 @@ def MagneticDipoleFields(
         :param numpy.ndarray obsLoc: Where the potentials will be calculated
                                      (x, y, z)
         :param str component: The component to calculate - 'x', 'y', or 'z'
-        :param numpy.ndarray moment: The vector dipole moment (vertical)
+        :param str,numpy.ndarray orientation: dipole orientation, one per
+                                              source (nSrc, 3) or a single one
+        :param float,numpy.ndarray moment: dipole moment, one per source or a
+                                           single value
+        :param float,numpy.ndarray mu: permeability, one per source or a
+                                       single value
+        :param int chunkSize: number of sources evaluated at once
         :rtype: numpy.ndarray
-        :return: The vector potential each dipole at each observation location
+        :return: The magnetic flux density of each dipole at each observation
+                 location (nObs, nSrc)
     """
 
     if isinstance(orientation, str):
@@ -108,22 +248,23 @@ def MagneticDipoleFields(
                                                       "'y', or 'z' or a vector"
                                                       "not {}".format(orientation)
                                                       )
-    elif (not np.allclose(np.r_[1., 0., 0.], orientation) or
-          not np.allclose(np.r_[0., 1., 0.], orientation) or
-          not np.allclose(np.r_[0., 0., 1.], orientation)):
+    elif not all(
+        any(np.allclose(o, axis) for axis in orientationDict.values())
+        for o in np.atleast_2d(orientation)
+    ):
         warnings.warn('Arbitrary trasnmitter orientations ({}) not thouroughly tested '
-                      'Pull request on a test anyone? bueller?').format(orientation)
+                      'Pull request on a test anyone? bueller?'.format(orientation))
 
     if isinstance(component, str):
         assert component.upper() in ['X', 'Y', 'Z'], ("component must be 'x', "
                                                       "'y', or 'z' or a vector"
                                                       "not {}".format(component)
                                                       )
-    elif (not np.allclose(np.r_[1., 0., 0.], component) or
-          not np.allclose(np.r_[0., 1., 0.], component) or
-          not np.allclose(np.r_[0., 0., 1.], component)):
+    elif not any(
+        np.allclose(component, axis) for axis in orientationDict.values()
+    ):
         warnings.warn('Arbitrary receiver orientations ({}) not thouroughly tested '
-                      'Pull request on a test anyone? bueller?').format(component)
+                      'Pull request on a test anyone? bueller?'.format(component))
 
     if isinstance(orientation, str):
         orientation = orientationDict[orientation.upper()]
@@ -131,73 +272,42 @@ def MagneticDipoleFields(
     if isinstance(component, str):
         component = orientationDict[component.upper()]
 
-    assert np.linalg.norm(orientation, 2) == 1., ('orientation must be a unit '
-                                                  'vector. Use "moment=X to '
-                                                  'scale source fields')
+    assert np.allclose(
+        np.linalg.norm(np.atleast_2d(orientation), axis=1), 1.
+    ), ('orientation must be a unit vector. Use "moment=X to scale source '
+        'fields')
 
     if np.linalg.norm(component, 2) != 1.:
         warnings.warn('The magnitude of the receiver component vector is > 1, '
-                      ' it is {}. The receiver fields will be scaled.'
-                      ).format(np.linalg.norm(component, 2))
+                      ' it is {}. The receiver fields will be scaled.'.format(
+                          np.linalg.norm(component, 2)))
 
     srcLoc = np.atleast_2d(srcLoc)
     component = np.atleast_2d(component)
     obsLoc = np.atleast_2d(obsLoc)
-    orientation = np.atleast_2d(orientation)
 
     nObs = obsLoc.shape[0]
-    nSrc = int(srcLoc.size / 3.)
-
-    # use outer product to construct an array of [x_src, y_src, z_src]
-
-    m = moment*orientation.repeat(nObs, axis=0)
-    B = []
-
-    for i in range(nSrc):
-        srcLoc = srcLoc[i, np.newaxis].repeat(nObs, axis=0)
-        rx = component.repeat(nObs, axis=0)
-        dR = obsLoc - srcLoc
-        r = np.sqrt((dR**2).sum(axis=1))
-        # mult each element and sum along the axis (vector dot product)
-        m_dot_dR_div_r2 = (m * dR).sum(axis=1) / (r**2)
-
-        #multiply the scalar m_dot_dR by the 3D vector r
-
-        rvec_m_dot_dR_div_r2 = np.vstack(
-            [np.multiply(m_dot_dR_div_r2, dR[:, i]) for i in range(3)]
-        ).T
-
-        # print((3. * rvec_m_dot_dR_div_r2).shape,rvec_m_dot_dR_div_r2.shape, m.shape)
-        inside = (3. * rvec_m_dot_dR_div_r2) - m
-
-        # dot product with rx orientation
-        inside_dot_rx = (inside * rx).sum(axis=1)
-        front = (mu/(4.* np.pi * r**3))
-        B.append(Utils.mkvc(np.multiply(front, inside_dot_rx)))
-
-    return np.vstack(B).T
-
-
-    #     if np.all(orientation == np.r_[1., 0., 0.]):
-
-    #     elif np.all(orientation == np.r_[0., 0., 1.]):
-    #         x1 = dR[:, 2]
-    #         x2 = dR[:, 0]
-    #         x3 = dR[:, 1]
-
-
-    #     if component == 'x':
-    #         B[:, i] = front * (3*x1*x2/r**2)
-    #     elif component == 'y':
-    #         B[:, i] = front * (3*x1*x3/r**2)
-    #     elif component == 'z':
-    #         B[:, i] = front * (3*x1**2/r**2-1)
-    #     else:
-    #         raise Exception("Not Implemented")
-    # if nSrc == 1:
-    #     return B.flatten()
-    # return B
+    nSrc = srcLoc.shape[0]
 
+    m = (
+        _perSource(orientation, nSrc, 3) *
+        (_perSource(moment, nSrc) * _perSource(mu, nSrc))[:, np.newaxis]
+    )
+
+    B = np.empty((nObs, nSrc))
+    for chunk in _sourceChunks(nSrc, nObs, chunkSize):
+        dR = obsLoc[:, np.newaxis, :] - srcLoc[np.newaxis, chunk, :]
+        r = np.sqrt((dR**2).sum(axis=2))
+        # m . dR / r^2 and rx . dR
+        m_dot_dR_div_r2 = (m[np.newaxis, chunk, :] * dR).sum(axis=2) / (r**2)
+        rx_dot_dR = (component[np.newaxis, :, :] * dR).sum(axis=2)
+        rx_dot_m = (m[chunk, :] * component).sum(axis=1)
+
+        # (3 r (m . r) / r^2 - m) . rx
+        inside_dot_rx = 3. * m_dot_dR_div_r2 * rx_dot_dR - rx_dot_m
+        B[:, chunk] = inside_dot_rx / (4. * np.pi * r**3)
+
+    return B
 
 
 def MagneticLoopVectorPotential(srcLoc, obsLoc, component, radius, orientation='Z', mu=mu_0):
@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.sparse as sp
 from SimPEG import Utils
 
 
@@ -20,7 +21,7 @@ def weight(t, a1, l1, h1, a2, l2, h2):
     w1 = (x1 / h1) * (1. - x2 / h2)
     w2 = (1. - x1 / h1) * (x2 / h2)
     w3 = (x1 / h1) * (x2 / h2)
-    return np.r_[w0, w1, w2, w3]
+    return np.array([w0, w1, w2, w3])
 
 
 # TODO: Extend this when current is defined on cell-face
@@ -30,18 +31,16 @@ def getStraightLineCurrentIntegral(hx, hy, hz, ax, ay, az, bx, by, bz):
       where W denotes the 12 local bilinear edge basis functions
       and where J prescribes a unit line current
       between points (ax,ay,az) and (bx,by,bz).
+
+      All arguments can be arrays of the same shape, in which case the
+      integrals of all the bricks are computed at once and sx, sy, sz are
+      (4, ...) arrays.
     """
 
     # length of line segment
     lx = bx - ax
     ly = by - ay
     lz = bz - az
-    l = np.sqrt(lx**2+ly**2+lz**2)
-
-    if l == 0:
-        sx = np.zeros(4, 1)
-        sy = np.zeros(4, 1)
-        sz = np.zeros(4, 1)
 
     # integration using Simpson's rule
     wx0 = weight(0., ay, ly, hy, az, lz, hz)
@@ -85,110 +84,133 @@ def getSourceTermLineCurrentPolygon(xorig, hx, hy, hz, px, py, pz):
             Christoph Schwarzbach, February 2014
 
     """
-    import numpy as np
-    # number of cells
-    nx = len(hx)
-    ny = len(hy)
-    nz = len(hz)
-    x0, y0, z0 = xorig[0], xorig[1], xorig[2]
-    # nodal grid
-    x = np.r_[x0, x0+np.cumsum(hx)]
-    y = np.r_[y0, y0+np.cumsum(hy)]
-    z = np.r_[z0, z0+np.cumsum(hz)]
+    polygon = np.c_[px, py, pz]
+    S = getSourceTermLineCurrentPolygons(xorig, hx, hy, hz, [polygon])
+    return S.toarray().flatten()
 
-    # discrete edge function
-    sx = np.zeros((nx, ny+1, nz+1))
-    sy = np.zeros((nx+1, ny, nz+1))
-    sz = np.zeros((nx+1, ny+1, nz))
 
-    # number of line segments
-    nP = len(px) - 1
+def getSourceTermLineCurrentPolygons(xorig, hx, hy, hz, polygons):
+    """
+        Given a tensor product mesh with origin at (x0,y0,z0) and cell sizes
+        hx, hy, hz, compute the source vectors for unit currents flowing along
+        a list of polygons, each given by its vertices (nVertices, 3). The
+        segments of all the polygons are integrated at once.
+
+        :param numpy.ndarray xorig: origin of the mesh
+        :param numpy.ndarray hx: cell widths in x
+        :param numpy.ndarray hy: cell widths in y
+        :param numpy.ndarray hz: cell widths in z
+        :param list polygons: polygon vertices, one (nVertices, 3) array
+                              per source
+        :rtype: scipy.sparse.csc_matrix
+        :return: source terms on the x, y and z edges (nE, nPolygons)
+    """
+    hx, hy, hz = [np.asarray(h, dtype=float) for h in [hx, hy, hz]]
+    nx, ny, nz = len(hx), len(hy), len(hz)
+    # nodal grid
+    nodes = [
+        np.r_[x0, x0 + np.cumsum(h)] for x0, h in zip(xorig, [hx, hy, hz])
+    ]
+    nEx = nx * (ny+1) * (nz+1)
+    nEy = (nx+1) * ny * (nz+1)
+    nEz = (nx+1) * (ny+1) * nz
 
-    # check that all polygon vertices are inside the mesh
-    for ip in range(nP+1):
-        ax = px[ip]
-        ay = py[ip]
-        az = pz[ip]
-        ix = findlast(np.logical_and(ax >= x[:nx-1], ax <= x[1:nx]))
-        iy = findlast(np.logical_and(ay >= y[:ny-1], ay <= y[1:ny]))
-        iz = findlast(np.logical_and(az >= z[:nz-1], az <= z[1:nz]))
-
-        if (ix < 0) or (iy < 0) or (iz < 0):
-            msg = "Polygon vertex (%.1f, %.1f, %.1f) is outside the mesh"
-            print ((msg) % (ax, ay, az))
-
-    # integrate each line segment
-    for ip in range(nP):
-        # start and end vertices
-        ax = px[ip]
-        ay = py[ip]
-        az = pz[ip]
-        bx = px[ip+1]
-        by = py[ip+1]
-        bz = pz[ip+1]
-
-        # find intersection with mesh planes
-        dx = bx - ax
-        dy = by - ay
-        dz = bz - az
-        d = np.sqrt(dx**2+dy**2+dz**2)
-
-        tol = d * np.finfo(float).eps
-
-        if abs(dx) > tol:
-            tx = (x - ax) / dx
-            tx = tx[np.logical_and(tx >= 0, tx <= 1)]
-        else:
-            tx = []
-
-        if abs(dy) > tol:
-            ty = (y - ay) / dy
-            ty = ty[np.logical_and(ty >= 0, ty <= 1)]
-        else:
-            ty = []
-
-        if abs(dz) > tol:
-            tz = (z - az) / dz
-            tz = tz[np.logical_and(tz >= 0, tz <= 1)]
-        else:
-            tz = []
-
-        t = np.unique(np.r_[0., tx, ty, tz, 1.])
-        nq = len(t) - 1
-        tc = 0.5 * (t[:nq] + t[1:nq+1])
-
-        for iq in range(nq):
-
-            cx = ax + tc[iq] * dx
-            cy = ay + tc[iq] * dy
-            cz = az + tc[iq] * dz
-
-            # locate cell id
-
-            ix = findlast(np.logical_and(cx >= x[:nx-1], cx <= x[1:nx]))
-            iy = findlast(np.logical_and(cy >= y[:ny-1], cy <= y[1:ny]))
-            iz = findlast(np.logical_and(cz >= z[:nz-1], cz <= z[1:nz]))
-
-            # local coordinates
-            hxloc = hx[ix]
-            hyloc = hy[iy]
-            hzloc = hz[iz]
-            axloc = ax + t[iq]   * dx - x[ix]
-            ayloc = ay + t[iq]   * dy - y[iy]
-            azloc = az + t[iq]   * dz - z[iz]
-            bxloc = ax + t[iq+1] * dx - x[ix]
-            byloc = ay + t[iq+1] * dy - y[iy]
-            bzloc = az + t[iq+1] * dz - z[iz]
-            # integrate
-            sxloc, syloc, szloc = getStraightLineCurrentIntegral(hxloc, hyloc,
-                                                                 hzloc, axloc,
-                                                                 ayloc, azloc,
-                                                                 bxloc, byloc,
-                                                                 bzloc)
-            # integrate
-            sx[ix, iy:iy+2, iz:iz+2] += np.reshape(sxloc, (2, 2), order="F")
-            sy[ix:ix+2, iy, iz:iz+2] += np.reshape(syloc, (2, 2), order="F")
-            sz[ix:ix+2, iy:iy+2, iz] += np.reshape(szloc, (2, 2), order="F")
-
-    return np.r_[Utils.mkvc(sx), Utils.mkvc(sy), Utils.mkvc(sz)]
+    polygons = [np.atleast_2d(np.asarray(p, dtype=float)) for p in polygons]
 
+    # check that all polygon vertices are inside the mesh
+    vertices = np.vstack(polygons)
+    outside = np.zeros(vertices.shape[0], dtype=bool)
+    for dim, x in enumerate(nodes):
+        outside |= (vertices[:, dim] < x[0]) | (vertices[:, dim] > x[-1])
+    for vertex in vertices[outside]:
+        msg = "Polygon vertex (%.1f, %.1f, %.1f) is outside the mesh"
+        print((msg) % tuple(vertex))
+
+    # start and end vertices of all segments of all polygons
+    a = np.vstack([p[:-1] for p in polygons])
+    b = np.vstack([p[1:] for p in polygons])
+    seg_src = np.hstack([
+        i * np.ones(p.shape[0] - 1, dtype=int)
+        for i, p in enumerate(polygons)
+    ])
+    nSeg = a.shape[0]
+    d = b - a
+    tol = np.sqrt((d**2).sum(axis=1)) * np.finfo(float).eps
+
+    # find intersections with mesh planes, (segment, t) pairs
+    seg = [np.arange(nSeg), np.arange(nSeg)]
+    t = [np.zeros(nSeg), np.ones(nSeg)]
+    for dim, x in enumerate(nodes):
+        crosses = np.abs(d[:, dim]) > tol
+        tx = (
+            (x[np.newaxis, :] - a[crosses, dim, np.newaxis]) /
+            d[crosses, dim, np.newaxis]
+        )
+        inside = (tx >= 0) & (tx <= 1)
+        seg.append(
+            np.repeat(np.where(crosses)[0], inside.sum(axis=1))
+        )
+        t.append(tx[inside])
+    seg = np.hstack(seg)
+    t = np.hstack(t)
+
+    # sort the intersections along each segment and drop duplicates
+    order = np.lexsort((t, seg))
+    seg, t = seg[order], t[order]
+    keep = np.r_[True, (seg[1:] != seg[:-1]) | (t[1:] != t[:-1])]
+    seg, t = seg[keep], t[keep]
+
+    # pieces of the segments within a single cell
+    piece = seg[1:] == seg[:-1]
+    t0, t1, seg = t[:-1][piece], t[1:][piece], seg[:-1][piece]
+    a, d = a[seg], d[seg]
+    tc = 0.5 * (t0 + t1)
+
+    # locate cell ids and local coordinates
+    ind, h, aloc, bloc = [], [], [], []
+    for dim, (x, hdim) in enumerate(zip(nodes, [hx, hy, hz])):
+        c = a[:, dim] + tc * d[:, dim]
+        i = np.clip(
+            np.searchsorted(x, c, side='right') - 1, 0, len(hdim) - 1
+        )
+        ind.append(i)
+        h.append(hdim[i])
+        aloc.append(a[:, dim] + t0 * d[:, dim] - x[i])
+        bloc.append(a[:, dim] + t1 * d[:, dim] - x[i])
+    ix, iy, iz = ind
+
+    # integrate
+    sxloc, syloc, szloc = getStraightLineCurrentIntegral(
+        *(h + aloc + bloc)
+    )
+
+    # edges of the local basis functions, in the order of the integrals
+    rows = np.hstack([
+        # x-edges: (ix, iy:iy+2, iz:iz+2)
+        Utils.mkvc(np.array([
+            ix + nx * (iy + (ny+1) * iz),
+            ix + nx * (iy + 1 + (ny+1) * iz),
+            ix + nx * (iy + (ny+1) * (iz + 1)),
+            ix + nx * (iy + 1 + (ny+1) * (iz + 1)),
+        ])),
+        # y-edges: (ix:ix+2, iy, iz:iz+2)
+        nEx + Utils.mkvc(np.array([
+            ix + (nx+1) * (iy + ny * iz),
+            ix + 1 + (nx+1) * (iy + ny * iz),
+            ix + (nx+1) * (iy + ny * (iz + 1)),
+            ix + 1 + (nx+1) * (iy + ny * (iz + 1)),
+        ])),
+        # z-edges: (ix:ix+2, iy:iy+2, iz)
+        nEx + nEy + Utils.mkvc(np.array([
+            ix + (nx+1) * (iy + (ny+1) * iz),
+            ix + 1 + (nx+1) * (iy + (ny+1) * iz),
+            ix + (nx+1) * (iy + 1 + (ny+1) * iz),
+            ix + 1 + (nx+1) * (iy + 1 + (ny+1) * iz),
+        ])),
+    ])
+    cols = np.tile(np.repeat(seg_src[seg], 4), 3)
+    vals = np.hstack([Utils.mkvc(sxloc), Utils.mkvc(syloc), Utils.mkvc(szloc)])
+
+    return sp.csc_matrix(
+        (vals, (rows, cols)), shape=(nEx + nEy + nEz, len(polygons))
+    )
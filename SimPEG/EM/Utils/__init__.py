@@ -1,8 +1,11 @@
 from .EMUtils import omega, k, VTEMFun, TriangleFun, SineFun
 from .AnalyticUtils import (
     MagneticDipoleFields, MagneticDipoleVectorPotential,
-    MagneticLoopVectorPotential, orientationDict
+    MagneticDipoleVectorPotentialOnMesh, MagneticDipoleVectorPotentialCache,
+    MagneticLoopVectorPotential,
+    orientationDict
     )
 from .CurrentUtils import (
-    getSourceTermLineCurrentPolygon, getStraightLineCurrentIntegral
+    getSourceTermLineCurrentPolygon, getSourceTermLineCurrentPolygons,
+    getStraightLineCurrentIntegral
     )
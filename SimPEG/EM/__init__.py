@@ -9,3 +9,4 @@ from . import Static
 from . import Base
 from . import Analytics
 from . import Utils
+from . import EM1D
@@ -122,17 +122,16 @@ class BaseProblem(Props.HasModel):
     #: List of strings, e.g. ['_MeSigma', '_MeSigmaI']
     deleteTheseOnModelUpdate = []
 
-    @properties.observer('model')
-    def _on_model_update(self, change):
-        if change['previous'] is change['value']:
-            return
-        if (
-            isinstance(change['previous'], np.ndarray) and
-            isinstance(change['value'], np.ndarray) and
-            np.allclose(change['previous'], change['value'])
-        ):
-            return
-        for prop in self.deleteTheseOnModelUpdate:
+    #: Dict of physical property names to lists of strings that are only
+    #: deleted when that property changes, e.g. {'sigma': ['_MeSigma']}
+    deleteTheseOnPropertyUpdate = {}
+
+    def _on_property_update(self, changed):
+        toDelete = list(self.deleteTheseOnModelUpdate)
+        byProperty = self.deleteTheseOnPropertyUpdate
+        for name in changed:
+            toDelete += byProperty.get(name, [])
+        for prop in toDelete:
             if hasattr(self, prop):
                 delattr(self, prop)
 
@@ -266,6 +265,85 @@ class BaseTimeProblem(BaseProblem):
         if hasattr(self, '_timeMesh'):
             del self._timeMesh
 
+    def scheduleTimeSteps(
+        self, times, breakpoints=None, accuracy=0.1, dtMin=None, nDt=8
+    ):
+        """Generate and set a geometric time-stepping schedule.
+
+        Each time step is chosen from at most :code:`nDt` geometrically
+        spaced values so that it does not exceed :code:`accuracy` times the
+        time since the last breakpoint. Steps only grow between breakpoints,
+        so each distinct dt is used in one contiguous block per interval
+        (one factorization each). Nodes of the time mesh are placed on all
+        breakpoints (e.g. where a source waveform is not smooth) and the
+        schedule extends to the latest requested time.
+
+        For example::
+
+            prob.scheduleTimeSteps(np.logspace(-5, -3, 31), accuracy=0.1)
+
+        :param numpy.ndarray times: times at which the fields are needed
+        :param numpy.ndarray breakpoints: times where nodes are required,
+            the first one is used as the start time (default: [t0])
+        :param float accuracy: target ratio between a time step and the time
+            since the last breakpoint
+        :param float dtMin: smallest time step (default: accuracy times the
+            shortest time between a breakpoint and a requested time or the
+            next breakpoint)
+        :param int nDt: number of distinct time steps (not counting the
+            steps that land on breakpoints)
+        :rtype: list
+        :return: time steps as [..., (dt, repeat), ...]
+        """
+        times = np.unique(np.atleast_1d(times).astype(float))
+        if breakpoints is None:
+            breakpoints = [self.t0]
+        breakpoints = np.unique(np.atleast_1d(breakpoints).astype(float))
+
+        t0, tEnd = breakpoints[0], times.max()
+        assert tEnd > t0, 'times must be after the first breakpoint'
+        breakpoints = breakpoints[breakpoints < tEnd]
+
+        # time between each breakpoint / requested time and the previous
+        # breakpoint
+        nodes = np.r_[breakpoints[1:], times[times > t0]]
+        offsets = nodes - breakpoints[
+            np.searchsorted(breakpoints, nodes, side='left') - 1
+        ]
+
+        if dtMin is None:
+            dtMin = accuracy * offsets.min()
+        dtMax = max(accuracy * offsets.max(), dtMin)
+        dts = np.unique(
+            np.logspace(np.log10(dtMin), np.log10(dtMax), nDt)
+        )
+
+        segments = np.r_[breakpoints, tEnd]
+        timeSteps = []
+        for iseg, (a, b) in enumerate(zip(segments[:-1], segments[1:])):
+            lastSegment = iseg == len(segments) - 2
+            t = a
+            while t < b - 1e-6 * dtMin:
+                allowed = max(dtMin, accuracy * (t - a))
+                dt = dts[dts <= allowed * (1. + 1e-10)].max()
+                # land on the next breakpoint
+                if not lastSegment and t + dt > b:
+                    dt = b - t
+                timeSteps.append(dt)
+                t = t + dt
+
+        # compress to [..., (dt, repeat), ...]
+        schedule = []
+        for dt in timeSteps:
+            if len(schedule) > 0 and schedule[-1][0] == dt:
+                schedule[-1] = (dt, schedule[-1][1] + 1)
+            else:
+                schedule.append((dt, 1))
+
+        self.t0 = t0
+        self.timeSteps = schedule
+        return schedule
+
 
 class LinearProblem(BaseProblem):
 
@@ -61,6 +61,14 @@ class Model(SphinxProp, properties.Array):
     class_info = 'a numpy array'
     _required = False
 
+    def equal(self, value_a, value_b):
+        """Exact comparison, a single pass over the model"""
+        if value_a is value_b:
+            return True
+        if not _comparable_models(value_a, value_b):
+            return False
+        return np.array_equal(value_a, value_b)
+
 
 class Mapping(SphinxProp, properties.Property):
 
@@ -121,6 +129,10 @@ class Mapping(SphinxProp, properties.Property):
             self._set(scope.name, value)
             if value is not properties.utils.undefined:
                 scope.clear_props(self)
+            _update_property_versions(self, [
+                prop.name for prop in (scope.prop, scope.reciprocal_prop)
+                if prop is not None
+            ])
 
         def fdel(self):
             self._set(scope.name, properties.utils.undefined)
@@ -220,6 +232,10 @@ class PhysicalProperty(SphinxProp, properties.Property):
             self._set(scope.name, value)
             if value is not properties.utils.undefined:
                 scope.clear_mappings(self)
+            _update_property_versions(self, [
+                prop.name for prop in (scope, scope.reciprocal)
+                if prop is not None
+            ])
 
         def fdel(self):
             self._set(scope.name, properties.utils.undefined)
@@ -321,6 +337,40 @@ class Derivative(SphinxProp, properties.GettableProperty):
         return property(fget=fget, doc=scope.doc)
 
 
+def _update_property_versions(instance, names):
+    """
+    Increments the versions of the physical properties `names` and calls
+    :code:`_on_property_update`
+    """
+    names = set(names)
+    versions = getattr(instance, '_propertyVersions', {})
+    for name in names:
+        versions[name] = versions.get(name, 0) + 1
+    instance._propertyVersions = versions
+    if isinstance(instance, HasModel):
+        instance._on_property_update(names)
+
+
+def _comparable_models(previous, value):
+    """True if two models can be compared value by value"""
+    return (
+        isinstance(previous, np.ndarray) and
+        isinstance(value, np.ndarray) and
+        previous.shape == value.shape
+    )
+
+
+def _model_index(mapping):
+    """
+    Indices of the model that a mapping reads, None if it reads all of it
+    """
+    if isinstance(mapping, Maps.ComboMap):
+        mapping = mapping.maps[-1]
+    if isinstance(mapping, Maps.Projection):
+        return mapping.index
+    return None
+
+
 def Invertible(help, default=None):
 
     mapping = Mapping(
@@ -371,6 +421,14 @@ class HasModel(BaseSimPEG):
             if getattr(self, k) is not None
         ])
 
+    def _property_version(self, name):
+        """
+        Counter that is incremented every time the physical property `name`
+        changes, either through a model update or by setting the property
+        or its mapping
+        """
+        return getattr(self, '_propertyVersions', {}).get(name, 0)
+
     @property
     def needs_model(self):
         """True if a model is necessary"""
@@ -386,6 +444,66 @@ class HasModel(BaseSimPEG):
                 return True
         return False
 
+    def _model_properties(self, previous=None, value=None):
+        """
+        Names of the physical properties that are set by the model. If the
+        `previous` and the new model `value` are given, only the properties
+        whose mapping reads a part of the model that changed are returned: a
+        mapping that ends with a :class:`SimPEG.Maps.Projection` (e.g. of
+        :class:`SimPEG.Maps.Wires`) only compares its part of the model.
+
+        :param numpy.ndarray previous: previous model
+        :param numpy.ndarray value: new model
+        :rtype: set
+        :return: names of the physical properties
+        """
+        compare = _comparable_models(previous, value)
+        unchanged = {}
+        names = set()
+        for name in self._act_map_names:
+            prop = self._props[name].prop
+            if prop is None:
+                continue
+            if compare:
+                index = _model_index(getattr(self, name))
+                key = None if index is None else id(index)
+                if key not in unchanged:
+                    unchanged[key] = (
+                        np.array_equal(previous, value) if index is None else
+                        np.array_equal(previous[index], value[index])
+                    )
+                if unchanged[key]:
+                    continue
+            names.add(prop.name)
+            if prop.reciprocal is not None:
+                names.add(prop.reciprocal.name)
+        return names
+
+    @properties.observer('model')
+    def _on_model_update(self, change):
+        """
+        Updates the versions of the physical properties whose part of the
+        model changed. Nothing is updated if the values did not change. The
+        values are compared here, per mapping, rather than with
+        :code:`change_only`, so the model is only read once.
+        """
+        previous, value = change['previous'], change['value']
+        names = self._model_properties(previous, value)
+        if len(names) == 0 and _comparable_models(previous, value) and (
+            self.needs_model or np.array_equal(previous, value)
+        ):
+            return
+        _update_property_versions(self, names)
+
+    def _on_property_update(self, changed):
+        """
+        Called after every model or physical property change with the names
+        of the physical properties that changed.
+
+        :param set changed: names of the changed physical properties
+        """
+        pass
+
     @properties.validator('model')
     def _check_model_valid(self, change):
         """Checks the model length and necessity"""
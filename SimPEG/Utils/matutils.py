@@ -1,5 +1,6 @@
 from __future__ import division
 import numpy as np
+import scipy.sparse as sp
 
 from discretize.utils import (
     Zero, Identity, mkvc, sdiag, sdInv, speye, kron3, spzeros, ddx, av,
@@ -81,3 +82,101 @@ def uniqueRows(M):
     _, invInd = np.unique(b, return_inverse=True)
     unqM = M[unqInd]
     return unqM, unqInd, invInd
+
+
+class SparsePattern(object):
+    """
+        Fixed sparsity pattern of the product
+
+        .. math ::
+
+            \mathbf{A} = \\text{diag}(\mathbf{s}) \mathbf{L}
+            \\text{diag}(\mathbf{d}) \mathbf{R} \\text{diag}(\mathbf{s})
+            + \\text{diag}(\mathbf{c})
+
+        for fixed sparse matrices L and R. The values of the product are
+        linear in d, so the map from d to the non-zero values is built once
+        and a new matrix is a vectorized fill of the values rather than a
+        sparse matrix product.
+
+        .. code:: python
+
+            P = SparsePattern(D, G)
+            A = P(rhoI, c=ky**2*vol/rho)  # D*sdiag(rhoI)*G + sdiag(c)
+
+        :param scipy.sparse.spmatrix L: left matrix (n, k)
+        :param scipy.sparse.spmatrix R: right matrix (k, m), identity if None
+    """
+
+    def __init__(self, L, R=None):
+        L = sp.csc_matrix(L)
+        if R is None:
+            R = sp.identity(L.shape[1], format='csr')
+        R = sp.csr_matrix(R)
+        assert L.shape[1] == R.shape[0], 'Incompatible shapes'
+        self.shape = (L.shape[0], R.shape[1])
+        nk = L.shape[1]
+
+        # all products L[i, k] * R[k, j], grouped by k
+        nl = np.diff(L.indptr)
+        nr = np.diff(R.indptr)
+        npairs = nl*nr
+        k = np.repeat(np.arange(nk), npairs)
+        t = np.arange(npairs.sum()) - np.repeat(
+            np.cumsum(npairs) - npairs, npairs
+        )
+        iL = L.indptr[k] + t // nr[k]
+        iR = R.indptr[k] + t % nr[k]
+        rows = L.indices[iL]
+        cols = R.indices[iR]
+        vals = L.data[iL] * R.data[iR]
+
+        # the diagonal is always part of the pattern of square matrices
+        if self.shape[0] == self.shape[1]:
+            diag = np.arange(self.shape[0])
+            rows = np.r_[rows, diag]
+            cols = np.r_[cols, diag]
+
+        # unique (row, col) pairs in csr order
+        unq, inv = np.unique(
+            rows.astype(np.int64)*self.shape[1] + cols, return_inverse=True
+        )
+        inv = inv.ravel()
+        self.nnz = unq.size
+        self.rows = (unq // self.shape[1]).astype(np.int32)
+        self.indices = (unq % self.shape[1]).astype(np.int32)
+        self.indptr = np.r_[
+            0, np.cumsum(np.bincount(self.rows, minlength=self.shape[0]))
+        ].astype(np.int32)
+
+        nv = vals.size
+        self._Q = sp.csr_matrix(
+            (vals, (inv[:nv], k)), shape=(self.nnz, nk)
+        )
+        if self.shape[0] == self.shape[1]:
+            self._diagInd = inv[nv:]
+        else:
+            self._diagInd = None
+
+    def __call__(self, d, c=None, s=None):
+        """
+            Assemble the matrix for new values of d, c and s
+
+            :param numpy.ndarray d: middle diagonal (k,)
+            :param numpy.ndarray c: added diagonal (n,), a scalar or None
+            :param numpy.ndarray s: symmetric scaling (n,) or None
+            :rtype: scipy.sparse.csr_matrix
+            :return: A
+        """
+        data = self._Q * d
+        if s is not None:
+            data = data * (s[self.rows] * s[self.indices])
+        if c is not None:
+            assert self._diagInd is not None, (
+                'A diagonal can only be added to a square matrix'
+            )
+            data = data.astype(np.result_type(data, c))
+            data[self._diagInd] += c
+        return sp.csr_matrix(
+            (data, self.indices.copy(), self.indptr.copy()), shape=self.shape
+        )
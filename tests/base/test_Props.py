@@ -277,6 +277,48 @@ class TestPropMaps(unittest.TestCase):
         PM = NestedModels()
         assert PM._has_nested_models is True
 
+    def test_model_versions(self):
+        wires = Maps.Wires(('Ks', 2), ('A', 3))
+        PM = ComplicatedInversion(
+            KsMap=Maps.ExpMap(nP=2) * wires.Ks,
+            AMap=wires.A
+        )
+        changes = []
+        PM._on_property_update = changes.append
+
+        m = np.ones(5)
+        PM.model = m
+        assert changes[-1] == {'Ks', 'A'}
+        Ks, A, gamma = [
+            PM._property_version(name) for name in ['Ks', 'A', 'gamma']
+        ]
+
+        # same values, no update
+        PM.model = m.copy()
+        assert len(changes) == 1
+
+        # only the A part of the model changes
+        m = m.copy()
+        m[3] = 2.
+        PM.model = m
+        assert len(changes) == 2
+        assert changes[-1] == {'A'}
+        assert PM._property_version('Ks') == Ks
+        assert PM._property_version('A') == A + 1
+        assert PM._property_version('gamma') == gamma
+
+        # the model is copied, an array changed in place is a new model
+        m[0] = 2.
+        PM.model = m
+        assert changes[-1] == {'Ks'}
+        assert PM._property_version('Ks') == Ks + 1
+
+        # setting a property or a mapping also changes its version
+        PM.gamma = 2.
+        assert PM._property_version('gamma') == gamma + 1
+        PM.KsMap = Maps.ExpMap(nP=5)
+        assert PM._property_version('Ks') == Ks + 2
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -21,6 +21,33 @@ class TestTimeProblem(unittest.TestCase):
 
         self.assertTrue(np.all(self.prob.times == np.r_[0, trueTS].cumsum()))
 
+    def test_timeProblem_scheduleTimeSteps(self):
+        times = np.logspace(-5, -3, 21)
+        breakpoints = np.r_[-1e-3, -2e-4, 0.]
+        accuracy = 0.2
+        schedule = self.prob.scheduleTimeSteps(
+            times, breakpoints=breakpoints, accuracy=accuracy, nDt=6
+        )
+
+        # starts at the first breakpoint and covers all times
+        self.assertTrue(self.prob.t0 == -1e-3)
+        self.assertTrue(self.prob.times[-1] >= times.max())
+
+        # nodes on the breakpoints
+        for bp in breakpoints:
+            self.assertTrue(np.min(np.abs(self.prob.times - bp)) < 1e-12)
+
+        # bounded number of distinct dts (plus one landing on each
+        # breakpoint) that only grow between breakpoints
+        dts = np.r_[[dt for dt, _ in schedule]]
+        self.assertTrue(len(np.unique(dts)) <= 6 + len(breakpoints))
+        self.assertTrue(np.sum(np.diff(dts) < 0) <= 2*len(breakpoints))
+
+        # step at each time is bounded by the accuracy
+        iT = np.searchsorted(self.prob.times, times)
+        dt = self.prob.timeSteps[iT - 1]
+        self.assertTrue(np.all(dt <= accuracy * times + 1e-12))
+
     def test_curModelDepreciation(self):
         with self.assertRaises(Exception):
             self.prob.curModel
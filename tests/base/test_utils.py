@@ -8,7 +8,7 @@ from SimPEG.Utils import (
     sdiag, sub2ind, ndgrid, mkvc, inv2X2BlockDiagonal,
     inv3X3BlockDiagonal, invPropertyTensor, makePropertyTensor, indexCube,
     ind2sub, asArray_N_x_Dim, TensorType, diagEst, count, timeIt, Counter,
-    download, surface2ind_topo
+    download, surface2ind_topo, SparsePattern
 )
 from SimPEG import Mesh
 from SimPEG.Tests import checkDerivative
@@ -324,6 +324,36 @@ class TestDiagEst(unittest.TestCase):
         self.assertTrue(err < TOL)
 
 
+class TestSparsePattern(unittest.TestCase):
+
+    def test_product(self):
+        mesh = Mesh.TensorMesh([4, 5, 6])
+        C = mesh.edgeCurl
+        P = SparsePattern(C.T, C)
+        for i in range(2):
+            d = np.random.rand(mesh.nF)
+            c = 1j*np.random.rand(mesh.nE)
+            A = P(d, c=c)
+            self.assertTrue(A.has_sorted_indices)
+            self.assertTrue(
+                np.abs(A - (C.T*sdiag(d)*C + sdiag(c))).max() < TOL
+            )
+
+    def test_scaled(self):
+        K = sp.random(30, 20, density=0.2, format='csr')
+        P = SparsePattern(K, K.T)
+        d = np.random.rand(20)
+        s = np.random.rand(30)
+        A = P(d, c=2., s=s)
+        Atrue = sdiag(s)*K*sdiag(d)*K.T*sdiag(s) + 2.*sp.eye(30)
+        self.assertTrue(np.abs(A - Atrue).max() < TOL)
+
+        # the right matrix defaults to the identity
+        K = sp.random(30, 30, density=0.2, format='csr')
+        A = SparsePattern(K)(np.arange(30.))
+        self.assertTrue(np.abs(A - K*sdiag(np.arange(30.))).max() < TOL)
+
+
 class TestDownload(unittest.TestCase):
     def test_downloads(self):
         url = "https://storage.googleapis.com/simpeg/Chile_GRAV_4_Miller/"
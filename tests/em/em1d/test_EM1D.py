@@ -0,0 +1,195 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from scipy.constants import mu_0
+
+from SimPEG import Mesh, Maps, Tests
+from SimPEG.EM import EM1D, Analytics
+
+np.random.seed(41)
+
+
+def get_survey_FD(locs, freqs, height=0.):
+    srcList = []
+    for loc in locs:
+        for freq in freqs:
+            rxList = [
+                EM1D.Rx.Point_bSecondary(
+                    loc + np.r_[r, 0., 0.], component=comp
+                )
+                for r in [50., 100.] for comp in ['real', 'imag']
+            ]
+            srcList.append(
+                EM1D.Src.MagDipole(rxList, freq, loc + np.r_[0., 0., height])
+            )
+    return EM1D.Survey(srcList)
+
+
+def get_survey_TD(locs, times):
+    srcList = []
+    for loc in locs:
+        rxList = [
+            Rx(np.vstack([loc + np.r_[r, 0., 0.] for r in [50., 100.]]), times)
+            for Rx in [EM1D.Rx.Point_b, EM1D.Rx.Point_dbdt]
+        ]
+        srcList.append(EM1D.Src.StepOffMagDipole(rxList, loc))
+    return EM1D.Survey(srcList)
+
+
+class EM1DForwardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.TensorMesh([np.r_[10., 20., 40., 1.]])
+        self.sigma = 1e-2
+
+    def test_halfspace_FD(self):
+        freqs = np.logspace(1, 5, 9)
+        survey = get_survey_FD([np.zeros(3)], freqs)
+        prob = EM1D.Problem1D_FD(
+            self.mesh, sigma=self.sigma * np.ones(self.mesh.nC)
+        )
+        prob.pair(survey)
+        dpred = survey.dpred(np.zeros(0))
+
+        bTrue = []
+        for freq in freqs:
+            for r in [50., 100.]:
+                hz = Analytics.FDEM.hzAnalyticDipoleF(
+                    r, freq, self.sigma, secondary=True
+                )
+                bTrue += [mu_0 * hz.real, mu_0 * hz.imag]
+        bTrue = np.hstack(bTrue)
+        self.assertTrue(
+            np.linalg.norm(dpred - bTrue) < 1e-4 * np.linalg.norm(bTrue)
+        )
+
+    def test_halfspace_TD(self):
+        # at later times the analytic solution loses digits to cancellation
+        times = np.logspace(-5, -3, 9)
+        survey = get_survey_TD([np.zeros(3)], times)
+        prob = EM1D.Problem1D_TD(
+            self.mesh, sigma=self.sigma * np.ones(self.mesh.nC)
+        )
+        prob.pair(survey)
+        dpred = survey.dpred(np.zeros(0))
+
+        r = np.r_[50., 100.]
+        b = mu_0 * Analytics.TDEM.hzAnalyticDipoleT(
+            r[:, np.newaxis], times, self.sigma
+        )
+        dt = 1e-3 * times
+        dbdt = mu_0 * (
+            Analytics.TDEM.hzAnalyticDipoleT(
+                r[:, np.newaxis], times + dt, self.sigma
+            ) - Analytics.TDEM.hzAnalyticDipoleT(
+                r[:, np.newaxis], times - dt, self.sigma
+            )
+        ) / (2. * dt)
+        for true, pred in zip(
+            [b, dbdt], [dpred[:r.size*times.size], dpred[r.size*times.size:]]
+        ):
+            # the data of a receiver are ordered with its locations first
+            true = true.flatten(order='F')
+            err = np.abs(pred - true) / np.abs(true)
+            self.assertTrue(err.max() < 5e-3)
+
+    def test_layers(self):
+        # a layered earth with a resistive layer is not a halfspace; the
+        # layers with equal conductivities are
+        survey = get_survey_FD([np.zeros(3)], [1e3, 1e4], height=30.)
+        prob = EM1D.Problem1D_FD(self.mesh)
+        prob.pair(survey)
+        prob.sigma = self.sigma * np.ones(self.mesh.nC)
+        layered = survey.dpred(np.zeros(0))
+        prob.sigma = np.r_[self.sigma, 1e-4, self.sigma, self.sigma]
+        resistive = survey.dpred(np.zeros(0))
+
+        halfspace = EM1D.Problem1D_FD(
+            Mesh.TensorMesh([np.r_[1.]]), sigma=np.r_[self.sigma]
+        )
+        survey.unpair()
+        halfspace.pair(survey)
+        self.assertTrue(
+            np.allclose(
+                layered, survey.dpred(np.zeros(0)), rtol=1e-10, atol=0.
+            )
+        )
+        self.assertFalse(
+            np.allclose(layered, resistive, rtol=1e-2, atol=0.)
+        )
+
+    def test_stitched(self):
+        locs = [np.r_[0., 0., 0.], np.r_[200., 0., 0.], np.r_[0., 0., 0.]]
+        survey = get_survey_FD(locs, [1e3, 1e4])
+        self.assertTrue(survey.nSounding == 2)
+        self.assertTrue(
+            np.all(survey.soundingIndex == np.r_[0, 0, 1, 1, 0, 0])
+        )
+
+        sigma = np.random.rand(2, self.mesh.nC) * 1e-1
+        prob = EM1D.Problem1D_FD(self.mesh, sigma=sigma.flatten())
+        prob.pair(survey)
+        dpred = survey.dpred(np.zeros(0))
+
+        # each sounding sees its own model
+        for i, loc in enumerate(locs[:2]):
+            single = get_survey_FD([loc], [1e3, 1e4])
+            EM1D.Problem1D_FD(self.mesh, sigma=sigma[i]).pair(single)
+            self.assertTrue(np.allclose(
+                dpred[i*single.nD:(i+1)*single.nD],
+                single.dpred(np.zeros(0)), rtol=1e-12, atol=0.
+            ))
+
+
+class EM1DDerivTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.TensorMesh([np.r_[10., 20., 40., 1.]])
+        self.locs = [np.r_[0., 0., 0.], np.r_[200., 0., 0.]]
+
+    def get_prob(self, Problem, survey):
+        nP = survey.nSounding * self.mesh.nC
+        prob = Problem(self.mesh, sigmaMap=Maps.ExpMap(nP=nP))
+        prob.pair(survey)
+        return prob
+
+    def get_probs(self):
+        return [
+            self.get_prob(
+                EM1D.Problem1D_FD,
+                get_survey_FD(self.locs, [1e2, 1e4], height=20.)
+            ),
+            self.get_prob(
+                EM1D.Problem1D_TD,
+                get_survey_TD(self.locs, np.logspace(-5, -3, 5))
+            )
+        ]
+
+    def test_Jvec(self):
+        for prob in self.get_probs():
+            m0 = np.log(1e-2) + 0.5 * np.random.randn(prob.sigmaMap.nP)
+            passed = Tests.checkDerivative(
+                lambda m: [prob.survey.dpred(m), lambda v: prob.Jvec(m, v)],
+                m0, num=4, plotIt=False
+            )
+            self.assertTrue(passed)
+
+    def test_Jtvec_adjoint(self):
+        for prob in self.get_probs():
+            m = np.log(1e-2) + 0.5 * np.random.randn(prob.sigmaMap.nP)
+            v = np.random.randn(prob.sigmaMap.nP)
+            w = np.random.randn(prob.survey.nD)
+            vJw = v.dot(prob.Jtvec(m, w))
+            wJv = w.dot(prob.Jvec(m, v))
+            self.assertTrue(np.abs(vJw - wJv) < 1e-10 * np.abs(vJw))
+
+    def test_Jmatrix_cache(self):
+        prob = self.get_probs()[0]
+        m = np.log(1e-2) * np.ones(prob.sigmaMap.nP)
+        J = prob.getJ(m)
+        self.assertTrue(prob.getJ(m) is J)
+        self.assertTrue(prob.getJ(m + 1.) is not J)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,7 @@ from SimPEG import Mesh
 from SimPEG import Utils
 from SimPEG import SolverLU
 from SimPEG import EM
-from scipy.constants import mu_0
+from scipy.constants import mu_0, epsilon_0
 
 import matplotlib
 matplotlib.use('Agg')
@@ -289,5 +289,101 @@ class TestDipoles(unittest.TestCase):
         )
 
 
+class TestBatchedDipoles(unittest.TestCase):
+
+    def setUp(self):
+        self.XYZ = np.random.randn(20, 3) * 100.
+        self.srcLocs = np.random.randn(5, 3) * 10.
+        self.freqs = np.r_[1., 1e2, 1e4]
+
+    def test_MagneticDipoleWholeSpace(self):
+        for orientation in ['X', 'Y', 'Z']:
+            B = EM.Analytics.FDEM.MagneticDipoleWholeSpaceBatch(
+                self.XYZ, self.srcLocs, 1e-2, self.freqs,
+                moment=np.arange(1., 6.), orientation=orientation,
+                chunkSize=2
+            )
+            for i, srcLoc in enumerate(self.srcLocs):
+                for j, freq in enumerate(self.freqs):
+                    Btrue = EM.Analytics.FDEM.MagneticDipoleWholeSpace(
+                        self.XYZ, srcLoc, 1e-2, freq, moment=i+1.,
+                        orientation=orientation
+                    )
+                    for Bc, Bc_true in zip(B, Btrue):
+                        self.assertTrue(
+                            np.allclose(Bc[:, i, j], Utils.mkvc(Bc_true))
+                        )
+
+    def test_ElectricDipoleWholeSpace(self):
+        dipolar = EM.Analytics.FDEMDipolarfields
+        for orientation in ['X', 'Y', 'Z']:
+            E = EM.Analytics.FDEM.ElectricDipoleWholeSpaceBatch(
+                self.XYZ, self.srcLocs, 1e-2, self.freqs, current=2.,
+                orientation=orientation
+            )
+            # with magnetic permeability and electric permittivity
+            kwargs = dict(
+                orientation=orientation, mu=2.*mu_0,
+                epsilon=3.*epsilon_0
+            )
+            E2 = EM.Analytics.FDEM.ElectricDipoleWholeSpaceBatch(
+                self.XYZ, self.srcLocs, 1e-2, self.freqs, **kwargs
+            )
+            H2 = EM.Analytics.FDEM.ElectricDipoleWholeSpaceBatch(
+                self.XYZ, self.srcLocs, 1e-2, self.freqs, field='H',
+                **kwargs
+            )
+            for i, srcLoc in enumerate(self.srcLocs):
+                for j, freq in enumerate(self.freqs):
+                    for F, Ftrue in [
+                        (E, EM.Analytics.FDEM.ElectricDipoleWholeSpace(
+                            self.XYZ, srcLoc, 1e-2, freq, current=2.,
+                            orientation=orientation
+                        )),
+                        (E2, dipolar.E_from_ElectricDipoleWholeSpace(
+                            self.XYZ, srcLoc, 1e-2, np.r_[freq],
+                            orientation=orientation, kappa=1., epsr=3.
+                        )),
+                        (H2, dipolar.H_from_ElectricDipoleWholeSpace(
+                            self.XYZ, srcLoc, 1e-2, np.r_[freq],
+                            orientation=orientation, kappa=1., epsr=3.
+                        )),
+                    ]:
+                        for Fc, Fc_true in zip(F, Ftrue):
+                            self.assertTrue(
+                                np.allclose(Fc[:, i, j], Fc_true)
+                            )
+
+    def test_MagneticDipoleFields(self):
+        moments = np.arange(1., 6.)
+        orientations = np.random.randn(5, 3)
+        orientations /= np.sqrt((orientations**2).sum(axis=1))[:, None]
+        for component in ['x', 'y', 'z']:
+            A = EM.Utils.MagneticDipoleVectorPotential(
+                self.srcLocs, self.XYZ, component, moment=moments,
+                orientation=orientations, chunkSize=2
+            )
+            B = EM.Utils.MagneticDipoleFields(
+                self.srcLocs, self.XYZ, component, moment=moments,
+                chunkSize=2
+            )
+            for i, srcLoc in enumerate(self.srcLocs):
+                self.assertTrue(np.allclose(
+                    A[:, i], EM.Utils.MagneticDipoleVectorPotential(
+                        srcLoc, self.XYZ, component, moment=moments[i],
+                        orientation=orientations[i]
+                    )
+                ))
+                # vertical dipole
+                dR = self.XYZ - srcLoc
+                r = np.sqrt((dR**2).sum(axis=1))
+                Btrue = (mu_0 * moments[i] / (4. * np.pi * r**3))[:, None] * (
+                    3. * dR * (dR[:, 2] / r**2)[:, None] - np.r_[0., 0., 1.]
+                )
+                self.assertTrue(np.allclose(
+                    B[:, i], Btrue[:, 'xyz'.index(component)]
+                ))
+
+
 if __name__ == '__main__':
     unittest.main()
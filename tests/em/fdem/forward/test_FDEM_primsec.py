@@ -7,7 +7,7 @@ from SimPEG.EM.Utils import omega
 try:
     from pymatsolver import Pardiso as Solver
 except ImportError:
-    from SimPEG import Solver as SolverLU
+    from SimPEG import SolverLU as Solver
 
 import time
 import os
@@ -213,6 +213,42 @@ class PrimSecFDEMSrcTest_Cyl2Cart_EB_EB(unittest.TestCase, PrimSecFDEMTest):
     def test_Jadjoint_EB(self):
         self.AdjointTest()
 
+    def test_primary_cache_EB(self):
+        src, prob = self.secondarySrc, self.secondaryProblem
+        primarySolver = self.primaryProblem.Solver
+        cleaned = []
+
+        class RecordingSolver(primarySolver):
+            def clean(self):
+                cleaned.append(self)
+                super(RecordingSolver, self).clean()
+
+        self.primaryProblem.Solver = RecordingSolver
+        self.primaryProblem._primaryCache = None
+        prob.model = model
+        f = src._primaryFields(prob)
+        P = src._ProjPrimary(prob, 'E', 'E')
+        Ainv = list(self.primaryProblem._primaryCache['Ainv'].values())
+        self.assertTrue(len(Ainv) == 1)
+
+        # the block parameters are not seen by the primary problem
+        m = model.copy()
+        m[1] += 0.1
+        prob.model = m
+        self.assertTrue(src._primaryFields(prob) is f)
+        self.assertTrue(src._ProjPrimary(prob, 'E', 'E') is P)
+
+        m = m.copy()
+        m[0] += 0.1
+        prob.model = m
+        self.assertTrue(src._primaryFields(prob) is not f)
+
+        # the replaced factorizations are cleaned
+        self.assertTrue(cleaned == Ainv)
+
+        self.primaryProblem.Solver = primarySolver
+        prob.model = model
+
 
 class PrimSecFDEMSrcTest_Cyl2Cart_HJ_EB(unittest.TestCase, PrimSecFDEMTest):
 
@@ -308,6 +308,114 @@ class TestSimpleSourcePropertiesTensor(unittest.TestCase):
         assert self.bPrimaryTest(src, 'j')
 
 
+class TestSourceTermCache(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.TensorMesh([8, 8, 8], 'CCC')
+        wires = Maps.Wires(('sigma', self.mesh.nC), ('mu', self.mesh.nC))
+        self.prob = FDEM.Problem3D_b(
+            self.mesh, sigmaMap=Maps.ExpMap(self.mesh) * wires.sigma,
+            muMap=wires.mu
+        )
+        self.srcList = [
+            FDEM.Src.MagDipole([], freq=1., loc=np.r_[0., 0., 0.]),
+            FDEM.Src.RawVec_e(
+                [], freq=1., s_e=np.random.rand(self.mesh.nE)
+            ),
+            FDEM.Src.PrimSecSigma(
+                [], freq=1., sigBack=1e-2,
+                ePrimary=np.random.rand(self.mesh.nE)
+            ),
+        ]
+        survey = FDEM.Survey(self.srcList)
+        self.prob.pair(survey)
+
+    def compare(self):
+        s_m, s_e = self.prob.getSourceTerm(1.)
+        for i, src in enumerate(self.srcList):
+            smi, sei = src.eval(self.prob)
+            assert np.allclose(s_m[:, i], np.zeros_like(s_m[:, i]) + smi)
+            assert np.allclose(s_e[:, i], np.zeros_like(s_e[:, i]) + sei)
+        return s_m, s_e
+
+    def test_cache(self):
+        nC = self.mesh.nC
+        m = np.r_[np.log(1e-2) * np.ones(nC), mu_0 * np.ones(nC)]
+        self.prob.model = m
+        s_m, s_e = self.compare()
+
+        # the cached source terms are reused while mu is unchanged
+        m = m.copy()
+        m[0] = np.log(1e-1)
+        self.prob.model = m
+        s_m2, s_e2 = self.compare()
+        assert np.all(s_m2[:, :2] == s_m[:, :2])
+        assert not np.all(s_e2[:, 2] == s_e[:, 2])
+        self.prob.getSourceTerm(1.)
+        assert self.prob._sourceTerms[1][1.][2] is s_m2
+
+        # the cached arrays can not be changed by the caller
+        with self.assertRaises(ValueError):
+            s_m2[:, 0] = 0.
+
+        # a change in mu refreshes the cache
+        m = m.copy()
+        m[nC:] = 2. * mu_0
+        self.prob.model = m
+        s_m3, s_e3 = self.compare()
+        assert self.prob._sourceTerms[1][1.][2] is s_m3
+        assert not np.all(s_e3[:, 0] == s_e2[:, 0])
+
+    def test_geometry_change(self):
+        nC = self.mesh.nC
+        self.prob.model = np.r_[
+            np.log(1e-2) * np.ones(nC), mu_0 * np.ones(nC)
+        ]
+        loop = FDEM.Src.CircularLoop([], freq=1., loc=np.r_[0., 0., 0.])
+        self.srcList = self.srcList + [loop]
+        self.prob.unpair()
+        self.prob.pair(FDEM.Survey(self.srcList))
+        s_m, s_e = self.compare()
+
+        # moving a source refreshes its source term
+        self.srcList[0].loc = np.r_[1., 1., 1.]
+        s_m2, s_e2 = self.compare()
+        assert s_m2 is not s_m
+        assert not np.allclose(s_m2[:, 0], s_m[:, 0])
+        assert np.all(s_m2[:, 3] == s_m[:, 3])
+
+        # so does a new loop radius
+        loop.radius = 2.
+        s_m3, s_e3 = self.compare()
+        assert not np.allclose(s_m3[:, 3], s_m2[:, 3])
+
+    def test_batched_potentials(self):
+        nC = self.mesh.nC
+        self.prob.model = np.r_[
+            np.log(1e-2) * np.ones(nC), mu_0 * np.ones(nC)
+        ]
+        dipoles = [
+            FDEM.Src.MagDipole(
+                [], freq=1., loc=loc, moment=moment, orientation=orientation
+            ) for loc, moment, orientation in zip(
+                np.random.randn(3, 3), [1., 2., 3.], ['X', 'Y', 'Z']
+            )
+        ]
+        self.srcList = self.srcList + dipoles
+        self.prob.unpair()
+        self.prob.pair(FDEM.Survey(self.srcList))
+
+        # the source terms of all the dipoles are computed at once
+        self.compare()
+        for src in dipoles:
+            a = src._aSrcs[(self.mesh, 'EB')]
+            self.assertTrue(np.allclose(a, src._getaSrc(self.prob)))
+
+        # moving a source clears its potential
+        a = dipoles[0]._aSrc(self.prob)
+        dipoles[0].loc = np.r_[1., 1., 1.]
+        self.assertTrue(dipoles[0]._aSrcs is None)
+        self.assertFalse(np.allclose(a, dipoles[0]._aSrc(self.prob)))
 
 
 if __name__ == '__main__':
@@ -79,6 +79,101 @@ class DCProblemAnalyticTests_PDP(unittest.TestCase):
             print(">> DC analytic test for PDP Problem2D_CC is failed")
         self.assertTrue(passed)
 
+    def test_kyQuadrature(self, tolerance=0.05):
+        # fewer wavenumbers fitted to the offsets of the survey
+        for Problem in [DC.Problem2D_N, DC.Problem2D_CC]:
+            self.setUp()
+            problem = Problem(self.mesh, sigma=self.sigma)
+            problem.Solver = self.Solver
+            problem.pair(self.survey)
+            fitError = problem.setKyQuadrature(nky=5)
+            self.assertTrue(problem.nky == 5)
+            self.assertTrue(fitError < 1e-2)
+            self.assertTrue(fitError == problem.kyQuadratureError)
+            data = self.survey.dpred()
+            err = (
+                np.linalg.norm((data-self.data_anal)/self.data_anal)**2 /
+                self.data_anal.size
+            )
+            print(Problem.__name__, 'ky fit error {0:.2e}, data misfit {1:.2e}'.format(
+                fitError, err
+            ))
+            self.assertTrue(err < tolerance)
+
+    def test_getKyQuadrature(self):
+        from scipy.special import k0
+        r = np.logspace(1, 3, 50)
+        for nky in [4, 6, 8]:
+            kys, weights, error = DC.Utils.getKyQuadrature(10., 1000., nky)
+            self.assertTrue(kys.size == weights.size == nky)
+            # (1/pi) int K0(ky r) dky = 1/(2r)
+            whole = 2.*r*k0(np.outer(r, kys)).dot(weights)
+            self.assertTrue(np.abs(whole - 1.).max() <= 1.01*error)
+        self.assertTrue(error < 1e-3)
+
+    def test_getKyWeights(self):
+        from scipy.special import k0
+        kys = np.logspace(-6, 0, 400)
+        r, y = 50., np.r_[0., 20., 50., 100.]
+        weights = DC.Utils.getKyWeights(kys, y=y)
+        self.assertTrue(weights.shape == (kys.size, y.size))
+        for i, yi in enumerate(y):
+            self.assertTrue(np.allclose(
+                DC.Utils.getKyWeights(kys, y=yi), weights[:, i],
+                rtol=1e-14, atol=0.
+            ))
+        # (1/pi) int K0(ky r) cos(ky y) dky = 1/(2 sqrt(r^2 + y^2))
+        whole = 2.*np.sqrt(r**2 + y**2)*k0(kys*r).dot(weights)
+        self.assertTrue(np.abs(whole - 1.).max() < 2e-2)
+
+    def test_fields_to_space(self):
+        for Problem in [DC.Problem2D_N, DC.Problem2D_CC]:
+            self.setUp()
+            problem = Problem(self.mesh, sigma=self.sigma)
+            problem.Solver = self.Solver
+            problem.pair(self.survey)
+            f = problem.fields(None)
+            src = self.survey.srcList[0]
+            rx = src.rxList[0]
+            P = rx.getP(self.mesh, rx.projGLoc(f))
+            Pf = P*f[src, rx.projField, :]
+            for y in [0., 25.]:
+                phi = Utils.mkvc(
+                    problem.fields_to_space(f, y=y)[src, rx.projField]
+                )
+                self.assertTrue(np.allclose(
+                    P*phi, rx.IntTrapezoidal(problem.kys, Pf, y=y),
+                    rtol=1e-10, atol=0.
+                ))
+            # the weights of an offset are only computed once
+            self.assertTrue(
+                problem._kyWeights(y=25.) is problem._kyWeights(y=25.)
+            )
+            phi_y = rx.IntTrapezoidal(problem.kys, Pf, y=np.r_[0., 25.])
+            self.assertTrue(np.allclose(
+                P*phi, phi_y[:, 1], rtol=1e-10, atol=0.
+            ))
+            # one set of fields per offset
+            f_y = problem.fields_to_space(f, y=np.r_[0., 25.])
+            self.assertTrue(len(f_y) == 2)
+            for i, f_yi in enumerate(f_y):
+                self.assertTrue(np.allclose(
+                    P*Utils.mkvc(f_yi[src, rx.projField]), phi_y[:, i],
+                    rtol=1e-10, atol=0.
+                ))
+            # the receivers integrate at the offsets too
+            self.assertTrue(np.allclose(
+                rx.eval(problem.kys, src, self.mesh, f, y=np.r_[0., 25.]),
+                phi_y, rtol=1e-10, atol=0.
+            ))
+            self.assertTrue(np.allclose(
+                rx.eval(
+                    problem.kys, src, self.mesh, f,
+                    weights=problem._kyWeights(y=np.r_[0., 25.])
+                ),
+                phi_y, rtol=1e-10, atol=0.
+            ))
+
 
 class DCProblemAnalyticTests_DPP(unittest.TestCase):
 
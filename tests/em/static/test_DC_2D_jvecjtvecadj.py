@@ -1,4 +1,7 @@
 from __future__ import print_function
+import os
+import shutil
+import tempfile
 import unittest
 import numpy as np
 from SimPEG import (Mesh, Maps, Utils, DataMisfit, Regularization,
@@ -311,5 +314,61 @@ class DCProblemTestsN_storeJ(unittest.TestCase):
         )
         self.assertTrue(passed)
 
+class DCProblem_2DTests_Jmatrix(unittest.TestCase):
+
+    def get_prob(self, Problem, **kwargs):
+        cs = 12.5
+        hx = [(cs, 2, -1.3), (cs, 21), (cs, 2, 1.3)]
+        hy = [(cs, 2, -1.3), (cs, 8)]
+        mesh = Mesh.TensorMesh([hx, hy], x0="CN")
+        x = np.linspace(-100, 100., 9)
+        M = Utils.ndgrid(x-12.5, np.r_[0.])
+        N = Utils.ndgrid(x+12.5, np.r_[0.])
+        srcList = [
+            DC.Src.Pole([DC.Rx.Dipole_ky(M, N), DC.Rx.Pole_ky(M)], A)
+            for A in [np.r_[-150, 0.], np.r_[-130, 0.]]
+        ]
+        survey = DC.Survey_ky(srcList)
+        problem = Problem(mesh, rhoMap=Maps.IdentityMap(mesh), **kwargs)
+        problem.Ainv = [None for i in range(problem.nky)]
+        problem.pair(survey)
+        return problem
+
+    def test_blocks(self):
+        for Problem in [DC.Problem2D_CC, DC.Problem2D_N]:
+            problem = self.get_prob(Problem)
+            m = 1. + np.random.rand(problem.mesh.nC)
+            v = np.random.rand(problem.mesh.nC)
+            w = np.random.rand(problem.survey.nD)
+            Jv = problem.Jvec(m, v)
+            Jtw = problem.Jtvec(m, w)
+
+            tempdir = tempfile.mkdtemp()
+            try:
+                for kwargs, rtol in [
+                    ({'JmatrixBlockSize': 4}, 1e-10),
+                    (
+                        {'JmatrixBlockSize': 7, 'JmatrixDtype': np.float32},
+                        1e-5
+                    ),
+                    ({'JmatrixFile': os.path.join(tempdir, 'J.dat')}, 1e-10),
+                ]:
+                    problem = self.get_prob(Problem, storeJ=True, **kwargs)
+                    J = problem.getJ(m)
+                    self.assertTrue(J.shape == (problem.survey.nD, m.size))
+                    self.assertTrue(J.dtype == problem.JmatrixDtype)
+                    self.assertTrue(np.allclose(
+                        problem.Jvec(m, v), Jv, rtol=rtol,
+                        atol=rtol*np.abs(Jv).max()
+                    ))
+                    self.assertTrue(np.allclose(
+                        problem.Jtvec(m, w), Jtw, rtol=rtol,
+                        atol=rtol*np.abs(Jtw).max()
+                    ))
+                    del J, problem
+            finally:
+                shutil.rmtree(tempdir)
+
+
 if __name__ == '__main__':
     unittest.main()
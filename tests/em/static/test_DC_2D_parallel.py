@@ -0,0 +1,92 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps, Utils
+import SimPEG.EM.Static.DC as DC
+
+np.random.seed(41)
+
+
+def get_prob(Problem, nWorkers):
+    cs = 25.
+    hx = [(cs, 2, -1.3), (cs, 21), (cs, 2, 1.3)]
+    hy = [(cs, 2, -1.3), (cs, 8)]
+    mesh = Mesh.TensorMesh([hx, hy], x0="CN")
+    x = np.linspace(-100, 100., 5)
+    M = Utils.ndgrid(x-12.5, np.r_[0.])
+    N = Utils.ndgrid(x+12.5, np.r_[0.])
+    srcList = [
+        DC.Src.Dipole(
+            [DC.Rx.Dipole_ky(M, N)], np.r_[xA, 0.], np.r_[xA + 25., 0.]
+        )
+        for xA in [-200., 175.]
+    ]
+    survey = DC.Survey_ky(srcList)
+    prob = Problem(mesh, rhoMap=Maps.ExpMap(mesh), nWorkers=nWorkers)
+    prob.Ainv = [None for i in range(prob.nky)]
+    prob.pair(survey)
+    return prob
+
+
+class DC_2D_ParallelWavenumbers(unittest.TestCase):
+
+    def compare(self, Problem):
+        serial = get_prob(Problem, 1)
+        parallel = get_prob(Problem, 3)
+        try:
+            m = np.log(100.) + 0.2*np.random.randn(serial.mesh.nC)
+            v = np.random.randn(serial.mesh.nC)
+            w = np.random.randn(serial.survey.nD)
+
+            d = serial.survey.dpred(m)
+            self.assertTrue(np.allclose(
+                parallel.survey.dpred(m), d, rtol=1e-10, atol=0.
+            ))
+            workers = parallel._kyWorkers()
+
+            Jv = serial.Jvec(m, v)
+            Jtw = serial.Jtvec(m, w)
+            self.assertTrue(np.allclose(
+                parallel.Jvec(m, v), Jv, rtol=1e-10, atol=1e-12*abs(Jv).max()
+            ))
+            self.assertTrue(np.allclose(
+                parallel.Jtvec(m, w), Jtw, rtol=1e-10,
+                atol=1e-12*abs(Jtw).max()
+            ))
+            J = serial.getJ(m)
+            self.assertTrue(np.allclose(
+                parallel.getJ(m), J, rtol=1e-10, atol=1e-12*abs(J).max()
+            ))
+
+            # the same workers (and factorizations) are used throughout
+            self.assertTrue(parallel._kyWorkers() is workers)
+            self.assertTrue(len(workers) == 3)
+            self.assertTrue(
+                sorted(np.hstack([kyInds for kyInds, _, _ in workers])) ==
+                list(range(parallel.nky))
+            )
+
+            # a new mapping is not seen by the forked workers, they restart
+            for prob in [serial, parallel]:
+                prob.rhoMap = Maps.IdentityMap(prob.mesh)
+            d = serial.survey.dpred(2.*np.exp(m))
+            self.assertTrue(np.allclose(
+                parallel.survey.dpred(2.*np.exp(m)), d, rtol=1e-10, atol=0.
+            ))
+            restarted = parallel._kyWorkers()
+            self.assertTrue(restarted is not workers)
+        finally:
+            parallel.closeWorkers()
+
+        for _, _, process in workers + restarted:
+            self.assertFalse(process.is_alive())
+
+    def test_CC(self):
+        self.compare(DC.Problem2D_CC)
+
+    def test_N(self):
+        self.compare(DC.Problem2D_N)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ from SimPEG import Mesh, Maps
 from SimPEG.Utils import io_utils
 import shutil
 import os
+import tempfile
 
 try:
     from pymatsolver import Pardiso as Solver
@@ -404,5 +405,281 @@ class DCUtilsTests_fullspace(unittest.TestCase):
         shutil.rmtree(self.basePath)
 
 
+class DCUtilsTests_geometry(unittest.TestCase):
+
+    def setUp(self):
+        x = np.arange(0., 100., 10.)
+        M, N = np.c_[x[4:-1], np.zeros(5)], np.c_[x[5:], np.zeros(5)]
+        srcList = [
+            DC.Src.Dipole(
+                [DC.Rx.Dipole(M, N), DC.Rx.Pole(N)],
+                np.r_[x[i], 0.], np.r_[x[i+1], 0.]
+            )
+            for i in range(3)
+        ]
+        srcList.append(DC.Src.Pole([DC.Rx.Dipole(M, N)], np.r_[x[1], 0.]))
+        self.survey = DC.Survey(srcList)
+        self.x = x
+
+    def test_electrode_table(self):
+        locs, abmn = self.survey.getElectrodeTable()
+        self.assertTrue(np.all(np.sort(locs[:, 0]) == self.x))
+        self.assertTrue(abmn.shape == (self.survey.nD, 4))
+
+        self.survey.getABMN_locations()
+        A, B, M, N = [], [], [], []
+        for src in self.survey.srcList:
+            for rx in src.rxList:
+                if isinstance(src, DC.Src.Dipole):
+                    A.append(np.tile(src.loc[0], (rx.nD, 1)))
+                    B.append(np.tile(src.loc[1], (rx.nD, 1)))
+                else:
+                    A.append(np.tile(src.loc, (rx.nD, 1)))
+                    B.append(np.tile(src.loc, (rx.nD, 1)))
+                if isinstance(rx, DC.Rx.Dipole):
+                    M.append(rx.locs[0])
+                    N.append(rx.locs[1])
+                else:
+                    M.append(rx.locs)
+                    N.append(rx.locs)
+        for true, locs in zip(
+            [A, B, M, N], [
+                self.survey.a_locations, self.survey.b_locations,
+                self.survey.m_locations, self.survey.n_locations
+            ]
+        ):
+            self.assertTrue(np.all(np.vstack(true) == locs))
+
+    def test_electrode_table_updates(self):
+        self.survey.getABMN_locations()
+        src = self.survey.srcList[0]
+        src.loc = [np.r_[-10., 0.], np.r_[-20., 0.]]
+        self.survey.getABMN_locations()
+        rows = slice(0, src.nD)
+        self.assertTrue(np.all(self.survey.a_locations[rows] == src.loc[0]))
+        self.assertTrue(np.all(self.survey.b_locations[rows] == src.loc[1]))
+
+        rx = self.survey.srcList[-1].rxList[0]
+        rx.locs[0] = rx.locs[0] + 1.
+        self.survey.srcList = self.survey.srcList[1:]
+        locs, abmn = self.survey.getElectrodeTable()
+        self.assertTrue(abmn.shape == (self.survey.nD, 4))
+        self.assertTrue(np.all(locs[abmn[-rx.nD:, 2]] == rx.locs[0]))
+
+    def test_geometric_factor(self):
+        G = DCUtils.geometric_factor(
+            self.survey, survey_type='dipole-dipole', space_type='half-space'
+        )
+        self.survey.getABMN_locations()
+        a, b, m, n = [
+            loc[:, 0] for loc in [
+                self.survey.a_locations, self.survey.b_locations,
+                self.survey.m_locations, self.survey.n_locations
+            ]
+        ]
+
+        def inv(r):
+            return 1./np.abs(r)
+
+        Gtrue = (inv(m-a) - inv(m-b) - inv(n-a) + inv(n-b)) / (2*np.pi)
+        # pole sources and receivers repeat their electrode
+        poles = (a == b) | (m == n)
+        self.assertTrue(np.allclose(G[~poles], Gtrue[~poles]))
+        self.assertTrue(np.allclose(G[poles], 0.))
+
+        rhoApp = DCUtils.apparent_resistivity(
+            self.survey, survey_type='dipole-dipole', dobs=G*100., eps=0.
+        )
+        self.assertTrue(np.allclose(rhoApp[~poles], 100.))
+
+        midx, midz = DCUtils.source_receiver_midpoints(
+            self.survey, survey_type='dipole-dipole', dim=2
+        )
+        self.assertTrue(np.allclose(midx, (a + b + m + n)/4.))
+        self.assertTrue(np.allclose(midz, -np.abs(a + b - m - n)/4.))
+
+    def test_drapeTopo(self):
+        mesh = Mesh.TensorMesh([[(5., 30)], [(5., 10)]], x0=[-25., -40.])
+        topo = -5. * (mesh.vectorCCx > 40.)
+        actind = mesh.gridCC[:, 1] < np.interp(
+            mesh.gridCC[:, 0], mesh.vectorCCx, topo
+        )
+        self.survey.drapeTopo(mesh, actind, option='top')
+
+        locs, abmn = self.survey.getElectrodeTable()
+        self.assertTrue(np.all(np.sort(locs[:, 0]) == self.x))
+        self.assertTrue(np.allclose(locs[:, 1], -5. * (locs[:, 0] > 40.)))
+        # the sources and receivers are moved with the table
+        src = self.survey.srcList[0]
+        self.assertTrue(np.all(src.loc[1] == locs[abmn[0, 1]]))
+        self.assertTrue(np.all(src.rxList[1].locs == locs[abmn[5:10, 2]]))
+
+
+class DCUtilsTests_IO(unittest.TestCase):
+
+    def setUp(self):
+        self.basePath = tempfile.mkdtemp()
+        x = np.arange(0., 100., 10.)
+        M = np.c_[x[4:-1], 5.*np.ones(5), -np.ones(5)]
+        N = np.c_[x[5:], 5.*np.ones(5), -np.ones(5)]
+        srcList = [
+            DC.Src.Dipole(
+                [DC.Rx.Dipole(M, N)], np.r_[x[i], 0., -2.],
+                np.r_[x[i+1], 0., -2.]
+            )
+            for i in range(3)
+        ]
+        srcList.append(DC.Src.Pole([DC.Rx.Pole(N)], np.r_[x[1], 0., -2.]))
+        survey = DC.Survey(srcList)
+        survey.dobs = np.random.randn(survey.nD)
+        survey.std = np.random.rand(survey.nD)
+        survey.eps = 1e-3
+        self.survey = survey
+
+    def tearDown(self):
+        shutil.rmtree(self.basePath)
+
+    def test_obs_format(self):
+        obsfile = os.path.sep.join([self.basePath, 'obs.txt'])
+        DCUtils.writeUBC_DCobs(obsfile, self.survey, 3, 'GENERAL')
+        with open(obsfile, 'r') as fid:
+            lines = fid.read().split('\n')
+
+        # the line by line layout of the format
+        true = ['! GENERAL FORMAT']
+        count = 0
+        for src in self.survey.srcList:
+            locs, _ = src.electrodes
+            tx = np.r_[locs[0], locs[-1]] * np.r_[1., 1., -1., 1., 1., -1.]
+            true.append(
+                ' '.join('%e' % v for v in tx) + ' %i' % src.nD
+            )
+            rx = src.rxList[0]
+            M, N = rx.locs if isinstance(rx, DC.Rx.Dipole) else [rx.locs]*2
+            for m, n in zip(M, N):
+                row = np.r_[
+                    m*np.r_[1., 1., -1.], n*np.r_[1., 1., -1.],
+                    self.survey.dobs[count],
+                    self.survey.std[count] + self.survey.eps
+                ]
+                true.append(' '.join('%e' % v for v in row))
+                count += 1
+            true.append('')
+        self.assertTrue(lines == true + [''])
+
+    def test_obs_round_trip(self):
+        obsfile = os.path.sep.join([self.basePath, 'obs.txt'])
+        for format_type in ['GENERAL', 'SURFACE']:
+            DCUtils.writeUBC_DCobs(
+                obsfile, self.survey, 3, format_type, ip_type=1
+            )
+            survey = DCUtils.readUBC_DC3Dobs(obsfile)['dc_survey']
+            self.assertTrue(survey.nSrc == self.survey.nSrc)
+            self.assertTrue(
+                [type(src) for src in survey.srcList] ==
+                [type(src) for src in self.survey.srcList]
+            )
+            self.assertTrue(np.allclose(survey.dobs, self.survey.dobs))
+            self.assertTrue(
+                np.allclose(survey.std, self.survey.std + self.survey.eps)
+            )
+
+            survey.getABMN_locations()
+            self.survey.getABMN_locations()
+            nDim = 3 if format_type == 'GENERAL' else 2
+            for name in ['a', 'b', 'm', 'n']:
+                locs = getattr(survey, name + '_locations')
+                self.assertTrue(np.allclose(
+                    locs[:, :nDim],
+                    getattr(self.survey, name + '_locations')[:, :nDim]
+                ))
+                if nDim == 2:
+                    self.assertTrue(np.all(np.isnan(locs[:, 2])))
+
+            # the file of the survey read back is the same
+            with open(obsfile, 'r') as fid:
+                text = fid.read()
+            DCUtils.writeUBC_DCobs(
+                obsfile, survey, 3, format_type, ip_type=1
+            )
+            with open(obsfile, 'r') as fid:
+                self.assertTrue(fid.read() == text)
+
+    def test_legacy_files(self):
+        # files written by the previous, line by line, writer
+        dataPath = os.path.sep.join([
+            os.path.dirname(os.path.abspath(__file__)), 'data'
+        ])
+        x = np.arange(0., 100., 10.)
+        M = np.c_[x[4:-1], 5.*np.ones(5), -np.ones(5)]
+        N = np.c_[x[5:], 5.*np.ones(5), -np.ones(5)]
+        survey = DC.Survey([
+            DC.Src.Dipole(
+                [DC.Rx.Dipole(M.copy(), N.copy())], np.r_[x[i], 0., -2.],
+                np.r_[x[i+1], 0., -2.]
+            )
+            for i in range(3)
+        ])
+        survey.dobs = np.linspace(-1., 1., survey.nD)
+        survey.std = np.linspace(0.01, 0.1, survey.nD)
+        survey.eps = 1e-3
+
+        obsfile = os.path.sep.join([self.basePath, 'obs.txt'])
+        for format_type in ['GENERAL', 'SURFACE']:
+            legacy = os.path.sep.join([
+                dataPath, 'legacy_{}.obs'.format(format_type)
+            ])
+            DCUtils.writeUBC_DCobs(obsfile, survey, 3, format_type)
+            with open(obsfile, 'r') as fid, open(legacy, 'r') as fidLegacy:
+                self.assertTrue(fid.read() == fidLegacy.read())
+
+        read = DCUtils.readUBC_DC3Dobs(
+            os.path.sep.join([dataPath, 'legacy_GENERAL.obs'])
+        )['dc_survey']
+        self.assertTrue(np.allclose(read.dobs, survey.dobs))
+        self.assertTrue(np.allclose(read.std, survey.std + survey.eps))
+        read.getABMN_locations()
+        survey.getABMN_locations()
+        for name in ['a', 'b', 'm', 'n']:
+            self.assertTrue(np.allclose(
+                getattr(read, name + '_locations'),
+                getattr(survey, name + '_locations')
+            ))
+
+    def test_cache(self):
+        obsfile = os.path.sep.join([self.basePath, 'obs.txt'])
+        DCUtils.writeUBC_DCobs(obsfile, self.survey, 3, 'GENERAL')
+        survey = DCUtils.readUBC_DC3Dobs(obsfile, cache=True)['dc_survey']
+        self.assertTrue(os.path.exists(obsfile + '.npz'))
+        cached = DCUtils.readUBC_DC3Dobs(obsfile, cache=True)['dc_survey']
+        self.assertTrue(np.all(cached.dobs == survey.dobs))
+
+        # a changed file is read again
+        self.survey.dobs = self.survey.dobs + 1.
+        DCUtils.writeUBC_DCobs(obsfile, self.survey, 3, 'GENERAL')
+        stat = os.stat(obsfile)
+        os.utime(obsfile, (stat.st_atime, stat.st_mtime + 10.))
+        cached = DCUtils.readUBC_DC3Dobs(obsfile, cache=True)['dc_survey']
+        self.assertTrue(np.allclose(cached.dobs, self.survey.dobs))
+
+    def test_2Dpre(self):
+        prefile = os.path.sep.join([self.basePath, 'dc.pre'])
+        A = np.r_[0., 0., 0., 10., 10.]
+        M = np.r_[20., 30., 40., 30., 40.]
+        d = np.random.randn(5)
+        np.savetxt(
+            prefile, np.c_[A, A + 10., M, M + 10., d], header='comment',
+            comments='! '
+        )
+        survey = DCUtils.readUBC_DC2Dpre(prefile)['dc_survey']
+
+        # consecutive data of a transmitter are one source
+        self.assertTrue(survey.nSrc == 2)
+        self.assertTrue(np.allclose(survey.dobs, d))
+        survey.getABMN_locations()
+        self.assertTrue(np.all(survey.a_locations[:, 0] == A))
+        self.assertTrue(np.all(survey.n_locations[:, 0] == M + 10.))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,7 @@
 from __future__ import print_function
+import os
+import shutil
+import tempfile
 import unittest
 import numpy as np
 from SimPEG import (Mesh, Maps, DataMisfit, Regularization, Inversion,
@@ -307,5 +310,118 @@ class DCProblemTestsN_storeJ(unittest.TestCase):
         )
         self.assertTrue(passed)
 
+class DCProblemTests_Jmatrix(unittest.TestCase):
+
+    def get_prob(self, Problem, **kwargs):
+        aSpacing = 2.5
+        nElecs = 5
+
+        surveySize = nElecs*aSpacing - aSpacing
+        cs = surveySize / nElecs / 4
+
+        mesh = Mesh.TensorMesh([
+            [(cs, 10, -1.3), (cs, surveySize / cs), (cs, 10, 1.3)],
+            [(cs, 3, -1.3), (cs, 3, 1.3)],
+        ], 'CN')
+
+        srcList = DC.Utils.WennerSrcList(nElecs, aSpacing, in2D=True)
+        survey = DC.Survey(srcList)
+        problem = Problem(mesh, rhoMap=Maps.IdentityMap(mesh), **kwargs)
+        problem.pair(survey)
+        return problem
+
+    def test_blocks(self):
+        for Problem in [DC.Problem3D_CC, DC.Problem3D_N]:
+            problem = self.get_prob(Problem)
+            m = 1. + np.random.rand(problem.mesh.nC)
+            v = np.random.rand(problem.mesh.nC)
+            w = np.random.rand(problem.survey.nD)
+            Jv = problem.Jvec(m, v)
+            Jtw = problem.Jtvec(m, w)
+
+            tempdir = tempfile.mkdtemp()
+            try:
+                for kwargs, rtol in [
+                    ({'JmatrixBlockSize': 1}, 1e-10),
+                    (
+                        {'JmatrixBlockSize': 3, 'JmatrixDtype': np.float32},
+                        1e-5
+                    ),
+                    ({'JmatrixFile': os.path.join(tempdir, 'J.dat')}, 1e-10),
+                ]:
+                    problem = self.get_prob(Problem, storeJ=True, **kwargs)
+                    J = problem.getJ(m)
+                    self.assertTrue(J.shape == (problem.survey.nD, m.size))
+                    self.assertTrue(J.dtype == problem.JmatrixDtype)
+                    if 'JmatrixFile' in kwargs:
+                        self.assertTrue(isinstance(J, np.memmap))
+                    self.assertTrue(np.allclose(
+                        problem.Jvec(m, v), Jv, rtol=rtol,
+                        atol=rtol*np.abs(Jv).max()
+                    ))
+                    self.assertTrue(np.allclose(
+                        problem.Jtvec(m, w), Jtw, rtol=rtol,
+                        atol=rtol*np.abs(Jtw).max()
+                    ))
+                    del J, problem
+            finally:
+                shutil.rmtree(tempdir)
+
+
+class DCProblemTests_Electrodes(unittest.TestCase):
+
+    def get_prob(self, Problem, **kwargs):
+        cs = 0.5
+        mesh = Mesh.TensorMesh([
+            [(cs, 10, -1.3), (cs, 24), (cs, 10, 1.3)],
+            [(cs, 6, -1.3), (cs, 6)],
+        ], 'CN')
+
+        # every pair of 6 electrodes is a source
+        x = np.linspace(-5., 5., 6)
+        M, N = np.c_[x[:-1], np.zeros(5)], np.c_[x[1:], np.zeros(5)]
+        srcList = [
+            DC.Src.Dipole(
+                [DC.Rx.Dipole(M, N), DC.Rx.Pole(M)],
+                np.r_[x[i], 0.], np.r_[x[j], 0.]
+            )
+            for i in range(x.size) for j in range(i+1, x.size)
+        ]
+        srcList.append(DC.Src.Pole([DC.Rx.Dipole(M, N)], np.r_[x[2], 0.]))
+        survey = DC.Survey(srcList)
+        problem = Problem(mesh, rhoMap=Maps.IdentityMap(mesh), **kwargs)
+        problem.pair(survey)
+        return problem
+
+    def test_superposition(self):
+        for Problem, storeJ in [
+            (DC.Problem3D_CC, False), (DC.Problem3D_CC, True),
+            (DC.Problem3D_N, False), (DC.Problem3D_N, True)
+        ]:
+            problem = self.get_prob(Problem, storeJ=storeJ)
+            m = 1. + np.random.rand(problem.mesh.nC)
+            v = np.random.rand(problem.mesh.nC)
+            w = np.random.rand(problem.survey.nD)
+            d = problem.survey.dpred(m)
+            Jv = problem.Jvec(m, v)
+            Jtw = problem.Jtvec(m, w)
+
+            problem = self.get_prob(
+                Problem, superposeElectrodes=True, storeJ=storeJ,
+                JmatrixBlockSize=4
+            )
+            f = problem.fields(m)
+            # one solve per electrode rather than per source
+            self.assertTrue(problem._electrodeFields.shape[1] == 6)
+            for a, b in [
+                (problem.survey.dpred(m, f=f), d),
+                (problem.Jvec(m, v, f=f), Jv),
+                (problem.Jtvec(m, w, f=f), Jtw),
+            ]:
+                self.assertTrue(np.allclose(
+                    a, b, rtol=1e-8, atol=1e-10*np.abs(b).max()
+                ))
+
+
 if __name__ == '__main__':
     unittest.main()
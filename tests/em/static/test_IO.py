@@ -3,6 +3,7 @@
 from SimPEG import DC
 import matplotlib.pyplot as plt
 import numpy as np
+import time
 import unittest
 
 
@@ -66,5 +67,52 @@ class TestsIO(unittest.TestCase):
                 )
             plt.show()
 
+    def test_bulk_survey(self):
+        # 100k data of random four electrode arrays on 200 electrodes, the
+        # survey (with its geometric factors) must be built within budget
+        budget = 5.  # seconds, about 1s on a laptop
+        nD, nE = 100000, 200
+        x = np.c_[np.arange(nE) * 5., np.zeros(nE), np.zeros(nE)]
+        abmn = np.cumsum(np.c_[
+            np.random.randint(0, 100, nD), np.random.randint(1, 50, nD),
+            np.random.randint(1, 25, (nD, 2))
+        ], axis=1)
+        A, B, M, N = [x[abmn[:, i]] for i in range(4)]
+        data = np.random.rand(nD)
+        std = np.random.rand(nD)
+
+        start = time.time()
+        survey = self.IO.from_ambn_locations_to_survey(
+            A, B, M, N, 'dipole-dipole', data_dc=data, uncertainty_dc=std,
+            dimension=3
+        )
+        elapsed = time.time() - start
+        self.assertTrue(
+            elapsed < budget,
+            'built 100k data in {:.2f}s, budget {:.0f}s'.format(
+                elapsed, budget
+            )
+        )
+        self.assertTrue(survey.nD == nD)
+        self.assertTrue(np.all(np.sort(self.IO.sort_inds) == np.arange(nD)))
+        self.assertTrue(np.all(self.IO.data_dc == data[self.IO.sort_inds]))
+        self.assertTrue(
+            np.all(self.IO.uncertainty_dc == std[self.IO.sort_inds])
+        )
+
+        # the sources and receivers hold the sorted data
+        survey.getABMN_locations()
+        for true, locs in zip(
+            [A, B, M, N], [
+                survey.a_locations, survey.b_locations,
+                survey.m_locations, survey.n_locations
+            ]
+        ):
+            self.assertTrue(np.all(true[self.IO.sort_inds] == locs))
+        self.assertTrue(np.allclose(
+            self.IO.G, self.IO.geometric_factor(survey), rtol=1e-12
+        ))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -108,5 +108,133 @@ class IPProblemAnalyticTests(unittest.TestCase):
             print(">> IP forward test for Problem3D_CC is failed")
         self.assertTrue(passed)
 
+
+class IPProblemAttachedDCTests(unittest.TestCase):
+
+    def setUp(self):
+        h = [(10., 3, -1.3), (10., 8), (10., 3, 1.3)]
+        self.mesh = Mesh.TensorMesh(
+            [h, h, [(10., 3, -1.3), (10., 5), (10., 3, 1.3)]], 'CCN'
+        )
+        self.act = self.mesh.gridCC[:, 2] < -10.
+        x = np.linspace(-30., 30., 5)
+        self.M = Utils.ndgrid(x-5., np.r_[0.], np.r_[-10.])
+        self.N = Utils.ndgrid(x+5., np.r_[0.], np.r_[-10.])
+
+    def get_srcList(self):
+        return [
+            DC.Src.Dipole(
+                [DC.Rx.Dipole(self.M, self.N)], np.r_[xA, 0., -10.],
+                np.r_[xA + 100., 0., -10.]
+            )
+            for xA in [-50., -40.]
+        ]
+
+    def compare(self, name):
+        factorizations = []
+
+        class CountingSolver(Solver):
+            def __init__(self, A, **kwargs):
+                factorizations.append(A)
+                Solver.__init__(self, A, **kwargs)
+
+        expmap = Maps.ExpMap(self.mesh) * Maps.InjectActiveCells(
+            self.mesh, self.act, np.log(1e-8)
+        )
+        problemDC = getattr(DC, name)(
+            self.mesh, sigmaMap=expmap, storeJ=True, Solver=CountingSolver
+        )
+        problemDC.pair(DC.Survey(self.get_srcList()))
+        m = np.log(1e-2) + 0.3*np.random.randn(self.act.sum())
+        J = problemDC.getJ(m)
+        nFactorizations = len(factorizations)
+
+        etaMap = Maps.InjectActiveCells(self.mesh, self.act, 0.)
+        problemIP = getattr(IP, name)(
+            self.mesh, etaMap=etaMap, dcProblem=problemDC, storeJ=True,
+            Solver=CountingSolver
+        )
+        problemIP.pair(IP.Survey(self.get_srcList()))
+        eta = 0.1*np.random.rand(self.act.sum())
+        data = problemIP.survey.dpred(eta)
+
+        # the DC factorization and sensitivity are reused
+        self.assertTrue(len(factorizations) == nFactorizations)
+        self.assertTrue(np.allclose(problemIP.getJ(eta), -J))
+        self.assertTrue(problemIP.getJ(eta) is problemIP.getJ(eta + 1.))
+
+        problemIP0 = getattr(IP, name)(
+            self.mesh, etaMap=etaMap, sigma=problemDC.sigma
+        )
+        problemIP0.Solver = Solver
+        problemIP0.pair(IP.Survey(self.get_srcList()))
+        data0 = problemIP0.survey.dpred(eta)
+        self.assertTrue(
+            np.linalg.norm(data - data0) < 1e-10 * np.linalg.norm(data0)
+        )
+
+        # with a nonlinear etaMap the stored sensitivity follows the model
+        expEta = etaMap * Maps.ExpMap(nP=self.act.sum())
+        problems = []
+        for kwargs in [
+            {'dcProblem': problemDC, 'storeJ': True},
+            {'sigma': problemDC.sigma}
+        ]:
+            problem = getattr(IP, name)(
+                self.mesh, etaMap=expEta, Solver=Solver, **kwargs
+            )
+            problem.pair(IP.Survey(self.get_srcList()))
+            problems.append(problem)
+        v = np.random.randn(eta.size)
+        for mEta in [np.log(eta), np.log(eta) + 0.5]:
+            Jv = problems[1].Jvec(mEta, v)
+            self.assertTrue(np.allclose(
+                problems[0].Jvec(mEta, v), Jv, rtol=1e-8,
+                atol=1e-10*np.abs(Jv).max()
+            ))
+
+        # without a stored DC sensitivity only the factorization is shared
+        problemDC.storeJ = False
+        problemDC._Jmatrix = None
+        problemIP = getattr(IP, name)(
+            self.mesh, etaMap=etaMap, dcProblem=problemDC,
+            Solver=CountingSolver
+        )
+        problemIP.pair(IP.Survey(self.get_srcList()))
+        w = np.random.randn(data.size)
+        self.assertTrue(np.allclose(
+            problemIP.Jtvec(eta, w), problemIP0.Jtvec(eta, w)
+        ))
+        self.assertTrue(len(factorizations) == nFactorizations)
+
+        # a new conductivity is factorized once, by the DC problem
+        problemDC.model = m + 0.1
+        problemIP.survey.dpred(eta)
+        self.assertTrue(len(factorizations) == nFactorizations + 1)
+        self.assertTrue(np.all(problemIP.sigma == problemDC.sigma))
+
+        # the DC problem must share the mesh, the data and the formulation
+        # of the IP problem
+        problemIP = getattr(IP, name)(
+            self.mesh, etaMap=etaMap, dcProblem=problemDC
+        )
+        problemIP.pair(IP.Survey(self.get_srcList()[:1]))
+        self.assertRaises(AssertionError, problemIP.fields, eta)
+
+        # and its formulation
+        other = {'Problem3D_CC': 'Problem3D_N', 'Problem3D_N': 'Problem3D_CC'}
+        problemIP = getattr(IP, other[name])(
+            self.mesh, etaMap=etaMap, dcProblem=problemDC
+        )
+        problemIP.pair(IP.Survey(self.get_srcList()))
+        self.assertRaises(AssertionError, problemIP.fields, eta)
+
+    def test_Problem3D_CC(self):
+        self.compare('Problem3D_CC')
+
+    def test_Problem3D_N(self):
+        self.compare('Problem3D_N')
+
+
 if __name__ == '__main__':
     unittest.main()
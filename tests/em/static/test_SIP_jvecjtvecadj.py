@@ -312,5 +312,84 @@ class IPProblemTestsN_air(unittest.TestCase):
         )
         self.assertTrue(passed)
 
+
+class SIPProblemTestsTimeChannels(unittest.TestCase):
+
+    def get_problem(self, name, **kwargs):
+        mesh = Mesh.TensorMesh(
+            [[(25., 12)], [(25., 12)], [(25., 8)]], x0="CCN"
+        )
+        x = np.linspace(-100., 100., 5)
+        M = Utils.ndgrid(x-12.5, np.r_[0.], np.r_[0.])
+        N = Utils.ndgrid(x+12.5, np.r_[0.], np.r_[0.])
+        times = np.arange(6)*1e-3 + 1e-3
+        srcList = [
+            SIP.Src.Dipole(
+                [
+                    SIP.Rx.Dipole(M, N, times),
+                    SIP.Rx.Dipole(M[:3], N[:3], times[1::2])
+                ],
+                np.r_[xA, 0., 0.], np.r_[xA + 200., 0., 0.]
+            )
+            for xA in [-140., -110., -90.]
+        ]
+        # trailing receiver locations without times are not in the data
+        srcList[-1].rxList.append(SIP.Rx.Dipole(M[:2], N[:2], times[:0]))
+        survey = SIP.Survey(srcList)
+        wires = Maps.Wires(('eta', mesh.nC), ('taui', mesh.nC))
+        problem = getattr(SIP, name)(
+            mesh, rho=100.*np.ones(mesh.nC), sigma=1e-2*np.ones(mesh.nC),
+            etaMap=wires.eta, tauiMap=wires.taui, **kwargs
+        )
+        problem.Solver = Solver
+        problem.pair(survey)
+        return problem
+
+    def compare(self, name):
+        problem = self.get_problem(name)
+        survey = problem.survey
+        nC = problem.mesh.nC
+        m = np.r_[0.1*np.random.rand(nC), 1./(0.01 + np.random.rand(nC))]
+        v = np.random.randn(2*nC)
+        w = np.random.randn(survey.nD)
+
+        d = survey.dpred(m)
+        Jv = problem.Jvec(m, v)
+        Jtw = problem.Jtvec(m, w)
+        wJv = w.dot(Jv)
+        self.assertTrue(np.abs(wJv - v.dot(Jtw)) < 1e-10*np.abs(wJv))
+
+        # the data are ordered by sources, receivers and receiver times
+        J0 = problem.getJ0(m)
+        data = SIP.Data(survey)
+        start = 0
+        for src in survey.srcList:
+            for rx in src.rxList:
+                for t in rx.times:
+                    data[src, rx, t] = J0[start:start+rx.nRx].dot(
+                        problem.DebyeTime(t)
+                    )
+                start += rx.nRx
+        self.assertTrue(np.allclose(d, data.tovec(), rtol=1e-10, atol=0.))
+
+        for kwargs in [{'storeJ': True}, {'nWorkers': 2}]:
+            other = self.get_problem(name, **kwargs)
+            self.assertTrue(
+                np.allclose(other.survey.dpred(m), d, rtol=1e-10, atol=0.)
+            )
+            self.assertTrue(np.allclose(
+                other.Jvec(m, v), Jv, rtol=1e-10, atol=1e-12*abs(Jv).max()
+            ))
+            self.assertTrue(np.allclose(
+                other.Jtvec(m, w), Jtw, rtol=1e-10, atol=1e-12*abs(Jtw).max()
+            ))
+
+    def test_CC(self):
+        self.compare('Problem3D_CC')
+
+    def test_N(self):
+        self.compare('Problem3D_N')
+
+
 if __name__ == '__main__':
     unittest.main()
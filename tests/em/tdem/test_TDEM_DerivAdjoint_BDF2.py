@@ -0,0 +1,179 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps, Tests
+from SimPEG import EM
+
+try:
+    from pymatsolver import Pardiso as Solver
+except ImportError:
+    from SimPEG import SolverLU as Solver
+
+TOL = 1e-4
+
+np.random.seed(42)
+
+
+def get_mesh():
+    cs = 10.
+    ncx = 4
+    ncy = 4
+    ncz = 4
+    npad = 2
+    return Mesh.TensorMesh(
+        [
+            [(cs, npad, -1.5), (cs, ncx), (cs, npad, 1.5)],
+            [(cs, npad, -1.5), (cs, ncy), (cs, npad, 1.5)],
+            [(cs, npad, -1.5), (cs, ncz), (cs, npad, 1.5)]
+        ], 'CCC'
+    )
+
+
+def get_mapping(mesh):
+    active = mesh.vectorCCz < 0.
+    activeMap = Maps.InjectActiveCells(
+        mesh, active, np.log(1e-8), nC=mesh.nCz
+    )
+    return (
+        Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * activeMap
+    )
+
+
+def get_prob(mesh, mapping, formulation):
+    prb = getattr(EM.TDEM, 'Problem3D_{}'.format(formulation))(
+        mesh, sigmaMap=mapping, timeIntegration='BDF2'
+    )
+    # changing step sizes exercise the variable step coefficients
+    prb.timeSteps = [(1e-05, 5), (5e-05, 5), (2.5e-4, 5)]
+    prb.Solver = Solver
+    return prb
+
+
+def get_survey(rxcomp):
+    rx = getattr(EM.TDEM.Rx, 'Point_{}'.format(rxcomp[:-1]))(
+        locs=np.array([[15., 0., -1e-2]]), times=np.logspace(-4, -3, 10),
+        orientation=rxcomp[-1]
+    )
+    src1 = EM.TDEM.Src.MagDipole([rx], loc=np.array([0., 0., 0.]))
+    src2 = EM.TDEM.Src.MagDipole([rx], loc=np.array([0., 0., 8.]))
+    return EM.TDEM.Survey([src1, src2])
+
+
+class BDF2_DerivAdjoint_Test(unittest.TestCase):
+
+    def setUpProb(self, formulation, rxcomp):
+        mesh = get_mesh()
+        prob = get_prob(mesh, get_mapping(mesh), formulation)
+        survey = get_survey(rxcomp)
+        prob.pair(survey)
+        m = (
+            np.log(1e-1)*np.ones(prob.sigmaMap.nP) +
+            1e-3*np.random.randn(prob.sigmaMap.nP)
+        )
+        return prob, survey, m
+
+    def JvecTest(self, formulation, rxcomp):
+        prob, survey, m = self.setUpProb(formulation, rxcomp)
+        f = prob.fields(m)
+
+        mesh = get_mesh()
+        probfwd = get_prob(mesh, get_mapping(mesh), formulation)
+        probfwd.pair(get_survey(rxcomp))
+
+        def derChk(mx):
+            return [
+                probfwd.survey.dpred(mx),
+                lambda v: prob.Jvec(m, v, f=f)
+            ]
+        print('test_Jvec_BDF2_{}_{}'.format(formulation, rxcomp))
+        self.assertTrue(
+            Tests.checkDerivative(derChk, m, plotIt=False, num=2, eps=1e-20)
+        )
+
+    def AdjointTest(self, formulation, rxcomp):
+        prob, survey, m = self.setUpProb(formulation, rxcomp)
+        f = prob.fields(m)
+
+        v = np.random.rand(prob.sigmaMap.nP)
+        d = np.random.randn(survey.nD)
+        V1 = d.dot(prob.Jvec(m, v, f=f))
+        V2 = v.dot(prob.Jtvec(m, d, f=f))
+        tol = TOL * (np.abs(V1) + np.abs(V2)) / 2.
+        print(
+            'Adjoint BDF2 {} {}: {} {}'.format(formulation, rxcomp, V1, V2)
+        )
+        self.assertTrue(np.abs(V1-V2) < tol)
+
+    def test_Jvec_b_bz(self):
+        self.JvecTest('b', 'bz')
+
+    def test_Jvec_e_dbdtx(self):
+        self.JvecTest('e', 'dbdtx')
+
+    def test_Jvec_h_hz(self):
+        self.JvecTest('h', 'hz')
+
+    def test_Jvec_j_jy(self):
+        self.JvecTest('j', 'jy')
+
+    def test_Adjoint_b_bz(self):
+        self.AdjointTest('b', 'bz')
+
+    def test_Adjoint_e_ey(self):
+        self.AdjointTest('e', 'ey')
+
+    def test_Adjoint_h_hz(self):
+        self.AdjointTest('h', 'hz')
+
+    def test_Adjoint_j_jy(self):
+        self.AdjointTest('j', 'jy')
+
+
+class BDF2_Accuracy_Test(unittest.TestCase):
+
+    def test_time_accuracy(self):
+        # compare against a finely time-stepped reference so that only the
+        # time discretization error is measured
+        cs, ncx, ncz, npad = 5., 30, 10, 15
+        hx = [(cs, ncx), (cs, npad, 1.3)]
+        hz = [(cs, npad, -1.3), (cs, ncz), (cs, npad, 1.3)]
+        mesh = Mesh.CylMesh([hx, 1, hz], '00C')
+
+        active = mesh.vectorCCz < 0.
+        actMap = Maps.InjectActiveCells(
+            mesh, active, np.log(1e-8), nC=mesh.nCz
+        )
+        mapping = Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * actMap
+        sigma = np.ones(mesh.nCz)*1e-8
+        sigma[active] = 1e-2
+        m = np.log(sigma[active])
+
+        def dpred(timeIntegration, timeSteps):
+            rx = EM.TDEM.Rx.Point_b(
+                np.array([[50., 0., 0.]]), np.linspace(2e-5, 1e-4, 9), 'z'
+            )
+            src = EM.TDEM.Src.MagDipole([rx], loc=np.array([0., 0., 0.]))
+            survey = EM.TDEM.Survey([src])
+            prb = EM.TDEM.Problem3D_b(
+                mesh, sigmaMap=mapping, timeIntegration=timeIntegration
+            )
+            prb.Solver = Solver
+            prb.timeSteps = timeSteps
+            prb.pair(survey)
+            return survey.dpred(m)
+
+        bz_ref = dpred('BDF2', [(2e-7, 500)])
+
+        err = {}
+        for timeIntegration in ['BackwardEuler', 'BDF2']:
+            bz = dpred(timeIntegration, [(2e-06, 50)])
+            err[timeIntegration] = (
+                np.linalg.norm(bz - bz_ref) / np.linalg.norm(bz_ref)
+            )
+            print('{}: {}'.format(timeIntegration, err[timeIntegration]))
+
+        self.assertTrue(err['BDF2'] < 0.1 * err['BackwardEuler'])
+
+
+if __name__ == '__main__':
+    unittest.main()
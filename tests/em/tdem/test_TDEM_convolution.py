@@ -0,0 +1,184 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps, Tests
+from SimPEG import EM
+
+try:
+    from pymatsolver import Pardiso as Solver
+except ImportError:
+    from SimPEG import SolverLU as Solver
+
+TOL = 1e-4
+
+np.random.seed(42)
+
+
+def get_cyl_mesh():
+    cs, ncx, ncz, npad = 5., 30, 10, 15
+    hx = [(cs, ncx), (cs, npad, 1.3)]
+    hz = [(cs, npad, -1.3), (cs, ncz), (cs, npad, 1.3)]
+    return Mesh.CylMesh([hx, 1, hz], '00C')
+
+
+def get_tensor_mesh():
+    cs, nc, npad = 10., 4, 2
+    h = [(cs, npad, -1.5), (cs, nc), (cs, npad, 1.5)]
+    return Mesh.TensorMesh([h, h, h], 'CCC')
+
+
+def get_mapping(mesh):
+    active = mesh.vectorCCz < 0.
+    actMap = Maps.InjectActiveCells(mesh, active, np.log(1e-8), nC=mesh.nCz)
+    return Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * actMap
+
+
+class TDEM_WaveformQuadrature(unittest.TestCase):
+
+    def test_stepoff(self):
+        tau, w = EM.TDEM.Src.StepOffWaveform().stepOffQuadrature()
+        self.assertTrue(np.all(tau == np.r_[0.]))
+        self.assertTrue(np.all(w == np.r_[1.]))
+
+    def test_weights(self):
+        # waveforms with initial fields start from a unit current, the
+        # others switch on and off within the waveform
+        for waveform, total in [
+            (EM.TDEM.Src.RampOffWaveform(offTime=1e-5), 1.),
+            (EM.TDEM.Src.TriangularWaveform(offTime=4e-5, peakTime=1e-5), 0.),
+            (EM.TDEM.Src.VTEMWaveform(), 0.),
+        ]:
+            tau, w = waveform.stepOffQuadrature()
+            self.assertTrue(np.all(np.diff(tau) > 0))
+            self.assertTrue(tau[-1] == waveform.offTime)
+            self.assertTrue(np.abs(w.sum() - total) < 1e-12)
+
+
+class TDEM_ConvolutionForward(unittest.TestCase):
+
+    def test_convolution_vs_timestepping(self):
+        mesh = get_cyl_mesh()
+        mapping = get_mapping(mesh)
+        sigma = np.ones(mesh.nCz)*1e-8
+        sigma[mesh.vectorCCz < 0.] = 1e-2
+        m = np.log(sigma[mesh.vectorCCz < 0.])
+
+        waveform = EM.TDEM.Src.TriangularWaveform(
+            offTime=4e-5, peakTime=1e-5
+        )
+
+        def dpred(convolveWaveforms):
+            rx = EM.TDEM.Rx.Point_dbdt(
+                np.array([[50., 0., 0.]]),
+                waveform.offTime + np.logspace(-5, -4, 11), 'z'
+            )
+            src = EM.TDEM.Src.MagDipole(
+                [rx], waveform=waveform, loc=np.array([0., 0., 0.])
+            )
+            survey = EM.TDEM.Survey([src])
+            prb = EM.TDEM.Problem3D_b(
+                mesh, sigmaMap=mapping, convolveWaveforms=convolveWaveforms
+            )
+            prb.Solver = Solver
+            prb.timeSteps = [(5e-7, 300)]
+            prb.pair(survey)
+            return survey.dpred(m)
+
+        d_ts = dpred(False)
+        d_conv = dpred(True)
+        err = np.linalg.norm(d_conv - d_ts) / np.linalg.norm(d_ts)
+        self.assertTrue(
+            err < 0.05, 'convolution vs time stepping: {}'.format(err)
+        )
+
+    def test_offtime_only(self):
+        mesh = get_tensor_mesh()
+        waveform = EM.TDEM.Src.VTEMWaveform(offTime=4e-5, peakTime=3e-5)
+        rx = EM.TDEM.Rx.Point_b(
+            np.array([[15., 0., 0.]]), np.logspace(-5, -4, 5), 'z'
+        )
+        src = EM.TDEM.Src.MagDipole(
+            [rx], waveform=waveform, loc=np.array([0., 0., 0.])
+        )
+        survey = EM.TDEM.Survey([src])
+        prb = EM.TDEM.Problem3D_b(
+            mesh, sigmaMap=get_mapping(mesh), convolveWaveforms=True
+        )
+        prb.timeSteps = [(1e-5, 20)]
+        prb.Solver = Solver
+        prb.pair(survey)
+        m = np.log(1e-2)*np.ones(prb.sigmaMap.nP)
+        with self.assertRaises(AssertionError):
+            survey.dpred(m)
+
+
+class TDEM_ConvolutionDerivAdjoint(unittest.TestCase):
+
+    def setUp(self):
+        mesh = get_tensor_mesh()
+        waveforms = [
+            EM.TDEM.Src.VTEMWaveform(offTime=4e-5, peakTime=3e-5),
+            EM.TDEM.Src.RampOffWaveform(offTime=1e-5),
+        ]
+        self.mesh = mesh
+        self.waveforms = waveforms
+        self.prob = self.get_prob()
+        self.m = (
+            np.log(1e-1)*np.ones(self.prob.sigmaMap.nP) +
+            1e-3*np.random.randn(self.prob.sigmaMap.nP)
+        )
+
+    def get_prob(self):
+        rxList = [
+            EM.TDEM.Rx.Point_dbdt(
+                np.array([[15., 0., -1e-2]]),
+                waveform.offTime + np.logspace(-4, -3, 10), 'z'
+            )
+            for waveform in self.waveforms
+        ]
+        srcList = [
+            EM.TDEM.Src.MagDipole(
+                [rx], waveform=waveform, loc=np.array([0., 0., 0.])
+            )
+            for rx, waveform in zip(rxList, self.waveforms)
+        ]
+        survey = EM.TDEM.Survey(srcList)
+        prb = EM.TDEM.Problem3D_b(
+            self.mesh, sigmaMap=get_mapping(self.mesh),
+            convolveWaveforms=True
+        )
+        prb.Solver = Solver
+        prb.pair(survey)
+        prb.scheduleTimeSteps(accuracy=0.2, nDt=4)
+        return prb
+
+    def test_Jvec(self):
+        prob, m = self.prob, self.m
+        f = prob.fields(m)
+        probfwd = self.get_prob()
+
+        def derChk(mx):
+            return [
+                probfwd.survey.dpred(mx),
+                lambda v: prob.Jvec(m, v, f=f)
+            ]
+        self.assertTrue(
+            Tests.checkDerivative(derChk, m, plotIt=False, num=2, eps=1e-20)
+        )
+
+    def test_Adjoint(self):
+        prob, m = self.prob, self.m
+        f = prob.fields(m)
+
+        v = np.random.rand(prob.sigmaMap.nP)
+        d = np.random.randn(prob.survey.nD)
+        V1 = d.dot(prob.Jvec(m, v, f=f))
+        V2 = v.dot(prob.Jtvec(m, d, f=f))
+        tol = TOL * (np.abs(V1) + np.abs(V2)) / 2.
+        self.assertTrue(
+            np.abs(V1-V2) < tol, 'Adjoint convolution: {} {}'.format(V1, V2)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps
+from SimPEG import EM
+
+try:
+    from pymatsolver import Pardiso as Solver
+except ImportError:
+    from SimPEG import SolverLU as Solver
+
+np.random.seed(42)
+
+
+def get_mesh():
+    cs, nc, npad = 10., 4, 2
+    h = [(cs, npad, -1.5), (cs, nc), (cs, npad, 1.5)]
+    return Mesh.TensorMesh([h, h, h], 'CCC')
+
+
+def get_mapping(mesh):
+    active = mesh.vectorCCz < 0.
+    actMap = Maps.InjectActiveCells(mesh, active, np.log(1e-8), nC=mesh.nCz)
+    return Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * actMap
+
+
+class TDEM_ParallelSources(unittest.TestCase):
+
+    def get_prob(self, formulation, rxcomp, nWorkers):
+        mesh = get_mesh()
+        rx = getattr(EM.TDEM.Rx, 'Point_{}'.format(rxcomp[:-1]))(
+            np.array([[15., 0., -1e-2]]), np.logspace(-4, -3, 5), rxcomp[-1]
+        )
+        srcList = [
+            EM.TDEM.Src.MagDipole([rx], loc=np.array([x, 1.3, 0.7]))
+            for x in [0., 5., 10., 15., 20.]
+        ]
+        prb = getattr(EM.TDEM, 'Problem3D_{}'.format(formulation))(
+            mesh, sigmaMap=get_mapping(mesh), nWorkers=nWorkers
+        )
+        prb.timeSteps = [(1e-5, 10), (5e-5, 10), (2.5e-4, 5)]
+        prb.Solver = Solver
+        prb.pair(EM.TDEM.Survey(srcList))
+        return prb
+
+    def compare(self, formulation, rxcomp):
+        out = []
+        for nWorkers in [1, 3]:
+            prb = self.get_prob(formulation, rxcomp, nWorkers)
+            m = np.log(1e-1)*np.ones(prb.sigmaMap.nP)
+            v = np.linspace(0.5, 1.5, prb.sigmaMap.nP)
+            w = np.linspace(-1., 1., prb.survey.nD)
+
+            f = prb.fields(m)
+            out.append([
+                prb.survey.dpred(m, f=f),
+                prb.Jvec(m, v, f=f),
+                prb.Jtvec(m, w, f=f)
+            ])
+
+        for serial, parallel in zip(*out):
+            self.assertTrue(
+                np.linalg.norm(serial - parallel) <
+                1e-10 * np.linalg.norm(serial)
+            )
+
+    def test_b_bz(self):
+        self.compare('b', 'bz')
+
+    def test_e_ey(self):
+        self.compare('e', 'ey')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from scipy.constants import mu_0
+from SimPEG import Mesh, Maps
+from SimPEG import EM
+
+
+def get_mesh():
+    cs, nc, npad = 10., 4, 2
+    h = [(cs, npad, -1.5), (cs, nc), (cs, npad, 1.5)]
+    return Mesh.TensorMesh([h, h, h], 'CCC')
+
+
+class TDEM_SourceTermCache(unittest.TestCase):
+
+    def setUp(self):
+        mesh = get_mesh()
+        rx = EM.TDEM.Rx.Point_e(
+            np.array([[15., 0., -1e-2]]), np.logspace(-4, -3, 5), 'x'
+        )
+        self.dipole = EM.TDEM.Src.MagDipole(
+            [rx], waveform=EM.TDEM.Src.RampOffWaveform(offTime=1e-4),
+            loc=np.array([0., 0., 0.])
+        )
+        self.line = EM.TDEM.Src.LineCurrent(
+            [rx], waveform=EM.TDEM.Src.VTEMWaveform(
+                offTime=1e-4, peakTime=5e-5
+            ),
+            loc=np.array([[-20., 0., 0.], [20., 0., 0.]])
+        )
+        survey = EM.TDEM.Survey([self.dipole, self.line])
+        self.prob = EM.TDEM.Problem3D_e(
+            mesh, sigmaMap=Maps.ExpMap(mesh)
+        )
+        self.prob.timeSteps = [(1e-5, 20), (5e-5, 10)]
+        self.prob.pair(survey)
+
+    def test_spatial_cache(self):
+        a = self.dipole._aSrc(self.prob)
+        self.assertTrue(a is self.dipole._aSrc(self.prob))
+        self.assertTrue(len(self.dipole._aSrcs) == 1)
+        self.assertTrue(
+            self.line.Mejs(self.prob) is self.line.Mejs(self.prob)
+        )
+
+        # a new mesh gets its own source terms
+        prob2 = EM.TDEM.Problem3D_e(get_mesh())
+        self.dipole._aSrc(prob2)
+        self.assertTrue(len(self.dipole._aSrcs) == 2)
+
+    def test_getSourceTerm(self):
+        for tInd in [0, 1, 5, 15, 25]:
+            s_m, s_e = self.prob.getSourceTerm(tInd)
+            for i, src in enumerate(self.prob.survey.srcList):
+                smi, sei = src.eval(self.prob, self.prob.times[tInd])
+                # source terms may be Zero()
+                self.assertTrue(np.allclose(s_m[:, i] - smi, 0.))
+                self.assertTrue(np.allclose(s_e[:, i] - sei, 0.))
+
+        self.assertTrue(
+            self.prob.getSourceSpatial()[1] is
+            self.prob.getSourceSpatial()[1]
+        )
+
+    def test_spatial_cache_updates(self):
+        mesh = get_mesh()
+        src = EM.TDEM.Src.MagDipole([], loc=np.r_[0., 0., 0.])
+        prob = EM.TDEM.Problem3D_b(mesh, sigma=1e-2*np.ones(mesh.nC))
+        prob.pair(EM.TDEM.Survey([src]))
+
+        def check():
+            S_e = prob.getSourceSpatial()[2][:, 0]
+            b = mesh.edgeCurl * src._getaSrc(prob)
+            self.assertTrue(np.allclose(
+                S_e, mesh.edgeCurl.T * (prob.MfMui * b), rtol=1e-12, atol=0.
+            ))
+
+        # the spatial parts include MfMui, a new permeability updates them
+        for mu in [mu_0, 2.*mu_0]:
+            prob.mu = mu*np.ones(mesh.nC)
+            check()
+
+        # so does moving the source
+        src.loc = np.r_[3., 2., 1.]
+        self.assertTrue(src._aSrcs is None)
+        check()
+
+    def test_batched_potentials(self):
+        mesh = get_mesh()
+        prob = EM.TDEM.Problem3D_b(mesh)
+        srcs = [
+            EM.TDEM.Src.MagDipole([], loc=loc, moment=moment)
+            for loc, moment in zip(np.random.randn(4, 3) * 5., [1., 2., 3., 4.])
+        ]
+        loop = EM.TDEM.Src.CircularLoop([], loc=np.r_[0., 0., 0.])
+        line = EM.TDEM.Src.LineCurrent([], loc=np.random.randn(3, 3) * 10.)
+        srcs = srcs + [loop, line]
+        a_srcs = EM.Utils.MagneticDipoleVectorPotentialCache(
+            srcs, prob, EM.TDEM.Src.MagDipole._srcFct, orientation=False
+        )
+        self.assertTrue(a_srcs[-1] is None)
+        for src, a in zip(srcs[:-1], a_srcs):
+            self.assertTrue(a is src._aSrcs[(mesh, 'EB')])
+            self.assertTrue(a is src._aSrc(prob))
+            self.assertTrue(np.allclose(a, src._getaSrc(prob)))
+
+    def test_batched_line_currents(self):
+        mesh = get_mesh()
+        prob = EM.TDEM.Problem3D_b(mesh)
+        srcs = [
+            EM.TDEM.Src.LineCurrent([], loc=np.random.randn(3, 3) * 10.)
+            for _ in range(3)
+        ]
+        EM.TDEM.SrcTDEM._cacheLineCurrents(srcs, prob)
+        for src in srcs:
+            Mejs = src.Mejs(prob)
+            self.assertTrue(Mejs is src._Mejs)
+            self.assertTrue(np.allclose(
+                Mejs, EM.Utils.getSourceTermLineCurrentPolygon(
+                    mesh.x0, mesh.hx, mesh.hy, mesh.hz,
+                    src.loc[:, 0], src.loc[:, 1], src.loc[:, 2]
+                )
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()
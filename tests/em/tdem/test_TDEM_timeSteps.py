@@ -0,0 +1,82 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps
+from SimPEG import EM
+from scipy.constants import mu_0
+
+try:
+    from pymatsolver import Pardiso as Solver
+except ImportError:
+    from SimPEG import SolverLU as Solver
+
+
+def get_mesh():
+    cs, ncx, ncz, npad = 5., 30, 10, 15
+    hx = [(cs, ncx), (cs, npad, 1.3)]
+    hz = [(cs, npad, -1.3), (cs, ncz), (cs, npad, 1.3)]
+    return Mesh.CylMesh([hx, 1, hz], '00C')
+
+
+def get_mapping(mesh):
+    active = mesh.vectorCCz < 0.
+    actMap = Maps.InjectActiveCells(mesh, active, np.log(1e-8), nC=mesh.nCz)
+    return Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) * actMap
+
+
+class TDEM_ScheduleTimeSteps(unittest.TestCase):
+
+    def test_waveform_breakpoints(self):
+        mesh = get_mesh()
+        waveform = EM.TDEM.Src.VTEMWaveform()
+        rx = EM.TDEM.Rx.Point_dbdt(
+            np.array([[50., 0., 0.]]),
+            waveform.offTime + np.logspace(-5, -3, 21), 'z'
+        )
+        src = EM.TDEM.Src.MagDipole(
+            [rx], waveform=waveform, loc=np.array([0., 0., 0.])
+        )
+        survey = EM.TDEM.Survey([src])
+        prb = EM.TDEM.Problem3D_b(mesh, sigmaMap=get_mapping(mesh))
+        prb.pair(survey)
+
+        schedule = prb.scheduleTimeSteps(accuracy=0.1, nDt=6)
+
+        self.assertTrue(prb.t0 == 0.)
+        self.assertTrue(prb.times[-1] >= rx.times.max())
+        for bp in [waveform.peakTime, waveform.offTime]:
+            self.assertTrue(np.min(np.abs(prb.times - bp)) < 1e-12)
+        self.assertTrue(len(set([dt for dt, _ in schedule])) <= 6 + 3)
+
+    def test_accuracy(self):
+        mesh = get_mesh()
+        sig_half = 1e-2
+        rx = EM.TDEM.Rx.Point_b(
+            np.array([[50., 0., 0.]]), np.logspace(-5, -4, 21), 'z'
+        )
+        src = EM.TDEM.Src.MagDipole([rx], loc=np.array([0., 0., 0.]))
+        survey = EM.TDEM.Survey([src])
+        prb = EM.TDEM.Problem3D_b(mesh, sigmaMap=get_mapping(mesh))
+        prb.Solver = Solver
+        prb.pair(survey)
+
+        prb.scheduleTimeSteps(accuracy=0.1)
+
+        sigma = np.ones(mesh.nCz)*1e-8
+        sigma[mesh.vectorCCz < 0.] = sig_half
+        m = np.log(sigma[mesh.vectorCCz < 0.])
+
+        bz_ana = mu_0*EM.Analytics.hzAnalyticDipoleT(
+            rx.locs[0][0]+1e-3, rx.times, sig_half
+        )
+        bz = survey.dpred(m)
+        err = np.linalg.norm(bz - bz_ana) / np.linalg.norm(bz_ana)
+        self.assertTrue(
+            err < 0.06, 'nT: {}, factorizations: {}, error: {}'.format(
+                prb.nT, len(np.unique(prb.timeSteps)), err
+            )
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+from scipy.constants import mu_0
+from SimPEG import Mesh, Maps, Utils
+from SimPEG.EM import FDEM
+from SimPEG.EM.Base import BaseEMProblem
+
+
+def get_meshes():
+    h = [(10., 2, -1.3), (10., 4), (10., 2, 1.3)]
+    return [
+        Mesh.TensorMesh([h, h, h], 'CCC'),
+        Mesh.TensorMesh([h, h], 'CC'),
+        Mesh.CylMesh([[(10., 6), (10., 2, 1.3)], 1, h], '00C'),
+    ]
+
+
+class MassMatrixTest(unittest.TestCase):
+
+    def compare(self, prob, props):
+        for projType, name in [('E', 'Edge'), ('F', 'Face')]:
+            for prop in props:
+                for invMat in [False, True]:
+                    M = prob._getMassMatrix(projType, prop, invMat=invMat)
+                    Mtrue = getattr(
+                        prob.mesh, 'get{}InnerProduct'.format(name)
+                    )(prop, invMat=invMat)
+                    self.assertTrue(
+                        np.abs(M - Mtrue).max() <=
+                        1e-12 * np.abs(Mtrue).max()
+                    )
+
+    def test_isotropic_anisotropic(self):
+        for mesh in get_meshes():
+            prob = BaseEMProblem(mesh)
+            self.compare(prob, [
+                np.random.rand(mesh.nC) + 1.,
+                np.random.rand(mesh.nC, mesh.dim) + 1.,
+                mu_0
+            ])
+            # the maps are only built once per mesh and property size
+            self.assertTrue(
+                prob._innerProductMap('E', np.ones(mesh.nC)) is
+                prob._innerProductMap('E', np.ones(mesh.nC) * 2.)
+            )
+
+    def test_model_update(self):
+        mesh = get_meshes()[0]
+        prob = BaseEMProblem(mesh, sigmaMap=Maps.ExpMap(mesh))
+        for m in [np.zeros(mesh.nC), np.random.randn(mesh.nC)]:
+            prob.model = m
+            for name, Mtrue in [
+                ('MeSigma', mesh.getEdgeInnerProduct(np.exp(m))),
+                ('MeSigmaI', mesh.getEdgeInnerProduct(
+                    np.exp(m), invMat=True
+                )),
+                ('MfRho', mesh.getFaceInnerProduct(np.exp(-m))),
+                ('MfRhoI', mesh.getFaceInnerProduct(
+                    np.exp(-m), invMat=True
+                )),
+            ]:
+                M = getattr(prob, name)
+                self.assertTrue(
+                    np.abs(M - Mtrue).max() <= 1e-12 * np.abs(Mtrue).max()
+                )
+
+    def test_property_update(self):
+        mesh = get_meshes()[0]
+        wires = Maps.Wires(('sigma', mesh.nC), ('mu', mesh.nC))
+        prob = FDEM.Problem3D_b(
+            mesh, sigmaMap=Maps.ExpMap(mesh) * wires.sigma, muMap=wires.mu
+        )
+        m = np.r_[np.zeros(mesh.nC), mu_0 * np.ones(mesh.nC)]
+        prob.model = m
+        MeSigma, MfMui = prob.MeSigma, prob.MfMui
+
+        # only mu changes, the conductivity mass matrices are kept
+        m = m.copy()
+        m[mesh.nC:] *= 2.
+        prob.model = m
+        self.assertTrue(prob.MeSigma is MeSigma)
+        self.assertTrue(prob.MfMui is not MfMui)
+        self.assertTrue(np.allclose(
+            prob.MfMui.diagonal(), 0.5 * MfMui.diagonal()
+        ))
+
+        MfMui = prob.MfMui
+        m = m.copy()
+        m[0] = 1.
+        prob.model = m
+        self.assertTrue(prob.MeSigma is not MeSigma)
+        self.assertTrue(prob.MfMui is MfMui)
+
+    def test_derivatives(self):
+        for mesh in get_meshes():
+            mapping = Maps.ExpMap(mesh)
+            prob = BaseEMProblem(mesh, sigmaMap=mapping)
+            for m in [np.zeros(mesh.nC), np.random.randn(mesh.nC)]:
+                prob.model = m
+                sigma = np.exp(m)
+                dsigma = mapping.deriv(m)
+                uE = np.random.rand(mesh.nE)
+                uF = np.random.rand(mesh.nF)
+                dMe = mesh.getEdgeInnerProductDeriv(sigma)(uE) * dsigma
+                dMf = mesh.getFaceInnerProductDeriv(1./sigma)(uF) * (
+                    Utils.sdiag(-1./sigma**2) * dsigma
+                )
+                for name, u, Dtrue in [
+                    ('MeSigmaDeriv', uE, dMe),
+                    ('MeSigmaIDeriv', uE, -prob.MeSigmaI**2 * dMe),
+                    ('MfRhoDeriv', uF, dMf),
+                    ('MfRhoIDeriv', uF, -prob.MfRhoI**2 * dMf),
+                ]:
+                    D = getattr(prob, name)(u)
+                    self.assertTrue(
+                        np.abs(D - Dtrue).max() <=
+                        1e-12 * np.abs(Dtrue).max()
+                    )
+
+                # the derivative of the mapping is only applied once per model
+                derivMap = prob._MeSigmaDerivMap
+                prob.MeSigmaDeriv(uE)
+                self.assertTrue(derivMap is prob._MeSigmaDerivMap)
+
+    def test_matrix_free_derivatives(self):
+        mesh = get_meshes()[0]
+        active = mesh.vectorCCz < 0.
+        mapping = (
+            Maps.ExpMap(mesh) * Maps.SurjectVertical1D(mesh) *
+            Maps.InjectActiveCells(mesh, active, np.log(1e-8), nC=mesh.nCz)
+        )
+        # the derivative of a parametrized layer takes no vector
+        layer = Maps.ExpMap(mesh) * Maps.ParametrizedLayer(mesh)
+        layerModel = np.r_[1e-2, 1e-1, -10., 15.]
+        for kwargs, m in [
+            ({'sigmaMap': mapping}, np.random.randn(mapping.nP)),
+            ({'rhoMap': mapping}, np.random.randn(mapping.nP)),
+            ({'sigmaMap': layer}, np.r_[np.log(layerModel[:2]), -10., 15.]),
+            ({'sigmaMap': Maps.ParametrizedLayer(mesh)}, layerModel)
+        ]:
+            prob = BaseEMProblem(mesh, **kwargs)
+            prob.model = m
+            nP = m.size
+            for name, n in [
+                ('MeSigmaDeriv', mesh.nE), ('MeSigmaIDeriv', mesh.nE),
+                ('MfRhoDeriv', mesh.nF), ('MfRhoIDeriv', mesh.nF)
+            ]:
+                u = np.random.rand(n)
+                D = getattr(prob, name)(u)
+                # vectors and blocks of vectors
+                for v, w in [
+                    (np.random.randn(nP), np.random.randn(n)),
+                    (np.random.randn(nP, 2), np.random.randn(n, 2))
+                ]:
+                    Dv = getattr(prob, name)(u, v)
+                    DTw = getattr(prob, name)(u, w, adjoint=True)
+                    self.assertTrue(Dv.shape == (D * v).shape)
+                    self.assertTrue(DTw.shape == (D.T * w).shape)
+                    self.assertTrue(
+                        np.abs(Dv - D * v).max() <=
+                        1e-12 * np.abs(D * v).max()
+                    )
+                    self.assertTrue(
+                        np.abs(DTw - D.T * w).max() <=
+                        1e-12 * np.abs(D.T * w).max()
+                    )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+from __future__ import division, print_function
+import unittest
+import numpy as np
+import scipy.sparse as sp
+from scipy.constants import mu_0
+from SimPEG import Mesh, Maps, Utils
+from SimPEG import EM
+from SimPEG.EM.Static import DC
+from SimPEG.EM.Utils import omega
+
+TOL = 1e-12
+
+
+def get_meshes():
+    h = [(10., 2, -1.3), (10., 4), (10., 2, 1.3)]
+    return [
+        Mesh.TensorMesh([h, h, h], 'CCC'),
+        Mesh.CylMesh([[(10., 6), (10., 2, 1.3)], 1, h], '00C'),
+    ]
+
+
+def fdemA(prob, freq):
+    C = prob.mesh.edgeCurl
+    iomega = 1j * omega(freq) * sp.eye(prob.mesh.nF)
+    if isinstance(prob, EM.FDEM.Problem3D_e):
+        return C.T*prob.MfMui*C + 1j*omega(freq)*prob.MeSigma
+    elif isinstance(prob, EM.FDEM.Problem3D_b):
+        A = C * (prob.MeSigmaI * (C.T * prob.MfMui)) + iomega
+        if prob._makeASymmetric:
+            return prob.MfMui.T*A
+        return A
+    elif isinstance(prob, EM.FDEM.Problem3D_j):
+        A = C * prob.MeMuI * C.T * prob.MfRho + iomega
+        if prob._makeASymmetric:
+            return prob.MfRho.T*A
+        return A
+    elif isinstance(prob, EM.FDEM.Problem3D_h):
+        return C.T * (prob.MfRho * C) + 1j*omega(freq)*prob.MeMu
+
+
+class SystemMatrixTest(unittest.TestCase):
+
+    def assertClose(self, A, Atrue):
+        self.assertTrue(
+            np.abs(A - Atrue).max() <= TOL * np.abs(Atrue).max()
+        )
+
+    def test_fdem(self):
+        for mesh in get_meshes():
+            for name in ['e', 'b', 'h', 'j']:
+                for muMap in [None, Maps.ExpMap(mesh)]:
+                    kwargs = {'sigmaMap': Maps.ExpMap(mesh)}
+                    if muMap is not None:
+                        kwargs = {
+                            'sigmaMap': Maps.ExpMap(mesh) * Maps.Projection(
+                                2*mesh.nC, slice(0, mesh.nC)
+                            ),
+                            'muMap': muMap * Maps.Projection(
+                                2*mesh.nC, slice(mesh.nC, 2*mesh.nC)
+                            )
+                        }
+                    prob = getattr(EM.FDEM, 'Problem3D_{}'.format(name))(
+                        mesh, **kwargs
+                    )
+                    for symmetric in [True, False]:
+                        setattr(prob, '__makeASymmetric', symmetric)
+                        prob._BaseEMProblem__makeASymmetric = symmetric
+                        self.assertTrue(prob._makeASymmetric is symmetric)
+                        for i in range(2):
+                            m = np.random.randn(mesh.nC) - 2.
+                            if muMap is not None:
+                                m = np.r_[m, np.log(mu_0) + np.random.rand(
+                                    mesh.nC
+                                )]
+                            prob.model = m
+                            for freq in [1., 1e3]:
+                                self.assertClose(
+                                    prob.getA(freq), fdemA(prob, freq)
+                                )
+
+    def test_dc(self):
+        mesh = get_meshes()[0]
+        for prob in [
+            DC.Problem3D_CC(mesh, rhoMap=Maps.ExpMap(mesh)),
+            DC.Problem3D_N(mesh, sigmaMap=Maps.ExpMap(mesh))
+        ]:
+            for i in range(2):
+                prob.model = np.random.randn(mesh.nC)
+                if isinstance(prob, DC.Problem3D_CC):
+                    Atrue = prob.Div * prob.MfRhoI * prob.Grad
+                else:
+                    G = mesh.nodalGrad
+                    Atrue = G.T * prob.MeSigma * G
+                Atrue = Atrue.tolil()
+                Atrue[0, :] = 0.
+                Atrue[0, 0] = 1.
+                self.assertClose(prob.getA(), Atrue)
+
+    def test_dc_2d(self):
+        hx = [(10., 2, -1.3), (10., 6), (10., 2, 1.3)]
+        mesh = Mesh.TensorMesh([hx, hx], 'CN')
+        prob = DC.Problem2D_N(mesh, sigmaMap=Maps.ExpMap(mesh))
+        prob.model = np.random.randn(mesh.nC)
+        G = mesh.nodalGrad
+        for ky in [1e-3, 1e-1]:
+            self.assertClose(
+                prob.getA(ky),
+                G.T * prob.MeSigma * G + ky**2 * prob.MnSigma
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
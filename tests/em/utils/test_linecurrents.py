@@ -1,6 +1,7 @@
 import numpy as np
 from SimPEG.EM.Utils.CurrentUtils import (
-    getStraightLineCurrentIntegral, getSourceTermLineCurrentPolygon
+    getStraightLineCurrentIntegral, getSourceTermLineCurrentPolygon,
+    getSourceTermLineCurrentPolygons
     )
 import unittest
 from SimPEG.Utils import io_utils
@@ -63,6 +64,48 @@ class LineCurrentTests(unittest.TestCase):
 
         self.assertTrue(passed)
 
+
+class LineCurrentPolygonsTests(unittest.TestCase):
+
+    def test_polygons(self):
+        hx = np.ones(10)*1.
+        hy = np.ones(10)*2.
+        hz = np.ones(10)*3.
+        xorig = np.r_[0., 0., 0.]
+        nEx, nEy = 10*11*11, 11*10*11
+
+        polygons = [
+            np.c_[[0, 3, 5], [0, 3, 5], [2., 3., 4.]],
+            np.c_[[1., 9., 9., 1., 1.], [2., 2., 18., 18., 2.], [6.] * 5],
+            np.c_[[0.5, 7.25], [4., 4.], [3., 3.]],
+        ]
+        S = getSourceTermLineCurrentPolygons(xorig, hx, hy, hz, polygons)
+        self.assertTrue(S.shape == (nEx + nEy + 11*11*10, 3))
+
+        for i, p in enumerate(polygons):
+            s = getSourceTermLineCurrentPolygon(
+                xorig, hx, hy, hz, p[:, 0], p[:, 1], p[:, 2]
+            )
+            self.assertTrue(np.allclose(S[:, i].toarray().flatten(), s))
+
+            # the edge basis functions are a partition of unity, so the
+            # currents on the x, y and z-edges add up to the extent of
+            # the polygon
+            for s_dim, extent in zip(
+                [s[:nEx], s[nEx:nEx+nEy], s[nEx+nEy:]], p[-1] - p[0]
+            ):
+                self.assertTrue(np.allclose(s_dim.sum(), extent))
+
+        # each segment piece integrated on its own
+        sx, sy, sz = getStraightLineCurrentIntegral(*[
+            np.ones(2) * v for v in [2, 2, 2, 0.1, 0.3, 0.4, 1, 0.8, 0.7]
+        ])
+        self.assertTrue(sx.shape == (4, 2))
+        self.assertTrue(np.allclose(
+            sx[:, 0], np.r_[0.475875, 0.176625, 0.176625, 0.070875]
+        ))
+
+
 if __name__ == '__main__':
     unittest.main()
 